@@ -3,7 +3,7 @@ from __future__ import annotations
 import copy
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Iterator, ValuesView
+from typing import Callable, Generic, Iterator, TypeVar, ValuesView
 
 from arcor2.data import common as cmn
 from arcor2.exceptions import Arcor2Exception
@@ -18,6 +18,89 @@ class CachedSceneException(Arcor2Exception):
     pass
 
 
+T = TypeVar("T")
+
+
+class _CowDict(dict[str, T], Generic[T]):
+    """Dict used by the Updateable* classes, with values shared with the
+    document it was created from.
+
+    A value is copied (using `copier`) when it is accessed for the first time, so the shared one is never modified.
+    Values which were set or copied are "owned" by the dict.
+    """
+
+    __slots__ = ("_owned", "_copier")
+
+    def __init__(self, data: dict[str, T], copier: Callable[[T], T]) -> None:
+        super().__init__(data)
+        self._owned: set[str] = set()
+        self._copier = copier
+
+    def __getitem__(self, key: str) -> T:
+        value = super().__getitem__(key)
+
+        if key not in self._owned:
+            value = self._copier(value)
+            super().__setitem__(key, value)
+            self._owned.add(key)
+
+        return value
+
+    def __setitem__(self, key: str, value: T) -> None:
+        super().__setitem__(key, value)
+        self._owned.add(key)
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._owned.discard(key)
+
+    def get(self, key: str, default=None):  # type: ignore[override]
+        if key in self:
+            return self[key]
+        return default
+
+    def setdefault(self, key: str, default: T) -> T:  # type: ignore[override]
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: str, *args):  # type: ignore[override]
+        if key in self:
+            value = self[key]  # the removed value might be still used (e.g. sent in an event)
+            del self[key]
+            return value
+        return super().pop(key, *args)
+
+    def clear(self) -> None:
+        super().clear()
+        self._owned.clear()
+
+    def values(self):  # type: ignore[override]
+        return [self[key] for key in self]
+
+    def items(self):  # type: ignore[override]
+        return [(key, self[key]) for key in self]
+
+    def detached(self, copier: Callable[[T], T]) -> dict[str, T]:
+        """Returns a plain dict that can be used independently on this one.
+
+        Owned values (which might be modified later) are copied using
+        `copier`, the rest is shared.
+        """
+
+        return {key: copier(value) if key in self._owned else value for key, value in dict.items(self)}
+
+
+def _detached(data: dict[str, T], copier: Callable[[T], T] = copy.deepcopy) -> dict[str, T]:
+    if isinstance(data, _CowDict):
+        return data.detached(copier)
+    return dict(data)
+
+
+def _copy_index(index: dict[str, dict[str, None]]) -> dict[str, dict[str, None]]:
+    return _detached(index, dict)
+
+
 class CachedBase:
     __slots__ = "id", "name", "description", "created", "modified", "int_modified"
 
@@ -60,15 +143,22 @@ class UpdateableMixin(CachedBase):
 
 
 class CachedScene(CachedBase):
-    __slots__ = ("_objects", "_object_types")
+    __slots__ = ("_objects", "_objects_by_type", "_object_names")
 
     def __init__(self, scene: cmn.Scene | CachedScene) -> None:
         super().__init__(scene)
 
         self._objects: dict[str, cmn.SceneObject] = {}
 
+        # secondary indexes, maintained together with _objects
+        self._objects_by_type: dict[str, dict[str, None]] = {}  # type -> ids
+        self._object_names: dict[str, str] = {}  # name -> id, names might be changed in place (see _object_id)
+
         if isinstance(scene, CachedScene):
-            self._objects = scene._objects
+            # objects modified by UpdateableCachedScene are copied, the rest is shared
+            self._objects = _detached(scene._objects)
+            self._objects_by_type = _copy_index(scene._objects_by_type)
+            self._object_names = dict(scene._object_names)
         else:
             # TODO deal with children
 
@@ -77,15 +167,45 @@ class CachedScene(CachedBase):
                     raise CachedSceneException(f"Duplicate object id: {obj.id}.")
 
                 self._objects[obj.id] = obj
+                self._index_object(obj)
+
+    def _index_object(self, obj: cmn.SceneObject) -> None:
+        self._objects_by_type.setdefault(obj.type, {})[obj.id] = None
+        self._object_names.setdefault(obj.name, obj.id)
+
+    def _unindex_object(self, obj: cmn.SceneObject) -> None:
+        of_type = self._objects_by_type[obj.type]
+        del of_type[obj.id]
+        if not of_type:
+            del self._objects_by_type[obj.type]
+
+        if self._object_names.get(obj.name) == obj.id:
+            del self._object_names[obj.name]
+
+    def _object_id(self, name: str) -> None | str:
+        """Finds object by name using the index, which is rebuilt when
+        outdated (e.g. after an object was renamed)."""
+
+        obj_id = self._object_names.get(name)
+
+        if obj_id is not None and obj_id in self._objects and dict.__getitem__(self._objects, obj_id).name == name:
+            return obj_id
+
+        if not any(obj.name == name for obj in dict.values(self._objects)):
+            return None
+
+        self._object_names.clear()
+        for obj in dict.values(self._objects):
+            self._object_names.setdefault(obj.name, obj.id)
 
-        self._object_types = {obj.type for obj in self.objects}
+        return self._object_names[name]
 
     @property
     def bare(self) -> cmn.BareScene:
         return cmn.BareScene(self.name, self.description, self.created, self.modified, self.int_modified, id=self.id)
 
     def object_names(self) -> Iterator[str]:
-        for obj in self._objects.values():
+        for obj in dict.values(self._objects):
             yield obj.name
 
     @property
@@ -104,21 +224,19 @@ class CachedScene(CachedBase):
             raise Arcor2Exception(f"Object ID {object_id} not found.")
 
     def objects_of_type(self, obj_type: str) -> Iterator[cmn.SceneObject]:
-        for obj in self.objects:
-            if obj.type == obj_type:
-                yield obj
+        for obj_id in dict.get(self._objects_by_type, obj_type, ()):
+            yield self._objects[obj_id]
 
     @property
     def object_types(self) -> set[str]:
-        assert self._object_types == {obj.type for obj in self.objects}
-        return self._object_types
+        return set(self._objects_by_type)
 
     @property
     def scene(self) -> cmn.Scene:
         sc = cmn.Scene.from_bare(self.bare)
         sc.modified = self.modified
         sc.int_modified = self.int_modified
-        sc.objects = list(self.objects)
+        sc.objects = list(dict.values(self._objects))
         return sc
 
     def get_object_by_name(self, object_method: str) -> str:
@@ -131,6 +249,13 @@ class CachedScene(CachedBase):
         :return:    Object_id/method for example "obj_123456789abc/pick"
         """
 
+        # usually, there is the object name followed by the method name
+        obj_id = self._object_id(object_method.partition(".")[0])
+
+        if obj_id is not None:
+            scene_object = self._objects[obj_id]
+            return object_method.replace(scene_object.name + ".", (scene_object.id + "/"))
+
         # looking for object
         for scene_object in self.objects:
             if object_method.find(scene_object.name + ".") != -1:
@@ -146,11 +271,20 @@ class UpdateableCachedScene(CachedScene, UpdateableMixin):
     __slots__ = ()
 
     def __init__(self, scene: cmn.Scene | CachedScene):
-        super().__init__(copy.deepcopy(scene))
+        """Objects are shared with the given scene and copied on first
+        access, so opening or cloning a scene does not copy all of them."""
+
+        super().__init__(scene)
+
+        self._objects = _CowDict(self._objects, copy.deepcopy)
+        self._objects_by_type = _CowDict(self._objects_by_type, dict)
 
     def upsert_object(self, obj: cmn.SceneObject) -> None:
+        if obj.id in self._objects:
+            self._unindex_object(dict.__getitem__(self._objects, obj.id))
+
         self._objects[obj.id] = obj
-        self._object_types.add(obj.type)
+        self._index_object(obj)
         self.update_modified()
 
     def delete_object(self, obj_id: str) -> None:
@@ -159,11 +293,7 @@ class UpdateableCachedScene(CachedScene, UpdateableMixin):
         except KeyError as e:
             raise Arcor2Exception("Object id not found.") from e
 
-        if not any(True for _ in self.objects_of_type(obj.type)):
-            self._object_types.discard(obj.type)
-
-        assert self._object_types == {obj.type for obj in self.objects}
-
+        self._unindex_object(obj)
         self.update_modified()
 
 
@@ -177,6 +307,22 @@ class Parent:
 
     ap: cmn.BareActionPoint
 
+    def rebound(self: P, ap: cmn.BareActionPoint, copy_item: bool = False) -> P:
+        """Returns the same entry for the given AP object, optionally with a
+        copy of the action/joints/orientation."""
+
+        ret = copy.copy(self)
+        ret.ap = ap
+
+        if copy_item:
+            for slot in type(self).__slots__:
+                setattr(ret, slot, copy.deepcopy(getattr(self, slot)))
+
+        return ret
+
+
+P = TypeVar("P", bound=Parent)
+
 
 @dataclass
 class ApAction(Parent):
@@ -199,6 +345,17 @@ class ApOrientation(Parent):
     orientation: cmn.NamedOrientation
 
 
+def _detached_children(data: dict[str, P], aps: dict[str, cmn.BareActionPoint]) -> dict[str, P]:
+    ret = _detached(data, lambda value: value.rebound(aps[value.ap.id], copy_item=True))
+
+    # entries of modified (and therefore copied) APs have to refer to the copies
+    for key, value in ret.items():
+        if value.ap is not aps[value.ap.id]:
+            ret[key] = value.rebound(aps[value.ap.id])
+
+    return ret
+
+
 class CachedProject(CachedBase):
     __slots__ = (
         "scene_id",
@@ -212,7 +369,12 @@ class CachedProject(CachedBase):
         "_functions",
         "overrides",
         "_childs",
+        "_logic_by_start",
+        "_logic_by_end",
+        "_logic_keys",
+        "_action_names",
         "project_objects_ids",
+        "_abs_poses",
     )
 
     def __init__(self, project: cmn.Project | CachedProject):
@@ -234,18 +396,34 @@ class CachedProject(CachedBase):
 
         self.overrides: dict[str, list[cmn.Parameter]] = {}
 
-        self._childs: dict[str, set[str]] = {}
+        # values are not used, dict keeps the insertion order (unlike set)
+        self._childs: dict[str, dict[str, None]] = {}
+
+        # secondary indexes of logic items (by action id from start/end) and actions (by name)
+        self._logic_by_start: dict[str, dict[str, None]] = {}
+        self._logic_by_end: dict[str, dict[str, None]] = {}
+        self._logic_keys: dict[str, tuple[str, str]] = {}  # logic item id -> (start, end) used for indexing
+        self._action_names: dict[str, str] = {}  # name -> id, names might be changed in place (see action_from_name)
+
+        # memoized absolute poses (see arcor2.transformations), by AP id (position and orientation of its frame)
+        # or orientation id, not shared with the source project as the scene might have been changed meanwhile
+        self._abs_poses: dict[str, cmn.Pose] = {}
 
         if isinstance(project, CachedProject):
-            self._action_points = project._action_points
-            self._actions = project._actions
-            self._joints = project._joints
-            self._orientations = project._orientations
-            self._parameters = project._parameters
-            self._logic_items = project._logic_items
-            self._functions = project._functions
-            self.overrides = project.overrides
-            self._childs = project._childs
+            # items modified by UpdateableCachedProject are copied, the rest is shared
+            self._action_points = _detached(project._action_points)
+            self._actions = _detached_children(project._actions, self._action_points)
+            self._joints = _detached_children(project._joints, self._action_points)
+            self._orientations = _detached_children(project._orientations, self._action_points)
+            self._parameters = _detached(project._parameters)
+            self._logic_items = _detached(project._logic_items)
+            self._functions = _detached(project._functions)
+            self.overrides = _detached(project.overrides)
+            self._childs = _copy_index(project._childs)
+            self._logic_by_start = _copy_index(project._logic_by_start)
+            self._logic_by_end = _copy_index(project._logic_by_end)
+            self._logic_keys = dict(project._logic_keys)
+            self._action_names = dict(project._action_names)
 
         else:
             for ap in project.action_points:
@@ -261,6 +439,7 @@ class CachedProject(CachedBase):
                         raise CachedProjectException(f"Duplicate action id: {ac.id}.")
 
                     self._actions[ac.id] = ApAction(bare_ap, ac)
+                    self._action_names.setdefault(ac.name, ac.id)
                     self._upsert_child(ap.id, ac.id)
 
                 for joints in ap.robot_joints:
@@ -285,10 +464,26 @@ class CachedProject(CachedBase):
 
             for logic_item in project.logic:
                 self._logic_items[logic_item.id] = logic_item
+                self._index_logic_item(logic_item)
 
             for function in project.functions:
                 self._functions[function.id] = function
 
+    def _index_logic_item(self, logic_item: cmn.LogicItem) -> None:
+        start = logic_item.parse_start().start_action_id
+        self._logic_by_start.setdefault(start, {})[logic_item.id] = None
+        self._logic_by_end.setdefault(logic_item.end, {})[logic_item.id] = None
+        self._logic_keys[logic_item.id] = start, logic_item.end
+
+    def _unindex_logic_item(self, logic_item_id: str) -> None:
+        start, end = self._logic_keys.pop(logic_item_id)
+
+        for index, key in ((self._logic_by_start, start), (self._logic_by_end, end)):
+            items = index[key]
+            del items[logic_item_id]
+            if not items:
+                del index[key]
+
     @property
     def logic(self) -> ValuesView[cmn.LogicItem]:
         return self._logic_items.values()
@@ -313,17 +508,24 @@ class CachedProject(CachedBase):
     def project(self) -> cmn.Project:
         proj = cmn.Project.from_bare(self.bare)
 
-        for bare_ap in self._action_points.values():
+        # dict methods are used directly, so the items are not copied by UpdateableCachedProject
+        for bare_ap in dict.values(self._action_points):
             ap = cmn.ActionPoint.from_bare(bare_ap)
-            ap.actions = self.ap_actions(ap.id)
-            ap.robot_joints = self.ap_joints(ap.id)
-            ap.orientations = self.ap_orientations(ap.id)
+
+            for ch in dict.get(self._childs, ap.id, ()):
+                if ch in self._actions:
+                    ap.actions.append(dict.__getitem__(self._actions, ch).action)
+                elif ch in self._joints:
+                    ap.robot_joints.append(dict.__getitem__(self._joints, ch).joints)
+                elif ch in self._orientations:
+                    ap.orientations.append(dict.__getitem__(self._orientations, ch).orientation)
+
             proj.action_points.append(ap)
 
-        proj.object_overrides = [cmn.SceneObjectOverride(k, v) for k, v in self.overrides.items()]
-        proj.parameters = list(self.parameters)
-        proj.functions = list(self.functions)
-        proj.logic = list(self.logic)
+        proj.object_overrides = [cmn.SceneObjectOverride(k, v) for k, v in dict.items(self.overrides)]
+        proj.parameters = list(dict.values(self._parameters))
+        proj.functions = list(dict.values(self._functions))
+        proj.logic = list(dict.values(self._logic_items))
         proj.project_objects_ids = self.project_objects_ids
         return proj
 
@@ -355,11 +557,11 @@ class CachedProject(CachedBase):
 
     @property
     def action_names(self) -> set[str]:
-        return {value.action.name for value in self._actions.values()}
+        return {value.action.name for value in dict.values(self._actions)}
 
     @property
     def action_points_names(self) -> set[str]:
-        return {ap.name for ap in self._action_points.values()}
+        return {ap.name for ap in dict.values(self._action_points)}
 
     @property
     def action_points_ids(self) -> set[str]:
@@ -392,13 +594,15 @@ class CachedProject(CachedBase):
         return cmn.Pose(ap.position, ori.orientation)
 
     def ap_orientations(self, ap_id: str) -> list[cmn.NamedOrientation]:
-        return [value.orientation for value in self._orientations.values() if ap_id == value.ap.id]
+        return [
+            self._orientations[ch].orientation for ch in dict.get(self._childs, ap_id, ()) if ch in self._orientations
+        ]
 
     def ap_joints(self, ap_id: str) -> list[cmn.ProjectRobotJoints]:
-        return [value.joints for value in self._joints.values() if ap_id == value.ap.id]
+        return [self._joints[ch].joints for ch in dict.get(self._childs, ap_id, ()) if ch in self._joints]
 
     def ap_actions(self, ap_id: str) -> list[cmn.Action]:
-        return [value.action for value in self._actions.values() if ap_id == value.ap.id]
+        return [self._actions[ch].action for ch in dict.get(self._childs, ap_id, ()) if ch in self._actions]
 
     def ap_action_ids(self, ap_id: str) -> set[str]:
         return {ac.id for ac in self.ap_actions(ap_id)}
@@ -432,15 +636,8 @@ class CachedProject(CachedBase):
         :return:
         """
 
-        inputs: list[cmn.LogicItem] = []
-        outputs: list[cmn.LogicItem] = []
-
-        for item in self._logic_items.values():
-            parsed_start = item.parse_start()
-            if parsed_start.start_action_id == action_id:
-                outputs.append(item)
-            if item.end == action_id:
-                inputs.append(item)
+        inputs = [self._logic_items[li_id] for li_id in dict.get(self._logic_by_end, action_id, ())]
+        outputs = [self._logic_items[li_id] for li_id in dict.get(self._logic_by_start, action_id, ())]
 
         if __debug__:  # make it a bit harder for tests to succeed
             random.shuffle(inputs)
@@ -449,18 +646,15 @@ class CachedProject(CachedBase):
         return inputs, outputs
 
     def first_action_id(self) -> str:
-        first_action: None | str = None
-
-        for item in self._logic_items.values():
-            if item.start == item.START:
-                if first_action:
-                    raise CachedProjectException("Duplicate start.")
-                first_action = self.action(item.end).id
+        starts = dict.get(self._logic_by_start, cmn.LogicItem.START, {})
 
-        if first_action is None:
+        if not starts:
             raise CachedProjectException("Start action not found.")
 
-        return first_action
+        if len(starts) > 1:
+            raise CachedProjectException("Duplicate start.")
+
+        return self.action(dict.__getitem__(self._logic_items, next(iter(starts))).end).id
 
     def action_point_and_action(self, action_id: str) -> tuple[cmn.BareActionPoint, cmn.Action]:
         try:
@@ -538,29 +732,63 @@ class CachedProject(CachedBase):
     def _upsert_child(self, parent: None | str, child: str) -> None:
         if parent:
             if parent not in self._childs:
-                self._childs[parent] = set()
-            self._childs[parent].add(child)
+                self._childs[parent] = {}
+            self._childs[parent][child] = None
 
     def childs(self, obj_id: str, recursive: bool = False) -> set[str]:
         try:
-            ret = self._childs[obj_id]
+            ret = set(dict.__getitem__(self._childs, obj_id))
         except KeyError:
             return set()  # TODO distinguish between no childs and unknown object
 
         if not recursive:
             return ret
 
-        return ret | {c for s in [self.childs(ch, True) for ch in ret] for c in s}
+        stack = list(ret)
+        while stack:
+            for child in dict.get(self._childs, stack.pop(), ()):
+                if child not in ret:
+                    ret.add(child)
+                    stack.append(child)
+
+        return ret
 
     def _remove_child(self, parent: None | str, child: str) -> None:
         if parent and parent in self._childs:
-            self._childs[parent].remove(child)
+            del self._childs[parent][child]
             if not self._childs[parent]:
                 del self._childs[parent]
 
     def update_child(self, obj_id: str, old_parent: None | str, new_parent: None | str) -> None:
         self._remove_child(old_parent, obj_id)
         self._upsert_child(new_parent, obj_id)
+        self.invalidate_abs_poses(obj_id)
+
+    def abs_pose(self, obj_id: str) -> None | cmn.Pose:
+        """Returns memoized absolute pose of AP/orientation (if any)."""
+
+        return self._abs_poses.get(obj_id)
+
+    def set_abs_pose(self, obj_id: str, pose: cmn.Pose) -> None:
+        self._abs_poses[obj_id] = pose
+
+    def invalidate_abs_poses(self, obj_id: None | str = None) -> None:
+        """Removes memoized absolute poses of the given object/AP/orientation
+        and all its descendants (or all of them).
+
+        Has to be called when something is modified in place, e.g. pose of a scene object.
+        """
+
+        if obj_id is None:
+            self._abs_poses.clear()
+            return
+
+        if not self._abs_poses:
+            return
+
+        self._abs_poses.pop(obj_id, None)
+        for child_id in self.childs(obj_id, recursive=True):
+            self._abs_poses.pop(child_id, None)
 
     def find_logic_start_end(self, start: str, end: str) -> cmn.LogicItem:
         """find specific LogicItem with start parameter and end parameter.
@@ -571,15 +799,26 @@ class CachedProject(CachedBase):
         :return:   Found LogicItem
         """
 
-        for logic_item in self.logic:
-            if start == logic_item.start and end == logic_item.end:
-                return logic_item
+        for logic_item_id in dict.get(self._logic_by_end, end, ()):
+            if start == dict.__getitem__(self._logic_items, logic_item_id).start:
+                return self._logic_items[logic_item_id]
         raise CachedProjectException(f"LogicItem in project {self.name} not found.")
 
     def action_from_name(self, name: str) -> cmn.Action:
-        for action in self.actions:
-            if name == action.name:
-                return action
+        action_id = self._action_names.get(name)
+
+        if action_id is not None and action_id in self._actions:
+            if dict.__getitem__(self._actions, action_id).action.name == name:
+                return self.action(action_id)
+
+        # the index is outdated (action renamed in place) or the name does not exist
+        for value in dict.values(self._actions):
+            if name == value.action.name:
+                self._action_names.clear()
+                for other in dict.values(self._actions):
+                    self._action_names.setdefault(other.action.name, other.action.id)
+                return self.action(value.action.id)
+
         raise CachedProjectException(f"Action {name} in project {self.name} not found.")
 
 
@@ -587,17 +826,38 @@ class UpdateableCachedProject(CachedProject, UpdateableMixin):
     __slots__ = ()
 
     def __init__(self, project: cmn.Project | CachedProject):
-        super().__init__(copy.deepcopy(project))
+        """Items are shared with the given project and copied on first
+        access, so opening, saving or cloning a project does not copy all of
+        them."""
+
+        super().__init__(project)
+
+        self._action_points = _CowDict(self._action_points, copy.deepcopy)
+        self._actions = _CowDict(self._actions, self._copy_child)
+        self._joints = _CowDict(self._joints, self._copy_child)
+        self._orientations = _CowDict(self._orientations, self._copy_child)
+        self._parameters = _CowDict(self._parameters, copy.deepcopy)
+        self._logic_items = _CowDict(self._logic_items, copy.deepcopy)
+        self._functions = _CowDict(self._functions, copy.deepcopy)
+        self.overrides = _CowDict(self.overrides, copy.deepcopy)
+        self._childs = _CowDict(self._childs, dict)
+        self._logic_by_start = _CowDict(self._logic_by_start, dict)
+        self._logic_by_end = _CowDict(self._logic_by_end, dict)
+
+    def _copy_child(self, value: P) -> P:
+        return value.rebound(self._action_points[value.ap.id], copy_item=True)
 
     def upsert_action(self, ap_id: str, action: cmn.Action) -> None:
         ap = self.bare_action_point(ap_id)
 
         if action.id in self._actions:
-            assert self._actions[action.id].ap == ap
-            self._actions[action.id].action = action
-        else:
-            self._actions[action.id] = ApAction(ap, action)
+            current = dict.__getitem__(self._actions, action.id)
+            assert current.ap.id == ap.id
+            self._remove_action_name(current.action)
+
+        self._actions[action.id] = ApAction(ap, action)
 
+        self._action_names.setdefault(action.name, action.id)
         self._upsert_child(ap.id, action.id)
         self.update_modified()
 
@@ -607,10 +867,15 @@ class UpdateableCachedProject(CachedProject, UpdateableMixin):
         except KeyError as e:
             raise CachedProjectException("Action not found.") from e
 
+        self._remove_action_name(value.action)
         self._remove_child(value.ap.id, action_id)
         self.update_modified()
         return value.action
 
+    def _remove_action_name(self, action: cmn.Action) -> None:
+        if self._action_names.get(action.name) == action.id:
+            del self._action_names[action.name]
+
     def invalidate_joints(self, ap_id: str) -> None:
         for joints in self.ap_joints(ap_id):
             joints.is_valid = False
@@ -619,18 +884,19 @@ class UpdateableCachedProject(CachedProject, UpdateableMixin):
         ap = self.bare_action_point(ap_id)
         ap.position = position
         self.invalidate_joints(ap_id)
+        self.invalidate_abs_poses(ap_id)
         self.update_modified()
 
     def upsert_orientation(self, ap_id: str, orientation: cmn.NamedOrientation) -> None:
         ap = self.bare_action_point(ap_id)
 
         if orientation.id in self._orientations:
-            assert self._orientations[orientation.id].ap == ap
-            self._orientations[orientation.id].orientation = orientation
-        else:
-            self._orientations[orientation.id] = ApOrientation(ap, orientation)
+            assert dict.__getitem__(self._orientations, orientation.id).ap.id == ap.id
+
+        self._orientations[orientation.id] = ApOrientation(ap, orientation)
 
         self._upsert_child(ap_id, orientation.id)
+        self.invalidate_abs_poses(orientation.id)
         self.update_modified()
 
     def remove_orientation(self, orientation_id: str) -> cmn.NamedOrientation:
@@ -639,6 +905,7 @@ class UpdateableCachedProject(CachedProject, UpdateableMixin):
         except KeyError as e:
             raise CachedProjectException("Orientation not found.") from e
 
+        self.invalidate_abs_poses(orientation_id)
         self._remove_child(value.ap.id, orientation_id)
         self.update_modified()
         return value.orientation
@@ -647,10 +914,9 @@ class UpdateableCachedProject(CachedProject, UpdateableMixin):
         ap = self.bare_action_point(ap_id)
 
         if joints.id in self._joints:
-            assert self._joints[joints.id].ap == ap
-            self._joints[joints.id].joints = joints
-        else:
-            self._joints[joints.id] = ApJoints(ap, joints)
+            assert dict.__getitem__(self._joints, joints.id).ap.id == ap.id
+
+        self._joints[joints.id] = ApJoints(ap, joints)
 
         self._upsert_child(ap_id, joints.id)
         self.update_modified()
@@ -681,20 +947,21 @@ class UpdateableCachedProject(CachedProject, UpdateableMixin):
             ap = cmn.BareActionPoint(name, position, parent, id=ap_id)
             self._action_points[ap_id] = ap
         self._upsert_child(parent, ap_id)
+        self.invalidate_abs_poses(ap_id)
         self.update_modified()
         return ap
 
     def remove_action_point(self, ap_id: str) -> cmn.BareActionPoint:
         ap = self.bare_action_point(ap_id)
+        self.invalidate_abs_poses(ap_id)
 
-        for action in self.ap_actions(ap_id):
-            self.remove_action(action.id)
-
-        for joints in self.ap_joints(ap_id):
-            self.remove_joints(joints.id)
-
-        for ori in self.ap_orientations(ap_id):
-            self.remove_orientation(ori.id)
+        for ch in list(dict.get(self._childs, ap_id, ())):
+            if ch in self._actions:
+                self.remove_action(ch)
+            elif ch in self._joints:
+                self.remove_joints(ch)
+            elif ch in self._orientations:
+                self.remove_orientation(ch)
 
         self._remove_child(ap.parent, ap_id)
         del self._action_points[ap_id]
@@ -702,7 +969,11 @@ class UpdateableCachedProject(CachedProject, UpdateableMixin):
         return ap
 
     def upsert_logic_item(self, logic_item: cmn.LogicItem) -> None:
+        if logic_item.id in self._logic_items:
+            self._unindex_logic_item(logic_item.id)
+
         self._logic_items[logic_item.id] = logic_item
+        self._index_logic_item(logic_item)
         self.update_modified()
 
     def remove_logic_item(self, logic_item_id: str) -> cmn.LogicItem:
@@ -710,11 +981,15 @@ class UpdateableCachedProject(CachedProject, UpdateableMixin):
             logic_item = self._logic_items.pop(logic_item_id)
         except KeyError as e:
             raise CachedProjectException("Logic item not found.") from e
+        self._unindex_logic_item(logic_item_id)
         self.update_modified()
         return logic_item
 
     def clear_logic(self) -> None:
         self._logic_items.clear()
+        self._logic_by_start.clear()
+        self._logic_by_end.clear()
+        self._logic_keys.clear()
         self.update_modified()
 
     def upsert_parameter(self, parameter: cmn.ProjectParameter) -> None:
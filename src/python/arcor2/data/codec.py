@@ -0,0 +1,336 @@
+"""Fast (de)serialization of JsonSchemaMixin dataclasses.
+
+A codec is generated once for each class (on the first use). For each
+field, a specialized encoder/decoder is prepared based on the field type,
+so there is no type introspection per call. Keys are converted to/from
+camelCase (optionally) as part of that, without an additional recursive
+pass over the data (humps). Validation against the JSON schema is
+optional.
+
+Differences from to_dict/from_dict (+humps): overridden to_dict methods
+are not used and keys of dict-typed fields are not converted.
+"""
+
+from __future__ import annotations
+
+import threading
+import types
+from collections import abc
+from dataclasses import MISSING
+from enum import Enum
+from typing import Any, Callable, Generic, Iterable, TypeVar, Union, get_args, get_origin
+
+import fastjsonschema
+import humps
+import orjson
+from dataclasses_jsonschema import JsonSchemaMixin
+
+from arcor2.data import DataException
+
+T = TypeVar("T", bound=JsonSchemaMixin)
+
+Encoder = Callable[[Any], Any]
+Decoder = Callable[[Any], Any]
+
+_DUMPS_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+_SEQUENCES = (list, tuple, set, frozenset, abc.Sequence)
+_MAPPINGS = (dict, abc.Mapping)
+_UNIONS = (Union, types.UnionType)
+
+
+class CodecException(DataException):
+    """Invalid JSON or data not matching the class."""
+
+
+class Codec(Generic[T]):
+    def __init__(self, cls: type[T], camel: bool = True) -> None:
+        self.cls = cls
+        self.camel = camel
+
+        self._fields: list[tuple[str, str, Encoder | None]] = []
+        # name, key, alternative key, decoder, required, init
+        self._decoders: list[tuple[str, str, str | None, Decoder | None, bool, bool]] = []
+
+        for jf in cls._get_fields():
+            f = jf.field
+            key = humps.camelize(jf.mapped_name) if camel else jf.mapped_name
+            alt_key = jf.mapped_name if key != jf.mapped_name else None
+            required = f.default is MISSING and f.default_factory is MISSING
+
+            self._fields.append((f.name, key, self._encoder(f.type)))
+            self._decoders.append((f.name, key, alt_key, self._decoder(f.name, f.type), required, f.init))
+
+        self._validator: None | Callable[[Any], Any] = None
+        self._validator_lock = threading.Lock()
+
+    # ------------------------------------------------------------------------------------------------ public interface
+
+    def to_dict(self, obj: T) -> dict[str, Any]:
+        """Returns JSON-compatible dict (None values are omitted)."""
+
+        data: dict[str, Any] = {}
+
+        for name, key, encoder in self._fields:
+            value = getattr(obj, name)
+
+            if value is None:
+                continue
+
+            data[key] = value if encoder is None else encoder(value)
+
+        return data
+
+    def dumps(self, obj: T) -> bytes:
+        return orjson.dumps(self.to_dict(obj), option=_DUMPS_OPTIONS)
+
+    def dumps_list(self, objs: Iterable[T]) -> bytes:
+        return orjson.dumps([self.to_dict(obj) for obj in objs], option=_DUMPS_OPTIONS)
+
+    def from_dict(self, data: Any, validate: bool = False) -> T:
+        if validate:
+            self.validate(data)
+
+        try:
+            return self._decode(data)
+        except (TypeError, ValueError, AttributeError, KeyError) as e:
+            raise CodecException(f"Invalid data for {self.cls.__name__}. {str(e)}") from e
+
+    def from_list(self, data: Any, validate: bool = False) -> list[T]:
+        if not isinstance(data, list):
+            raise CodecException("Not a list.")
+
+        return [self.from_dict(item, validate) for item in data]
+
+    def loads(self, data: bytes | str, validate: bool = False) -> T:
+        return self.from_dict(_loads(data), validate)
+
+    def loads_list(self, data: bytes | str, validate: bool = False) -> list[T]:
+        return self.from_list(_loads(data), validate)
+
+    def validate(self, data: Any) -> None:
+        """Validates data against JSON schema of the class (compiled on the
+        first use)."""
+
+        if self._validator is None:
+            with self._validator_lock:
+                if self._validator is None:
+                    self._validator = self._compile_schema()
+
+        try:
+            self._validator(data)
+        except fastjsonschema.JsonSchemaException as e:
+            raise CodecException(f"Invalid data for {self.cls.__name__}. {str(e)}") from e
+
+    # ------------------------------------------------------------------------------------------------------- internals
+
+    def _decode(self, data: dict[str, Any]) -> T:
+        init_values: dict[str, Any] = {}
+        non_init_values: dict[str, Any] = {}
+
+        for name, key, alt_key, decoder, required, init in self._decoders:
+            if key in data:
+                value = data[key]
+            elif alt_key is not None and alt_key in data:
+                value = data[alt_key]
+            elif required:
+                value = None
+            else:
+                continue
+
+            if value is not None and decoder is not None:
+                value = decoder(value)
+
+            if init:
+                init_values[name] = value
+            else:
+                non_init_values[name] = value
+
+        instance = self.cls(**init_values)
+        for name, value in non_init_values.items():
+            setattr(instance, name, value)
+        return instance
+
+    def _compile_schema(self) -> Callable[[Any], Any]:
+        schema = self.cls.json_schema()
+
+        if self.camel:
+            schema = _camelize_schema(schema)
+
+        formats = {}
+        for field_encoder in self.cls._field_encoders.values():
+            field_schema = field_encoder.json_schema
+            if "pattern" in field_schema and "format" in field_schema:
+                formats[field_schema["format"]] = field_schema["pattern"]
+
+        return fastjsonschema.compile(schema, formats=formats)
+
+    def _encoder(self, tp: Any) -> Encoder | None:
+        """Returns None if the value can be used as it is."""
+
+        origin = get_origin(tp)
+        args = get_args(tp)
+
+        if tp in (str, int, bool) or tp is Any:
+            return None
+
+        if tp is float:
+            return float  # e.g. numpy.float64 -> float
+
+        if tp in self.cls._field_encoders:
+            return self.cls._field_encoders[tp].to_wire
+
+        if isinstance(tp, type):
+            if issubclass(tp, Enum):
+                return _enum_value
+
+            if issubclass(tp, JsonSchemaMixin):
+                camel = self.camel
+                # value might be an instance of a subclass
+                return lambda value: codec(type(value), camel).to_dict(value)
+
+        if _is_optional(origin, args):
+            return self._encoder(_unwrap_optional(args))
+
+        if origin in _SEQUENCES:
+            if len(args) == 1 or (origin is tuple and len(args) == 2 and args[1] is Ellipsis):
+                item_encoder = self._encoder(args[0])
+                if item_encoder is None:
+                    return list
+                return lambda value: [item_encoder(item) for item in value]
+
+        if origin in _MAPPINGS:
+            key_encoder = self._encoder(args[0])
+            value_encoder = self._encoder(args[1])
+            return lambda value: {
+                (k if key_encoder is None else key_encoder(k)): (v if value_encoder is None else value_encoder(v))
+                for k, v in value.items()
+            }
+
+        # anything else (unions, tuples of fixed length...) is left to the (slower) generic code
+        cls = self.cls
+
+        if self.camel:
+            return lambda value: humps.camelize(cls._encode_field(tp, value, True))
+
+        return lambda value: cls._encode_field(tp, value, True)
+
+    def _decoder(self, name: str, tp: Any) -> Decoder | None:
+        """Returns None if the value can be used as it is."""
+
+        origin = get_origin(tp)
+        args = get_args(tp)
+
+        if tp in (str, int, bool) or tp is Any:
+            return None
+
+        if tp is float:
+            return float
+
+        if tp in self.cls._field_encoders:
+            return self.cls._field_encoders[tp].to_python
+
+        if isinstance(tp, type):
+            if issubclass(tp, Enum):
+                return tp
+
+            if issubclass(tp, JsonSchemaMixin):
+                dc_codec: list[Codec] = []  # created on the first use, the type might be recursive
+                camel = self.camel
+
+                def decode_dc(value: Any) -> Any:
+                    if not dc_codec:
+                        dc_codec.append(codec(tp, camel))
+                    return dc_codec[0]._decode(value)
+
+                return decode_dc
+
+        if _is_optional(origin, args):
+            return self._decoder(name, _unwrap_optional(args))
+
+        if origin in _SEQUENCES:
+            if len(args) == 1 or (origin is tuple and len(args) == 2 and args[1] is Ellipsis):
+                item_decoder = self._decoder(name, args[0])
+                seq_type = list if origin is abc.Sequence else origin
+
+                if item_decoder is None:
+                    return seq_type
+
+                def decode_seq(value: Any) -> Any:
+                    if isinstance(value, str):
+                        raise TypeError(f"Attempted decode of '{value}' as '{seq_type}'")
+                    return seq_type(item_decoder(item) for item in value)
+
+                return decode_seq
+
+        if origin in _MAPPINGS:
+            key_decoder = self._decoder(name, args[0])
+            value_decoder = self._decoder(name, args[1])
+            return lambda value: {
+                (k if key_decoder is None else key_decoder(k)): (v if value_decoder is None else value_decoder(v))
+                for k, v in value.items()
+            }
+
+        cls = self.cls
+
+        if self.camel:
+            return lambda value: cls._decode_field(name, tp, humps.decamelize(value))
+
+        return lambda value: cls._decode_field(name, tp, value)
+
+
+_codecs: dict[tuple[type, bool], Codec] = {}
+
+
+def codec(cls: type[T], camel: bool = True) -> Codec[T]:
+    """Returns codec for the given class.
+
+    :param cls: Dataclass.
+    :param camel: Keys are in camelCase (as used by REST APIs). Otherwise, field names are used (as in WebSockets API).
+    :return:
+    """
+
+    try:
+        return _codecs[(cls, camel)]
+    except KeyError:
+        return _codecs.setdefault((cls, camel), Codec(cls, camel))
+
+
+def _loads(data: bytes | str) -> Any:
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError as e:
+        raise CodecException(f"Not a JSON. {str(e)}") from e
+
+
+def _enum_value(value: Enum) -> Any:
+    return value.value
+
+
+def _is_optional(origin: Any, args: tuple[Any, ...]) -> bool:
+    return origin in _UNIONS and len(args) == 2 and type(None) in args
+
+
+def _unwrap_optional(args: tuple[Any, ...]) -> Any:
+    return args[0] if args[1] is type(None) else args[1]
+
+
+def _camelize_schema(schema: Any) -> Any:
+    """Converts property names in JSON schema to camelCase."""
+
+    if isinstance(schema, list):
+        return [_camelize_schema(item) for item in schema]
+
+    if not isinstance(schema, dict):
+        return schema
+
+    res: dict[str, Any] = {}
+
+    for key, value in schema.items():
+        if key == "properties" and isinstance(value, dict):
+            res[key] = {humps.camelize(prop): _camelize_schema(prop_schema) for prop, prop_schema in value.items()}
+        elif key == "required" and isinstance(value, list):
+            res[key] = [humps.camelize(prop) for prop in value]
+        else:
+            res[key] = _camelize_schema(value)
+
+    return res
@@ -88,13 +88,21 @@ class Position(IterableIndexable):
 
     def rotated(self, ori: Orientation, inverse: bool = False) -> Position:
         q = ori.as_quaternion()
+        w, qx, qy, qz = q.w, q.x, q.y, q.z
 
-        if inverse:
-            q = q.inverse()
+        if inverse:  # inverse of a unit quaternion is its conjugate
+            qx, qy, qz = -qx, -qy, -qz
 
-        rotated_vector = quaternion.rotate_vectors([q], [list(self)])[0][0]
+        # v' = v + w * t + u x t, where t = 2 * (u x v)
+        tx = 2 * (qy * self.z - qz * self.y)
+        ty = 2 * (qz * self.x - qx * self.z)
+        tz = 2 * (qx * self.y - qy * self.x)
 
-        return Position(rotated_vector[0], rotated_vector[1], rotated_vector[2])
+        return Position(
+            self.x + w * tx + qy * tz - qz * ty,
+            self.y + w * ty + qz * tx - qx * tz,
+            self.z + w * tz + qx * ty - qy * tx,
+        )
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Position):
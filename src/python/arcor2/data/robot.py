@@ -17,3 +17,18 @@ class InverseKinematicsRequest(JsonSchemaMixin):
     pose: Pose
     start_joints: Optional[list[Joint]] = None
     avoid_collisions: bool = True
+
+
+@dataclass
+class InverseKinematicsBatchRequest(JsonSchemaMixin):
+    poses: list[Pose]
+    start_joints: Optional[list[Joint]] = None
+    avoid_collisions: bool = True
+
+
+@dataclass
+class InverseKinematicsResult(JsonSchemaMixin):
+    """Result of IK for one of the poses of a batch request."""
+
+    joints: Optional[list[Joint]] = None  # None when IK could not be computed
+    message: Optional[str] = None
@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+
+import humps
+import numpy as np
+import pytest
+
+from arcor2.data.codec import CodecException, codec
+from arcor2.data.common import (
+    Action,
+    ActionParameter,
+    ActionPoint,
+    Flow,
+    NamedOrientation,
+    Orientation,
+    Position,
+    Project,
+    ProjectRobotJoints,
+    Scene,
+    SceneObject,
+)
+from arcor2.data.events import Event
+from arcor2.data.object_type import Box, Mesh
+
+
+def _project() -> Project:
+    project = Project("project", "scn_1", description="desc", has_logic=True, id="pro_1")
+    project.created = project.modified = datetime(2021, 6, 9, 8, 50, 33, tzinfo=timezone.utc)
+
+    ap = ActionPoint("ap", Position(np.float64(0.1), 0.2, 0.3), id="acp_1")
+    ap.orientations.append(NamedOrientation("ori", Orientation(), id="ori_1"))
+    ap.robot_joints.append(ProjectRobotJoints("joints", "robot", [], id="rj_1"))
+    ap.actions.append(
+        Action("act", "obj/act", flows=[Flow(outputs=["out"])], parameters=[ActionParameter("p", "integer", "1")])
+    )
+    project.action_points.append(ap)
+
+    return project
+
+
+def test_same_output_as_to_dict() -> None:
+    project = _project()
+
+    assert codec(Project).to_dict(project) == humps.camelize(project.to_dict())
+    assert codec(Project, camel=False).to_dict(project) == project.to_dict()
+
+    scene = Scene("scene", objects=[SceneObject("box", "Box")])
+    assert codec(Scene).to_dict(scene) == humps.camelize(scene.to_dict())
+
+
+def test_round_trip() -> None:
+    project = _project()
+    project_codec = codec(Project)
+
+    data = project_codec.dumps(project)
+    assert project_codec.loads(data) == project
+    assert project_codec.loads(data, validate=True) == project
+    assert project_codec.loads_list(project_codec.dumps_list([project, project])) == [project, project]
+
+    # field names are accepted as well
+    assert project_codec.from_dict(project.to_dict()) == project
+    assert codec(Project, camel=False).loads(project.to_json(), validate=True) == project
+
+
+def test_nested_subclasses_and_enums() -> None:
+    box = Box("box", 0.1, 0.2, 0.3)
+    assert codec(Box).loads(codec(Box).dumps(box)) == box
+
+    mesh = Mesh("mesh", "mesh.dae")
+    assert codec(Mesh).to_dict(mesh) == humps.camelize(mesh.to_dict())
+
+    event = Event()
+    event.change_type = Event.Type.ADD
+    assert codec(Event, camel=False).to_dict(event) == event.to_dict()
+    assert codec(Event, camel=False).from_dict(event.to_dict()).change_type == Event.Type.ADD
+
+
+def test_invalid_data() -> None:
+    project_codec = codec(Project)
+
+    with pytest.raises(CodecException):
+        project_codec.loads(b"{")
+
+    with pytest.raises(CodecException):
+        project_codec.from_dict({"name": "project"}, validate=True)  # sceneId missing
+
+    with pytest.raises(CodecException):
+        project_codec.from_dict({"name": "project", "sceneId": "scn", "actionPoints": "nope"}, validate=True)
+
+    with pytest.raises(CodecException):
+        project_codec.from_list({})
@@ -15,14 +15,14 @@ JsonType = bool | str | int | float | dict[str, Any] | Sequence[Any] | None
 T = TypeVar("T")
 
 
-def loads(value: str) -> JsonType:
+def loads(value: str | bytes) -> JsonType:
     try:
         return orjson.loads(value)
     except (ValueError, TypeError) as e:
         raise JsonException(f"Not a JSON. {str(e)}") from e
 
 
-def loads_type(value: str, output_type: type[T]) -> T:
+def loads_type(value: str | bytes, output_type: type[T]) -> T:
     val = loads(value)
 
     if not isinstance(val, output_type):
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""Measures queries of CachedProject/CachedScene for projects of different
+sizes.
+
+With the secondary indexes, time per query should not depend on the
+number of actions. Opening, saving and cloning of a project is measured
+as well, comparing copy-on-write of UpdateableCachedProject with a deep
+copy (what used to be done).
+"""
+
+import argparse
+import copy
+import time
+from typing import Callable
+
+from arcor2.cached import CachedProject, CachedScene, UpdateableCachedProject
+from arcor2.data.common import Action, ActionPoint, LogicItem, Position, Project, Scene, SceneObject
+
+
+def _scene(objects: int) -> Scene:
+    return Scene(
+        "scene", objects=[SceneObject(f"obj_{idx}", f"Type{idx % 10}", id=f"obj_{idx}") for idx in range(objects)]
+    )
+
+
+def _project(scene: Scene, actions: int, actions_per_ap: int) -> Project:
+    project = Project("project", scene.id)
+    ap: None | ActionPoint = None
+
+    for idx in range(actions):
+        if idx % actions_per_ap == 0:
+            ap = ActionPoint(f"ap_{idx}", Position(), ap.id if ap else None, id=f"acp_{idx}")
+            project.action_points.append(ap)
+
+        assert ap
+        ap.actions.append(Action(f"action_{idx}", f"obj_{idx % len(scene.objects)}/move", id=f"act_{idx}"))
+
+    project.logic.append(LogicItem(LogicItem.START, "act_0"))
+    project.logic.extend(LogicItem(f"act_{idx}", f"act_{idx + 1}") for idx in range(actions - 1))
+    project.logic.append(LogicItem(f"act_{actions - 1}", LogicItem.END))
+
+    return project
+
+
+def _measure(name: str, func: Callable[[int], object], count: int, iterations: int) -> None:
+    start = time.monotonic()
+    for it in range(iterations):
+        func(it % count)
+    end = time.monotonic()
+
+    print(f"  {name}: {(end - start) / iterations * 1e6:.2f}us")
+
+
+def _save(project: UpdateableCachedProject, ap_id: str) -> CachedProject:
+    """Modifies one AP and does what ARServer does when saving (without the
+    request itself)."""
+
+    project.update_ap_position(ap_id, project.bare_action_point(ap_id).position + Position(0.1))
+    project.project  # serialization
+    return CachedProject(project)  # new cache entry
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CachedProject/CachedScene benchmark.")
+    parser.add_argument("-a", "--actions", type=int, nargs="+", default=[500, 5000], help="Number of actions.")
+    parser.add_argument("-p", "--actions-per-ap", type=int, default=10)
+    parser.add_argument("-o", "--objects", type=int, default=50, help="Number of scene objects.")
+    parser.add_argument("-i", "--iterations", type=int, default=10000)
+    parser.add_argument("-s", "--save-aps", type=int, default=10000, help="Number of APs for the save benchmark.")
+    parser.add_argument("--save-iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    scene = CachedScene(_scene(args.objects))
+
+    print(f"Scene with {args.objects} objects")
+    _measure("objects_of_type", lambda idx: list(scene.objects_of_type(f"Type{idx % 10}")), 10, args.iterations)
+    _measure(
+        "get_object_by_name", lambda idx: scene.get_object_by_name(f"obj_{idx}.move"), args.objects, args.iterations
+    )
+
+    for actions in args.actions:
+        project = CachedProject(_project(scene.scene, actions, args.actions_per_ap))
+        aps = actions // args.actions_per_ap
+
+        print(f"Project with {actions} actions")
+        _measure("action_io", lambda idx: project.action_io(f"act_{idx}"), actions, args.iterations)
+        _measure(
+            "find_logic_start_end",
+            lambda idx: project.find_logic_start_end(f"act_{idx}", f"act_{idx + 1}"),
+            actions - 1,
+            args.iterations,
+        )
+        _measure("first_action_id", lambda idx: project.first_action_id(), 1, args.iterations)
+        _measure("action_from_name", lambda idx: project.action_from_name(f"action_{idx}"), actions, args.iterations)
+        _measure("ap_actions", lambda idx: project.ap_actions(f"acp_{idx * args.actions_per_ap}"), aps, args.iterations)
+        # APs form a chain, so this is proportional to the number of descendants
+        _measure(
+            "childs (recursive, last 10 APs)",
+            lambda idx: project.childs(f"acp_{(aps - 10) * args.actions_per_ap}", True),
+            1,
+            args.iterations,
+        )
+
+    cached = CachedProject(_project(scene.scene, args.save_aps, 1))
+    opened = UpdateableCachedProject(cached)
+
+    print(f"Project with {args.save_aps} APs")
+    _measure("open (deepcopy)", lambda idx: copy.deepcopy(cached), 1, args.save_iterations)
+    _measure("open", lambda idx: UpdateableCachedProject(cached), 1, args.save_iterations)
+    _measure(
+        "save (deepcopy)", lambda idx: copy.deepcopy(_save(opened, f"acp_{idx}")), args.save_aps, args.save_iterations
+    )
+    _measure("save", lambda idx: _save(opened, f"acp_{idx}"), args.save_aps, args.save_iterations)
+    _measure("clone", lambda idx: UpdateableCachedProject(opened), 1, args.save_iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,22 @@
 import json
 import time
+from typing import Callable
 
+import humps
 import orjson
 
+from arcor2.data.codec import codec
+from arcor2.data.common import Project
+
+
+def _measure(name: str, func: Callable[[], object], iterations: int) -> None:
+    start = time.monotonic()
+    for _ in range(iterations):
+        func()
+    end = time.monotonic()
+
+    print(f"{name}: {(end - start) * 1000:.3f}ms")
+
 
 def main() -> None:
     data = """{
@@ -229,6 +243,31 @@ def main() -> None:
 
     print(f"{orjson.__name__}.dumps: {(end - start) * 1000:.3f}ms")
 
+    print()
+
+    # (de)serialization of a dataclass as done by REST clients/services: humps + dataclasses_jsonschema vs codec
+    project = Project.from_dict(humps.decamelize(d))
+    project_codec = codec(Project)
+    comp_bytes = comp_data.encode()
+
+    _measure(
+        "humps + from_dict (validated)",
+        lambda: Project.from_dict(humps.decamelize(orjson.loads(comp_bytes))),
+        iterations,
+    )
+    _measure(
+        "humps + from_dict",
+        lambda: Project.from_dict(humps.decamelize(orjson.loads(comp_bytes)), validate=False),
+        iterations,
+    )
+    _measure("codec.loads (validated)", lambda: project_codec.loads(comp_bytes, validate=True), iterations)
+    _measure("codec.loads", lambda: project_codec.loads(comp_bytes), iterations)
+
+    print()
+
+    _measure("to_dict + humps", lambda: orjson.dumps(humps.camelize(project.to_dict())), iterations)
+    _measure("codec.dumps", lambda: project_codec.dumps(project), iterations)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+"""Compares resolving absolute poses of all action points one by one (per-
+AP recursion through parents, without and with memoization) with
+abs_poses/make_all_aps_global, which process the whole project at once.
+
+APs form chains of given depth, parent of each chain is a scene object.
+"""
+
+import argparse
+import copy
+import random
+import time
+from typing import Callable
+
+from arcor2 import transformations as tr
+from arcor2.cached import CachedProject, CachedScene
+from arcor2.data.common import ActionPoint, NamedOrientation, Orientation, Pose, Position, Project, Scene, SceneObject
+
+
+def _orientation() -> Orientation:
+    return Orientation.from_rotation_vector(*(random.uniform(-3, 3) for _ in range(3)))
+
+
+def _position() -> Position:
+    return Position(*(random.uniform(-1, 1) for _ in range(3)))
+
+
+def _scene(objects: int) -> Scene:
+    return Scene(
+        "scene",
+        objects=[
+            SceneObject(f"obj_{idx}", "Type", Pose(_position(), _orientation()), id=f"obj_{idx}")
+            for idx in range(objects)
+        ],
+    )
+
+
+def _project(scene: Scene, aps: int, depth: int) -> Project:
+    project = Project("project", scene.id)
+    parent: None | str = None
+
+    for idx in range(aps):
+        if idx % depth == 0:
+            parent = scene.objects[idx % len(scene.objects)].id
+
+        ap = ActionPoint(
+            f"ap_{idx}",
+            _position(),
+            parent,
+            [NamedOrientation("ori", _orientation(), id=f"ori_{idx}")],
+            id=f"acp_{idx}",
+        )
+        project.action_points.append(ap)
+        parent = ap.id
+
+    return project
+
+
+def _per_ap(scene: CachedScene, project: CachedProject, memoized: bool = False) -> None:
+    if not memoized:
+        project.invalidate_abs_poses()
+
+    for ap in project.action_points:
+        tr.abs_position_from_ap(scene, project, ap.id)
+        for ori in project.ap_orientations(ap.id):
+            tr.abs_pose_from_ap_orientation(scene, project, ori.id)
+
+
+def _make_global_per_ap(scene: CachedScene, project: CachedProject) -> None:
+    # what Resources used to do
+    for ap in project.action_points_with_parent:
+        tr.make_relative_ap_global(scene, project, ap)
+
+
+def _measure(name: str, func: Callable[[], object], iterations: int) -> float:
+    start = time.monotonic()
+    for _ in range(iterations):
+        func()
+    duration = (time.monotonic() - start) / iterations
+
+    print(f"  {name}: {duration * 1e3:.2f}ms")
+    return duration
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Absolute poses benchmark.")
+    parser.add_argument("-a", "--aps", type=int, nargs="+", default=[100, 1000, 5000], help="Number of APs.")
+    parser.add_argument("-d", "--depth", type=int, default=5, help="Depth of AP hierarchy.")
+    parser.add_argument("-o", "--objects", type=int, default=20, help="Number of scene objects.")
+    parser.add_argument("-i", "--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    scene = _scene(args.objects)
+    cached_scene = CachedScene(scene)
+
+    for aps in args.aps:
+        project = _project(scene, aps, args.depth)
+        cached_project = CachedProject(project)
+
+        print(f"Project with {aps} APs (depth {args.depth})")
+        per_ap = _measure("per AP", lambda: _per_ap(cached_scene, cached_project), args.iterations)
+        _measure("per AP (memoized)", lambda: _per_ap(cached_scene, cached_project, True), args.iterations)
+        batch = _measure("abs_poses", lambda: tr.abs_poses(cached_scene, cached_project), args.iterations)
+        print(f"  speedup: {per_ap / batch:.1f}x")
+
+        copies = [CachedProject(copy.deepcopy(project)) for _ in range(2 * args.iterations)]
+        per_ap = _measure(
+            "make_relative_ap_global (each AP)",
+            lambda: _make_global_per_ap(cached_scene, copies.pop()),
+            args.iterations,
+        )
+        batch = _measure(
+            "make_all_aps_global", lambda: tr.make_all_aps_global(cached_scene, copies.pop()), args.iterations
+        )
+        print(f"  speedup: {per_ap / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,14 @@
-from arcor2.cached import CachedProject, CachedScene, UpdateableCachedProject, UpdateableCachedScene
-from arcor2.data.common import Project, Scene
+import pytest
+
+from arcor2.cached import (
+    CachedProject,
+    CachedProjectException,
+    CachedScene,
+    UpdateableCachedProject,
+    UpdateableCachedScene,
+)
+from arcor2.data.common import Action, ActionPoint, LogicItem, Position, Project, Scene, SceneObject
+from arcor2.exceptions import Arcor2Exception
 
 
 def test_slots() -> None:
@@ -12,3 +21,104 @@ def test_slots() -> None:
     assert not hasattr(CachedProject(p), "__dict__")
     assert not hasattr(UpdateableCachedScene(s), "__dict__")
     assert not hasattr(UpdateableCachedProject(p), "__dict__")
+
+
+def test_scene_indexes() -> None:
+    scene = UpdateableCachedScene(Scene("s", objects=[SceneObject("box", "Box", id="obj_1")]))
+
+    scene.upsert_object(SceneObject("robot", "Robot", id="obj_2"))
+    assert scene.object_types == {"Box", "Robot"}
+    assert [obj.id for obj in scene.objects_of_type("Robot")] == ["obj_2"]
+    assert scene.get_object_by_name("robot.move") == "obj_2/move"
+
+    scene.upsert_object(SceneObject("robot", "OtherRobot", id="obj_2"))  # type changed
+    assert scene.object_types == {"Box", "OtherRobot"}
+    assert not list(scene.objects_of_type("Robot"))
+
+    scene.object("obj_1").name = "renamed"  # as done by ARServer
+    assert scene.get_object_by_name("renamed.pick") == "obj_1/pick"
+    with pytest.raises(Arcor2Exception):
+        scene.get_object_by_name("box.pick")
+
+    scene.delete_object("obj_2")
+    assert scene.object_types == {"Box"}
+
+
+def test_project_indexes() -> None:
+    project = Project("p", "s")
+    ap = ActionPoint("ap", Position(), id="acp_1")
+    ap.actions = [Action(f"a{idx}", "obj/type", id=f"act_{idx}") for idx in range(3)]
+    project.action_points.append(ap)
+    project.action_points.append(ActionPoint("child", Position(), parent="acp_1", id="acp_2"))
+    project.action_points.append(ActionPoint("grandchild", Position(), parent="acp_2", id="acp_3"))
+    project.logic = [
+        LogicItem(LogicItem.START, "act_0", id="lit_1"),
+        LogicItem("act_0", "act_1", id="lit_2"),
+        LogicItem("act_1/default", "act_2", id="lit_3"),
+        LogicItem("act_2", LogicItem.END, id="lit_4"),
+    ]
+
+    cached = UpdateableCachedProject(project)
+
+    assert cached.first_action_id() == "act_0"
+    assert [[li.id for li in io] for io in cached.action_io("act_1")] == [["lit_2"], ["lit_3"]]
+    assert cached.find_logic_start_end("act_1/default", "act_2").id == "lit_3"
+    assert cached.childs("acp_1", recursive=True) == {"act_0", "act_1", "act_2", "acp_2", "acp_3"}
+    assert [ac.id for ac in cached.ap_actions("acp_1")] == ["act_0", "act_1", "act_2"]
+
+    cached.upsert_logic_item(LogicItem("act_0", "act_2", id="lit_2"))
+    assert [[li.id for li in io] for io in cached.action_io("act_1")] == [[], ["lit_3"]]
+    assert {li.id for li in cached.action_io("act_2")[0]} == {"lit_2", "lit_3"}
+
+    cached.remove_logic_item("lit_1")
+    with pytest.raises(CachedProjectException):
+        cached.first_action_id()
+
+    cached.action("act_1").name = "renamed"  # as done by ARServer
+    assert cached.action_from_name("renamed").id == "act_1"
+    with pytest.raises(CachedProjectException):
+        cached.action_from_name("a1")
+
+    cached.remove_action("act_0")
+    with pytest.raises(CachedProjectException):
+        cached.action_from_name("a0")
+    assert [ac.id for ac in cached.ap_actions("acp_1")] == ["act_1", "act_2"]
+
+
+def test_copy_on_write() -> None:
+    project = Project("p", "s")
+    ap = ActionPoint("ap", Position(), id="acp_1")
+    ap.actions = [Action("a0", "obj/type", id="act_0"), Action("a1", "obj/type", id="act_1")]
+    project.action_points.append(ap)
+
+    cached = CachedProject(project)
+    opened = UpdateableCachedProject(cached)
+
+    opened.action("act_0").name = "renamed"  # as done by ARServer
+    opened.update_ap_position("acp_1", Position(1, 0, 0))
+    assert cached.action("act_0").name == "a0"
+    assert cached.bare_action_point("acp_1").position == Position()
+    assert project.action_points[0].actions[0].name == "a0"
+
+    # not modified items are shared
+    assert opened.project.action_points[0].actions[1] is cached.action("act_1")
+
+    saved = CachedProject(opened)
+    clone = UpdateableCachedProject(opened)
+    opened.action("act_0").name = "renamed_again"
+    opened.update_ap_position("acp_1", Position(2, 0, 0))
+
+    for other in (saved, clone):
+        assert other.action("act_0").name == "renamed"
+        assert other.bare_action_point("acp_1").position == Position(1, 0, 0)
+        ap_of_action, _ = other.action_point_and_action("act_1")
+        assert ap_of_action is other.bare_action_point("acp_1")
+
+    clone.remove_action("act_1")
+    assert opened.ap_action_ids("acp_1") == {"act_0", "act_1"}
+
+    scene = CachedScene(Scene("s", objects=[SceneObject("box", "Box", id="obj_1")]))
+    opened_scene = UpdateableCachedScene(scene)
+    opened_scene.object("obj_1").name = "renamed"
+    assert scene.object("obj_1").name == "box"
+    assert CachedScene(opened_scene).object("obj_1").name == "renamed"
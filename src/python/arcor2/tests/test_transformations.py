@@ -4,14 +4,20 @@ from math import cos, pi, sin, sqrt
 import numpy as np
 import pytest
 
-from arcor2.cached import CachedProject, CachedScene
+from arcor2.cached import CachedProject, CachedScene, UpdateableCachedProject
 from arcor2.data.common import ActionPoint, NamedOrientation, Orientation, Pose, Position, Project, Scene, SceneObject
 from arcor2.exceptions import Arcor2Exception
 from arcor2.transformations import (
+    abs_pose_from_ap_orientation,
+    abs_poses,
+    abs_position_from_ap,
     get_parent_pose,
+    make_all_aps_global,
     make_global_ap_relative,
     make_pose_abs,
     make_pose_rel,
+    make_poses_abs,
+    make_poses_rel,
     make_relative_ap_global,
 )
 
@@ -191,3 +197,121 @@ def test_obj_relative_ap_global() -> None:
     assert ap2.position == Position(1, 0, 0)
     assert no1.orientation == Orientation()
     check_ap(ap2)
+
+
+@pytest.mark.repeat(10)
+def test_make_poses_abs_and_rel() -> None:
+    parents = [random_pose() for _ in range(10)]
+    children = [random_pose() for _ in range(10)]
+
+    def arrays(poses: list[Pose]) -> tuple[np.ndarray, np.ndarray]:
+        return np.array([list(p.position) for p in poses]), np.array([list(p.orientation) for p in poses])
+
+    positions, quaternions = make_poses_abs(*arrays(parents), *arrays(children))
+
+    for parent, child, pos, quat in zip(parents, children, positions, quaternions):
+        assert make_pose_abs(parent, child) == Pose(Position(*pos), Orientation(*quat))
+
+    positions, quaternions = make_poses_rel(*arrays(parents), positions, quaternions)
+
+    for child, pos, quat in zip(children, positions, quaternions):
+        assert child == Pose(Position(*pos), Orientation(*quat))
+
+
+def test_abs_poses() -> None:
+    scene = Scene("s1")
+    scene.objects.append(SceneObject("so1", "WhatEver", random_pose()))
+    scene.objects.append(SceneObject("so2", "WhatEver", random_pose()))
+    cached_scene = CachedScene(scene)
+
+    project = Project("p1", scene.id)
+    parents: list[None | str] = [None, scene.objects[0].id, scene.objects[1].id]
+
+    for idx in range(30):
+        ap = ActionPoint(
+            f"ap{idx}",
+            random_position(),
+            parent=parents[idx % len(parents)],
+            orientations=[NamedOrientation("ori", random_orientation())],
+        )
+        project.action_points.append(ap)
+        parents.append(ap.id)
+
+    project.action_points.reverse()  # children before parents
+    cached_project = CachedProject(project)
+
+    poses = abs_poses(cached_scene, cached_project)
+
+    for ap in project.action_points:
+        assert poses.positions[ap.id] == abs_position_from_ap(cached_scene, cached_project, ap.id)
+        ori = ap.orientations[0]
+        assert Pose(poses.positions[ap.id], poses.orientations[ori.id]) == abs_pose_from_ap_orientation(
+            cached_scene, cached_project, ori.id
+        )
+
+    global_project = CachedProject(copy.deepcopy(project))
+    assert make_all_aps_global(cached_scene, global_project) == {ap.id for ap in project.action_points if ap.parent}
+
+    for ap in global_project.action_points:
+        check_ap(ActionPoint.from_dict(global_project.action_point(ap.id).to_dict()))
+        assert ap.parent is None
+        assert ap.position == poses.positions[ap.id]
+        for ori in global_project.ap_orientations(ap.id):
+            assert ori.orientation == poses.orientations[ori.id]
+
+    root = project.action_points[-1]
+    assert root.parent is None
+    root.parent = next(ap.id for ap in project.action_points if ap.parent == root.id)  # cycle
+
+    with pytest.raises(Arcor2Exception):
+        abs_poses(cached_scene, CachedProject(project))
+
+
+def test_abs_poses_memoized() -> None:
+    scene = Scene("s1")
+    so1 = SceneObject("so1", "WhatEver", Pose(Position(1, 0, 0), Orientation(0, 0, -0.707, 0.707)))
+    scene.objects.append(so1)
+    cached_scene = CachedScene(scene)
+
+    project = Project("p1", scene.id)
+    ap1 = ActionPoint("ap1", Position(1, 0, 0), parent=so1.id)
+    ap2 = ActionPoint("ap2", Position(1, 0, 0), parent=ap1.id, orientations=[NamedOrientation("o1", Orientation())])
+    ap3 = ActionPoint("ap3", Position(0, 1, 0))
+    project.action_points.extend([ap1, ap2, ap3])
+    ori_id = ap2.orientations[0].id
+
+    proj = UpdateableCachedProject(project)
+
+    def check() -> None:
+        fresh = CachedProject(proj)  # without memoized poses
+        for ap in proj.action_points:
+            assert abs_position_from_ap(cached_scene, proj, ap.id) == abs_position_from_ap(cached_scene, fresh, ap.id)
+        assert abs_pose_from_ap_orientation(cached_scene, proj, ori_id) == abs_pose_from_ap_orientation(
+            cached_scene, fresh, ori_id
+        )
+
+    assert abs_position_from_ap(cached_scene, proj, ap2.id) == Position(1, -2, 0)
+    pose = abs_pose_from_ap_orientation(cached_scene, proj, ori_id)
+    assert pose == Pose(Position(1, -2, 0), so1.pose.orientation)  # type: ignore[union-attr]
+
+    pose.position.x = 100  # returned poses are copies
+    check()
+
+    proj.update_ap_position(ap1.id, Position(2, 0, 0))
+    check()
+
+    proj.upsert_orientation(ap2.id, NamedOrientation("o1", Orientation(0, 0, 1, 0), id=ori_id))
+    check()
+
+    proj.bare_action_point(ap2.id).parent = ap3.id
+    proj.update_child(ap2.id, ap1.id, ap3.id)
+    check()
+
+    proj.bare_action_point(ap3.id).parent = so1.id
+    proj.update_child(ap3.id, None, so1.id)
+    check()
+
+    assert so1.pose
+    so1.pose.position.y = 5  # e.g. done by ARServer, project has to be notified
+    proj.invalidate_abs_poses(so1.id)
+    check()
@@ -1,5 +1,8 @@
+import copy
 from typing import NamedTuple
 
+import numpy as np
+
 from arcor2.cached import CachedProject as CProject
 from arcor2.cached import CachedProjectException
 from arcor2.cached import CachedScene as CScene
@@ -33,6 +36,97 @@ def make_pose_abs(parent: Pose, child: Pose) -> Pose:
     )
 
 
+def normalized_quaternions(quaternions: np.ndarray) -> np.ndarray:
+    """
+    :param quaternions: Nx4 array of quaternions (x, y, z, w), same order as in Orientation
+    :return: normalized quaternions
+    """
+
+    norms = np.linalg.norm(quaternions, axis=1, keepdims=True)
+
+    if not np.all(np.isfinite(norms)) or np.any(norms == 0):
+        raise Arcor2Exception("Invalid quaternion.")
+
+    return quaternions / norms
+
+
+def multiply_quaternions(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise Hamilton product of (normalized) quaternions.
+
+    :param a: Nx4 array of quaternions (x, y, z, w)
+    :param b: Nx4 array of quaternions (x, y, z, w)
+    :return: Nx4 array of quaternions (x, y, z, w)
+    """
+
+    ax, ay, az, aw = a.T
+    bx, by, bz, bw = b.T
+
+    return np.stack(
+        (
+            aw * bx + ax * bw + ay * bz - az * by,
+            aw * by - ax * bz + ay * bw + az * bx,
+            aw * bz + ax * by - ay * bx + az * bw,
+            aw * bw - ax * bx - ay * by - az * bz,
+        ),
+        axis=1,
+    )
+
+
+def rotate_positions(quaternions: np.ndarray, positions: np.ndarray, inverse: bool = False) -> np.ndarray:
+    """Row-wise rotation of positions by (normalized) quaternions.
+
+    :param quaternions: Nx4 array of quaternions (x, y, z, w)
+    :param positions: Nx3 array of positions
+    :param inverse: Rotate by the inverse quaternions
+    :return: Nx3 array of rotated positions
+    """
+
+    u = -quaternions[:, :3] if inverse else quaternions[:, :3]
+    t = 2 * np.cross(u, positions)
+    return positions + quaternions[:, 3:] * t + np.cross(u, t)
+
+
+def make_poses_abs(
+    parent_positions: np.ndarray, parent_quaternions: np.ndarray, positions: np.ndarray, quaternions: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Batch version of make_pose_abs.
+
+    :param parent_positions: Nx3 array, e.g. positions of scene objects
+    :param parent_quaternions: Nx4 array (x, y, z, w), e.g. orientations of scene objects
+    :param positions: Nx3 array, e.g. positions of action points
+    :param quaternions: Nx4 array (x, y, z, w), e.g. orientations of action points
+    :return: absolute positions and orientations
+    """
+
+    parent_quaternions = normalized_quaternions(parent_quaternions)
+
+    return (
+        rotate_positions(parent_quaternions, positions) + parent_positions,
+        multiply_quaternions(parent_quaternions, normalized_quaternions(quaternions)),
+    )
+
+
+def make_poses_rel(
+    parent_positions: np.ndarray, parent_quaternions: np.ndarray, positions: np.ndarray, quaternions: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Batch version of make_pose_rel.
+
+    :param parent_positions: Nx3 array, e.g. positions of scene objects
+    :param parent_quaternions: Nx4 array (x, y, z, w), e.g. orientations of scene objects
+    :param positions: Nx3 array, e.g. absolute positions of action points
+    :param quaternions: Nx4 array (x, y, z, w), e.g. absolute orientations of action points
+    :return: relative positions and orientations
+    """
+
+    parent_quaternions = normalized_quaternions(parent_quaternions)
+    inversed = parent_quaternions * (-1, -1, -1, 1)
+
+    return (
+        rotate_positions(parent_quaternions, positions - parent_positions, inverse=True),
+        multiply_quaternions(inversed, normalized_quaternions(quaternions)),
+    )
+
+
 class Parent(NamedTuple):
     pose: Pose
     parent_id: None | str = None  # parent of the parent
@@ -47,18 +141,24 @@ def get_parent_pose(scene: CScene, project: CProject, parent_id: str) -> Parent:
     :return:
     """
 
-    if parent_id in scene.object_ids:
+    # object_ids/action_points_ids would create a set on each call
+    try:
         parent_obj = scene.object(parent_id)
+    except Arcor2Exception:
+        pass
+    else:
         if not parent_obj.pose:
             raise Arcor2Exception("Parent object does not have pose!")
         # TODO find parent object in the graph (SceneObject has "children" property)
         return Parent(parent_obj.pose, None)
-    elif parent_id in project.action_points_ids:
+
+    try:
         ap = project.bare_action_point(parent_id)
-        return Parent(Pose(ap.position, Orientation()), ap.parent)
-    else:
+    except CachedProjectException:
         raise Arcor2Exception(f"Unknown parent_id {parent_id}.")
 
+    return Parent(Pose(ap.position, Orientation()), ap.parent)
+
 
 def make_relative_ap_global(scene: CScene, project: CProject, ap: BareActionPoint) -> set[str]:
     """Transforms (in place) relative AP into a global one.
@@ -108,6 +208,7 @@ def make_relative_ap_global(scene: CScene, project: CProject, ap: BareActionPoin
         _make_relative_ap_global(_ap)
 
     _make_relative_ap_global(ap)
+    project.invalidate_abs_poses(ap.id)
     return updated_aps
 
 
@@ -164,6 +265,7 @@ def make_global_ap_relative(scene: CScene, project: CProject, ap: BareActionPoin
 
     _make_global_ap_relative(parent_id)
     ap.parent = parent_id
+    project.invalidate_abs_poses(ap.id)
     return updated_aps
 
 
@@ -185,6 +287,44 @@ def make_pose_rel_to_parent(scene: CScene, project: CProject, pose: Pose, parent
     return make_pose_rel(parent.pose, pose)
 
 
+def _abs_ap_frame(scene: CScene, project: CProject, ap_id: str) -> Pose:
+    """Returns absolute position of AP together with orientation of its frame
+    (given by the parent object, if any).
+
+    Results are memoized within the project, see
+    CachedProject.invalidate_abs_poses.
+    """
+
+    pose = project.abs_pose(ap_id)
+
+    if pose is not None:
+        return pose
+
+    ap = project.bare_action_point(ap_id)
+
+    if not ap.parent:
+        pose = Pose(copy.copy(ap.position), Orientation())
+    else:
+        try:
+            parent_obj = scene.object(ap.parent)
+        except Arcor2Exception:
+            try:
+                parent_pose = _abs_ap_frame(scene, project, ap.parent)
+            except CachedProjectException:
+                raise Arcor2Exception(f"Unknown parent_id {ap.parent}.")
+        else:
+            if not parent_obj.pose:
+                raise Arcor2Exception("Parent object does not have pose!")
+            parent_pose = parent_obj.pose
+
+        pose = Pose(
+            ap.position.rotated(parent_pose.orientation) + parent_pose.position, copy.copy(parent_pose.orientation)
+        )
+
+    project.set_abs_pose(ap_id, pose)
+    return pose
+
+
 def abs_pose_from_ap_orientation(scene: CScene, project: CProject, orientation_id: str) -> Pose:
     """Returns absolute Pose without modifying anything within the project.
 
@@ -192,17 +332,15 @@ def abs_pose_from_ap_orientation(scene: CScene, project: CProject, orientation_i
     :return:
     """
 
-    ap, ori = project.bare_ap_and_orientation(orientation_id)
+    pose = project.abs_pose(orientation_id)
 
-    pose = Pose(ap.position, ori.orientation)
-    parent_id = ap.parent
+    if pose is None:
+        ap, ori = project.bare_ap_and_orientation(orientation_id)
+        frame = _abs_ap_frame(scene, project, ap.id)
+        pose = Pose(frame.position, frame.orientation * ori.orientation)
+        project.set_abs_pose(orientation_id, pose)
 
-    while parent_id:
-        parent = get_parent_pose(scene, project, parent_id)
-        pose = make_pose_abs(parent.pose, pose)
-        parent_id = parent.parent_id
-
-    return pose
+    return Pose(copy.copy(pose.position), copy.copy(pose.orientation))
 
 
 def abs_position_from_ap(scene: CScene, project: CProject, ap_id: str) -> Position:
@@ -212,13 +350,122 @@ def abs_position_from_ap(scene: CScene, project: CProject, ap_id: str) -> Positi
     :return:
     """
 
-    ap = project.bare_action_point(ap_id)
-    pose = Pose(ap.position, Orientation())
-    parent_id = ap.parent
+    return copy.copy(_abs_ap_frame(scene, project, ap_id).position)
 
-    while parent_id:
-        parent = get_parent_pose(scene, project, parent_id)
-        pose = make_pose_abs(parent.pose, pose)
-        parent_id = parent.parent_id
 
-    return pose.position
+class AbsolutePoses(NamedTuple):
+    positions: dict[str, Position]  # by action point id
+    orientations: dict[str, Orientation]  # by orientation id
+
+
+def abs_poses(scene: CScene, project: CProject) -> AbsolutePoses:
+    """Returns absolute positions of all action points and absolute
+    orientations of all their orientations, without modifying anything
+    within the project.
+
+    Action points are processed level by level (objects/no parent first,
+    then their children, etc.), each level at once using numpy.
+
+    :param scene:
+    :param project:
+    :return:
+    """
+
+    aps = list(project.action_points)
+    index = {ap.id: idx for idx, ap in enumerate(aps)}
+    children: dict[str, list[int]] = {}
+
+    rel_positions = np.array([list(ap.position) for ap in aps], dtype=float).reshape(-1, 3)
+    positions = np.empty_like(rel_positions)
+    frames = np.empty((len(aps), 4))  # action points do not have orientation, only their parent objects
+    frames[:] = (0, 0, 0, 1)
+
+    object_ids = scene.object_ids
+    roots: list[int] = []
+    obj_positions: list[list[float]] = []
+    obj_orientations: list[list[float]] = []
+
+    for idx, ap in enumerate(aps):
+        if not ap.parent:
+            roots.append(idx)
+            obj_positions.append([0, 0, 0])
+            obj_orientations.append([0, 0, 0, 1])
+        elif ap.parent in index:
+            children.setdefault(ap.parent, []).append(idx)
+        elif ap.parent in object_ids:
+            parent_obj = scene.object(ap.parent)
+            if not parent_obj.pose:
+                raise Arcor2Exception("Parent object does not have pose!")
+            roots.append(idx)
+            obj_positions.append(list(parent_obj.pose.position))
+            obj_orientations.append(list(parent_obj.pose.orientation))
+        else:
+            raise Arcor2Exception(f"Unknown parent_id {ap.parent}.")
+
+    level = np.array(roots, dtype=int)
+
+    if roots:
+        frames[level] = normalized_quaternions(np.array(obj_orientations, dtype=float))
+        positions[level] = rotate_positions(frames[level], rel_positions[level]) + obj_positions
+
+    done = len(roots)
+
+    while len(level):
+        parents = [
+            (parent_idx, child_idx) for parent_idx in level for child_idx in children.get(aps[parent_idx].id, ())
+        ]
+
+        if not parents:
+            break
+
+        parent_level, level = np.array(parents).T
+        frames[level] = frames[parent_level]
+        positions[level] = rotate_positions(frames[level], rel_positions[level]) + positions[parent_level]
+        done += len(level)
+
+    if done != len(aps):
+        raise Arcor2Exception("Action points with cyclic parents.")
+
+    ori_ids: list[str] = []
+    ori_frames: list[int] = []
+    ori_quaternions: list[list[float]] = []
+
+    for idx, ap in enumerate(aps):
+        for ori in project.ap_orientations(ap.id):
+            ori_ids.append(ori.id)
+            ori_frames.append(idx)
+            ori_quaternions.append(list(ori.orientation))
+
+    quaternions = multiply_quaternions(
+        frames[ori_frames], normalized_quaternions(np.array(ori_quaternions, dtype=float).reshape(-1, 4))
+    )
+
+    return AbsolutePoses(
+        {ap.id: Position(*positions[idx].tolist()) for idx, ap in enumerate(aps)},
+        {ori_id: Orientation(*quaternion.tolist()) for ori_id, quaternion in zip(ori_ids, quaternions)},
+    )
+
+
+def make_all_aps_global(scene: CScene, project: CProject) -> set[str]:
+    """Transforms (in place) all relative APs into global ones.
+
+    Same as calling make_relative_ap_global for each AP with a parent,
+    but all the poses are computed at once using abs_poses.
+
+    :param scene:
+    :param project:
+    :return: IDs of updated APs
+    """
+
+    poses = abs_poses(scene, project)
+    updated_aps: set[str] = set()
+
+    for ap in project.action_points_with_parent:
+        ap.position = poses.positions[ap.id]
+        for ori in project.ap_orientations(ap.id):
+            ori.orientation = poses.orientations[ori.id]
+        ap.parent = None
+        updated_aps.add(ap.id)
+
+    project.invalidate_abs_poses()
+    return updated_aps
@@ -3,55 +3,78 @@ import time
 from copy import deepcopy
 from dataclasses import dataclass
 from datetime import datetime
-from typing import TYPE_CHECKING, Any, Awaitable, Callable
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, TypeVar
 
 from lru import LRU
 
 from arcor2 import env
 from arcor2.cached import CachedProject, CachedScene
-from arcor2.data.common import IdDesc
+from arcor2.data.common import IdDesc, Project, Scene
 from arcor2.data.object_type import ObjectType
 from arcor2.exceptions import Arcor2Exception
+from arcor2_arserver import logger
 from arcor2_storage import aio_client as ps
 from arcor2_storage.aio_client import (
     delete_model,
     get_mesh,
     get_meshes,
     get_model,
+    get_project_ids_using_object,
+    get_project_ids_with_scene,
     get_project_sources,
     put_model,
     update_project_sources,
 )
-from arcor2_storage.client import StorageClientException
+from arcor2_storage.client import Change, StorageClientException
+from arcor2_web import metrics
 
 
 @dataclass
 class CachedListing:
-    __slots__ = "listing", "ts"
+    __slots__ = "listing", "ts", "stale"
 
     listing: dict[str, IdDesc]
     ts: float
+    stale: bool
 
     def time_to_update(self) -> bool:
+        if self.stale:
+            return True
+
+        # listing is kept up-to-date by the change feed
+        if _changes_feed_active:
+            return False
+
         return time.monotonic() - self.ts > _cache_timeout
 
 
 """
 This module adds some caching capabilities to the aio version of project_service. It should be only used by ARServer.
 
-Caching can be disabled by setting respective environment variable - this is useful for environments
-where ARServer is not the only one who touches Project service.
+When the Storage service provides the change feed, cached items are invalidated based on it and caching is correct
+even when there are other writers. Otherwise (or when the feed is disabled), listings are polled at most once per
+ARCOR2_ARSERVER_CACHE_TIMEOUT and the timeout can be set to zero for environments where ARServer is not the only one
+who touches the Storage service.
 """
 
 _cache_timeout = max(env.get_float("ARCOR2_ARSERVER_CACHE_TIMEOUT", 1.0), 0)
 _cache_scenes = max(env.get_int("ARCOR2_ARSERVER_CACHE_SCENES", 32), 1)
 _cache_projects = max(env.get_int("ARCOR2_ARSERVER_CACHE_PROJECTS", 64), 1)
 _cache_object_types = max(env.get_int("ARCOR2_ARSERVER_CACHE_OBJECT_TYPES", 64), 1)
+_changes_feed_enabled = env.get_bool("ARCOR2_ARSERVER_CHANGES_FEED", True)
+_changes_feed_timeout = max(env.get_float("ARCOR2_ARSERVER_CHANGES_FEED_TIMEOUT", 30.0), 1.0)
+
+_cache_requests = metrics.counter(
+    "arcor2_arserver_cache_requests_total", "Requests for cached projects, scenes and ObjectTypes."
+)
+
+_changes_feed_active = False
+_changes_feed_task: None | asyncio.Task = None
 
 # here we need to know all the items
-_scenes_list = CachedListing({}, 0)
-_projects_list = CachedListing({}, 0)
-_object_type_list = CachedListing({}, 0)
+_scenes_list = CachedListing({}, 0, True)
+_projects_list = CachedListing({}, 0, True)
+_object_type_list = CachedListing({}, 0, True)
 
 _scenes_list_lock = asyncio.Lock()
 _projects_list_lock = asyncio.Lock()
@@ -79,18 +102,151 @@ async def _update_list(
         cache.pop(deleted, None)
     cached_listing.listing = updated
     cached_listing.ts = time.monotonic()
+    cached_listing.stale = False
+
+
+C = TypeVar("C", CachedProject, CachedScene, ObjectType)
+D = TypeVar("D", Project, Scene, ObjectType)
+
+
+async def _get_many(
+    ids: Iterable[str],
+    cached_listing: CachedListing,
+    cache: dict[str, C],
+    batch_getter: Callable[[list[str]], Awaitable[list[D]]],
+    wrapper: Callable[[D], C],
+    kind: str,
+) -> dict[str, C]:
+    """Returns up-to-date items from the cache, the missing or outdated ones
+    are downloaded using one batch request.
+
+    Listing has to be updated before calling this.
+    """
+
+    ret: dict[str, C] = {}
+    to_fetch: list[str] = []
+
+    for item_id in ids:
+        if item_id not in cached_listing.listing:  # removed (or never existed)
+            continue
+
+        try:
+            item = cache[item_id]
+        except KeyError:
+            to_fetch.append(item_id)
+            continue
+
+        assert item.modified
+        if item.modified < cached_listing.listing[item_id].modified:
+            to_fetch.append(item_id)
+            continue
+
+        ret[item_id] = item
+
+    _cache_requests.inc(len(ret), kind=kind, result="hit")
+    _cache_requests.inc(len(to_fetch), kind=kind, result="miss")
+
+    if to_fetch:
+        for fetched in await batch_getter(to_fetch):
+            ret[fetched.id] = cache[fetched.id] = wrapper(fetched)
+
+    return ret
+
+
+def _targets(change_type: Change.TypeEnum) -> tuple[CachedListing, dict[str, Any]]:
+    if change_type == Change.TypeEnum.PROJECT:
+        return _projects_list, _projects
+    if change_type == Change.TypeEnum.SCENE:
+        return _scenes_list, _scenes
+    return _object_type_list, _object_types
+
+
+def _apply_change(change: Change) -> None:
+    cached_listing, cache = _targets(change.type)
+
+    if change.deleted:
+        cached_listing.listing.pop(change.id, None)
+        cache.pop(change.id, None)
+        return
+
+    if change.item is None:  # can't update the listing item
+        cached_listing.stale = True
+        cache.pop(change.id, None)
+        return
+
+    cached_listing.listing[change.id] = change.item
+
+    if (cached := cache.get(change.id)) is not None and (
+        cached.modified is None or cached.modified < change.item.modified
+    ):
+        cache.pop(change.id, None)
+
+
+def _invalidate_all() -> None:
+    for change_type in Change.TypeEnum:
+        cached_listing, cache = _targets(change_type)
+        cached_listing.stale = True
+        cache.clear()
+
+
+async def _watch_changes(since: int) -> None:
+    """Long-polls the change feed and updates the cache accordingly.
+
+    When the feed is not available, it falls back to polling of
+    listings.
+    """
+
+    global _changes_feed_active
+
+    while True:
+        try:
+            changes = await ps.get_changes(since, _changes_feed_timeout)
+        except StorageClientException as e:
+            if _changes_feed_active:
+                logger.warn(f"Change feed interrupted, falling back to polling. {str(e)}")
+            _changes_feed_active = False
+            await asyncio.sleep(_changes_feed_timeout / 10)
+            continue
+
+        if changes.reset:
+            logger.debug("Change feed was reset, invalidating the cache.")
+            _invalidate_all()
+        else:
+            for change in changes.changes:
+                _apply_change(change)
+
+        since = changes.last_seq
+        _changes_feed_active = True
 
 
 async def initialize_module() -> None:
+    global _changes_feed_active, _changes_feed_task
+
+    if _changes_feed_task:
+        _changes_feed_task.cancel()
+        _changes_feed_task = None
+    _changes_feed_active = False
+
+    since: None | int = None
+
+    if _changes_feed_enabled:
+        try:
+            # has to be obtained before the listings so that no change is missed
+            since = (await ps.get_changes()).last_seq
+        except StorageClientException as e:
+            logger.warn(f"Change feed not available, falling back to polling. {str(e)}")
+
+    _invalidate_all()
+
     await asyncio.gather(
         _update_list(ps.get_projects, _projects_list, _projects),
         _update_list(ps.get_scenes, _scenes_list, _scenes),
         _update_list(ps.get_object_type_ids, _object_type_list, _object_types),
     )
 
-    _scenes.clear()
-    _projects.clear()
-    _object_types.clear()
+    if since is not None:
+        _changes_feed_active = True
+        _changes_feed_task = asyncio.create_task(_watch_changes(since))
 
 
 async def get_project_ids() -> set[str]:
@@ -144,6 +300,7 @@ async def get_project(project_id: str) -> CachedProject:
             project = _projects[project_id]
             assert project.modified
         except KeyError:
+            _cache_requests.inc(kind="project", result="miss")
             project = CachedProject(await ps.get_project(project_id))
             _projects[project_id] = project
         else:
@@ -155,8 +312,11 @@ async def get_project(project_id: str) -> CachedProject:
 
             # project in cache is outdated
             if project.modified < _projects_list.listing[project_id].modified:
+                _cache_requests.inc(kind="project", result="miss")
                 project = CachedProject(await ps.get_project(project_id))
                 _projects[project_id] = project
+            else:
+                _cache_requests.inc(kind="project", result="hit")
 
     return project
 
@@ -167,6 +327,7 @@ async def get_scene(scene_id: str) -> CachedScene:
             scene = _scenes[scene_id]
             assert scene.modified
         except KeyError:
+            _cache_requests.inc(kind="scene", result="miss")
             scene = CachedScene(await ps.get_scene(scene_id))
             _scenes[scene_id] = scene
         else:
@@ -178,18 +339,62 @@ async def get_scene(scene_id: str) -> CachedScene:
 
             # scene in cache is outdated
             if scene.modified < _scenes_list.listing[scene_id].modified:
+                _cache_requests.inc(kind="scene", result="miss")
                 scene = CachedScene(await ps.get_scene(scene_id))
                 _scenes[scene_id] = scene
+            else:
+                _cache_requests.inc(kind="scene", result="hit")
 
     return scene
 
 
+async def get_projects_by_ids(project_ids: Iterable[str]) -> dict[str, CachedProject]:
+    """Gets multiple projects at once.
+
+    Unknown ids are skipped.
+    """
+
+    async with _projects_list_lock:
+        await _update_list(ps.get_projects, _projects_list, _projects)
+        return await _get_many(project_ids, _projects_list, _projects, ps.get_projects_batch, CachedProject, "project")
+
+
+async def get_all_projects() -> list[CachedProject]:
+    async with _projects_list_lock:
+        await _update_list(ps.get_projects, _projects_list, _projects)
+        projects = await _get_many(
+            list(_projects_list.listing), _projects_list, _projects, ps.get_projects_batch, CachedProject, "project"
+        )
+    return list(projects.values())
+
+
+async def get_scenes_by_ids(scene_ids: Iterable[str]) -> dict[str, CachedScene]:
+    """Gets multiple scenes at once.
+
+    Unknown ids are skipped.
+    """
+
+    async with _scenes_list_lock:
+        await _update_list(ps.get_scenes, _scenes_list, _scenes)
+        return await _get_many(scene_ids, _scenes_list, _scenes, ps.get_scenes_batch, CachedScene, "scene")
+
+
+async def get_all_scenes() -> list[CachedScene]:
+    async with _scenes_list_lock:
+        await _update_list(ps.get_scenes, _scenes_list, _scenes)
+        scenes = await _get_many(
+            list(_scenes_list.listing), _scenes_list, _scenes, ps.get_scenes_batch, CachedScene, "scene"
+        )
+    return list(scenes.values())
+
+
 async def get_object_type(object_type_id: str) -> ObjectType:
     async with _object_type_lock:
         try:
             ot = _object_types[object_type_id]
             assert ot.modified
         except KeyError:
+            _cache_requests.inc(kind="object_type", result="miss")
             ot = await ps.get_object_type(object_type_id)
             _object_types[object_type_id] = ot
         else:
@@ -201,12 +406,46 @@ async def get_object_type(object_type_id: str) -> ObjectType:
 
             # ObjectType in cache is outdated
             if ot.modified < _object_type_list.listing[object_type_id].modified:
+                _cache_requests.inc(kind="object_type", result="miss")
                 ot = await ps.get_object_type(object_type_id)
                 _object_types[object_type_id] = ot
+            else:
+                _cache_requests.inc(kind="object_type", result="hit")
 
     return ot
 
 
+async def _get_object_types_batch(object_type_ids: list[str]) -> list[ObjectType]:
+    # there is no batch endpoint for ObjectTypes, so at least they are downloaded concurrently
+    ret: list[ObjectType] = []
+
+    for obj_id, res in zip(
+        object_type_ids,
+        await asyncio.gather(*(ps.get_object_type(obj_id) for obj_id in object_type_ids), return_exceptions=True),
+    ):
+        if isinstance(res, Arcor2Exception):
+            logger.warning(f"Failed to get ObjectType {obj_id}: {str(res)}")
+            continue
+        if isinstance(res, BaseException):
+            raise res
+        ret.append(res)
+
+    return ret
+
+
+async def get_object_types_by_ids(object_type_ids: Iterable[str]) -> dict[str, ObjectType]:
+    """Gets multiple ObjectTypes at once.
+
+    Unknown ids (or ObjectTypes that could not be downloaded) are skipped.
+    """
+
+    async with _object_type_lock:
+        await _update_list(ps.get_object_type_ids, _object_type_list, _object_types)
+        return await _get_many(
+            object_type_ids, _object_type_list, _object_types, _get_object_types_batch, lambda ot: ot, "object_type"
+        )
+
+
 async def update_project(project: CachedProject) -> datetime:
     assert project.id
 
@@ -219,7 +458,7 @@ async def update_project(project: CachedProject) -> datetime:
     _projects_list.listing[project.id] = IdDesc(
         project.id, project.name, project.created, project.modified, project.description
     )
-    _projects[project.id] = deepcopy(project)
+    _projects[project.id] = CachedProject(project)  # shares what was not modified
     _projects[project.id].int_modified = None
 
     return ret
@@ -235,7 +474,7 @@ async def update_scene(scene: CachedScene) -> datetime:
         scene.created = scene.modified
 
     _scenes_list.listing[scene.id] = IdDesc(scene.id, scene.name, scene.created, scene.modified, scene.description)
-    _scenes[scene.id] = deepcopy(scene)
+    _scenes[scene.id] = CachedScene(scene)  # shares what was not modified
     _scenes[scene.id].int_modified = None
 
     return ret
@@ -288,6 +527,12 @@ __all__ = [
     get_project.__name__,
     get_project_sources.__name__,
     get_scene.__name__,
+    get_projects_by_ids.__name__,
+    get_all_projects.__name__,
+    get_project_ids_with_scene.__name__,
+    get_project_ids_using_object.__name__,
+    get_scenes_by_ids.__name__,
+    get_all_scenes.__name__,
     get_object_type.__name__,
     get_object_types.__name__,
     update_project.__name__,
@@ -1,4 +1,4 @@
-from typing import AsyncIterator
+from typing import AsyncIterator, Iterable
 
 from arcor2.cached import CachedProject, UpdateableCachedProject
 from arcor2.data import common
@@ -16,7 +16,7 @@ async def project_names() -> set[str]:
 
 
 async def associated_projects(scene_id: str) -> set[str]:
-    return {project.id async for project in projects(scene_id)}
+    return await storage.get_project_ids_with_scene(scene_id)
 
 
 async def remove_object_references_from_projects(obj_id: str) -> None:
@@ -55,52 +55,29 @@ async def remove_object_references_from_projects(obj_id: str) -> None:
     logger.info("Updated projects: {}".format(updated_project_ids))
 
 
-async def projects(scene_id: str) -> AsyncIterator[UpdateableCachedProject]:
-    for project_meta in await storage.get_projects():
-        project = await storage.get_project(project_meta.id)
-
-        if project.scene_id != scene_id:
-            continue
-
+async def projects(project_ids: Iterable[str]) -> AsyncIterator[UpdateableCachedProject]:
+    for project in (await storage.get_projects_by_ids(project_ids)).values():
         yield UpdateableCachedProject(project)
 
 
-def _project_using_object_as_parent(project: CachedProject, obj_id: str) -> bool:
-    for ap in project.action_points:
-        if ap.parent == obj_id:
-            return True
-
-    return False
-
-
-def _project_referencing_object(project: CachedProject, obj_id: str) -> bool:
-    for action in project.actions:
-        action_obj_id, _ = action.parse_type()
-
-        if action_obj_id == obj_id:
-            return True
-
-    return False
-
-
 async def projects_using_object(scene_id: str, obj_id: str) -> AsyncIterator[UpdateableCachedProject]:
     """Combines functionality of projects_using_object_as_parent and
     projects_referencing_object.
 
+    Projects are found using the reference index of the Storage service.
+
     :param scene_id:
     :param obj_id:
     :return:
     """
 
-    async for project in projects(scene_id):
-        if _project_using_object_as_parent(project, obj_id) or _project_referencing_object(project, obj_id):
-            yield project
+    async for project in projects(await storage.get_project_ids_using_object(scene_id, obj_id)):
+        yield project
 
 
 async def projects_using_object_as_parent(scene_id: str, obj_id: str) -> AsyncIterator[UpdateableCachedProject]:
-    async for project in projects(scene_id):
-        if _project_using_object_as_parent(project, obj_id):
-            yield project
+    async for project in projects(await storage.get_project_ids_using_object(scene_id, obj_id, in_actions=False)):
+        yield project
 
 
 async def invalidate_joints_using_object_as_parent(obj: common.SceneObject) -> None:
@@ -119,6 +96,5 @@ async def invalidate_joints_using_object_as_parent(obj: common.SceneObject) -> N
 
 
 async def projects_referencing_object(scene_id: str, obj_id: str) -> AsyncIterator[CachedProject]:
-    async for project in projects(scene_id):
-        if _project_referencing_object(project, obj_id):
-            yield project
+    async for project in projects(await storage.get_project_ids_using_object(scene_id, obj_id, as_parent=False)):
+        yield project
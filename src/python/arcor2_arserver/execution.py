@@ -1,7 +1,6 @@
 import asyncio
-import base64
 import os
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
 
 import aiofiles
 import websockets
@@ -22,10 +21,17 @@ from arcor2_arserver_data import events as sevts
 from arcor2_build_data import URL as BUILD_URL
 from arcor2_execution_data import URL as EXE_URL
 from arcor2_execution_data import rpc as erpc
+from arcor2_execution_data.upload import CHUNK_SIZE, package_chunk
 from arcor2_web import rest
 
+
+class _BinaryMessage(NamedTuple):
+    data: bytes
+    sent: asyncio.Future
+
+
 if TYPE_CHECKING:
-    ReqQueue = asyncio.Queue[rpc.common.RPC.Request]
+    ReqQueue = asyncio.Queue[rpc.common.RPC.Request | _BinaryMessage]
     RespQueue = asyncio.Queue[rpc.common.RPC.Response]
 else:
     ReqQueue = asyncio.Queue
@@ -102,12 +108,14 @@ async def build_and_upload_package(project_id: str, package_name: str) -> str:
             },
         )
 
+        # send data to execution service, chunk by chunk
+        size = 0
         async with aiofiles.open(path, "rb") as zip_file:
-            b64_bytes = base64.b64encode(await zip_file.read())
-            b64_str = b64_bytes.decode()
+            while chunk := await zip_file.read(CHUNK_SIZE):
+                await manager_send_binary(package_chunk(package_id, chunk))
+                size += len(chunk)
 
-    # send data to execution service
-    exe_req = erpc.UploadPackage.Request(get_id(), args=erpc.UploadPackage.Request.Args(package_id, b64_str))
+    exe_req = erpc.UploadPackageStream.Request(get_id(), args=erpc.UploadPackageStream.Request.Args(package_id, size))
     exe_resp = await manager_request(exe_req)
 
     if not exe_resp.result:
@@ -128,6 +136,40 @@ async def manager_request(req: rpc.common.RPC.Request, ui: None | WsClient = Non
     return resp
 
 
+async def manager_send_binary(data: bytes) -> None:
+    """Sends a binary message to the Execution service (in order with RPCs).
+
+    Waits until the message is sent, so the caller does not produce
+    data faster than they can be sent.
+    """
+
+    msg = _BinaryMessage(data, asyncio.get_running_loop().create_future())
+    await MANAGER_RPC_REQUEST_QUEUE.put(msg)
+    await msg.sent
+
+
+def _fail_binary_messages() -> None:
+    """Chunks can't be sent over another connection, as the Execution service
+    would miss the previous ones, so the upload has to be started again."""
+
+    requests: list[rpc.common.RPC.Request] = []
+
+    while not MANAGER_RPC_REQUEST_QUEUE.empty():
+        msg = MANAGER_RPC_REQUEST_QUEUE.get_nowait()
+        if isinstance(msg, _BinaryMessage):
+            _connection_lost(msg)
+        else:
+            requests.append(msg)
+
+    for req in requests:
+        MANAGER_RPC_REQUEST_QUEUE.put_nowait(req)
+
+
+def _connection_lost(msg: _BinaryMessage) -> None:
+    if not msg.sent.done():  # might be cancelled
+        msg.sent.set_exception(Arcor2Exception("Connection to the Execution service was lost."))
+
+
 async def project_manager_client(handle_manager_incoming_messages) -> None:
     while True:
         logger.info("Attempting connection to manager...")
@@ -148,10 +190,20 @@ async def project_manager_client(handle_manager_incoming_messages) -> None:
                         continue
 
                     try:
-                        await manager_client.send(msg.to_json())
+                        if isinstance(msg, _BinaryMessage):
+                            await manager_client.send(msg.data)
+                            msg.sent.set_result(None)
+                        else:
+                            await manager_client.send(msg.to_json())
                     except websockets.exceptions.ConnectionClosed:
-                        await MANAGER_RPC_REQUEST_QUEUE.put(msg)
+                        if isinstance(msg, _BinaryMessage):
+                            _connection_lost(msg)
+                        else:
+                            await MANAGER_RPC_REQUEST_QUEUE.put(msg)
                         break
+
+                _fail_binary_messages()
         except ConnectionRefusedError as e:
             logger.error(e)
+            _fail_binary_messages()  # the service is not there, do not let the upload wait for it
             await asyncio.sleep(delay=1.0)
@@ -1,20 +1,22 @@
-import asyncio
-
 from websockets.server import WebSocketServerProtocol
 
 from arcor2.data import events
+from arcor2.data.codec import codec
 from arcor2_arserver import globals as glob
 from arcor2_arserver import logger
 from arcor2_web import ws_server
 
 
+def _dumps(event: events.Event) -> str:
+    return codec(type(event), camel=False).dumps(event).decode()
+
+
 async def broadcast_event(event: events.Event) -> None:
     logger.debug(event)
 
     if glob.USERS.interfaces:
-        message = event.to_json()
-        await asyncio.gather(*[ws_server.send_json_to_client(intf, message) for intf in glob.USERS.interfaces])
+        ws_server.broadcast(glob.USERS.interfaces, _dumps(event))
 
 
 async def event(interface: WebSocketServerProtocol, event: events.Event) -> None:
-    await ws_server.send_json_to_client(interface, event.to_json())
+    ws_server.send(interface, _dumps(event))
@@ -1,16 +1,23 @@
 import asyncio
-from typing import NamedTuple
+import hashlib
+import os
+import stat
+import sys
+import time
+from typing import Iterable, NamedTuple
 
 from arcor2 import helpers as hlp
+from arcor2 import json
 from arcor2.cached import CachedScene
+from arcor2.data.codec import CodecException, codec
 from arcor2.data.events import Event
-from arcor2.data.object_type import Mesh, ObjectModel
+from arcor2.data.object_type import Mesh, Model, ObjectModel, ObjectType
 from arcor2.exceptions import Arcor2Exception
 from arcor2.source.utils import parse
 from arcor2_arserver import globals as glob
 from arcor2_arserver import logger
 from arcor2_arserver import notifications as notif
-from arcor2_arserver import settings
+from arcor2_arserver import settings, version
 from arcor2_arserver.clients import project_service as storage
 from arcor2_arserver.object_types.utils import (
     ObjectTypeData,
@@ -24,13 +31,22 @@ from arcor2_arserver.object_types.utils import (
 )
 from arcor2_arserver.robot import get_robot_meta
 from arcor2_arserver_data.events.objects import ChangedObjectTypes
-from arcor2_arserver_data.objects import ObjectTypeMeta
+from arcor2_arserver_data.objects import ObjectAction, ObjectTypeMeta
 from arcor2_object_types import utils as otu
+from arcor2_object_types import version as otu_version
 from arcor2_object_types.abstract import Generic, Robot
 from arcor2_object_types.parameter_plugins.base import TypesDict
 from arcor2_object_types.utils import built_in_types_names, prepare_object_types_dir
 from arcor2_storage import aio_client as project_client
 
+CachedMetadata = tuple[ObjectTypeMeta, dict[str, ObjectAction]]
+
+# keys of (parsed metadata of) loaded ObjectTypes, needed to compute keys of their descendants
+_cache_keys: dict[str, str] = {}
+
+# the cache directory is checked (and created) once, before it is used for the first time
+_cache_enabled: None | bool = None
+
 
 def get_types_dict() -> TypesDict:
     return {k: v.type_def for k, v in glob.OBJECT_TYPES.items() if v.type_def is not None}
@@ -49,110 +65,339 @@ def valid_object_types() -> ObjectTypeDict:
     return {obj_type: obj for obj_type, obj in glob.OBJECT_TYPES.items() if not obj.meta.disabled}
 
 
-async def get_object_data(object_types: ObjectTypeDict, obj_id: str) -> None:
-    logger.debug(f"Processing {obj_id}.")
+async def _asset_exists(asset_id: str, existing_assets: None | set[str]) -> bool:
+    if existing_assets is not None and asset_id in existing_assets:
+        return True
 
-    if obj_id in object_types:
-        logger.debug(f"{obj_id} already processed, skipping...")
-        return
+    # might have been uploaded in the meantime
+    return await project_client.asset_exists(asset_id)
 
-    obj_iddesc = await storage.get_object_type_iddesc(obj_id)
 
-    if obj_id in glob.OBJECT_TYPES:
-        assert obj_iddesc.modified
-        assert glob.OBJECT_TYPES[obj_id].meta.modified, f"Object {obj_id} does not have 'modified' in its meta."
+def _cache_key(source: str, *dependencies: str) -> str:
+    """Key of parsed metadata of ObjectType - it depends also on its base
+    (and mixins) and on versions of ARServer and Python."""
 
-        if obj_iddesc.modified == glob.OBJECT_TYPES[obj_id].meta.modified:
-            logger.debug(f"No need to update {obj_id}.")
-            return
+    digest = hashlib.sha256(f"{version()}/{otu_version()}/{sys.version}".encode())
+    digest.update(source.encode())
 
-    obj = await storage.get_object_type(obj_id)
+    for dependency in dependencies:
+        digest.update(dependency.encode())
 
-    try:
-        bases = otu.base_from_source(obj.source, obj_id)
+    return digest.hexdigest()
 
-        if not bases:
-            logger.debug(f"{obj_id} is definitely not an ObjectType (subclass of {object.__name__}), maybe mixin?")
-            return
 
-        if bases[0] not in object_types.keys() | built_in_types_names():
-            logger.debug(f"Getting base class {bases[0]} for {obj_id}.")
-            await get_object_data(object_types, bases[0])
+def _cache_file(key: str) -> str:
+    return os.path.join(settings.OBJECT_TYPE_CACHE_PATH, f"{key}.json")
 
-        for mixin in bases[1:]:
-            mixin_obj = await storage.get_object_type(mixin)
 
-            await hlp.run_in_executor(
-                hlp.save_and_import_type_def,
-                mixin_obj.source,
-                mixin_obj.id,
-                object,
-                settings.OBJECT_TYPE_PATH,
-                settings.OBJECT_TYPE_MODULE,
-            )
+def _check_cache_dir(path: str) -> None | str:
+    """Creates the cache directory (accessible only by the current user).
 
-    except Arcor2Exception as e:
-        logger.error(f"Disabling ObjectType {obj.id}: can't get a base. {str(e)}")
-        object_types[obj_id] = ObjectTypeData(
-            ObjectTypeMeta(
-                obj_id, "ObjectType disabled.", disabled=True, problem="Can't get base.", modified=obj.modified
-            )
-        )
+    :return: Why the directory can't be used (None if it can).
+    """
+
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+
+    if not stat.S_ISDIR(st.st_mode):
+        return "is not a directory"
+    if st.st_uid != os.getuid():
+        return "is owned by another user"
+    if st.st_mode & 0o077:
+        return "is accessible by other users"
+
+    return None
+
+
+async def _init_cache() -> None:
+    global _cache_enabled
+
+    if _cache_enabled is not None:
         return
 
-    logger.debug(f"Updating {obj_id}.")
+    _cache_enabled = False
 
-    try:
-        type_def = await hlp.run_in_executor(
-            hlp.save_and_import_type_def,
-            obj.source,
-            obj.id,
-            Generic,
-            settings.OBJECT_TYPE_PATH,
-            settings.OBJECT_TYPE_MODULE,
-        )
-    except Arcor2Exception as e:
-        logger.debug(f"{obj.id} is probably not an ObjectType. {str(e)}")
+    if not (path := settings.OBJECT_TYPE_CACHE_PATH):
         return
 
-    assert issubclass(type_def, Generic)
+    try:
+        problem = await hlp.run_in_executor(_check_cache_dir, path, propagate=[OSError])
+    except OSError as e:
+        problem = f"can't be created ({str(e)})"
+
+    if problem:
+        logger.warning(f"Cache of ObjectTypes is disabled, {path} {problem}.")
+    else:
+        _cache_enabled = True
+
+
+def _dumps_cache(meta: ObjectTypeMeta, actions: dict[str, ObjectAction]) -> bytes:
+    return json.dumps(
+        {
+            "meta": codec(ObjectTypeMeta, camel=False).to_dict(meta),
+            "actions": [codec(ObjectAction, camel=False).to_dict(action) for action in actions.values()],
+        }
+    ).encode()
+
+
+def _read_cache(key: str) -> None | CachedMetadata:
+    if not _cache_enabled:
+        return None
 
     try:
-        meta = meta_from_def(type_def)
-    except Arcor2Exception as e:
-        logger.error(f"Disabling ObjectType {obj.id}.")
-        logger.debug(e, exc_info=True)
-        object_types[obj_id] = ObjectTypeData(
-            ObjectTypeMeta(obj_id, "ObjectType disabled.", disabled=True, problem=str(e), modified=obj.modified)
-        )
+        with open(_cache_file(key), "rb") as file:
+            data = json.loads_type(file.read(), dict)
+
+        meta = codec(ObjectTypeMeta, camel=False).from_dict(data["meta"])
+        actions = codec(ObjectAction, camel=False).from_list(data["actions"])
+    except (OSError, json.JsonException, CodecException, KeyError):  # missing or corrupted file, etc.
+        return None
+
+    return meta, {action.name: action for action in actions}
+
+
+def _write_cache(entries: dict[str, bytes]) -> None:
+    if not _cache_enabled:
         return
 
-    meta.modified = obj.modified
+    for key, data in entries.items():
+        path = _cache_file(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+
+        os.replace(tmp_path, path)  # readers never see a partially written file
+
+
+def _bases(sources: dict[str, str]) -> dict[str, list[str] | Arcor2Exception]:
+    ret: dict[str, list[str] | Arcor2Exception] = {}
+
+    for obj_id, source in sources.items():
+        try:
+            ret[obj_id] = otu.base_from_source(source, obj_id)
+        except Arcor2Exception as e:
+            ret[obj_id] = e
+
+    return ret
+
+
+def _import_mixins(mixins: list[ObjectType]) -> dict[str, Arcor2Exception]:
+    """Returns errors for mixins that could not be imported."""
+
+    ret: dict[str, Arcor2Exception] = {}
 
-    if obj.model:
+    for mixin in mixins:
         try:
-            model = await storage.get_model(obj.model.id, obj.model.type)
+            hlp.save_and_import_type_def(
+                mixin.source, mixin.id, object, settings.OBJECT_TYPE_PATH, settings.OBJECT_TYPE_MODULE
+            )
         except Arcor2Exception as e:
-            logger.error(f"{obj.model.id}: failed to get collision model of type {obj.model.type}. {str(e)}")
-            meta.disabled = True
-            meta.problem = "Can't get collision model."
-            object_types[obj_id] = ObjectTypeData(meta)
-            return
+            ret[mixin.id] = e
+
+    return ret
+
 
-        if isinstance(model, Mesh) and not await project_client.asset_exists(model.asset_id):
-            logger.error(f"Disabling {meta.type} as its mesh file {model.asset_id} does not exist.")
-            meta.disabled = True
-            meta.problem = "Mesh file does not exist."
-            object_types[obj_id] = ObjectTypeData(meta)
-            return
+class _Imported(NamedTuple):
+    type_def: None | type[Generic]
+    error: None | Arcor2Exception = None
+    cached: None | CachedMetadata = None
 
-        kwargs = {model.type().value.lower(): model}
-        meta.object_model = ObjectModel(model.type(), **kwargs)
 
-    ast = parse(obj.source)
-    otd = ObjectTypeData(meta, type_def, object_actions(type_def, ast), ast)
+def _import_object_types(object_types: list[tuple[ObjectType, str]]) -> dict[str, _Imported]:
+    """Imports ObjectTypes (of one level of the inheritance hierarchy) and
+    reads their cached metadata."""
 
-    object_types[obj_id] = otd
+    ret: dict[str, _Imported] = {}
+
+    for obj, key in object_types:
+        try:
+            type_def = hlp.save_and_import_type_def(
+                obj.source, obj.id, Generic, settings.OBJECT_TYPE_PATH, settings.OBJECT_TYPE_MODULE
+            )
+        except Arcor2Exception as e:
+            ret[obj.id] = _Imported(None, e)
+        else:
+            ret[obj.id] = _Imported(type_def, cached=_read_cache(key))
+
+    return ret
+
+
+def _disabled(obj: ObjectType, problem: str) -> ObjectTypeData:
+    return ObjectTypeData(
+        ObjectTypeMeta(obj.id, "ObjectType disabled.", disabled=True, problem=problem, modified=obj.modified)
+    )
+
+
+async def _load_object_types(
+    object_types: ObjectTypeDict, obj_ids: Iterable[str], existing_assets: None | set[str] = None
+) -> None:
+    """Loads new or updated ObjectTypes into object_types.
+
+    Sources (and mixins and models) are downloaded concurrently, then the
+    ObjectTypes are imported level by level of the inheritance hierarchy
+    (bases first). Metadata (meta, actions) of unchanged ObjectTypes are
+    taken from the on-disk cache.
+
+    :param existing_assets: Known existing assets (e.g. checked in advance for all meshes at once).
+    """
+
+    listing = {iddesc.id: iddesc for iddesc in await storage.get_object_types()}
+    to_update: list[str] = []
+
+    for obj_id in obj_ids:
+        if obj_id in glob.OBJECT_TYPES and obj_id in listing:
+            obj_iddesc = listing[obj_id]
+            assert obj_iddesc.modified
+            assert glob.OBJECT_TYPES[obj_id].meta.modified, f"Object {obj_id} does not have 'modified' in its meta."
+
+            if obj_iddesc.modified == glob.OBJECT_TYPES[obj_id].meta.modified:
+                continue
+
+        to_update.append(obj_id)
+
+    if not to_update:
+        logger.debug("No need to update any ObjectType.")
+        return
+
+    start = time.monotonic()
+    await _init_cache()
+    sources = await storage.get_object_types_by_ids(to_update)
+
+    for obj_id in sources:
+        _cache_keys.pop(obj_id, None)
+    bases: dict[str, list[str]] = {}
+
+    for obj_id, obj_bases in (await hlp.run_in_executor(_bases, {k: v.source for k, v in sources.items()})).items():
+        if isinstance(obj_bases, Arcor2Exception):
+            logger.error(f"Disabling ObjectType {obj_id}: can't get a base. {str(obj_bases)}")
+            object_types[obj_id] = _disabled(sources[obj_id], "Can't get base.")
+        elif not obj_bases:
+            logger.debug(f"{obj_id} is definitely not an ObjectType (subclass of {object.__name__}), maybe mixin?")
+        else:
+            bases[obj_id] = obj_bases
+
+    mixins = await storage.get_object_types_by_ids({mixin for obj_bases in bases.values() for mixin in obj_bases[1:]})
+    mixin_errors = await hlp.run_in_executor(_import_mixins, list(mixins.values()))
+
+    for obj_id, obj_bases in list(bases.items()):
+        for mixin in obj_bases[1:]:
+            if mixin not in mixins or mixin in mixin_errors:
+                logger.error(f"Disabling ObjectType {obj_id}: can't get a mixin {mixin}. {mixin_errors.get(mixin, '')}")
+                object_types[obj_id] = _disabled(sources[obj_id], "Can't get base.")
+                del bases[obj_id]
+                break
+
+    with_model = [sources[obj_id] for obj_id in bases if sources[obj_id].model]
+    models: dict[str, Model | BaseException] = dict(
+        zip(
+            (obj.id for obj in with_model),
+            await asyncio.gather(
+                *(storage.get_model(obj.model.id, obj.model.type) for obj in with_model if obj.model),
+                return_exceptions=True,
+            ),
+        )
+    )
+
+    built_in = built_in_types_names()
+    pending = dict(bases)
+    to_cache: dict[str, bytes] = {}
+    from_cache = 0
+
+    while pending:
+        level = [obj_id for obj_id, obj_bases in pending.items() if obj_bases[0] not in pending]
+
+        if not level:
+            for obj_id in pending:
+                logger.error(f"Disabling ObjectType {obj_id}: cyclic inheritance.")
+                object_types[obj_id] = _disabled(sources[obj_id], "Can't get base.")
+            break
+
+        to_import: list[tuple[ObjectType, str]] = []
+
+        for obj_id in level:
+            del pending[obj_id]
+            base = bases[obj_id][0]
+
+            if base not in built_in and base not in object_types and base not in glob.OBJECT_TYPES:
+                logger.error(f"Disabling ObjectType {obj_id}: unknown base {base}.")
+                object_types[obj_id] = _disabled(sources[obj_id], "Can't get base.")
+                continue
+
+            key = _cache_key(
+                sources[obj_id].source,
+                _cache_keys.get(base, base),
+                *(_cache_key(mixins[mixin].source) for mixin in bases[obj_id][1:]),
+            )
+            _cache_keys[obj_id] = key  # depends only on the sources, descendants will use it
+            to_import.append((sources[obj_id], key))
+
+        imported = await hlp.run_in_executor(_import_object_types, to_import)
+
+        for obj, key in to_import:
+            logger.debug(f"Updating {obj.id}.")
+            type_def, error, cached = imported[obj.id]
+
+            if type_def is None:
+                logger.debug(f"{obj.id} is probably not an ObjectType. {str(error)}")
+                continue
+
+            assert issubclass(type_def, Generic)
+
+            if cached:
+                meta, actions = cached
+                ast = parse(obj.source)
+                from_cache += 1
+            else:
+                try:
+                    meta = meta_from_def(type_def)
+                except Arcor2Exception as e:
+                    logger.error(f"Disabling ObjectType {obj.id}.")
+                    logger.debug(e, exc_info=True)
+                    object_types[obj.id] = _disabled(obj, str(e))
+                    continue
+
+                ast = parse(obj.source)
+                actions = object_actions(type_def, ast)
+
+                to_cache[key] = _dumps_cache(meta, actions)
+
+            meta.modified = obj.modified
+
+            if obj.model:
+                model = models[obj.id]
+
+                if isinstance(model, BaseException):
+                    if not isinstance(model, Arcor2Exception):
+                        raise model
+
+                    logger.error(
+                        f"{obj.model.id}: failed to get collision model of type {obj.model.type}. {str(model)}"
+                    )
+                    meta.disabled = True
+                    meta.problem = "Can't get collision model."
+                    object_types[obj.id] = ObjectTypeData(meta)
+                    continue
+
+                if isinstance(model, Mesh) and not await _asset_exists(model.asset_id, existing_assets):
+                    logger.error(f"Disabling {meta.type} as its mesh file {model.asset_id} does not exist.")
+                    meta.disabled = True
+                    meta.problem = "Mesh file does not exist."
+                    object_types[obj.id] = ObjectTypeData(meta)
+                    continue
+
+                kwargs = {model.type().value.lower(): model}
+                meta.object_model = ObjectModel(model.type(), **kwargs)
+
+            object_types[obj.id] = ObjectTypeData(meta, type_def, actions, ast)
+
+    if to_cache:
+        try:
+            await hlp.run_in_executor(_write_cache, to_cache)
+        except Arcor2Exception as e:
+            logger.warning(f"Failed to write cache of ObjectTypes. {str(e)}")
+
+    logger.info(f"Loaded {len(to_update)} ObjectTypes ({from_cache} from cache) in {time.monotonic() - start:.2f}s.")
 
 
 class UpdatedObjectTypes(NamedTuple):
@@ -190,8 +435,10 @@ async def get_object_types() -> UpdatedObjectTypes:
         object_type_ids = list(object_type_ids)
         random.shuffle(object_type_ids)
 
-    for obj_id in object_type_ids:
-        await get_object_data(updated_object_types, obj_id)
+    # existence of all mesh files is checked at once, instead of a request per ObjectType
+    existing_assets = await project_client.assets_exist([mesh.asset_id for mesh in await storage.get_meshes()])
+
+    await _load_object_types(updated_object_types, object_type_ids, existing_assets)
 
     removed_object_ids = {
         obj for obj in glob.OBJECT_TYPES.keys() if obj not in object_type_ids
@@ -1,8 +1,12 @@
 import asyncio
+import copy
 import inspect
-from typing import Any
+import time
+from collections import deque
+from typing import Any, NamedTuple
 
 import arcor2.helpers as hlp
+from arcor2 import env
 from arcor2.cached import CachedScene
 from arcor2.data import common
 from arcor2.exceptions import Arcor2Exception
@@ -17,6 +21,15 @@ from arcor2_arserver_data.robot import RobotMeta
 from arcor2_object_types.abstract import MultiArmRobot, Robot
 from arcor2_storage import aio_client as project_client
 
+STATE_PERIOD = env.get_float("ARCOR2_STREAMING_PERIOD", 0.1)
+
+if STATE_PERIOD <= 0:
+    STATE_PERIOD = 0.1
+
+STATE_MAX_AGE = max(env.get_float("ARCOR2_ROBOT_STATE_MAX_AGE", STATE_PERIOD), 0)
+STATE_IDLE_TIMEOUT = max(env.get_float("ARCOR2_ROBOT_STATE_IDLE_TIMEOUT", 2.0), STATE_PERIOD)
+STATE_HISTORY = max(env.get_int("ARCOR2_ROBOT_STATE_HISTORY", 16), 1)
+
 
 class RobotPoseException(Arcor2Exception):
     pass
@@ -26,6 +39,10 @@ class SingleArmRobotException(Arcor2Exception):
     pass
 
 
+class RobotStateException(Arcor2Exception):
+    pass
+
+
 def prepare_args(robot_inst: Robot, args: list[Any], arm_id: None | str) -> list[Any]:
     if isinstance(robot_inst, MultiArmRobot):
         args.append(arm_id)
@@ -74,34 +91,151 @@ async def get_suctions(robot_inst: Robot, arm_id: None | str) -> set[str]:
     return await hlp.run_in_executor(robot_inst.suctions, *prepare_args(robot_inst, [], arm_id))
 
 
+# ("joints", arm_id, include_gripper) or ("pose", arm_id, end_effector)
+StateKey = tuple[str, None | str, bool | str]
+
+
+class RobotState(NamedTuple):
+    ts: float  # when the sampling started
+    values: dict[StateKey, Any]  # value or exception
+
+
+class _StateSampler:
+    """Reads the state of a robot periodically (ARCOR2_STREAMING_PERIOD).
+
+    Only the values requested by readers (RPCs, streaming of events)
+    within ARCOR2_ROBOT_STATE_IDLE_TIMEOUT are read, all of them at once.
+    When there are no readers or the robot instance is gone, the sampler stops.
+    """
+
+    __slots__ = ("robot_inst", "history", "_keys", "_next", "_wakeup", "_task")
+
+    def __init__(self, robot_inst: Robot) -> None:
+        self.robot_inst = robot_inst
+        self.history: deque[RobotState] = deque(maxlen=STATE_HISTORY)
+        self._keys: dict[StateKey, float] = {}  # key -> when it was requested for the last time
+        self._next: asyncio.Future[RobotState] = asyncio.get_running_loop().create_future()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def running(self) -> bool:
+        return not self._task.done()
+
+    async def get(self, key: StateKey, max_age: float) -> Any:
+        now = time.monotonic()
+
+        if key in self._keys:
+            for state in reversed(self.history):
+                if state.ts < now - max_age:
+                    break
+                if key in state.values:
+                    return self._value(state.values[key])
+        else:
+            self._wakeup.set()  # don't wait for the next period
+
+        self._keys[key] = now
+
+        while True:
+            state = await asyncio.shield(self._next)
+            if state.ts >= now - max_age and key in state.values:
+                return self._value(state.values[key])
+
+    @staticmethod
+    def _value(value: Any) -> Any:
+        if isinstance(value, BaseException):
+            raise value
+        return copy.deepcopy(value)  # callers might modify it
+
+    async def _read(self, key: StateKey) -> Any:
+        what, arm_id, arg = key
+
+        if what == "joints":
+            return await hlp.run_in_executor(
+                self.robot_inst.robot_joints, *prepare_args(self.robot_inst, [arg], arm_id)
+            )
+
+        return await hlp.run_in_executor(
+            self.robot_inst.get_end_effector_pose, *prepare_args(self.robot_inst, [arg], arm_id)
+        )
+
+    async def _run(self) -> None:
+        try:
+            while glob.SCENE_OBJECT_INSTANCES.get(self.robot_inst.id) is self.robot_inst:
+                start = time.monotonic()
+
+                for key, requested in list(self._keys.items()):
+                    if requested < start - STATE_IDLE_TIMEOUT:
+                        del self._keys[key]
+
+                if not self._keys:
+                    break
+
+                self._wakeup.clear()
+                keys = list(self._keys)
+                values = await asyncio.gather(*[self._read(key) for key in keys], return_exceptions=True)
+                state = RobotState(start, dict(zip(keys, values)))
+                self.history.append(state)
+
+                done, self._next = self._next, asyncio.get_running_loop().create_future()
+                done.set_result(state)
+
+                # when the robot does not respond, there is no point in asking it too often
+                period = 1.0 if all(isinstance(val, BaseException) for val in values) else STATE_PERIOD
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), period - (time.monotonic() - start))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if not self._next.done():
+                self._next.set_exception(RobotStateException("Robot is not available."))
+                self._next.exception()  # marks it as retrieved, there might be no one waiting for it
+
+
+_samplers: dict[str, _StateSampler] = {}
+
+
+async def _state(robot_inst: Robot, key: StateKey, max_age: None | float) -> Any:
+    sampler = _samplers.get(robot_inst.id)
+
+    if sampler is None or sampler.robot_inst is not robot_inst or not sampler.running():
+        sampler = _samplers[robot_inst.id] = _StateSampler(robot_inst)
+
+    return await sampler.get(key, STATE_MAX_AGE if max_age is None else max_age)
+
+
 async def get_pose_and_joints(
-    robot_inst: Robot, end_effector: str, arm_id: None | str
+    robot_inst: Robot, end_effector: str, arm_id: None | str, max_age: None | float = None
 ) -> tuple[common.Pose, list[common.Joint]]:
     return await asyncio.gather(
-        hlp.run_in_executor(robot_inst.get_end_effector_pose, *prepare_args(robot_inst, [end_effector], arm_id)),
-        hlp.run_in_executor(robot_inst.robot_joints, *prepare_args(robot_inst, [False], arm_id)),
+        get_end_effector_pose(robot_inst, end_effector, arm_id, max_age),
+        get_robot_joints(robot_inst, arm_id, False, max_age),
     )
 
 
-async def get_end_effector_pose(robot_inst: Robot, end_effector: str, arm_id: None | str) -> common.Pose:
+async def get_end_effector_pose(
+    robot_inst: Robot, end_effector: str, arm_id: None | str, max_age: None | float = None
+) -> common.Pose:
     """
     :param robot_inst:
     :param end_effector:
+    :param max_age: Max. age of the pose in seconds (ARCOR2_ROBOT_STATE_MAX_AGE by default), 0 to wait for a new one.
     :return: Global pose
     """
 
-    return await hlp.run_in_executor(
-        robot_inst.get_end_effector_pose, *prepare_args(robot_inst, [end_effector], arm_id)
-    )
+    return await _state(robot_inst, ("pose", arm_id, end_effector), max_age)
 
 
-async def get_robot_joints(robot_inst: Robot, arm_id: None | str, include_gripper: bool = False) -> list[common.Joint]:
+async def get_robot_joints(
+    robot_inst: Robot, arm_id: None | str, include_gripper: bool = False, max_age: None | float = None
+) -> list[common.Joint]:
     """
     :param robot_inst:
+    :param max_age: Max. age of the joints in seconds (ARCOR2_ROBOT_STATE_MAX_AGE by default), 0 to wait for new ones.
     :return: List of joints
     """
 
-    return await hlp.run_in_executor(robot_inst.robot_joints, *prepare_args(robot_inst, [include_gripper], arm_id))
+    return await _state(robot_inst, ("joints", arm_id, include_gripper), max_age)
 
 
 def _feature(type_def: type[Robot], method_name: str, base_class: type[Robot]) -> bool:
@@ -198,6 +332,38 @@ async def ik(
     )
 
 
+async def ik_batch(
+    robot_inst: Robot,
+    end_effector_id: str,
+    arm_id: None | str,
+    poses: list[common.Pose],
+    start_joints: None | list[common.Joint] = None,
+    avoid_collisions: bool = True,
+) -> list[None | list[common.Joint]]:
+    """Computes IK for many poses, None where it could not be computed.
+
+    The default implementation of inverse_kinematics_batch computes one
+    pose after another, so for robots that don't override it, the poses
+    are processed concurrently instead.
+    """
+
+    if type(robot_inst).inverse_kinematics_batch in (
+        Robot.inverse_kinematics_batch,
+        MultiArmRobot.inverse_kinematics_batch,
+    ):
+        # order of results from gather corresponds to order of tasks
+        results = await asyncio.gather(
+            *[ik(robot_inst, end_effector_id, arm_id, pose, start_joints, avoid_collisions) for pose in poses],
+            return_exceptions=True,
+        )
+        return [res if isinstance(res, list) else None for res in results]
+
+    return await hlp.run_in_executor(
+        robot_inst.inverse_kinematics_batch,
+        *prepare_args(robot_inst, [end_effector_id, poses, start_joints, avoid_collisions], arm_id),
+    )
+
+
 async def fk(robot_inst: Robot, end_effector_id: str, arm_id: None | str, joints: list[common.Joint]) -> common.Pose:
     return await hlp.run_in_executor(
         robot_inst.forward_kinematics, *prepare_args(robot_inst, [end_effector_id, joints], arm_id)
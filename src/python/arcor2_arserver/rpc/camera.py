@@ -15,8 +15,10 @@ from arcor2_arserver_data.events.common import ProcessState
 from arcor2_arserver_data.rpc.camera import CalibrateCamera, CameraColorImage, CameraColorParameters
 from arcor2_calibration_data import client as calib_client
 from arcor2_object_types.abstract import Camera
+from arcor2_web.ws_server import RpcClass, rpc_class
 
 
+@rpc_class(RpcClass.ROBOT)
 async def camera_color_image_cb(req: CameraColorImage.Request, ui: WsClient) -> CameraColorImage.Response:
     glob.LOCK.scene_or_exception()
 
@@ -29,6 +31,7 @@ async def camera_color_image_cb(req: CameraColorImage.Request, ui: WsClient) ->
     return resp
 
 
+@rpc_class(RpcClass.ROBOT)
 async def camera_color_parameters_cb(
     req: CameraColorParameters.Request, ui: WsClient
 ) -> CameraColorParameters.Response:
@@ -64,6 +67,7 @@ async def calibrate_camera(scene: UpdateableCachedScene, camera: Camera) -> None
     await notif.broadcast_event(ProcessState(ProcessState.Data(CAMERA_CALIB, ProcessState.Data.StateEnum.Finished)))
 
 
+@rpc_class(RpcClass.ROBOT)
 async def calibrate_camera_cb(req: CalibrateCamera.Request, ui: WsClient) -> None:
     scene = glob.LOCK.scene_or_exception()
 
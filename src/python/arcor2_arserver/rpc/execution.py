@@ -7,8 +7,10 @@ from arcor2_arserver import globals as glob
 from arcor2_arserver.execution import build_and_upload_package, run_temp_package
 from arcor2_arserver.helpers import ctx_write_lock
 from arcor2_arserver_data import rpc
+from arcor2_web.ws_server import RpcClass, rpc_class
 
 
+@rpc_class(RpcClass.STORAGE)
 async def build_project_cb(req: rpc.b.BuildProject.Request, ui: WsClient) -> rpc.b.BuildProject.Response:
     """Builds project and uploads resulting package to the execution unit.
 
@@ -25,6 +27,7 @@ async def build_project_cb(req: rpc.b.BuildProject.Request, ui: WsClient) -> rpc
         return resp
 
 
+@rpc_class(RpcClass.STORAGE)
 async def temporary_package_cb(req: rpc.b.TemporaryPackage.Request, ui: WsClient) -> None:
     async with glob.LOCK.get_lock():
         project = glob.LOCK.project_or_exception()
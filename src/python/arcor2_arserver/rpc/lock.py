@@ -4,8 +4,10 @@ from arcor2_arserver import globals as glob
 from arcor2_arserver import logger
 from arcor2_arserver.lock.exceptions import CannotLock
 from arcor2_arserver_data import rpc as srpc
+from arcor2_web.ws_server import RpcClass, rpc_class
 
 
+@rpc_class(RpcClass.CHEAP)
 async def write_lock_cb(req: srpc.lock.WriteLock.Request, ui: WsClient) -> None:
     user_name = glob.USERS.user_name(ui)
 
@@ -17,20 +19,24 @@ async def write_lock_cb(req: srpc.lock.WriteLock.Request, ui: WsClient) -> None:
         raise CannotLock(glob.LOCK.ErrMessages.LOCK_FAIL.value)
 
 
+@rpc_class(RpcClass.CHEAP)
 async def write_unlock_cb(req: srpc.lock.WriteUnlock.Request, ui: WsClient) -> None:
     await glob.LOCK.write_unlock(req.args.object_id, glob.USERS.user_name(ui), notify=True)
 
 
+@rpc_class(RpcClass.CHEAP)
 async def read_lock_cb(req: srpc.lock.ReadLock.Request, ui: WsClient) -> None:
     # TODO currently unused, maybe delete?
     if not await glob.LOCK.read_lock(req.args.object_id, glob.USERS.user_name(ui)):
         raise CannotLock(glob.LOCK.ErrMessages.LOCK_FAIL.value)
 
 
+@rpc_class(RpcClass.CHEAP)
 async def read_unlock_cb(req: srpc.lock.ReadUnlock.Request, ui: WsClient) -> None:
     # TODO currently unused, maybe delete?
     await glob.LOCK.read_unlock(req.args.object_id, glob.USERS.user_name(ui))
 
 
+@rpc_class(RpcClass.CHEAP)
 async def update_lock_cb(req: srpc.lock.UpdateLock.Request, ui: WsClient) -> None:
     await glob.LOCK.update_lock(req.args.object_id, glob.USERS.user_name(ui), req.args.new_type)
@@ -35,6 +35,7 @@ from arcor2_arserver_data import events as sevts
 from arcor2_arserver_data import rpc as srpc
 from arcor2_object_types.abstract import CollisionObject, GenericWithPose, Robot
 from arcor2_scene_data import aio_scene_service as scene_srv
+from arcor2_web.ws_server import RpcClass, rpc_class
 
 
 @dataclass
@@ -191,7 +192,7 @@ async def object_aiming_add_point_cb(
     r.data = r.Data(finished_indexes=list(fo.poses.keys()))
 
     if not req.dry_run:
-        fo.poses[pt_idx] = await get_end_effector_pose(robot_inst, end_effector, arm_id)
+        fo.poses[pt_idx] = await get_end_effector_pose(robot_inst, end_effector, arm_id, max_age=0)
         r.data = r.Data(finished_indexes=list(fo.poses.keys()))
         logger.info(
             f"{user_name} just aimed index {pt_idx} for {scene_obj.name}. Done indexes: {r.data.finished_indexes}."
@@ -257,6 +258,7 @@ async def object_aiming_done_cb(req: srpc.o.ObjectAimingDone.Request, ui: WsClie
     return None
 
 
+@rpc_class(RpcClass.STORAGE)
 async def new_object_type_cb(req: srpc.o.NewObjectType.Request, ui: WsClient) -> None:
     async with ctx_write_lock(glob.LOCK.SpecialValues.ADDING_OBJECT, glob.USERS.user_name(ui)):
         meta = req.args
@@ -322,6 +324,7 @@ async def new_object_type_cb(req: srpc.o.NewObjectType.Request, ui: WsClient) ->
         return None
 
 
+@rpc_class(RpcClass.STORAGE)
 async def update_object_model_cb(req: srpc.o.UpdateObjectModel.Request, ui: WsClient) -> None:
     can_modify_scene()
     glob.LOCK.scene_or_exception(True)  # only allow while editing scene
@@ -371,6 +374,7 @@ def check_scene_for_object_type(scene: CachedScene, object_type: str) -> None:
         raise Arcor2Exception(f"Used in scene {scene.name}.")
 
 
+@rpc_class(RpcClass.STORAGE)
 async def delete_object_type_cb(
     req: srpc.o.DeleteObjectTypes.Request, ui: WsClient
 ) -> srpc.o.DeleteObjectTypes.Response:
@@ -1,13 +1,13 @@
 import asyncio
 import copy
 from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, Awaitable, TypeVar
 
 from websockets.server import WebSocketServerProtocol as WsClient
 
 from arcor2 import helpers as hlp
 from arcor2 import transformations as tr
-from arcor2.cached import CachedProject, UpdateableCachedProject
+from arcor2.cached import CachedProject, CachedScene, UpdateableCachedProject
 from arcor2.data import common
 from arcor2.data.events import Event, PackageState
 from arcor2.exceptions import Arcor2Exception
@@ -51,6 +51,9 @@ from arcor2_object_types.abstract import Generic, Robot
 from arcor2_object_types.parameter_plugins.base import ParameterPluginException
 from arcor2_object_types.parameter_plugins.pose import PosePlugin
 from arcor2_object_types.parameter_plugins.utils import plugin_from_type_name
+from arcor2_web.ws_server import RpcClass, rpc_class
+
+T = TypeVar("T")
 
 
 @asynccontextmanager
@@ -59,7 +62,7 @@ async def managed_project(project_id: str, make_copy: bool = False) -> AsyncGene
 
     if glob.LOCK.project and glob.LOCK.project.id == project_id:
         if make_copy:
-            project = copy.deepcopy(glob.LOCK.project)
+            project = UpdateableCachedProject(glob.LOCK.project)
             save_back = True
         else:
             project = glob.LOCK.project
@@ -193,44 +196,76 @@ async def execute_action_cb(req: srpc.p.ExecuteAction.Request, ui: WsClient) ->
         return None
 
 
+async def _gather_skip_errors(aws: list[Awaitable[T]]) -> list[T]:
+    """Results of the awaitables, those failing with Arcor2Exception are
+    only logged."""
+
+    ret: list[T] = []
+
+    for res in await asyncio.gather(*aws, return_exceptions=True):
+        if isinstance(res, Arcor2Exception):
+            logger.error(str(res))
+        elif isinstance(res, BaseException):
+            raise res  # zero toleration for other exceptions
+        else:
+            ret.append(res)
+
+    return ret
+
+
+async def _get_all_projects() -> list[CachedProject]:
+    try:
+        return await storage.get_all_projects()
+    except storage.StorageClientException as e:  # e.g. one of the projects can't be read
+        logger.warning(f"Failed to get all projects at once, getting them one by one. {str(e)}")
+
+    return await _gather_skip_errors(
+        [storage.get_project(project_id) for project_id in await storage.get_project_ids()]
+    )
+
+
+async def _get_scenes(scene_ids: set[str]) -> dict[str, CachedScene]:
+    try:
+        return await storage.get_scenes_by_ids(scene_ids)
+    except storage.StorageClientException as e:
+        logger.warning(f"Failed to get scenes at once, getting them one by one. {str(e)}")
+
+    return {scene.id: scene for scene in await _gather_skip_errors([storage.get_scene(sid) for sid in scene_ids])}
+
+
 async def list_projects_cb(req: srpc.p.ListProjects.Request, ui: WsClient) -> srpc.p.ListProjects.Response:
-    async def project_info(project_id: str) -> srpc.p.ListProjects.Response.Data:
-        project = await storage.get_project(project_id)
+    projects = await _get_all_projects()
+    scenes = await _get_scenes({proj.scene_id for proj in projects})
 
-        assert project.created
-        assert project.modified
+    resp = srpc.p.ListProjects.Response()
+    resp.data = []
+
+    for proj in projects:
+        assert proj.created
+        assert proj.modified
 
         pd = srpc.p.ListProjects.Response.Data(
-            project.name,
-            project.scene_id,
-            project.description,
-            project.has_logic,
-            project.created,
-            project.modified,
-            id=project.id,
+            proj.name,
+            proj.scene_id,
+            proj.description,
+            proj.has_logic,
+            proj.created,
+            proj.modified,
+            id=proj.id,
         )
 
         try:
-            scene = await storage.get_scene(project.scene_id)
-        except storage.StorageClientException:
+            scene = scenes[proj.scene_id]
+        except KeyError:
             pd.problems = ["Scene does not exist."]
-            return pd
-
-        pd.problems = await get_project_problems(scene, project)
-        return pd
-
-    resp = srpc.p.ListProjects.Response()
-
-    resp.data = []
-    for res in await asyncio.gather(
-        *[project_info(proj_id) for proj_id in (await storage.get_project_ids())], return_exceptions=True
-    ):
-        if isinstance(res, Arcor2Exception):
-            logger.error(str(res))
-        elif isinstance(res, BaseException):
-            raise res  # zero toleration for other exceptions
         else:
-            resp.data.append(res)
+            try:
+                pd.problems = await get_project_problems(scene, proj)
+            except Arcor2Exception as e:
+                logger.error(str(e))
+                continue
+
+        resp.data.append(pd)
 
     return resp
 
@@ -239,6 +274,7 @@ async def get_project_cb(req: srpc.p.GetProject.Request, ui: WsClient) -> srpc.p
     return srpc.p.GetProject.Response(data=(await storage.get_project(req.args.id)).project)
 
 
+@rpc_class(RpcClass.ROBOT)
 async def add_ap_using_robot_cb(req: srpc.p.AddApUsingRobot.Request, ui: WsClient) -> None:
     async def notify(ap: common.BareActionPoint, ori: common.NamedOrientation, joi: common.ProjectRobotJoints) -> None:
         ap_evt = sevts.p.ActionPointChanged(ap)
@@ -269,7 +305,7 @@ async def add_ap_using_robot_cb(req: srpc.p.AddApUsingRobot.Request, ui: WsClien
         if req.dry_run:
             return None
 
-        pose, joints = await get_pose_and_joints(robot_inst, req.args.end_effector_id, req.args.arm_id)
+        pose, joints = await get_pose_and_joints(robot_inst, req.args.end_effector_id, req.args.arm_id, max_age=0)
 
         ap = proj.upsert_action_point(common.ActionPoint.uid(), req.args.name, pose.position)
         ori = common.NamedOrientation("default", pose.orientation)
@@ -283,6 +319,7 @@ async def add_ap_using_robot_cb(req: srpc.p.AddApUsingRobot.Request, ui: WsClien
         return None
 
 
+@rpc_class(RpcClass.ROBOT)
 async def add_action_point_joints_using_robot_cb(
     req: srpc.p.AddActionPointJointsUsingRobot.Request, ui: WsClient
 ) -> None:
@@ -299,7 +336,7 @@ async def add_action_point_joints_using_robot_cb(
 
         unique_name(req.args.name, proj.ap_joint_names(ap.id))
 
-        new_joints = await get_robot_joints(robot_inst, req.args.arm_id)
+        new_joints = await get_robot_joints(robot_inst, req.args.arm_id, max_age=0)
 
         await ensure_write_locked(ap.id, glob.USERS.user_name(ui))
 
@@ -318,6 +355,7 @@ async def add_action_point_joints_using_robot_cb(
         return None
 
 
+@rpc_class(RpcClass.ROBOT)
 async def update_action_point_joints_using_robot_cb(
     req: srpc.p.UpdateActionPointJointsUsingRobot.Request, ui: WsClient
 ) -> None:
@@ -332,7 +370,9 @@ async def update_action_point_joints_using_robot_cb(
     async with ctx_read_lock(robot_joints.robot_id, user_name):
         await ensure_write_locked(ap.id, user_name)
 
-        robot_joints.joints = await get_robot_joints(get_robot_instance(robot_joints.robot_id), robot_joints.arm_id)
+        robot_joints.joints = await get_robot_joints(
+            get_robot_instance(robot_joints.robot_id), robot_joints.arm_id, max_age=0
+        )
         robot_joints.is_valid = True
 
         proj.update_modified()
@@ -558,6 +598,7 @@ async def update_action_point_position_cb(req: srpc.p.UpdateActionPointPosition.
     await update_ap_position(proj, ap, req.args.new_position)
 
 
+@rpc_class(RpcClass.ROBOT)
 async def update_action_point_using_robot_cb(req: srpc.p.UpdateActionPointUsingRobot.Request, ui: WsClient) -> None:
     scene = glob.LOCK.scene_or_exception()
     proj = glob.LOCK.project_or_exception()
@@ -570,7 +611,9 @@ async def update_action_point_using_robot_cb(req: srpc.p.UpdateActionPointUsingR
     async with ctx_read_lock(req.args.robot.robot_id, user_name):
         robot_inst = get_robot_instance(req.args.robot.robot_id)
         await check_eef_arm(robot_inst, req.args.robot.arm_id, req.args.robot.end_effector)
-        new_pose = await get_end_effector_pose(robot_inst, req.args.robot.end_effector, req.args.robot.arm_id)
+        new_pose = await get_end_effector_pose(
+            robot_inst, req.args.robot.end_effector, req.args.robot.arm_id, max_age=0
+        )
 
         if ap.parent:
             new_pose = tr.make_pose_rel_to_parent(scene, proj, new_pose, ap.parent)
@@ -620,6 +663,7 @@ async def update_action_point_orientation_cb(req: srpc.p.UpdateActionPointOrient
 
     orientation.orientation = req.args.orientation
 
+    proj.invalidate_abs_poses(orientation.id)
     proj.update_modified()
 
     evt = sevts.p.OrientationChanged(orientation)
@@ -628,6 +672,7 @@ async def update_action_point_orientation_cb(req: srpc.p.UpdateActionPointOrient
     return None
 
 
+@rpc_class(RpcClass.ROBOT)
 async def add_action_point_orientation_using_robot_cb(
     req: srpc.p.AddActionPointOrientationUsingRobot.Request, ui: WsClient
 ) -> None:
@@ -655,7 +700,9 @@ async def add_action_point_orientation_using_robot_cb(
         if req.dry_run:
             return None
 
-        new_pose = await get_end_effector_pose(robot_inst, req.args.robot.end_effector, req.args.robot.arm_id)
+        new_pose = await get_end_effector_pose(
+            robot_inst, req.args.robot.end_effector, req.args.robot.arm_id, max_age=0
+        )
 
         if ap.parent:
             new_pose = tr.make_pose_rel_to_parent(scene, proj, new_pose, ap.parent)
@@ -670,6 +717,7 @@ async def add_action_point_orientation_using_robot_cb(
         return None
 
 
+@rpc_class(RpcClass.ROBOT)
 async def update_action_point_orientation_using_robot_cb(
     req: srpc.p.UpdateActionPointOrientationUsingRobot.Request, ui: WsClient
 ) -> None:
@@ -692,13 +740,16 @@ async def update_action_point_orientation_using_robot_cb(
 
         await ensure_write_locked(ori.id, user_name)
 
-        new_pose = await get_end_effector_pose(robot_inst, req.args.robot.end_effector, req.args.robot.arm_id)
+        new_pose = await get_end_effector_pose(
+            robot_inst, req.args.robot.end_effector, req.args.robot.arm_id, max_age=0
+        )
 
         if ap.parent:
             new_pose = tr.make_pose_rel_to_parent(scene, proj, new_pose, ap.parent)
 
         ori.orientation = new_pose.orientation
 
+        proj.invalidate_abs_poses(ori.id)
         proj.update_modified()
 
         evt = sevts.p.OrientationChanged(ori)
@@ -767,6 +818,7 @@ async def open_project_cb(req: srpc.p.OpenProject.Request, ui: WsClient) -> None
         return None
 
 
+@rpc_class(RpcClass.STORAGE)
 async def save_project_cb(req: srpc.p.SaveProject.Request, ui: WsClient) -> None:
     async with glob.LOCK.get_lock(req.dry_run):
         proj = glob.LOCK.project_or_exception()
@@ -1343,6 +1395,7 @@ async def remove_project_parameter_cb(req: srpc.p.RemoveProjectParameter.Request
         asyncio.ensure_future(notif.broadcast_event(evt))
 
 
+@rpc_class(RpcClass.STORAGE)
 async def delete_project_cb(req: srpc.p.DeleteProject.Request, ui: WsClient) -> None:
     if glob.LOCK.project:
         raise Arcor2Exception("Project has to be closed first.")
@@ -1360,6 +1413,7 @@ async def delete_project_cb(req: srpc.p.DeleteProject.Request, ui: WsClient) ->
         return None
 
 
+@rpc_class(RpcClass.STORAGE)
 async def rename_project_cb(req: srpc.p.RenameProject.Request, ui: WsClient) -> None:
     unique_name(req.args.new_name, (await project_names()))
 
@@ -1385,6 +1439,7 @@ async def rename_project_cb(req: srpc.p.RenameProject.Request, ui: WsClient) ->
     return None
 
 
+@rpc_class(RpcClass.STORAGE)
 async def copy_project_cb(req: srpc.p.CopyProject.Request, ui: WsClient) -> None:
     async with ctx_write_lock(req.args.source_id, glob.USERS.user_name(ui)):
         unique_name(req.args.target_name, (await project_names()))
@@ -1,12 +1,10 @@
 import asyncio
 import math
-import time
 from typing import Awaitable, Callable
 
 import numpy as np
 from websockets.server import WebSocketServerProtocol as WsClient
 
-from arcor2 import env
 from arcor2 import transformations as tr
 from arcor2.data import common
 from arcor2.exceptions import Arcor2Exception
@@ -32,6 +30,7 @@ from arcor2_object_types.abstract import Camera, MultiArmRobot, Robot
 from arcor2_runtime.events import RobotEef, RobotJoints
 from arcor2_storage.client import URL as ps_url
 from arcor2_web import ws_server
+from arcor2_web.ws_server import RpcClass, rpc_class
 
 RBT_CALIB = "RobotCalibration"
 
@@ -40,32 +39,24 @@ TaskDict = dict[str, asyncio.Task]
 ROBOT_JOINTS_TASKS: TaskDict = {}
 EEF_POSE_TASKS: TaskDict = {}
 
-EVENT_PERIOD = env.get_float("ARCOR2_STREAMING_PERIOD", 0.1)
-
-if EVENT_PERIOD <= 0:
-    EVENT_PERIOD = 0.1
-
 
 async def robot_joints_event(robot_inst: Robot) -> None:
     logger.info(f"Sending joints for {robot_inst.name} started.")
     while scene_started() and glob.ROBOT_JOINTS_REGISTERED_UIS[robot_inst.id]:
-        start = time.monotonic()
-
-        try:
-            evt = RobotJoints(RobotJoints.Data(robot_inst.id, (await robot.get_robot_joints(robot_inst, None, True))))
+        try:  # waits for the next sample (paced by the sampler)
+            evt = RobotJoints(
+                RobotJoints.Data(robot_inst.id, (await robot.get_robot_joints(robot_inst, None, True, max_age=0)))
+            )
         except Arcor2Exception as e:
             logger.error(f"Failed to get joints for {robot_inst.name}. {str(e)}")
             await asyncio.sleep(1)
             continue
 
-        evt_json = evt.to_json()
-        await asyncio.gather(
-            *[ws_server.send_json_to_client(ui, evt_json) for ui in glob.ROBOT_JOINTS_REGISTERED_UIS[robot_inst.id]]
+        # only the latest joints are sent to clients that lag behind
+        ws_server.broadcast(
+            glob.ROBOT_JOINTS_REGISTERED_UIS[robot_inst.id], evt.to_json(), f"RobotJoints/{robot_inst.id}"
         )
 
-        end = time.monotonic()
-        await asyncio.sleep(EVENT_PERIOD - (end - start))
-
     ROBOT_JOINTS_TASKS.pop(robot_inst.id, None)
 
     # TODO notify UIs that registration was cancelled
@@ -75,7 +66,9 @@ async def robot_joints_event(robot_inst: Robot) -> None:
 
 
 async def eef_pose(robot_inst: Robot, eef_id: str, arm_id: None | str = None) -> RobotEef.Data.EefPose:
-    return RobotEef.Data.EefPose(eef_id, (await robot.get_end_effector_pose(robot_inst, eef_id, arm_id)), arm_id)
+    return RobotEef.Data.EefPose(
+        eef_id, (await robot.get_end_effector_pose(robot_inst, eef_id, arm_id, max_age=0)), arm_id
+    )
 
 
 async def robot_eef_pose_event(robot_inst: Robot) -> None:
@@ -93,8 +86,6 @@ async def robot_eef_pose_event(robot_inst: Robot) -> None:
         logger.info(f"Sending poses for {robot_inst.name} started. Arms/EEFs: {eefs}.")
 
         while scene_started() and glob.ROBOT_EEF_REGISTERED_UIS[robot_inst.id]:
-            start = time.monotonic()
-
             evt = RobotEef(RobotEef.Data(robot_inst.id))
 
             try:
@@ -106,13 +97,12 @@ async def robot_eef_pose_event(robot_inst: Robot) -> None:
                 await asyncio.sleep(1)
                 continue
 
-            evt_json = evt.to_json()
-            await asyncio.gather(
-                *[ws_server.send_json_to_client(ui, evt_json) for ui in glob.ROBOT_EEF_REGISTERED_UIS[robot_inst.id]]
+            ws_server.broadcast(
+                glob.ROBOT_EEF_REGISTERED_UIS[robot_inst.id], evt.to_json(), f"RobotEef/{robot_inst.id}"
             )
 
-            end = time.monotonic()
-            await asyncio.sleep(EVENT_PERIOD - (end - start))
+            if not evt.data.end_effectors:  # there is no sample to wait for
+                await asyncio.sleep(robot.STATE_PERIOD)
 
     EEF_POSE_TASKS.pop(robot_inst.id, None)
 
@@ -128,6 +118,7 @@ async def get_robot_meta_cb(req: srpc.r.GetRobotMeta.Request, ui: WsClient) -> s
     )
 
 
+@rpc_class(RpcClass.ROBOT)
 async def get_robot_joints_cb(req: srpc.r.GetRobotJoints.Request, ui: WsClient) -> srpc.r.GetRobotJoints.Response:
     glob.LOCK.scene_or_exception()
 
@@ -138,6 +129,7 @@ async def get_robot_joints_cb(req: srpc.r.GetRobotJoints.Request, ui: WsClient)
         )
 
 
+@rpc_class(RpcClass.ROBOT)
 async def get_end_effector_pose_cb(
     req: srpc.r.GetEndEffectorPose.Request, ui: WsClient
 ) -> srpc.r.GetEndEffectorPose.Response:
@@ -265,6 +257,7 @@ async def check_feature(robot_inst: Robot, feature_name: str) -> None:
         raise Arcor2Exception(f"Unknown robot feature: {feature_name}.")
 
 
+@rpc_class(RpcClass.ROBOT)
 async def move_to_pose_cb(req: srpc.r.MoveToPose.Request, ui: WsClient) -> None:
     glob.LOCK.scene_or_exception()
     user_name = glob.USERS.user_name(ui)
@@ -279,7 +272,9 @@ async def move_to_pose_cb(req: srpc.r.MoveToPose.Request, ui: WsClient) -> None:
         await robot.check_robot_before_move(robot_inst)
 
         if (req.args.position is None) != (req.args.orientation is None):
-            target_pose = await robot.get_end_effector_pose(robot_inst, req.args.end_effector_id, req.args.arm_id)
+            target_pose = await robot.get_end_effector_pose(
+                robot_inst, req.args.end_effector_id, req.args.arm_id, max_age=0
+            )
 
             if req.args.position:
                 target_pose.position = req.args.position
@@ -306,6 +301,7 @@ async def move_to_pose_cb(req: srpc.r.MoveToPose.Request, ui: WsClient) -> None:
         )
 
 
+@rpc_class(RpcClass.ROBOT)
 async def move_to_joints_cb(req: srpc.r.MoveToJoints.Request, ui: WsClient) -> None:
     glob.LOCK.scene_or_exception()
     user_name = glob.USERS.user_name(ui)
@@ -321,6 +317,8 @@ async def move_to_joints_cb(req: srpc.r.MoveToJoints.Request, ui: WsClient) -> N
         )
 
 
+# stopping must not wait for other robot-related RPCs
+@rpc_class(RpcClass.CHEAP)
 async def stop_robot_cb(req: srpc.r.StopRobot.Request, ui: WsClient) -> None:
     glob.LOCK.scene_or_exception()
 
@@ -331,6 +329,7 @@ async def stop_robot_cb(req: srpc.r.StopRobot.Request, ui: WsClient) -> None:
     await robot.stop(robot_inst)
 
 
+@rpc_class(RpcClass.ROBOT)
 async def move_to_action_point_cb(req: srpc.r.MoveToActionPoint.Request, ui: WsClient) -> None:
     scene = glob.LOCK.scene_or_exception()
     project = glob.LOCK.project_or_exception()
@@ -380,6 +379,7 @@ async def move_to_action_point_cb(req: srpc.r.MoveToActionPoint.Request, ui: WsC
             )
 
 
+@rpc_class(RpcClass.ROBOT)
 async def ik_cb(req: srpc.r.InverseKinematics.Request, ui: WsClient) -> srpc.r.InverseKinematics.Response:
     glob.LOCK.scene_or_exception()
 
@@ -401,6 +401,7 @@ async def ik_cb(req: srpc.r.InverseKinematics.Request, ui: WsClient) -> srpc.r.I
         return resp
 
 
+@rpc_class(RpcClass.ROBOT)
 async def fk_cb(req: srpc.r.ForwardKinematics.Request, ui: WsClient) -> srpc.r.ForwardKinematics.Response:
     glob.LOCK.scene_or_exception()
 
@@ -454,6 +455,7 @@ async def calibrate_robot(
         await glob.LOCK.write_unlock(camera_inst.id, user_name)
 
 
+@rpc_class(RpcClass.ROBOT)
 async def calibrate_robot_cb(req: srpc.r.CalibrateRobot.Request, ui: WsClient) -> None:
     glob.LOCK.scene_or_exception()
     user_name = glob.USERS.user_name(ui)
@@ -486,6 +488,7 @@ async def calibrate_robot_cb(req: srpc.r.CalibrateRobot.Request, ui: WsClient) -
         return None
 
 
+@rpc_class(RpcClass.ROBOT)
 async def hand_teaching_mode_cb(req: srpc.r.HandTeachingMode.Request, ui: WsClient) -> None:
     glob.LOCK.scene_or_exception()
 
@@ -522,6 +525,7 @@ async def hand_teaching_mode_cb(req: srpc.r.HandTeachingMode.Request, ui: WsClie
     asyncio.ensure_future(notif.broadcast_event(evt))
 
 
+@rpc_class(RpcClass.ROBOT)
 async def step_robot_eef_cb(req: srpc.r.StepRobotEef.Request, ui: WsClient) -> None:
     scene = glob.LOCK.scene_or_exception()
 
@@ -531,7 +535,7 @@ async def step_robot_eef_cb(req: srpc.r.StepRobotEef.Request, ui: WsClient) -> N
     await check_feature(robot_inst, Robot.move_to_pose.__name__)
     await robot.check_robot_before_move(robot_inst)
 
-    tp = await robot.get_end_effector_pose(robot_inst, req.args.end_effector_id, req.args.arm_id)
+    tp = await robot.get_end_effector_pose(robot_inst, req.args.end_effector_id, req.args.arm_id, max_age=0)
 
     if req.args.mode == req.args.mode.ROBOT:
         tp = tr.make_pose_rel(robot_inst.pose, tp)
@@ -577,6 +581,7 @@ async def step_robot_eef_cb(req: srpc.r.StepRobotEef.Request, ui: WsClient) -> N
     )
 
 
+@rpc_class(RpcClass.ROBOT)
 async def set_eef_perpendicular_to_world_cb(req: srpc.r.SetEefPerpendicularToWorld.Request, ui: WsClient) -> None:
     glob.LOCK.scene_or_exception()
 
@@ -593,7 +598,9 @@ async def set_eef_perpendicular_to_world_cb(req: srpc.r.SetEefPerpendicularToWor
     if req.dry_run:  # attempt to find suitable joints can take some time so it is not done for dry_run
         return
 
-    tp, current_joints = await robot.get_pose_and_joints(robot_inst, req.args.end_effector_id, req.args.arm_id)
+    tp, current_joints = await robot.get_pose_and_joints(
+        robot_inst, req.args.end_effector_id, req.args.arm_id, max_age=0
+    )
 
     target_joints_diff: float = 0.0
     winning_idx: int = -1
@@ -607,14 +614,12 @@ async def set_eef_perpendicular_to_world_cb(req: srpc.r.SetEefPerpendicularToWor
     ]
 
     # select best (closest joint configuration) reachable pose
-    tasks = [
-        robot.ik(robot_inst, req.args.end_effector_id, req.args.arm_id, pose, current_joints, req.args.safe)
-        for pose in poses
-    ]
+    results = await robot.ik_batch(
+        robot_inst, req.args.end_effector_id, req.args.arm_id, poses, current_joints, req.args.safe
+    )
 
-    # order of results from gather corresponds to order of tasks
-    for idx, res in enumerate(await asyncio.gather(*tasks, return_exceptions=True)):
-        if not isinstance(res, list):
+    for idx, res in enumerate(results):
+        if res is None:
             continue
 
         diff = 0.0
@@ -1,5 +1,4 @@
 import asyncio
-import copy
 import functools
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
@@ -67,6 +66,7 @@ from arcor2_arserver_data import rpc as srpc
 from arcor2_arserver_data.objects import ObjectTypeMeta
 from arcor2_calibration_data import client as calibration
 from arcor2_object_types.abstract import Generic, VirtualCollisionObject
+from arcor2_web.ws_server import RpcClass, rpc_class
 
 
 @asynccontextmanager
@@ -75,7 +75,7 @@ async def managed_scene(scene_id: str, make_copy: bool = False) -> AsyncGenerato
 
     if glob.LOCK.scene and glob.LOCK.scene.id == scene_id:
         if make_copy:
-            scene = copy.deepcopy(glob.LOCK.scene)
+            scene = UpdateableCachedScene(glob.LOCK.scene)
             save_back = True
         else:
             scene = glob.LOCK.scene
@@ -157,6 +157,7 @@ async def close_scene_cb(req: srpc.s.CloseScene.Request, ui: WsClient) -> None:
         asyncio.ensure_future(notify_scene_closed(scene_id))
 
 
+@rpc_class(RpcClass.STORAGE)
 async def save_scene_cb(req: srpc.s.SaveScene.Request, ui: WsClient) -> None:
     async with glob.LOCK.get_lock(req.dry_run):
         scene = glob.LOCK.scene_or_exception()
@@ -365,6 +366,7 @@ async def remove_from_scene_cb(req: srpc.s.RemoveFromScene.Request, ui: WsClient
             await schedule_auto_remove(meta.type)
 
 
+@rpc_class(RpcClass.ROBOT)
 async def update_object_pose_using_robot_cb(req: srpc.o.UpdateObjectPoseUsingRobot.Request, ui: WsClient) -> None:
     """Updates object's pose using a pose of the robot's end effector.
 
@@ -401,7 +403,9 @@ async def update_object_pose_using_robot_cb(req: srpc.o.UpdateObjectPoseUsingRob
         elif req.args.pivot != req.args.PivotEnum.MIDDLE:
             raise Arcor2Exception("Only middle pivot point is supported for objects without collision model.")
 
-        new_pose = await get_end_effector_pose(robot_inst, req.args.robot.end_effector, req.args.robot.arm_id)
+        new_pose = await get_end_effector_pose(
+            robot_inst, req.args.robot.end_effector, req.args.robot.arm_id, max_age=0
+        )
 
         position_delta = common.Position()
 
@@ -493,6 +497,7 @@ async def rename_object_cb(req: srpc.s.RenameObject.Request, ui: WsClient) -> No
     return None
 
 
+@rpc_class(RpcClass.STORAGE)
 async def rename_scene_cb(req: srpc.s.RenameScene.Request, ui: WsClient) -> None:
     unique_name(req.args.new_name, (await scene_names()))
 
@@ -516,6 +521,7 @@ async def rename_scene_cb(req: srpc.s.RenameScene.Request, ui: WsClient) -> None
     return None
 
 
+@rpc_class(RpcClass.STORAGE)
 async def delete_scene_cb(req: srpc.s.DeleteScene.Request, ui: WsClient) -> None | srpc.s.DeleteScene.Response:
     if glob.LOCK.scene:
         raise Arcor2Exception("Scene has to be closed first.")
@@ -569,6 +575,7 @@ async def update_scene_description_cb(req: srpc.s.UpdateSceneDescription.Request
         return None
 
 
+@rpc_class(RpcClass.STORAGE)
 async def copy_scene_cb(req: srpc.s.CopyScene.Request, ui: WsClient) -> None:
     async with ctx_write_lock(req.args.source_id, glob.USERS.user_name(ui)):
         # TODO check if target_name is unique
@@ -583,6 +590,7 @@ async def copy_scene_cb(req: srpc.s.CopyScene.Request, ui: WsClient) -> None:
 
 
 # TODO maybe this would better fit into another category of RPCs? Like common/misc?
+@rpc_class(RpcClass.ROBOT)
 async def get_camera_pose_cb(req: srpc.c.GetCameraPose.Request, ui: WsClient) -> srpc.c.GetCameraPose.Response:
     try:
         return srpc.c.GetCameraPose.Response(
@@ -601,6 +609,7 @@ async def get_camera_pose_cb(req: srpc.c.GetCameraPose.Request, ui: WsClient) ->
 
 
 # TODO maybe this would better fit into another category of RPCs? Like common/misc?
+@rpc_class(RpcClass.ROBOT)
 async def marker_corners_cb(req: srpc.c.MarkersCorners.Request, ui: WsClient) -> srpc.c.MarkersCorners.Response:
     return srpc.c.MarkersCorners.Response(
         data=await hlp.run_in_executor(
@@ -7,8 +7,10 @@ from arcor2_arserver import logger
 from arcor2_arserver.lock.structures import LockEventData
 from arcor2_arserver.rpc.objects import object_aiming_prune
 from arcor2_arserver_data import rpc as srpc
+from arcor2_web.ws_server import RpcClass, rpc_class
 
 
+@rpc_class(RpcClass.CHEAP)
 async def register_user_cb(req: srpc.u.RegisterUser.Request, ui: WsClient) -> None:
     await glob.USERS.login(req.args.user_name, ui)
     logger.debug(f"User {req.args.user_name} just logged in. Known user names are: {glob.USERS.user_names}")
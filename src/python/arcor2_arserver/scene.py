@@ -178,6 +178,9 @@ async def update_scene_object_pose(
         # SceneObject pose was already updated
         pose = obj.pose
 
+    if glob.LOCK.project:  # memoized poses of APs relative to the object
+        glob.LOCK.project.invalidate_abs_poses(obj.id)
+
     scene.update_modified()
 
     evt = SceneObjectChanged(obj)
@@ -235,8 +238,8 @@ async def notify_scene_opened(evt: OpenScene) -> None:
 
 
 async def scenes() -> AsyncIterator[CachedScene]:
-    for scene_id in await storage.get_scene_ids():
-        yield await storage.get_scene(scene_id)
+    for scene in await storage.get_all_scenes():
+        yield scene
 
 
 async def scene_names() -> set[str]:
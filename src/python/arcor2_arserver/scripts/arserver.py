@@ -43,62 +43,76 @@ from arcor2_runtime import events as runtime_events
 from arcor2_scene_data import aio_scene_service as scene_srv
 from arcor2_web import ws_server
 
+_EXE_EVENT_MAPPING: dict[str, type[events.Event]] = {evt.__name__: evt for evt in EXE_EVENTS}
+
+# events from the Execution service that ARServer has to inspect, others are just forwarded to clients
+_INSPECTED_EXE_EVENTS = frozenset(
+    evt.__name__ for evt in (events.PackageInfo, events.PackageState, events.ActionStateBefore)
+)
+
+
+async def _handle_manager_event(msg: dict, message: str) -> None:
+    if glob.USERS.interfaces:
+        ws_server.broadcast(glob.USERS.interfaces, message)
+
+    if msg["event"] not in _INSPECTED_EXE_EVENTS:
+        return
+
+    try:
+        evt = _EXE_EVENT_MAPPING[msg["event"]].from_dict(msg)
+    except ValidationError as e:
+        logger.error("Invalid event: {}, error: {}".format(msg, e))
+        return
+
+    if isinstance(evt, events.PackageInfo):
+        glob.PACKAGE_INFO = evt.data
+    elif isinstance(evt, events.PackageState):
+        glob.PACKAGE_STATE = evt.data
+
+        if evt.data.state == events.PackageState.Data.StateEnum.STOPPED:
+            if not glob.TEMPORARY_PACKAGE:
+                # after (ordinary) package is finished, show list of packages
+                glob.MAIN_SCREEN = evts.c.ShowMainScreen.Data(evts.c.ShowMainScreen.Data.WhatEnum.PackagesList)
+                await notif.broadcast_event(
+                    evts.c.ShowMainScreen(
+                        evts.c.ShowMainScreen.Data(
+                            evts.c.ShowMainScreen.Data.WhatEnum.PackagesList, evt.data.package_id
+                        )
+                    )
+                )
+
+            # temporary package is handled elsewhere
+            server_events.package_stopped.set()
+            server_events.package_started.clear()
+
+            glob.ACTION_STATE_BEFORE = None
+            glob.PACKAGE_INFO = None
+
+        else:
+            server_events.package_stopped.clear()
+            server_events.package_started.set()
+
+    elif isinstance(evt, events.ActionStateBefore):
+        glob.ACTION_STATE_BEFORE = evt.data
+
 
 async def handle_manager_incoming_messages(manager_client) -> None:
-    event_mapping: dict[str, type[events.Event]] = {evt.__name__: evt for evt in EXE_EVENTS}
     rpc_mapping: dict[str, type[rpc.common.RPC]] = {r.__name__: r for r in EXE_RPCS}
 
     try:
         async for message in manager_client:
             msg = json.loads(message)
 
+            if isinstance(msg, list):  # batch of events (see ARCOR2_EXECUTION_EVENT_BATCH_SIZE)
+                for item in msg:
+                    await _handle_manager_event(item, json.dumps(item))
+                continue
+
             if not isinstance(msg, dict):
                 continue
 
             if "event" in msg:
-                if glob.USERS.interfaces:
-                    await asyncio.gather(
-                        *[ws_server.send_json_to_client(intf, message) for intf in glob.USERS.interfaces]
-                    )
-
-                try:
-                    evt = event_mapping[msg["event"]].from_dict(msg)
-                except ValidationError as e:
-                    logger.error("Invalid event: {}, error: {}".format(msg, e))
-                    continue
-
-                if isinstance(evt, events.PackageInfo):
-                    glob.PACKAGE_INFO = evt.data
-                elif isinstance(evt, events.PackageState):
-                    glob.PACKAGE_STATE = evt.data
-
-                    if evt.data.state == events.PackageState.Data.StateEnum.STOPPED:
-                        if not glob.TEMPORARY_PACKAGE:
-                            # after (ordinary) package is finished, show list of packages
-                            glob.MAIN_SCREEN = evts.c.ShowMainScreen.Data(
-                                evts.c.ShowMainScreen.Data.WhatEnum.PackagesList
-                            )
-                            await notif.broadcast_event(
-                                evts.c.ShowMainScreen(
-                                    evts.c.ShowMainScreen.Data(
-                                        evts.c.ShowMainScreen.Data.WhatEnum.PackagesList, evt.data.package_id
-                                    )
-                                )
-                            )
-
-                        # temporary package is handled elsewhere
-                        server_events.package_stopped.set()
-                        server_events.package_started.clear()
-
-                        glob.ACTION_STATE_BEFORE = None
-                        glob.PACKAGE_INFO = None
-
-                    else:
-                        server_events.package_stopped.clear()
-                        server_events.package_started.set()
-
-                elif isinstance(evt, events.ActionStateBefore):
-                    glob.ACTION_STATE_BEFORE = evt.data
+                await _handle_manager_event(msg, message)
 
             elif "response" in msg:
                 # TODO handle potential errors
@@ -166,7 +180,7 @@ async def _initialize_server() -> None:
         logger.warn("Development mode. The service will shutdown on any unhandled exception.")
 
     logger.info(f"ARServer {arcor2_arserver.version()} " f"(API version {arcor2_arserver_data.version()}) initialized.")
-    _server = await websockets.server.serve(bound_handler, "0.0.0.0", glob.PORT)
+    _server = await websockets.server.serve(bound_handler, "0.0.0.0", glob.PORT, **ws_server.serve_options())
     asyncio.create_task(run_lock_notification_worker())
 
 
@@ -186,12 +200,12 @@ async def register(websocket: WsClient) -> None:
     elif glob.LOCK.scene:
         await notif.event(websocket, evts.s.OpenScene(evts.s.OpenScene.Data(glob.LOCK.scene.scene)))
     elif glob.PACKAGE_INFO:
-        # this can't be done in parallel - ui expects this order of events
-        await websocket.send(events.PackageState(glob.PACKAGE_STATE).to_json())
-        await websocket.send(events.PackageInfo(glob.PACKAGE_INFO).to_json())
+        # ui expects this order of events (messages are sent in the order they were queued)
+        ws_server.send(websocket, events.PackageState(glob.PACKAGE_STATE).to_json())
+        ws_server.send(websocket, events.PackageInfo(glob.PACKAGE_INFO).to_json())
 
         if glob.ACTION_STATE_BEFORE:
-            await websocket.send(events.ActionStateBefore(glob.ACTION_STATE_BEFORE).to_json())
+            ws_server.send(websocket, events.ActionStateBefore(glob.ACTION_STATE_BEFORE).to_json())
     else:
         assert glob.MAIN_SCREEN
         await notif.event(websocket, evts.c.ShowMainScreen(glob.MAIN_SCREEN))
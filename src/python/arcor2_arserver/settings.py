@@ -1,4 +1,10 @@
+import os
 import tempfile
 
 OBJECT_TYPE_PATH = tempfile.mkdtemp()
 OBJECT_TYPE_MODULE = "arcor2_object_types_tmp"
+
+# parsed metadata of ObjectTypes, kept between restarts (empty value disables the cache)
+OBJECT_TYPE_CACHE_PATH = os.getenv(
+    "ARCOR2_ARSERVER_OBJECT_TYPE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "arcor2_arserver_object_types")
+)
@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any
+
+import pytest
+import websockets
+
+from arcor2.exceptions import Arcor2Exception
+from arcor2_arserver import objects_actions  # noqa: F401 (has to be imported first)
+from arcor2_arserver import execution
+
+
+class FakeConnection:
+    """Connection to the Execution service, closed when a binary message
+    is sent."""
+
+    def __init__(self) -> None:
+        self.sent: list[str | bytes] = []
+
+    async def __aenter__(self) -> "FakeConnection":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+    async def send(self, message: str | bytes) -> None:
+        if isinstance(message, bytes):
+            raise websockets.exceptions.ConnectionClosed(None, None)
+        self.sent.append(message)
+
+
+async def _incoming(_: Any) -> None:
+    await asyncio.sleep(3600)
+
+
+async def _run_client(monkeypatch: pytest.MonkeyPatch, connect: Any) -> asyncio.Task:
+    monkeypatch.setattr(execution, "MANAGER_RPC_REQUEST_QUEUE", execution.ReqQueue())
+    monkeypatch.setattr(execution.websockets, "connect", connect)
+    return asyncio.create_task(execution.project_manager_client(_incoming))
+
+
+@pytest.mark.asyncio
+async def test_binary_message_connection_lost(monkeypatch: pytest.MonkeyPatch) -> None:
+    connections: list[FakeConnection] = []
+
+    def connect(_: str) -> FakeConnection:
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    task = await _run_client(monkeypatch, connect)
+
+    with pytest.raises(Arcor2Exception):
+        await asyncio.wait_for(execution.manager_send_binary(b"chunk"), 5)
+
+    await asyncio.sleep(0.1)
+    assert len(connections) == 2  # reconnected...
+    assert execution.MANAGER_RPC_REQUEST_QUEUE.empty()  # ...but the chunk was not sent again
+
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_binary_message_not_connected(monkeypatch: pytest.MonkeyPatch) -> None:
+    def connect(_: str) -> FakeConnection:
+        raise ConnectionRefusedError("Execution service is not running.")
+
+    task = await _run_client(monkeypatch, connect)
+
+    with pytest.raises(Arcor2Exception):
+        await asyncio.wait_for(execution.manager_send_binary(b"chunk"), 5)
+
+    task.cancel()
@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from arcor2.data.common import Joint, Pose, Position
+from arcor2_arserver import objects_actions  # noqa: F401 (has to be imported first)
+from arcor2_arserver import robot
+from arcor2_object_types.abstract import Robot
+
+
+class _Robot(Robot):
+    def __init__(self) -> None:
+        super().__init__("id", "name", Pose())
+        self.barrier = threading.Barrier(3, timeout=5)
+
+    def get_end_effectors_ids(self, an: None | str = None) -> set[str]:
+        return {"default"}
+
+    def get_end_effector_pose(self, end_effector_id: str, an: None | str = None) -> Pose:
+        return Pose()
+
+    def robot_joints(self, include_gripper: bool = False, an: None | str = None) -> list[Joint]:
+        return [Joint("j", 0.0)]
+
+    def grippers(self, an: None | str = None) -> set[str]:
+        return set()
+
+    def suctions(self, an: None | str = None) -> set[str]:
+        return set()
+
+    def inverse_kinematics(
+        self,
+        end_effector_id: str,
+        pose: Pose,
+        start_joints: None | list[Joint] = None,
+        avoid_collisions: bool = True,
+    ) -> list[Joint]:
+        self.barrier.wait()  # passes only when all the poses are being processed at once
+        if pose.position.x > 1:
+            raise Robot.KinematicsException("Unreachable.")
+        return [Joint("j", pose.position.x)]
+
+
+class _BatchRobot(_Robot):
+    def inverse_kinematics_batch(
+        self,
+        end_effector_id: str,
+        poses: list[Pose],
+        start_joints: None | list[Joint] = None,
+        avoid_collisions: bool = True,
+    ) -> list[None | list[Joint]]:
+        return [[Joint("batch", pose.position.x)] for pose in poses]
+
+
+POSES = [Pose(Position(0.5)), Pose(Position(2)), Pose(Position(1))]
+
+
+@pytest.mark.asyncio
+async def test_ik_batch_default() -> None:
+    assert await robot.ik_batch(_Robot(), "default", None, POSES) == [[Joint("j", 0.5)], None, [Joint("j", 1)]]
+
+
+@pytest.mark.asyncio
+async def test_ik_batch_overridden() -> None:
+    assert await robot.ik_batch(_BatchRobot(), "default", None, POSES) == [
+        [Joint("batch", 0.5)],
+        [Joint("batch", 2)],
+        [Joint("batch", 1)],
+    ]
@@ -0,0 +1,51 @@
+import asyncio
+import gc
+from typing import Any
+
+import pytest
+
+from arcor2.data import common
+from arcor2_arserver import globals as glob
+from arcor2_arserver import objects_actions, robot  # noqa: F401 (objects_actions has to be imported first)
+
+
+class FakeRobot:
+    def __init__(self) -> None:
+        self.id = "robot"
+        self.reads = 0
+
+    def robot_joints(self, include_gripper: bool) -> list[common.Joint]:
+        self.reads += 1
+        return [common.Joint("j1", float(self.reads))]
+
+
+@pytest.mark.asyncio
+async def test_sampler_idles_out(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(robot, "STATE_PERIOD", 0.01)
+    monkeypatch.setattr(robot, "STATE_IDLE_TIMEOUT", 0.05)
+
+    loop = asyncio.get_running_loop()
+    unhandled: list[dict[str, Any]] = []
+    loop.set_exception_handler(lambda _, context: unhandled.append(context))
+
+    robot_inst = FakeRobot()
+    monkeypatch.setitem(glob.SCENE_OBJECT_INSTANCES, robot_inst.id, robot_inst)
+
+    try:
+        assert await robot.get_robot_joints(robot_inst, None)  # type: ignore[arg-type]
+        sampler = robot._samplers[robot_inst.id]
+
+        await asyncio.sleep(0.2)  # no readers, the sampler stops
+        assert not sampler.running()
+
+        # a new sampler is started and the previous one (with its failed future) is gone
+        assert await robot.get_robot_joints(robot_inst, None, max_age=0)  # type: ignore[arg-type]
+        assert robot._samplers[robot_inst.id] is not sampler
+        del sampler
+        gc.collect()
+        await asyncio.sleep(0)
+
+        assert not unhandled
+    finally:
+        loop.set_exception_handler(None)
+        robot._samplers.pop(robot_inst.id, None)
@@ -10,8 +10,10 @@ from functools import wraps
 from flask import Response, jsonify, request
 
 from arcor2 import env
-from arcor2.data.common import Joint, Pose, StrEnum
+from arcor2.data.common import Joint, Pose, Position, StrEnum
+from arcor2.data.robot import InverseKinematicsResult
 from arcor2.data.scene import LineCheck
+from arcor2.exceptions import Arcor2Exception, Arcor2NotImplemented
 from arcor2.helpers import port_from_url
 from arcor2.logging import get_logger
 from arcor2_dobot import version
@@ -353,21 +355,23 @@ def put_eef_pose() -> RespT:
         ip1 = copy.deepcopy(cp)
         ip2 = copy.deepcopy(pose)
 
-        for _attempt in range(20):
-            res = scene_service.line_check(LineCheck(ip1.position, ip2.position))
+        # all the attempts (lines lifted by 1 cm each) are checked at once
+        checks: list[LineCheck] = []
+        for idx in range(1 if move_type == MoveType.LINEAR else 20):
+            lift = Position(z=0.01 * idx)
+            checks.append(LineCheck(ip1.position + lift, ip2.position + lift))
 
+        for _attempt, res in enumerate(scene_service.line_check_batch(checks)):
             if res.safe:
                 break
-
+        else:
             if move_type == MoveType.LINEAR:
                 raise DobotGeneral("There might be a collision.")
 
-            ip1.position.z += 0.01
-            ip2.position.z += 0.01
-
-        else:
             raise NotFound("Can't find safe path.")
 
+        ip1.position, ip2.position = checks[_attempt].pt1, checks[_attempt].pt2
+
         logger.debug(f"Collision avoidance attempts: {_attempt}")
 
         if _attempt > 0:
@@ -581,6 +585,57 @@ def put_ik() -> RespT:
     return jsonify(_dobot.inverse_kinematics(pose))
 
 
+@app.route("/ik/batch", methods=["PUT"])
+@requires_started
+def put_ik_batch() -> RespT:
+    """Computes IK for many poses at once.
+    ---
+    put:
+        description: Computes IK for many poses at once.
+        tags:
+           - Robot
+        requestBody:
+              content:
+                application/json:
+                  schema:
+                    type: array
+                    items:
+                        $ref: Pose
+        responses:
+            200:
+              description: Ok (for each pose, joints are missing if IK could not be computed)
+              content:
+                application/json:
+                    schema:
+                        type: array
+                        items:
+                            $ref: InverseKinematicsResult
+            500:
+              description: "Error types: **General**, **DobotGeneral**, **StartError**."
+              content:
+                application/json:
+                  schema:
+                    $ref: WebApiError
+    """
+
+    assert _dobot is not None
+
+    if not isinstance(request.json, list):
+        raise DobotGeneral("Body should be a JSON array containing poses.")
+
+    results: list[InverseKinematicsResult] = []
+
+    for pose in (Pose.from_dict(p) for p in request.json):
+        try:
+            results.append(InverseKinematicsResult(_dobot.inverse_kinematics(pose)))
+        except Arcor2NotImplemented:
+            raise
+        except Arcor2Exception as e:
+            results.append(InverseKinematicsResult(message=str(e)))
+
+    return jsonify(results)
+
+
 @app.route("/fk", methods=["PUT"])
 @requires_started
 def put_fk() -> RespT:
@@ -656,7 +711,7 @@ def main() -> None:
         SERVICE_NAME,
         version(),
         port_from_url(URL),
-        [Pose, Joint, WebApiError],
+        [Pose, Joint, InverseKinematicsResult, WebApiError],
         args.swagger,
         dependencies={"ARCOR2 Scene": "1.0.0"},
     )
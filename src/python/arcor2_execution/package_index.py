@@ -0,0 +1,124 @@
+"""Persistent index of package summaries, so listing packages does not have
+to read (and parse) all of them."""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from dataclasses_jsonschema import JsonSchemaMixin, ValidationError
+
+from arcor2 import json
+from arcor2.data.execution import PackageMeta
+from arcor2_execution_data.common import PackageSummary
+
+# files the summary is made of (relative to the package directory)
+SUMMARY_FILES = ("package.json", os.path.join("data", "project.json"), "script.py")
+
+
+@dataclass
+class IndexedPackage(JsonSchemaMixin):
+    stamp: list[int]
+    summary: Optional[PackageSummary] = None  # None for invalid packages
+
+
+def stamp(package_path: str) -> list[int]:
+    """Modification times of the summary files (-1 for missing ones)."""
+
+    ret: list[int] = []
+
+    for file_name in SUMMARY_FILES:
+        try:
+            ret.append(os.stat(os.path.join(package_path, file_name)).st_mtime_ns)
+        except FileNotFoundError:
+            ret.append(-1)
+
+    return ret
+
+
+def stamps(project_path: str) -> dict[str, list[int]]:
+    """Stamps of all packages in the given directory (hidden ones, e.g.
+    packages being uploaded, are skipped)."""
+
+    return {
+        entry.name: stamp(entry.path)
+        for entry in os.scandir(project_path)
+        if entry.is_dir() and not entry.name.startswith(".")
+    }
+
+
+class PackageIndex:
+    __slots__ = ("path", "_packages")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._packages: dict[str, IndexedPackage] = {}
+
+    def load(self) -> None:
+        """Loads the index from disk (it is empty if it does not exist or is
+        not valid)."""
+
+        try:
+            with open(self.path) as index_file:
+                data = json.loads_type(index_file.read(), dict)
+            self._packages = {package_id: IndexedPackage.from_dict(value) for package_id, value in data.items()}
+        except (OSError, json.JsonException, ValidationError, ValueError):
+            self._packages = {}
+
+    def dumps(self) -> str:
+        return json.dumps({package_id: ip.to_dict() for package_id, ip in self._packages.items()})
+
+    def save(self, content: str) -> None:
+        """Writes the index (obtained by dumps) to disk."""
+
+        tmp_path = self.path + ".tmp"
+
+        with open(tmp_path, "w") as index_file:
+            index_file.write(content)
+
+        os.replace(tmp_path, self.path)
+
+    def outdated(self, current: dict[str, list[int]]) -> tuple[list[str], list[str]]:
+        """Compares the index with current stamps of packages.
+
+        Removed packages are dropped from the index.
+        :return: IDs of new or changed packages, IDs of removed packages.
+        """
+
+        changed = [
+            package_id
+            for package_id, package_stamp in current.items()
+            if package_id not in self._packages or self._packages[package_id].stamp != package_stamp
+        ]
+
+        removed = [package_id for package_id in self._packages if package_id not in current]
+        for package_id in removed:
+            del self._packages[package_id]
+
+        return changed, removed
+
+    def set(self, package_id: str, package_stamp: list[int], summary: None | PackageSummary) -> None:
+        self._packages[package_id] = IndexedPackage(package_stamp, summary)
+
+    def set_meta(self, package_id: str, package_stamp: list[int], meta: PackageMeta) -> None:
+        """Updates content of 'package.json' of already indexed package."""
+
+        try:
+            ip = self._packages[package_id]
+        except KeyError:
+            return
+
+        if ip.summary is not None:
+            ip.summary.package_meta = meta
+            ip.stamp = package_stamp
+
+    def remove(self, package_id: str) -> None:
+        self._packages.pop(package_id, None)
+
+    def summary(self, package_id: str) -> None | PackageSummary:
+        try:
+            return self._packages[package_id].summary
+        except KeyError:
+            return None
+
+    def summaries(self) -> list[PackageSummary]:
+        return [ip.summary for ip in self._packages.values() if ip.summary is not None]
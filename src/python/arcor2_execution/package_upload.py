@@ -0,0 +1,50 @@
+"""Installation of uploaded packages (zip files)."""
+
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import IO
+
+from arcor2.exceptions import Arcor2Exception
+
+TMP_PREFIX = ".upload-"  # hidden, skipped by package_index.stamps
+
+
+def extract_package(zip_file: IO[bytes], project_path: str, package_id: str, main_script: str) -> None:
+    """Extracts the package next to the others and then replaces the previous
+    version (if any) by renaming, so the package is never seen half-
+    written.
+
+    The previous version is kept when the zip file is not valid.
+    """
+
+    target_path = os.path.join(project_path, package_id)
+    tmp_path = tempfile.mkdtemp(prefix=TMP_PREFIX, dir=project_path)
+    old_path = tmp_path + "-old"
+    replaced = False
+
+    try:
+        try:
+            with zipfile.ZipFile(zip_file, "r") as zip_ref:
+                zip_ref.extractall(tmp_path)
+        except zipfile.BadZipFile as e:
+            raise Arcor2Exception("Invalid zip file.") from e
+
+        if not os.path.isfile(os.path.join(tmp_path, main_script)):
+            raise Arcor2Exception("Main script not found.")
+
+        try:
+            os.rename(target_path, old_path)
+            replaced = True
+        except FileNotFoundError:
+            pass
+
+        os.rename(tmp_path, target_path)
+    except Exception:
+        if replaced:
+            os.rename(old_path, target_path)
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    shutil.rmtree(old_path, ignore_errors=True)
@@ -2,19 +2,20 @@ import argparse
 import asyncio
 import base64
 import functools
+import io
 import os
+import re
 import shutil
 import signal
+import socket
 import sys
+import tempfile
 import time
-import zipfile
 from datetime import datetime, timezone
-from typing import Awaitable
+from typing import IO
 
 import aiofiles
-import aiofiles.os
 import websockets
-from aiofiles import tempfile
 from aiologger.levels import LogLevel
 from aiorun import run
 from dataclasses_jsonschema import ValidationError
@@ -29,14 +30,22 @@ from arcor2.data.events import Event, PackageInfo, PackageState, ProjectExceptio
 from arcor2.exceptions import Arcor2Exception
 from arcor2.helpers import port_from_url, run_in_executor
 from arcor2.logging import get_aiologger
+from arcor2_execution import package_index
+from arcor2_execution.package_index import PackageIndex
+from arcor2_execution.package_upload import extract_package
+from arcor2_execution.zygote import ForkedProcess, Zygote, ZygoteException
 from arcor2_execution_data import EVENTS, URL, events, rpc
 from arcor2_execution_data.common import PackageSummary, ProjectMeta
+from arcor2_execution_data.upload import parse_package_chunk
+from arcor2_runtime import ipc
+from arcor2_runtime.ipc import Commands
 from arcor2_runtime.package import PROJECT_PATH, read_package_meta, write_package_meta
 from arcor2_web import ws_server
 
 logger = get_aiologger("Execution")
 
-PROCESS: asyncio.subprocess.Process | None = None
+PROCESS: asyncio.subprocess.Process | ForkedProcess | None = None
+IPC_WRITER: None | asyncio.StreamWriter = None  # commands for the script (see arcor2_runtime.ipc)
 PACKAGE_STATE_EVENT: PackageState = PackageState(PackageState.Data())  # undefined state
 RUNNING_PACKAGE_ID: None | str = None
 
@@ -55,6 +64,25 @@ PKG_STOP_TIMEOUT: float | None = env.get_float("ARCOR2_EXECUTION_PKG_STOP_TIMEOU
 if PKG_STOP_TIMEOUT is not None and PKG_STOP_TIMEOUT <= 0:
     PKG_STOP_TIMEOUT = None
 
+# events that are parsed (the service has to inspect them), others are relayed to clients as they are
+CONTROL_EVENTS = frozenset(evt.__name__ for evt in (PackageState, PackageInfo, ProjectException))
+EVENT_NAME_RE = re.compile(rb'\{\s*"event"\s*:\s*"(\w+)"')
+
+# max. number of relayed events sent in one message (as a JSON array), 1 means no batching
+EVENT_BATCH_SIZE = max(env.get_int("ARCOR2_EXECUTION_EVENT_BATCH_SIZE", 1), 1)
+READ_CHUNK_SIZE = 64 * 1024
+
+# summaries of all packages, kept up to date by the service (and by periodic rescan, for packages copied in by hand)
+PACKAGE_INDEX = PackageIndex(os.path.join(PROJECT_PATH, ".package_index.json"))
+PACKAGE_RESCAN_PERIOD = env.get_float("ARCOR2_EXECUTION_PACKAGE_RESCAN_PERIOD", 0.0)
+PACKAGE_INDEX_LOCK = asyncio.Lock()
+
+# packages are forked from a pre-imported process (if it is ready), instead of starting a new interpreter
+ZYGOTE: None | Zygote = None
+
+# packages being uploaded in chunks (binary messages), until finished by UploadPackageStream RPC
+UPLOADS: dict[tuple[WsClient, str], IO[bytes]] = {}
+
 
 def process_running() -> bool:
     return PROCESS is not None and PROCESS.returncode is None
@@ -65,57 +93,119 @@ async def package_state(event: PackageState) -> None:
     await send_to_clients(event)
 
 
-async def read_proc_stdout() -> None:
+def relay(messages: list[str]) -> None:
+    """Sends events (JSON) from the script to clients without parsing
+    them."""
+
+    if not CLIENTS:
+        return
+
+    for idx in range(0, len(messages), EVENT_BATCH_SIZE):
+        batch = messages[idx : idx + EVENT_BATCH_SIZE]
+        ws_server.broadcast(CLIENTS, batch[0] if len(batch) == 1 else "[" + ",".join(batch) + "]")
+
+
+async def handle_line(line: bytes, printed_out: list[str]) -> None:
     global PACKAGE_INFO_EVENT
-    global RUNNING_PACKAGE_ID
 
-    logger.info("Reading script stdout...")
+    assert RUNNING_PACKAGE_ID is not None
+
+    decoded = line.decode("utf-8")
+    stripped = decoded.strip()
+
+    try:
+        data = json.loads(stripped)
+    except json.JsonException:
+        printed_out.append(decoded)
+        logger.error(stripped)
+        return
+
+    if not isinstance(data, dict) or "event" not in data:
+        logger.error("Strange data from script: {}".format(data))
+        return
+
+    try:
+        evt = EVENT_MAPPING[data["event"]].from_dict(data)
+    except ValidationError as e:
+        logger.error("Invalid event: {}, error: {}".format(data, e))
+        return
+
+    if isinstance(evt, PackageState):
+        evt.data.package_id = RUNNING_PACKAGE_ID
+        await package_state(evt)
+        return
+    elif isinstance(evt, PackageInfo):
+        PACKAGE_INFO_EVENT = evt
+
+        # the event is sent just once, when the Resources class is fully initialized
+        await package_state(PackageState(PackageState.Data(PackageState.Data.StateEnum.RUNNING, RUNNING_PACKAGE_ID)))
+
+    await send_to_clients(evt)
+
+
+async def handle_messages(messages: list[bytes], printed_out: list[str]) -> None:
+    """Relays events from the script to clients, other messages are handled
+    by handle_line."""
+
+    relayed: list[str] = []
+
+    for msg in messages:
+        if (match := EVENT_NAME_RE.match(msg.lstrip())) and (name := match.group(1).decode()) not in CONTROL_EVENTS:
+            if name in EVENT_MAPPING:
+                relayed.append(msg.strip().decode("utf-8"))
+            else:
+                logger.error(f"Unknown event from script: {name}.")
+            continue
+
+        relay(relayed)  # to keep the order of events
+        relayed.clear()
+        await handle_line(msg, printed_out)
+
+    relay(relayed)
+
+
+async def read_stdout(printed_out: list[str]) -> None:
+    """Stdout is for human-readable output, however, events might be printed
+    out as well (e.g. by manually written scripts)."""
 
     assert PROCESS is not None
     assert PROCESS.stdout is not None
-    assert RUNNING_PACKAGE_ID is not None
 
-    printed_out: list[str] = []
+    remainder = b""
 
-    while process_running():
-        try:
-            stdout = await PROCESS.stdout.readuntil()
-        except asyncio.exceptions.IncompleteReadError:
-            break
+    # all lines that are available are handled at once, so relayed events might be batched
+    while chunk := await PROCESS.stdout.read(READ_CHUNK_SIZE):
+        *lines, remainder = (remainder + chunk).split(b"\n")
+        await handle_messages(lines, printed_out)
 
-        decoded = stdout.decode("utf-8")
-        stripped = decoded.strip()
+    if remainder:
+        await handle_line(remainder, printed_out)
 
-        try:
-            data = json.loads(stripped)
-        except json.JsonException:
-            printed_out.append(decoded)
-            logger.error(decoded.strip())
-            continue
 
-        if not isinstance(data, dict) or "event" not in data:
-            logger.error("Strange data from script: {}".format(data))
-            continue
+async def read_ipc(reader: asyncio.StreamReader, printed_out: list[str]) -> None:
+    remainder = b""
 
-        try:
-            evt = EVENT_MAPPING[data["event"]].from_dict(data)
-        except ValidationError as e:
-            logger.error("Invalid event: {}, error: {}".format(data, e))
-            continue
+    while chunk := await reader.read(READ_CHUNK_SIZE):
+        messages, remainder = ipc.split_frames(remainder + chunk)
+        await handle_messages(messages, printed_out)
 
-        if isinstance(evt, PackageState):
-            evt.data.package_id = RUNNING_PACKAGE_ID
-            await package_state(evt)
-            continue
-        elif isinstance(evt, PackageInfo):
-            PACKAGE_INFO_EVENT = evt
 
-            # the event is sent just once, when the Resources class is fully initialized
-            await package_state(
-                PackageState(PackageState.Data(PackageState.Data.StateEnum.RUNNING, RUNNING_PACKAGE_ID))
-            )
+async def read_proc_stdout(ipc_reader: asyncio.StreamReader) -> None:
+    global PACKAGE_INFO_EVENT
+    global RUNNING_PACKAGE_ID
+    global IPC_WRITER
 
-        await send_to_clients(evt)
+    logger.info("Reading script stdout...")
+
+    assert PROCESS is not None
+    assert IPC_WRITER is not None
+    assert RUNNING_PACKAGE_ID is not None
+
+    printed_out: list[str] = []
+    await asyncio.gather(read_stdout(printed_out), read_ipc(ipc_reader, printed_out))
+
+    IPC_WRITER.close()
+    IPC_WRITER = None
 
     PACKAGE_INFO_EVENT = None
 
@@ -134,7 +224,7 @@ async def read_proc_stdout() -> None:
             await send_to_clients(ProjectException(ProjectException.Data(message, exception_type)))
 
             async with aiofiles.open("traceback-{}.txt".format(time.strftime("%Y%m%d-%H%M%S")), "w") as tb_file:
-                await tb_file.write("".join(printed_out))
+                await tb_file.write("\n".join(printed_out))
 
         else:
             await send_to_clients(
@@ -153,6 +243,17 @@ async def read_proc_stdout() -> None:
     RUNNING_PACKAGE_ID = None
 
 
+def script_env() -> dict[str, str]:
+    # create a temp copy of the env variables
+    myenv = os.environ.copy()
+
+    # set PYTHONPATH to match this scripts sys.path
+    # this is necessary in order to make PEX embedded modules available to subprocess
+    myenv["PYTHONPATH"] = ":".join(sys.path)
+
+    return myenv
+
+
 async def check_script(script_path: str) -> None:
     if not await run_in_executor(os.path.exists, script_path):
         raise Arcor2Exception("Main script not found.")
@@ -163,8 +264,13 @@ async def run_package_cb(req: rpc.RunPackage.Request, ui: WsClient) -> None:
         meta = await run_in_executor(read_package_meta, package_id)
         meta.executed = datetime.now(tz=timezone.utc)
         await run_in_executor(write_package_meta, package_id, meta)
+        PACKAGE_INDEX.set_meta(
+            package_id, await run_in_executor(package_index.stamp, os.path.join(PROJECT_PATH, package_id)), meta
+        )
+        await save_package_index()
 
     global PROCESS
+    global IPC_WRITER
     global TASK
     global RUNNING_PACKAGE_ID
 
@@ -183,16 +289,7 @@ async def run_package_cb(req: rpc.RunPackage.Request, ui: WsClient) -> None:
     script_path = os.path.join(package_path, MAIN_SCRIPT_NAME)
     await check_script(script_path)
 
-    # this is necessary in order to make PEX embedded modules available to subprocess
-    pypath = ":".join(sys.path)
-
-    # create a temp copy of the env variables
-    myenv = os.environ.copy()
-
-    # set PYTHONPATH to match this scripts sys.path
-    myenv["PYTHONPATH"] = pypath
-
-    args = [script_path]
+    args: list[str] = []
 
     if req.args.start_paused:
         logger.warning("The script will be paused before the first action.")
@@ -203,21 +300,45 @@ async def run_package_cb(req: rpc.RunPackage.Request, ui: WsClient) -> None:
         args.append(f"-b \"{','.join(req.args.breakpoints)}\"")
 
     logger.info(f"Starting script: {script_path}")
-    PROCESS = await asyncio.create_subprocess_exec(
-        "python",
-        *args,
-        stdin=asyncio.subprocess.PIPE,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.STDOUT,
-        env=myenv,
-    )
+    PROCESS = None
+    ipc_sock, script_ipc_sock = socket.socketpair()
+
+    try:
+        if ZYGOTE and ZYGOTE.ready:
+            try:
+                PROCESS = await ZYGOTE.spawn(package_path, script_path, args, script_ipc_sock.fileno())
+            except ZygoteException as e:
+                logger.warning(f"{e} Starting the script without zygote.")
+
+        if PROCESS is None:
+            myenv = script_env()
+            myenv[ipc.FD_ENV] = str(script_ipc_sock.fileno())
+
+            PROCESS = await asyncio.create_subprocess_exec(
+                "python",
+                script_path,
+                *args,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                pass_fds=(script_ipc_sock.fileno(),),
+                env=myenv,
+            )
+    except Exception:
+        ipc_sock.close()
+        raise
+    finally:
+        script_ipc_sock.close()
+
+    ipc_reader, IPC_WRITER = await asyncio.open_unix_connection(sock=ipc_sock)
+
     if PROCESS.returncode is not None:
         raise Arcor2Exception("Failed to start package.")
 
     RUNNING_PACKAGE_ID = req.args.id
     await package_state(PackageState(PackageState.Data(PackageState.Data.StateEnum.STARTED, RUNNING_PACKAGE_ID)))
 
-    TASK = asyncio.create_task(read_proc_stdout())  # run task in background
+    TASK = asyncio.create_task(read_proc_stdout(ipc_reader))  # run task in background
     asyncio.create_task(_update_executed(req.args.id))
 
 
@@ -254,13 +375,16 @@ async def stop_package_cb(req: rpc.StopPackage.Request, ui: WsClient) -> None:
     asyncio.create_task(_terminate_task())
 
 
+async def send_command(cmd: Commands) -> None:
+    assert IPC_WRITER is not None
+
+    IPC_WRITER.write(ipc.frame(cmd.encode()))
+    await IPC_WRITER.drain()
+
+
 async def pause_package_cb(req: rpc.PausePackage.Request, ui: WsClient) -> None:
     async def _pause() -> None:
-        assert PROCESS is not None
-        assert PROCESS.stdin is not None
-
-        PROCESS.stdin.write("p\n".encode())
-        await PROCESS.stdin.drain()
+        await send_command(Commands.PAUSE)
         logger.info("Package paused.")
 
     if PACKAGE_STATE_EVENT.data.state != PackageState.Data.StateEnum.RUNNING:
@@ -273,11 +397,7 @@ async def pause_package_cb(req: rpc.PausePackage.Request, ui: WsClient) -> None:
 
 async def step_action_cb(req: rpc.StepAction.Request, ui: WsClient) -> None:
     async def _step() -> None:
-        assert PROCESS is not None
-        assert PROCESS.stdin is not None
-
-        PROCESS.stdin.write("s\n".encode())
-        await PROCESS.stdin.drain()
+        await send_command(Commands.STEP)
         logger.info("Stepping to a next action.")
 
     if PACKAGE_STATE_EVENT.data.state != PackageState.Data.StateEnum.PAUSED:
@@ -290,11 +410,7 @@ async def step_action_cb(req: rpc.StepAction.Request, ui: WsClient) -> None:
 
 async def resume_package_cb(req: rpc.ResumePackage.Request, ui: WsClient) -> None:
     async def _resume() -> None:
-        assert PROCESS is not None
-        assert PROCESS.stdin is not None
-
-        PROCESS.stdin.write("r\n".encode())
-        await PROCESS.stdin.drain()
+        await send_command(Commands.RESUME)
         logger.info("Package resumed.")
 
     assert process_running()
@@ -306,46 +422,50 @@ async def resume_package_cb(req: rpc.ResumePackage.Request, ui: WsClient) -> Non
     asyncio.create_task(_resume())
 
 
-async def _upload_package_cb(req: rpc.UploadPackage.Request, ui: WsClient) -> None:
-    async def _upload_event(path_to_package: str) -> None:
-        summary = await get_summary(path_to_package)
+async def install_package(zip_file: IO[bytes], package_id: str) -> None:
+    async def _upload_event(summary: PackageSummary) -> None:
         evt = events.PackageChanged(summary)
         evt.change_type = Event.Type.ADD
         await send_to_clients(evt)
         logger.info(f"Package '{summary.package_meta.name}' was added.")
 
-    target_path = os.path.join(PROJECT_PATH, req.args.id)
-
     # TODO do not allow if there are manual changes?
 
-    async with tempfile.TemporaryDirectory() as tmpdirname:
-        zip_path = os.path.join(tmpdirname, "publish.zip")
+    await run_in_executor(extract_package, zip_file, PROJECT_PATH, package_id, MAIN_SCRIPT_NAME)
+
+    if (summary := await index_package(package_id)) is None:
+        raise Arcor2Exception("Invalid package.")
 
-        b64_bytes = req.args.data.encode()
-        zip_content = base64.b64decode(b64_bytes)
+    asyncio.create_task(_upload_event(summary))
 
-        async with aiofiles.open(zip_path, mode="wb") as zip_file:
-            await zip_file.write(zip_content)
 
-        try:
-            with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                zip_ref.extractall(tmpdirname)
-        except zipfile.BadZipFile as e:
-            logger.error(e)
-            raise Arcor2Exception("Invalid zip file.")
+async def _upload_package_cb(req: rpc.UploadPackage.Request, ui: WsClient) -> None:
+    await install_package(io.BytesIO(base64.b64decode(req.args.data.encode())), req.args.id)
 
-        await aiofiles.os.remove(zip_path)
 
-        script_path = os.path.join(tmpdirname, MAIN_SCRIPT_NAME)
-        await check_script(script_path)
+async def package_chunk_cb(data: bytes, ui: WsClient) -> None:
+    package_id, chunk = parse_package_chunk(data)
 
-        try:
-            await run_in_executor(shutil.rmtree, target_path, propagate=[FileNotFoundError])
-        except FileNotFoundError:
-            pass
-        await run_in_executor(shutil.copytree, tmpdirname, target_path)
+    if (upload := UPLOADS.get((ui, package_id))) is None:
+        upload = UPLOADS[(ui, package_id)] = await run_in_executor(tempfile.TemporaryFile)
 
-    asyncio.create_task(_upload_event(target_path))
+    await run_in_executor(upload.write, chunk)
+
+
+async def _upload_package_stream_cb(req: rpc.UploadPackageStream.Request, ui: WsClient) -> None:
+    try:
+        upload = UPLOADS.pop((ui, req.args.id))
+    except KeyError:
+        raise Arcor2Exception("Nothing was uploaded.")
+
+    try:
+        if (size := await run_in_executor(upload.tell)) != req.args.size:
+            raise Arcor2Exception(f"Incomplete upload ({size} of {req.args.size} bytes received).")
+
+        await run_in_executor(upload.seek, 0)
+        await install_package(upload, req.args.id)
+    finally:
+        await run_in_executor(upload.close)
 
 
 async def get_summary(path: str) -> PackageSummary:
@@ -374,14 +494,51 @@ async def get_opt_summary(path: str) -> None | PackageSummary:
     return PackageSummary(package_dir, package_meta, ProjectMeta.from_project(project))
 
 
+async def save_package_index() -> None:
+    async with PACKAGE_INDEX_LOCK:  # the last one to save has the most recent content
+        await run_in_executor(PACKAGE_INDEX.save, PACKAGE_INDEX.dumps())
+
+
+async def index_package(package_id: str) -> None | PackageSummary:
+    """(Re)reads summary of the package into the index."""
+
+    path = os.path.join(PROJECT_PATH, package_id)
+    package_stamp = await run_in_executor(
+        package_index.stamp, path
+    )  # before reading, so changes made meanwhile are not missed
+    summary = await get_opt_summary(path)
+    PACKAGE_INDEX.set(package_id, package_stamp, summary)
+    await save_package_index()
+    return summary
+
+
+async def rescan_packages() -> None:
+    """Updates the index with packages changed on disk."""
+
+    stamps = await run_in_executor(package_index.stamps, PROJECT_PATH)
+    changed, removed = PACKAGE_INDEX.outdated(stamps)
+
+    if not changed and not removed:
+        return
+
+    for package_id, summary in zip(
+        changed, await asyncio.gather(*[get_opt_summary(os.path.join(PROJECT_PATH, pid)) for pid in changed])
+    ):
+        PACKAGE_INDEX.set(package_id, stamps[package_id], summary)
+
+    await save_package_index()
+    logger.info(f"Index of packages updated ({len(changed)} changed, {len(removed)} removed).")
+
+
+async def rescan_packages_periodically() -> None:
+    while True:
+        await asyncio.sleep(PACKAGE_RESCAN_PERIOD)
+        await rescan_packages()
+
+
 async def list_packages_cb(req: rpc.ListPackages.Request, ui: WsClient) -> rpc.ListPackages.Response:
     resp = rpc.ListPackages.Response()
-    subfolders = [f.path for f in os.scandir(PROJECT_PATH) if f.is_dir()]
-    resp.data = [
-        ps
-        for ps in await asyncio.gather(*[get_opt_summary(folder_path) for folder_path in subfolders])
-        if ps is not None
-    ]
+    resp.data = PACKAGE_INDEX.summaries()
     return resp
 
 
@@ -390,12 +547,15 @@ async def delete_package_cb(req: rpc.DeletePackage.Request, ui: WsClient) -> Non
         raise Arcor2Exception("Package is being executed.")
 
     target_path = os.path.join(PROJECT_PATH, req.args.id)
-    package_summary = await get_summary(target_path)
+    package_summary = PACKAGE_INDEX.summary(req.args.id) or await get_summary(target_path)
 
     try:
         await run_in_executor(shutil.rmtree, target_path, propagate=[FileNotFoundError])
     except FileNotFoundError:
         raise Arcor2Exception("Not found.")
+    finally:
+        PACKAGE_INDEX.remove(req.args.id)
+        await save_package_index()
 
     evt = events.PackageChanged(package_summary)
     evt.change_type = Event.Type.REMOVE
@@ -414,7 +574,10 @@ async def rename_package_cb(req: rpc.RenamePackage.Request, ui: WsClient) -> Non
     async with aiofiles.open(target_path, mode="w") as pkg_file:
         await pkg_file.write(pm.to_json())
 
-    evt = events.PackageChanged(await get_summary(os.path.join(PROJECT_PATH, req.args.package_id)))
+    if (summary := await index_package(req.args.package_id)) is None:
+        raise Arcor2Exception("Invalid package.")
+
+    evt = events.PackageChanged(summary)
     evt.change_type = Event.Type.UPDATE
 
     logger.info(f"Package '{old_name}' renamed to '{pm.name}'.")
@@ -432,25 +595,26 @@ async def send_to_clients(event: events.Event) -> None:
         logger.error(f"Script raised {event.data.type}. {event.data.message}")
 
     if CLIENTS:
-        websockets.broadcast(CLIENTS, event.to_json())
+        ws_server.broadcast(CLIENTS, event.to_json())
 
 
 async def register(websocket: WsClient) -> None:
     logger.info("Registering new client")
     CLIENTS.add(websocket)
 
-    tasks: list[Awaitable] = [websocket.send(PACKAGE_STATE_EVENT.to_json())]
+    ws_server.send(websocket, PACKAGE_STATE_EVENT.to_json())
 
     if PACKAGE_INFO_EVENT:
-        tasks.append(websocket.send(PACKAGE_INFO_EVENT.to_json()))
-
-    await asyncio.gather(*tasks)
+        ws_server.send(websocket, PACKAGE_INFO_EVENT.to_json())
 
 
 async def unregister(websocket: WsClient) -> None:
     logger.info("Unregistering client")
     CLIENTS.remove(websocket)
 
+    for key in [key for key in UPLOADS if key[0] == websocket]:  # unfinished uploads
+        await run_in_executor(UPLOADS.pop(key).close)
+
 
 RPC_DICT: ws_server.RPC_DICT_TYPE = {
     rpc.RunPackage.__name__: (rpc.RunPackage, run_package_cb),
@@ -459,6 +623,7 @@ RPC_DICT: ws_server.RPC_DICT_TYPE = {
     rpc.ResumePackage.__name__: (rpc.ResumePackage, resume_package_cb),
     rpc.StepAction.__name__: (rpc.StepAction, step_action_cb),
     rpc.UploadPackage.__name__: (rpc.UploadPackage, _upload_package_cb),
+    rpc.UploadPackageStream.__name__: (rpc.UploadPackageStream, _upload_package_stream_cb),
     rpc.ListPackages.__name__: (rpc.ListPackages, list_packages_cb),
     rpc.DeletePackage.__name__: (rpc.DeletePackage, delete_package_cb),
     rpc.RenamePackage.__name__: (rpc.RenamePackage, rename_package_cb),
@@ -467,6 +632,8 @@ RPC_DICT: ws_server.RPC_DICT_TYPE = {
 
 
 async def aio_main() -> None:
+    global ZYGOTE
+
     if __debug__:
         logger.warn("Development mode. The service will shutdown on any unhandled exception.")
 
@@ -474,10 +641,29 @@ async def aio_main() -> None:
         f"Execution service {arcor2_execution.version()} " f"(API version {arcor2_execution_data.version()}) started."
     )
 
+    await run_in_executor(functools.partial(os.makedirs, PROJECT_PATH, exist_ok=True))  # packages are stored there
+    await run_in_executor(PACKAGE_INDEX.load)
+    await rescan_packages()
+
+    if PACKAGE_RESCAN_PERIOD > 0:
+        asyncio.create_task(rescan_packages_periodically())
+
+    if env.get_bool("ARCOR2_EXECUTION_ZYGOTE", True):
+        ZYGOTE = Zygote(script_env())
+        await ZYGOTE.start()
+
     await websockets.server.serve(
-        functools.partial(ws_server.server, logger=logger, register=register, unregister=unregister, rpc_dict=RPC_DICT),
+        functools.partial(
+            ws_server.server,
+            logger=logger,
+            register=register,
+            unregister=unregister,
+            rpc_dict=RPC_DICT,
+            binary_cb=package_chunk_cb,
+        ),
         "0.0.0.0",
         port_from_url(URL),
+        **ws_server.serve_options(),
     )
 
 
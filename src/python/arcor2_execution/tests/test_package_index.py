@@ -0,0 +1,95 @@
+import os
+from datetime import datetime, timezone
+
+from arcor2.data.execution import PackageMeta
+from arcor2_execution import package_index
+from arcor2_execution.package_index import PackageIndex
+from arcor2_execution_data.common import PackageSummary
+
+
+def _meta(name: str) -> PackageMeta:
+    return PackageMeta(name, datetime(2026, 1, 1, tzinfo=timezone.utc))
+
+
+def _package(project_path: str, package_id: str) -> str:
+    path = os.path.join(project_path, package_id)
+    os.makedirs(os.path.join(path, "data"))
+
+    with open(os.path.join(path, "script.py"), "w") as script:
+        script.write("")
+
+    return path
+
+
+def test_stamp(tmp_path) -> None:
+    path = _package(str(tmp_path), "pkg")
+    stamp = package_index.stamp(path)
+
+    assert stamp[0] == -1  # package.json
+    assert stamp[1] == -1  # data/project.json
+    assert stamp[2] == os.stat(os.path.join(path, "script.py")).st_mtime_ns
+
+    os.makedirs(tmp_path / ".upload-xyz")  # hidden directories are not packages
+    assert package_index.stamps(str(tmp_path)) == {"pkg": stamp}
+
+
+def test_outdated(tmp_path) -> None:
+    index = PackageIndex(str(tmp_path / "index.json"))
+
+    index.set("unchanged", [1, 2, 3], PackageSummary("unchanged", _meta("unchanged")))
+    index.set("changed", [1, 2, 3], PackageSummary("changed", _meta("changed")))
+    index.set("removed", [1, 2, 3], PackageSummary("removed", _meta("removed")))
+
+    changed, removed = index.outdated({"unchanged": [1, 2, 3], "changed": [1, 2, 4], "new": [1, 2, 3]})
+
+    assert sorted(changed) == ["changed", "new"]
+    assert removed == ["removed"]
+    assert index.summary("removed") is None
+    assert {summary.id for summary in index.summaries()} == {"unchanged", "changed"}
+
+
+def test_set_meta(tmp_path) -> None:
+    index = PackageIndex(str(tmp_path / "index.json"))
+    index.set("pkg", [1, 2, 3], PackageSummary("pkg", _meta("old")))
+    index.set("invalid", [1, 2, 3], None)
+
+    index.set_meta("pkg", [4, 2, 3], _meta("new"))
+    index.set_meta("invalid", [4, 2, 3], _meta("new"))
+    index.set_meta("unknown", [4, 2, 3], _meta("new"))
+
+    summary = index.summary("pkg")
+    assert summary is not None
+    assert summary.package_meta.name == "new"
+    assert index.outdated({"pkg": [4, 2, 3], "invalid": [1, 2, 3]}) == ([], [])
+    assert index.summary("unknown") is None
+
+
+def test_save_load(tmp_path) -> None:
+    path = str(tmp_path / "index.json")
+
+    index = PackageIndex(path)
+    index.set("pkg", [1, 2, 3], PackageSummary("pkg", _meta("name")))
+    index.set("invalid", [1, -1, 3], None)
+    index.save(index.dumps())
+
+    loaded = PackageIndex(path)
+    loaded.load()
+
+    assert loaded.summaries() == index.summaries()
+    assert loaded.outdated({"pkg": [1, 2, 3], "invalid": [1, -1, 3]}) == ([], [])
+
+
+def test_load_corrupted(tmp_path) -> None:
+    path = tmp_path / "index.json"
+
+    for content in ("{not json", "[]", '{"pkg": {"stamp": "abc"}}'):
+        path.write_text(content)
+
+        index = PackageIndex(str(path))
+        index.load()
+        assert not index.summaries()
+        assert index.outdated({"pkg": [1, 2, 3]}) == (["pkg"], [])
+
+    index = PackageIndex(str(tmp_path / "missing.json"))
+    index.load()
+    assert not index.summaries()
@@ -0,0 +1,69 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from arcor2.exceptions import Arcor2Exception
+from arcor2_execution.package_upload import TMP_PREFIX, extract_package
+
+
+def _zip(files: dict[str, str]) -> io.BytesIO:
+    buff = io.BytesIO()
+
+    with zipfile.ZipFile(buff, "w") as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+
+    buff.seek(0)
+    return buff
+
+
+def _read(path: str) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+def _leftovers(project_path: str) -> list[str]:
+    return [name for name in os.listdir(project_path) if name.startswith(TMP_PREFIX)]
+
+
+def test_extract(tmp_path) -> None:
+    extract_package(_zip({"script.py": "v1", "data/project.json": "{}"}), str(tmp_path), "pkg", "script.py")
+
+    assert _read(os.path.join(tmp_path, "pkg", "script.py")) == "v1"
+    assert os.path.isfile(os.path.join(tmp_path, "pkg", "data", "project.json"))
+    assert not _leftovers(str(tmp_path))
+
+
+def test_replace(tmp_path) -> None:
+    extract_package(_zip({"script.py": "v1", "obsolete.py": ""}), str(tmp_path), "pkg", "script.py")
+    extract_package(_zip({"script.py": "v2"}), str(tmp_path), "pkg", "script.py")
+
+    assert os.listdir(os.path.join(tmp_path, "pkg")) == ["script.py"]  # replaced as a whole, not merged
+    assert _read(os.path.join(tmp_path, "pkg", "script.py")) == "v2"
+    assert not _leftovers(str(tmp_path))
+
+
+@pytest.mark.parametrize(
+    "zip_file",
+    [
+        io.BytesIO(b"not a zip file"),
+        _zip({"other.py": "v2"}),  # main script is missing
+    ],
+)
+def test_invalid_keeps_previous(tmp_path, zip_file: io.BytesIO) -> None:
+    extract_package(_zip({"script.py": "v1"}), str(tmp_path), "pkg", "script.py")
+
+    with pytest.raises(Arcor2Exception):
+        extract_package(zip_file, str(tmp_path), "pkg", "script.py")
+
+    assert _read(os.path.join(tmp_path, "pkg", "script.py")) == "v1"
+    assert not _leftovers(str(tmp_path))
+
+
+def test_invalid_new(tmp_path) -> None:
+    with pytest.raises(Arcor2Exception):
+        extract_package(io.BytesIO(b"not a zip file"), str(tmp_path), "pkg", "script.py")
+
+    assert os.listdir(tmp_path) == []
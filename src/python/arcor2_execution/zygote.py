@@ -0,0 +1,193 @@
+"""Client of the zygote process (see arcor2_runtime.zygote), which forks pre-
+imported processes for running packages."""
+
+import asyncio
+import os
+import signal
+import socket
+from typing import Any
+
+from arcor2 import json
+from arcor2.exceptions import Arcor2Exception
+from arcor2.logging import get_aiologger
+from arcor2_runtime.zygote import MAX_MSG_SIZE
+
+logger = get_aiologger("Zygote")
+
+RESTART_DELAY = 1.0
+
+
+class ZygoteException(Arcor2Exception):
+    pass
+
+
+class ForkedProcess:
+    """Subset of asyncio.subprocess.Process API for a process forked by the
+    zygote."""
+
+    def __init__(self, pid: int, stdin: asyncio.StreamWriter, stdout: asyncio.StreamReader, exited: asyncio.Future):
+        self.pid = pid
+        self.stdin = stdin
+        self.stdout = stdout
+        self._exited = exited
+
+    @property
+    def returncode(self) -> None | int:
+        if not self._exited.done():
+            return None
+        return self._exited.result()
+
+    def send_signal(self, sig: int) -> None:
+        if self.returncode is not None:
+            return
+
+        try:
+            os.kill(self.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    async def wait(self) -> int:
+        return await asyncio.shield(self._exited)
+
+    async def communicate(self) -> tuple[bytes, None]:
+        stdout = await self.stdout.read()
+        self.stdin.close()
+        await self.wait()
+        return stdout, None
+
+
+class Zygote:
+    def __init__(self, env: dict[str, str]) -> None:
+        self.env = env
+        self.ready = False
+
+        self._sock: None | socket.socket = None
+        self._process: None | asyncio.subprocess.Process = None
+        self._lock = asyncio.Lock()
+        self._replies: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self._exits: dict[int, asyncio.Future] = {}
+
+    async def start(self) -> None:
+        """Starts the zygote process, which then imports everything in the
+        background (it is ready in a few seconds)."""
+
+        sock, zygote_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+
+        self._replies = asyncio.Queue()
+
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                "python",
+                "-m",
+                "arcor2_runtime.zygote",
+                str(zygote_sock.fileno()),
+                stdin=asyncio.subprocess.DEVNULL,
+                pass_fds=(zygote_sock.fileno(),),
+                env=self.env,
+            )
+        finally:
+            zygote_sock.close()
+
+        sock.setblocking(False)
+        self._sock = sock
+        asyncio.create_task(self._read())
+
+    def _exit_future(self, pid: int) -> asyncio.Future:
+        try:
+            return self._exits[pid]
+        except KeyError:
+            fut = self._exits[pid] = asyncio.get_running_loop().create_future()
+            return fut
+
+    async def _read(self) -> None:
+        assert self._sock
+        loop = asyncio.get_running_loop()
+
+        while True:
+            try:
+                msg = await loop.sock_recv(self._sock, MAX_MSG_SIZE)
+            except OSError:
+                break
+
+            if not msg:
+                break
+
+            data = json.loads_type(msg, dict)
+
+            if data.get("ready"):
+                self.ready = True
+                logger.info("Zygote is ready.")
+            elif "returncode" in data:
+                self._exit_future(data["pid"]).set_result(data["returncode"])
+            else:
+                self._replies.put_nowait(data)
+
+        was_ready = self.ready
+        self.ready = False
+        self._sock.close()
+        self._sock = None
+
+        for fut in self._exits.values():  # forked processes are killed together with the zygote
+            if not fut.done():
+                fut.set_result(-signal.SIGKILL)
+
+        self._replies.put_nowait({"error": "Zygote terminated."})
+
+        if not was_ready:
+            logger.error("Zygote failed to start, packages will be started without it.")
+            return
+
+        logger.warning("Zygote terminated, starting a new one.")
+        await asyncio.sleep(RESTART_DELAY)
+        await self.start()
+
+    async def spawn(self, cwd: str, script: str, args: list[str], ipc_fd: int) -> ForkedProcess:
+        """Forks a new process running the given script.
+
+        The IPC socket (see arcor2_runtime.ipc) is passed to the process,
+        the caller should close it afterwards.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        async with self._lock:
+            if not self.ready or self._sock is None:
+                raise ZygoteException("Zygote not ready.")
+
+            stdin_r, stdin_w = os.pipe()
+            stdout_r, stdout_w = os.pipe()
+
+            try:
+                socket.send_fds(
+                    self._sock,
+                    [json.dumps({"cwd": cwd, "script": script, "args": args}).encode()],
+                    [stdin_r, stdout_w, ipc_fd],
+                )
+            except OSError as e:
+                for fd in (stdin_w, stdout_r):
+                    os.close(fd)
+                raise ZygoteException("Failed to contact zygote.") from e
+            finally:
+                os.close(stdin_r)
+                os.close(stdout_w)
+
+            reply = await self._replies.get()
+
+        if "error" in reply:
+            os.close(stdin_w)
+            os.close(stdout_r)
+            raise ZygoteException(f"Failed to fork: {reply['error']}")
+
+        pid: int = reply["pid"]
+        exited = self._exit_future(pid)
+        exited.add_done_callback(lambda _: self._exits.pop(pid, None))
+
+        stdout = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(stdout), open(stdout_r, "rb", 0))
+
+        transport, protocol = await loop.connect_write_pipe(
+            lambda: asyncio.StreamReaderProtocol(asyncio.StreamReader()), open(stdin_w, "wb", 0)
+        )
+        stdin = asyncio.StreamWriter(transport, protocol, None, loop)
+
+        return ForkedProcess(pid, stdin, stdout, exited)
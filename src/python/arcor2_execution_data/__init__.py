@@ -21,7 +21,7 @@ EXPOSED_RPCS: tuple[type[RPC], ...] = (
     rpc.StepAction,
 )
 
-RPCS: tuple[type[RPC], ...] = EXPOSED_RPCS + (Version,)
+RPCS: tuple[type[RPC], ...] = EXPOSED_RPCS + (Version, rpc.UploadPackageStream)
 
 EVENTS: tuple[type[arcor2_events.Event], ...] = (
     events.PackageChanged,
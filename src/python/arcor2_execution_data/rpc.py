@@ -26,6 +26,27 @@ class UploadPackage(RPC):
 # ----------------------------------------------------------------------------------------------------------------------
 
 
+class UploadPackageStream(RPC):
+    """Finishes upload of a package, which content was sent before as binary
+    messages (see arcor2_execution_data.upload)."""
+
+    @dataclass
+    class Request(RPC.Request):
+        @dataclass
+        class Args(JsonSchemaMixin):
+            id: str = field(metadata=dict(description="Id of the execution package."))
+            size: int = field(metadata=dict(description="Size of the zip file."))
+
+        args: Args
+
+    @dataclass
+    class Response(RPC.Response):
+        pass
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
 class ListPackages(RPC):
     @dataclass
     class Request(RPC.Request):
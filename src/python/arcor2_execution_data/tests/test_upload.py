@@ -0,0 +1,27 @@
+import pytest
+
+from arcor2.exceptions import Arcor2Exception
+from arcor2_execution_data.upload import package_chunk, parse_package_chunk
+
+
+@pytest.mark.parametrize("chunk", [b"", b"\x00\x01data"])
+def test_chunk(chunk: bytes) -> None:
+    package_id, parsed = parse_package_chunk(package_chunk("pkg-ěšč", chunk))
+
+    assert package_id == "pkg-ěšč"
+    assert isinstance(parsed, memoryview)
+    assert parsed.tobytes() == chunk
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        b"",
+        b"\x00",  # truncated header
+        b"\x00\x05pkg",  # id longer than the message
+        b"\x00\x02\xff\xfedata",  # id is not valid utf-8
+    ],
+)
+def test_invalid_chunk(message: bytes) -> None:
+    with pytest.raises(Arcor2Exception):
+        parse_package_chunk(message)
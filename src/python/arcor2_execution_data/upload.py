@@ -0,0 +1,38 @@
+"""Binary messages carrying content (zip file) of a package being uploaded.
+
+The zip file is sent in chunks, each prefixed with the package id,
+and then the upload is finished by the UploadPackageStream RPC.
+"""
+
+import struct
+
+from arcor2.exceptions import Arcor2Exception
+
+CHUNK_SIZE = 256 * 1024  # the whole message has to fit into the max. size of WebSocket message (1 MiB by default)
+
+_HEADER = struct.Struct("!H")  # length of the package id
+
+
+def package_chunk(package_id: str, chunk: bytes) -> bytes:
+    encoded_id = package_id.encode()
+    return _HEADER.pack(len(encoded_id)) + encoded_id + chunk
+
+
+def parse_package_chunk(message: bytes) -> tuple[str, memoryview]:
+    """Returns package id and the chunk (without copying it)."""
+
+    if len(message) < _HEADER.size:
+        raise Arcor2Exception("Invalid package chunk.")
+
+    (id_size,) = _HEADER.unpack_from(message)
+    start = _HEADER.size + id_size
+
+    if len(message) < start:
+        raise Arcor2Exception("Invalid package chunk.")
+
+    try:
+        package_id = message[_HEADER.size : start].decode()
+    except UnicodeDecodeError as e:
+        raise Arcor2Exception("Invalid package chunk.") from e
+
+    return package_id, memoryview(message)[start:]
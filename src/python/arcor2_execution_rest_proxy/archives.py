@@ -0,0 +1,65 @@
+"""Zip files of packages, cached for downloads.
+
+An archive is named by the package ID and a digest of its files, so it
+is created again whenever the package changes.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+
+def package_digest(package_path: str) -> str:
+    """Changes whenever any file of the package is added, removed or
+    modified."""
+
+    digest = hashlib.sha1()
+
+    for root, dirs, files in os.walk(package_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            st = os.stat(path)
+            digest.update(f"{os.path.relpath(path, package_path)}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+
+    return digest.hexdigest()
+
+
+def remove_archives(archives_path: str, package_id: str, keep: None | str = None) -> None:
+    prefix = f"{package_id}-"
+
+    try:
+        entries = list(os.scandir(archives_path))
+    except FileNotFoundError:
+        return
+
+    for entry in entries:
+        # the name is the prefix followed by the digest (40 hex digits) and ".zip"
+        if entry.name.startswith(prefix) and len(entry.name) == len(prefix) + 44 and entry.path != keep:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+def package_archive(archives_path: str, project_path: str, package_id: str) -> str:
+    """Returns path to a zip file with the package.
+
+    The archive is created only if the package was changed since the
+    last download.
+    """
+
+    package_path = os.path.join(project_path, package_id)
+    archive_path = os.path.join(archives_path, f"{package_id}-{package_digest(package_path)}.zip")
+
+    if os.path.exists(archive_path):
+        return archive_path
+
+    os.makedirs(archives_path, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=archives_path) as tmpdirname:
+        os.replace(shutil.make_archive(os.path.join(tmpdirname, package_id), "zip", package_path), archive_path)
+
+    remove_archives(archives_path, package_id, keep=archive_path)
+    return archive_path
@@ -1,17 +1,14 @@
 #!/usr/bin/env python3
 
 import argparse
-import base64
 import os
-import shutil
-import tempfile
 import time
 from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from queue import Queue
-from threading import Thread
+from threading import Lock, Thread
 from typing import TYPE_CHECKING, Optional
 
 import fastuuid as uuid
@@ -19,7 +16,6 @@ import websocket
 from dataclasses_jsonschema import DEFAULT_SCHEMA_TYPE, FieldMeta, JsonSchemaMixin
 from flask import Response, jsonify, request, send_file
 from sqlitedict import SqliteDict
-from werkzeug.utils import secure_filename
 
 import arcor2_execution_rest_proxy
 from arcor2 import json
@@ -27,9 +23,11 @@ from arcor2.data import events
 from arcor2.data import rpc as arcor2_rpc
 from arcor2.data.events import ActionStateBefore, PackageInfo, PackageState, ProjectException
 from arcor2.data.rpc import get_id
-from arcor2_execution_data import EVENTS, EXPOSED_RPCS
+from arcor2_execution_data import EVENTS, RPCS
 from arcor2_execution_data import URL as EXE_URL
 from arcor2_execution_data import rpc
+from arcor2_execution_data.upload import CHUNK_SIZE, package_chunk
+from arcor2_execution_rest_proxy import archives
 from arcor2_execution_rest_proxy.exceptions import NotFound, PackageRunState, RpcFail, WebApiError
 from arcor2_runtime.package import PROJECT_PATH
 from arcor2_web.flask import RespT, create_app, run_app
@@ -40,6 +38,7 @@ DEPENDENCIES: None | dict[str, str] = None
 
 DB_PATH = os.getenv("ARCOR2_EXECUTION_PROXY_DB_PATH", "/tmp")  # should be directory where DBs can be stored
 TOKENS_DB_PATH = os.path.join(DB_PATH, "tokens")
+ARCHIVES_PATH = os.path.join(DB_PATH, "archives")  # zip files of packages, cached for downloads
 
 
 class ExecutionState(Enum):
@@ -181,6 +180,9 @@ action_state_before: dict[int | None, ActionStateBefore.Data] = {}
 
 breakpoints: dict[str, set[str]] = {}
 
+# chunks of a package are sent over the shared connection, uploads must not interleave
+upload_lock = Lock()
+
 
 @contextmanager
 def tokens_db():
@@ -197,38 +199,46 @@ def ws_thread() -> None:  # TODO use (refactored) arserver client
     assert ws
 
     event_mapping: dict[str, type[events.Event]] = {evt.__name__: evt for evt in EVENTS}
-    rpc_mapping: dict[str, type[arcor2_rpc.common.RPC]] = {rpc.__name__: rpc for rpc in EXPOSED_RPCS}
+    rpc_mapping: dict[str, type[arcor2_rpc.common.RPC]] = {rpc.__name__: rpc for rpc in RPCS}
+
+    # other events (e.g. robot joints) are not of interest
+    inspected_events = {evt.__name__ for evt in (PackageInfo, PackageState, ProjectException, ActionStateBefore)}
 
     while True:
         raw_data = ws.recv()
         assert isinstance(raw_data, str), "Binary payload not supported."
         data = json.loads(raw_data)  # TODO handle WebSocketConnectionClosedException
 
-        if not isinstance(data, dict):
-            continue
+        # the Execution service might send a batch of events (ARCOR2_EXECUTION_EVENT_BATCH_SIZE)
+        for item in data if isinstance(data, list) else [data]:
+            if not isinstance(item, dict):
+                continue
 
-        if "event" in data:
-            evt = event_mapping[data["event"]].from_dict(data)
+            if "event" in item:
+                if item["event"] not in inspected_events:
+                    continue
 
-            if isinstance(evt, PackageInfo):
-                package_info = evt.data
-            elif isinstance(evt, PackageState):
-                package_state = evt.data
+                evt = event_mapping[item["event"]].from_dict(item)
 
-                if package_state.state == PackageState.Data.StateEnum.RUNNING:
-                    exception_messages.clear()
-                    action_state_before.clear()
-                elif package_state.state == PackageState.Data.StateEnum.STOPPED:
-                    action_state_before.clear()
+                if isinstance(evt, PackageInfo):
+                    package_info = evt.data
+                elif isinstance(evt, PackageState):
+                    package_state = evt.data
 
-            elif isinstance(evt, ProjectException):
-                exception_messages.append(evt.data.message)
-            elif isinstance(evt, ActionStateBefore):
-                action_state_before[evt.data.thread_id] = evt.data
+                    if package_state.state == PackageState.Data.StateEnum.RUNNING:
+                        exception_messages.clear()
+                        action_state_before.clear()
+                    elif package_state.state == PackageState.Data.StateEnum.STOPPED:
+                        action_state_before.clear()
 
-        elif "response" in data:
-            resp = rpc_mapping[data["response"]].Response.from_dict(data)
-            rpc_responses[resp.id].put(resp)
+                elif isinstance(evt, ProjectException):
+                    exception_messages.append(evt.data.message)
+                elif isinstance(evt, ActionStateBefore):
+                    action_state_before[evt.data.thread_id] = evt.data
+
+            elif "response" in item:
+                resp = rpc_mapping[item["response"]].Response.from_dict(item)
+                rpc_responses[resp.id].put(resp)
 
 
 def call_rpc(req: arcor2_rpc.common.RPC.Request) -> arcor2_rpc.common.RPC.Response:
@@ -499,17 +509,18 @@ def post_package(id: str) -> RespT:  # noqa
 
     file = request.files["executionPackage"]
     assert file.filename
-    file_name = secure_filename(file.filename)
+    assert ws
 
-    with tempfile.TemporaryDirectory() as tmpdirname:
-        file_path = os.path.join(tmpdirname, file_name)
-        file.save(file_path)
+    size = 0
 
-        with open(file_path, "rb") as zip_file:
-            b64_bytes = base64.b64encode(zip_file.read())
-            b64_str = b64_bytes.decode()
+    with upload_lock:
+        while chunk := file.stream.read(CHUNK_SIZE):
+            ws.send_binary(package_chunk(id, chunk))
+            size += len(chunk)
 
-    resp = call_rpc(rpc.UploadPackage.Request(id=get_id(), args=rpc.UploadPackage.Request.Args(id, b64_str)))
+        resp = call_rpc(
+            rpc.UploadPackageStream.Request(id=get_id(), args=rpc.UploadPackageStream.Request.Args(id, size))
+        )
 
     if resp.result:
         return Response(status=200)
@@ -552,11 +563,12 @@ def get_package(id: str) -> RespT:  # noqa
     if not package_exists(id):
         raise NotFound("Execution package ID not found.")
 
-    with tempfile.TemporaryDirectory() as tmpdirname:
-        archive_path = os.path.join(tmpdirname, id)
-        shutil.make_archive(archive_path, "zip", os.path.join(PROJECT_PATH, id))
-
-        return send_file(archive_path + ".zip", as_attachment=True, max_age=0)
+    return send_file(
+        archives.package_archive(ARCHIVES_PATH, PROJECT_PATH, id),
+        as_attachment=True,
+        download_name=f"{id}.zip",
+        max_age=0,
+    )
 
 
 @app.route("/packages", methods=["GET"])
@@ -637,6 +649,7 @@ def delete_package(id: str) -> RespT:  # noqa
 
     if resp.result:
         breakpoints.pop(id, None)
+        archives.remove_archives(ARCHIVES_PATH, id)
         return Response(status=200)
 
     raise RpcFail("Failed to delete the execution package.", content=json.dumps(resp.messages))
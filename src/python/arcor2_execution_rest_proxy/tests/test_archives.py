@@ -0,0 +1,56 @@
+import os
+import zipfile
+
+from arcor2_execution_rest_proxy.archives import package_archive, remove_archives
+
+
+def _write(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def _archives(archives_path: str) -> list[str]:
+    return sorted(os.listdir(archives_path))
+
+
+def test_package_archive(tmp_path) -> None:
+    archives_path = os.path.join(tmp_path, "archives")
+    project_path = os.path.join(tmp_path, "project")
+    _write(os.path.join(project_path, "pkg", "script.py"), "v1")
+
+    first = package_archive(archives_path, project_path, "pkg")
+
+    with zipfile.ZipFile(first) as zf:
+        assert zf.read("script.py") == b"v1"
+
+    mtime = os.stat(first).st_mtime_ns
+    assert package_archive(archives_path, project_path, "pkg") == first  # nothing changed, cached one is used
+    assert os.stat(first).st_mtime_ns == mtime
+
+    _write(os.path.join(project_path, "pkg", "data", "project.json"), "{}")
+    second = package_archive(archives_path, project_path, "pkg")
+
+    assert second != first
+    assert _archives(archives_path) == [os.path.basename(second)]  # stale archive removed
+
+    with zipfile.ZipFile(second) as zf:
+        assert sorted(zf.namelist()) == ["data/", "data/project.json", "script.py"]
+
+
+def test_remove_archives(tmp_path) -> None:
+    archives_path = os.path.join(tmp_path, "archives")
+    project_path = os.path.join(tmp_path, "project")
+    _write(os.path.join(project_path, "pkg", "script.py"), "")
+    _write(os.path.join(project_path, "pkg-2", "script.py"), "")
+
+    package_archive(archives_path, project_path, "pkg")
+    other = package_archive(archives_path, project_path, "pkg-2")
+
+    remove_archives(archives_path, "pkg")
+    assert _archives(archives_path) == [os.path.basename(other)]  # archive of "pkg-2" is kept
+
+
+def test_remove_archives_no_dir(tmp_path) -> None:
+    remove_archives(os.path.join(tmp_path, "archives"), "pkg")
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 
 from arcor2.data.common import Joint, Pose, StrEnum
+from arcor2.data.robot import InverseKinematicsResult
 from arcor2_web import rest
 
 from .abstract_dobot import AbstractDobot, MoveType  # noqa:ABS101
@@ -57,6 +58,31 @@ class DobotMagician(AbstractDobot):
 
         return rest.call(rest.Method.PUT, f"{self.settings.url}/ik", body=pose, list_return_type=Joint)
 
+    def inverse_kinematics_batch(
+        self,
+        end_effector_id: str,
+        poses: list[Pose],
+        start_joints: None | list[Joint] = None,
+        avoid_collisions: bool = True,
+    ) -> list[None | list[Joint]]:
+        """Computes inverse kinematics for many poses using one request.
+
+        :param end_effector_id: IK target pose end-effector
+        :param poses: IK target poses
+        :param start_joints: IK start joints (not supported)
+        :param avoid_collisions: Return non-collision IK result if true (not supported)
+        :return: Inverse kinematics for each pose, None where it could not be computed
+        """
+
+        results = rest.call(
+            rest.Method.PUT,
+            f"{self.settings.url}/ik/batch",
+            body=poses,
+            list_return_type=InverseKinematicsResult,
+            timeout=rest.Timeout(read=rest.Timeout().read * max(len(poses), 1)),  # as if called for each pose
+        )
+        return [res.joints for res in results]
+
     def forward_kinematics(self, end_effector_id: str, joints: list[Joint]) -> Pose:
         """Computes forward kinematics.
 
@@ -316,6 +316,38 @@ class Robot(GenericWithPose, metaclass=abc.ABCMeta):
         """
         raise Arcor2NotImplemented()
 
+    def inverse_kinematics_batch(
+        self,
+        end_effector_id: str,
+        poses: list[Pose],
+        start_joints: None | list[Joint] = None,
+        avoid_collisions: bool = True,
+    ) -> list[None | list[Joint]]:
+        """Computes inverse kinematics for many poses at once.
+
+        By default, inverse_kinematics is called for each pose. Robots
+        where IK is computed remotely should override it to get all the
+        results at once.
+
+        :param end_effector_id: IK target pose end-effector
+        :param poses: IK target poses
+        :param start_joints: IK start joints
+        :param avoid_collisions: Return non-collision IK result if true
+        :return: Inverse kinematics for each pose, None where it could not be computed
+        """
+
+        ret: list[None | list[Joint]] = []
+
+        for pose in poses:
+            try:
+                ret.append(self.inverse_kinematics(end_effector_id, pose, start_joints, avoid_collisions))
+            except Arcor2NotImplemented:
+                raise
+            except Arcor2Exception:
+                ret.append(None)
+
+        return ret
+
     def forward_kinematics(self, end_effector_id: str, joints: list[Joint]) -> Pose:
         """Computes forward kinematics.
 
@@ -447,6 +479,35 @@ class MultiArmRobot(Robot, metaclass=abc.ABCMeta):
         """
         raise Arcor2NotImplemented()
 
+    def inverse_kinematics_batch(
+        self,
+        end_effector_id: str,
+        poses: list[Pose],
+        start_joints: None | list[Joint] = None,
+        avoid_collisions: bool = True,
+        arm_id: None | str = None,
+    ) -> list[None | list[Joint]]:
+        """Computes inverse kinematics for many poses at once.
+
+        :param end_effector_id: IK target pose end-effector
+        :param poses: IK target poses
+        :param start_joints: IK start joints
+        :param avoid_collisions: Return non-collision IK result if true
+        :return: Inverse kinematics for each pose, None where it could not be computed
+        """
+
+        ret: list[None | list[Joint]] = []
+
+        for pose in poses:
+            try:
+                ret.append(self.inverse_kinematics(end_effector_id, pose, start_joints, avoid_collisions, arm_id))
+            except Arcor2NotImplemented:
+                raise
+            except Arcor2Exception:
+                ret.append(None)
+
+        return ret
+
     def forward_kinematics(self, end_effector_id: str, joints: list[Joint], arm_id: None | str = None) -> Pose:
         """Computes forward kinematics.
 
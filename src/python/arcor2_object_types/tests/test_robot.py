@@ -1,3 +1,7 @@
+import pytest
+
+from arcor2.data.common import Joint, Pose, Position
+from arcor2.exceptions import Arcor2NotImplemented
 from arcor2_object_types.abstract import Robot
 from arcor2_object_types.utils import check_object_type
 
@@ -5,3 +9,43 @@ from arcor2_object_types.utils import check_object_type
 def test_object_type() -> None:
     check_object_type(Robot)
     assert Robot.abstract()
+
+
+class _NoIkRobot(Robot):
+    def get_end_effectors_ids(self, an: None | str = None) -> set[str]:
+        return {"default"}
+
+    def get_end_effector_pose(self, end_effector_id: str, an: None | str = None) -> Pose:
+        return Pose()
+
+    def robot_joints(self, include_gripper: bool = False, an: None | str = None) -> list[Joint]:
+        return [Joint("j", 0.0)]
+
+    def grippers(self, an: None | str = None) -> set[str]:
+        return set()
+
+    def suctions(self, an: None | str = None) -> set[str]:
+        return set()
+
+
+class _Robot(_NoIkRobot):
+    def inverse_kinematics(
+        self,
+        end_effector_id: str,
+        pose: Pose,
+        start_joints: None | list[Joint] = None,
+        avoid_collisions: bool = True,
+    ) -> list[Joint]:
+        if pose.position.x > 1:
+            raise Robot.KinematicsException("Unreachable.")
+        return [Joint("j", pose.position.x)]
+
+
+def test_inverse_kinematics_batch() -> None:
+    robot = _Robot("id", "name", Pose())
+
+    poses = [Pose(Position(0.5)), Pose(Position(2)), Pose(Position(1))]
+    assert robot.inverse_kinematics_batch("default", poses) == [[Joint("j", 0.5)], None, [Joint("j", 1)]]
+
+    with pytest.raises(Arcor2NotImplemented):
+        _NoIkRobot("id", "name", Pose()).inverse_kinematics_batch("default", poses)
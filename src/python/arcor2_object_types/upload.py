@@ -62,8 +62,12 @@ def upload_def(
                 raise UploadException("For mesh collision model, file_to_upload parameter have to be set.")
 
             try:
-                with open(file_to_upload, "rb") as f:
-                    client.create_asset(type_def.mesh_filename, f.read(), description=f"mesh for {obj_type.id}")
+                client.create_asset_from_file(
+                    type_def.mesh_filename,
+                    file_to_upload,
+                    description=f"mesh for {obj_type.id}",
+                    file_name=type_def.mesh_filename,
+                )
             except OSError as e:
                 raise UploadException(f"Failed to read mesh file. {str(e)}")
 
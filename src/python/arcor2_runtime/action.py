@@ -6,20 +6,15 @@ from functools import wraps
 from typing import Any, Callable, TypeVar, cast
 
 from arcor2.cached import CachedProject, CachedScene
-from arcor2.data.common import Pose, ProjectRobotJoints, StrEnum
+from arcor2.data.common import Pose, ProjectRobotJoints
 from arcor2.data.events import ActionStateAfter, ActionStateBefore, Event, PackageState
 from arcor2.exceptions import Arcor2Exception
 from arcor2_object_types.abstract import Generic
 from arcor2_object_types.parameter_plugins.utils import plugin_from_instance
 from arcor2_object_types.utils import iterate_over_actions
+from arcor2_runtime import ipc
 from arcor2_runtime.exceptions import print_exception
-
-
-class Commands(StrEnum):
-    PAUSE = "p"
-    RESUME = "r"
-    STEP = "s"
-
+from arcor2_runtime.ipc import Commands
 
 ACTION_NAME_ID_MAPPING_ATTR = "_action_name_id_mapping"
 AP_ID_ATTR = "_ap_id"
@@ -118,65 +113,97 @@ except ImportError:
 
 
 def print_event(event: Event) -> None:
-    """Used from main script to print event as JSON."""
+    """Used from main script to send event to the Execution service (or print
+    it as JSON)."""
+
+    if ipc.channel:
+        ipc.channel.send(event.to_json().encode())
+        return
 
     print(event.to_json())
     sys.stdout.flush()
 
 
-def _get_stdin_commands():
-    """Reads stdin and checks for commands from parent script (e.g. Execution
-    unit). Prints events to stdout. State is signalled using events.
+def _callback(cb: CB_TYPE) -> None:
+    if cb:
+        g.callback_thread_id = threading.get_ident()
+        try:
+            cb()
+        except Exception as e:  # otherwise, the thread will stop silently
+            print_exception(e)
+            sys.exit(1)
+        g.callback_thread_id = 0
+
+
+def _handle_command(cmd: Commands) -> None:
+    with g.lock:
+        if g.pause.is_set():
+            if cmd in (Commands.STEP, Commands.RESUME):
+                _callback(g.resume_callback)
+                g.pause.clear()
+                print_event(PackageState(PackageState.Data(PackageState.Data.StateEnum.RUNNING)))
+
+                if cmd == Commands.STEP:
+                    g.pause_on_next_action.set()
+
+                g.resume.set()
+        else:
+            if cmd == Commands.PAUSE:
+                _callback(g.pause_callback)
+                g.resume.clear()
+                g.pause.set()
+                print_event(PackageState(PackageState.Data(PackageState.Data.StateEnum.PAUSED)))
+
+
+def _get_stdin_commands() -> None:
+    """Reads stdin and checks for commands (e.g. from a user in terminal).
 
     p == pause script
     r == resume script
+    s == step to the next action
 
     :return:
     """
 
-    def callback(cb: CB_TYPE) -> None:
-        if cb:
-            g.callback_thread_id = threading.get_ident()
-            try:
-                cb()
-            except Exception as e:  # otherwise, the thread will stop silently
-                print_exception(e)
-                sys.exit(1)
-            g.callback_thread_id = 0
-
     while True:
         raw_cmd = read_stdin(0.1)
 
         if not raw_cmd:
             continue
 
-        cmd = Commands(raw_cmd)
+        _handle_command(Commands(raw_cmd))
 
-        with g.lock:
-            if g.pause.is_set():
-                if cmd in (Commands.STEP, Commands.RESUME):
-                    callback(g.resume_callback)
-                    g.pause.clear()
-                    print_event(PackageState(PackageState.Data(PackageState.Data.StateEnum.RUNNING)))
 
-                    if cmd == Commands.STEP:
-                        g.pause_on_next_action.set()
+def _get_ipc_commands(channel: ipc.Channel) -> None:
+    """Waits for commands from the Execution service."""
 
-                    g.resume.set()
-            else:
-                if cmd == Commands.PAUSE:
-                    callback(g.pause_callback)
-                    g.resume.clear()
-                    g.pause.set()
-                    print_event(PackageState(PackageState.Data(PackageState.Data.StateEnum.PAUSED)))
+    while (payload := channel.recv()) is not None:
+        _handle_command(Commands(payload.decode()))
+
+
+def _get_commands() -> None:
+    if ipc.channel:
+        _get_ipc_commands(ipc.channel)
+    else:
+        _get_stdin_commands()
 
 
-_cmd_thread = threading.Thread(target=_get_stdin_commands)
+_cmd_thread = threading.Thread(target=_get_commands)
 _cmd_thread.daemon = True
 
-# only start a thread when stdin is available - otherwise select will return immediately and cause high CPU load
-if sys.stdin.isatty():
-    _cmd_thread.start()
+
+def start_command_thread() -> None:
+    """Starts handling of commands, if there is a source of them."""
+
+    if _cmd_thread.is_alive():
+        return
+
+    # only start a thread when stdin is available - otherwise select will return immediately and cause high CPU load
+    if ipc.channel or sys.stdin.isatty():
+        _cmd_thread.start()
+
+
+start_command_thread()
 
 
 def handle_commands(*, before: bool, breakpoint: bool = False) -> None:
@@ -4,6 +4,7 @@ import traceback
 
 from arcor2.data.events import ProjectException
 from arcor2.exceptions import Arcor2Exception
+from arcor2_runtime import ipc
 
 
 def format_stacktrace() -> str:
@@ -15,7 +16,8 @@ def format_stacktrace() -> str:
 
 def print_exception(e: Exception) -> None:
     """This is intended to be called from the main script. It prints out
-    exception in form of JSON (ProjectException).
+    exception in form of JSON (ProjectException), through the IPC channel if
+    available.
 
     The related traceback is saved to a text file for latter diagnosis.
     :param e: Exception to be printed out.
@@ -23,8 +25,12 @@ def print_exception(e: Exception) -> None:
     """
 
     pee = ProjectException(ProjectException.Data(str(e), e.__class__.__name__, isinstance(e, Arcor2Exception)))
-    print(pee.to_json())
-    sys.stdout.flush()
+
+    if ipc.channel:
+        ipc.channel.send(pee.to_json().encode())
+    else:
+        print(pee.to_json())
+        sys.stdout.flush()
 
     with open("traceback-{}.txt".format(time.strftime("%Y%m%d-%H%M%S")), "w") as tb_file:
         tb_file.write(format_stacktrace())
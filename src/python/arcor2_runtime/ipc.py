@@ -0,0 +1,101 @@
+"""Channel between the main script and the Execution service.
+
+It is a Unix socket (its file descriptor is given in the ARCOR2_RUNTIME_IPC_FD env. variable)
+carrying length-prefixed messages: events (JSON) from the script and commands to the script.
+Stdout is then used only for human-readable output. When the variable is not set (e.g. script
+started from a terminal), events are printed out and commands are read from stdin.
+"""
+
+import os
+import socket
+import struct
+import threading
+
+from arcor2.data.common import StrEnum
+
+FD_ENV = "ARCOR2_RUNTIME_IPC_FD"
+
+_HEADER = struct.Struct("!I")  # length of the message
+
+
+class Commands(StrEnum):
+    PAUSE = "p"
+    RESUME = "r"
+    STEP = "s"
+
+
+def frame(payload: bytes) -> bytes:
+    return _HEADER.pack(len(payload)) + payload
+
+
+def split_frames(buffer: bytes) -> tuple[list[bytes], bytes]:
+    """Splits received data into complete messages and the rest."""
+
+    messages: list[bytes] = []
+    start = 0
+
+    while len(buffer) - start >= _HEADER.size:
+        (size,) = _HEADER.unpack_from(buffer, start)
+        end = start + _HEADER.size + size
+
+        if end > len(buffer):
+            break
+
+        messages.append(buffer[start + _HEADER.size : end])
+        start = end
+
+    return messages, buffer[start:]
+
+
+class Channel:
+    __slots__ = ("_sock", "_lock")
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._lock = threading.Lock()  # events are sent from multiple threads
+
+    def send(self, payload: bytes) -> None:
+        with self._lock:
+            self._sock.sendall(frame(payload))
+
+    def _recv_exactly(self, size: int) -> None | bytes:
+        buf = bytearray()
+
+        while len(buf) < size:
+            if not (chunk := self._sock.recv(size - len(buf))):
+                return None
+            buf += chunk
+
+        return bytes(buf)
+
+    def recv(self) -> None | bytes:
+        """Blocks until a message is received.
+
+        Returns None when the channel is closed.
+        """
+
+        if (header := self._recv_exactly(_HEADER.size)) is None:
+            return None
+
+        (size,) = _HEADER.unpack(header)
+        return self._recv_exactly(size)
+
+
+channel: None | Channel = None
+
+
+def connect() -> None:
+    """Opens the channel given by the env. variable (if set and not opened
+    yet)."""
+
+    global channel
+
+    if channel is not None:
+        return
+
+    # subprocesses of the script should not attempt to use it
+    if fd := os.environ.pop(FD_ENV, None):
+        channel = Channel(socket.socket(fileno=int(fd)))
+
+
+connect()
@@ -117,9 +117,8 @@ class Resources:
             raise ResourcesException("Project/scene not consistent!")
 
         # make all poses absolute
-        for aps in self.project.action_points_with_parent:
-            # Action point pose is relative to its parent object/AP pose in scene but is absolute during runtime.
-            tr.make_relative_ap_global(self.scene, self.project, aps)
+        # Action point pose is relative to its parent object/AP pose in scene but is absolute during runtime.
+        tr.make_all_aps_global(self.scene, self.project)
 
         for obj_type in self.scene.object_types:
             try:
@@ -0,0 +1,40 @@
+import socket
+import threading
+
+from arcor2_runtime import ipc
+
+
+def test_split_frames() -> None:
+    data = ipc.frame(b"first") + ipc.frame(b"") + ipc.frame(b"third")
+
+    for split_at in range(len(data) + 1):
+        messages, remainder = ipc.split_frames(data[:split_at])
+        rest, remainder = ipc.split_frames(remainder + data[split_at:])
+        assert messages + rest == [b"first", b"", b"third"]
+        assert not remainder
+
+
+def test_channel() -> None:
+    ours, theirs = socket.socketpair()
+    channel = ipc.Channel(theirs)
+
+    threads = [threading.Thread(target=channel.send, args=(str(idx).encode() * 10000,)) for idx in range(10)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+    ours.sendall(ipc.frame(ipc.Commands.PAUSE.encode()))
+    assert channel.recv() == b"p"
+
+    theirs.shutdown(socket.SHUT_WR)
+    received = b""
+    while chunk := ours.recv(65536):
+        received += chunk
+
+    messages, remainder = ipc.split_frames(received)
+    assert sorted(messages) == [str(idx).encode() * 10000 for idx in range(10)]  # messages are not interleaved
+    assert not remainder
+
+    ours.close()
+    assert channel.recv() is None
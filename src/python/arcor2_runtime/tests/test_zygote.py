@@ -0,0 +1,26 @@
+import json
+import os
+import sys
+
+import pytest
+
+from arcor2_runtime import zygote
+
+
+def test_run(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(os.getcwd())  # restored afterwards
+    monkeypatch.setattr(sys, "argv", ["zygote.py", "3"])
+    monkeypatch.setattr(sys, "path", list(sys.path))
+
+    script = os.path.join(tmp_path, "script.py")
+    with open(script, "w") as f:
+        f.write(
+            "import json, os, sys\n"
+            "with open('out.json', 'w') as f:\n"
+            "    json.dump([__name__, os.getcwd(), sys.path[0], *sys.argv], f)\n"
+        )
+
+    zygote.run(zygote.Run(str(tmp_path), script, ["-d"]))
+
+    with open(os.path.join(tmp_path, "out.json")) as f:  # as if it was started by `python script.py -d`
+        assert json.load(f) == ["__main__", str(tmp_path), str(tmp_path), script, "-d"]
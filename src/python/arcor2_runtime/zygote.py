@@ -0,0 +1,173 @@
+"""Pre-imported process that forks a new process for each run of a package.
+
+It is started by the Execution service as `python -m arcor2_runtime.zygote <fd>`, where `<fd>`
+is one end of a Unix socket (SOCK_SEQPACKET, one JSON message per packet):
+
+- zygote -> service: `{"ready": true}` once all the heavy modules are imported,
+- service -> zygote: `{"cwd": ..., "script": ..., "args": [...]}` together with three file descriptors
+  (stdin, stdout and IPC channel of the package, see arcor2_runtime.ipc),
+- zygote -> service: `{"pid": ...}` (or `{"error": ...}`) as a reply,
+- zygote -> service: `{"pid": ..., "returncode": ...}` when a forked process finishes.
+
+The forked process then behaves exactly as `python script.py` started with the given stdin/stdout.
+"""
+
+import ctypes
+import importlib
+import os
+import runpy
+import selectors
+import signal
+import socket
+import sys
+from typing import NamedTuple
+
+from arcor2 import json
+from arcor2_runtime import ipc
+
+# imported in advance, as they are needed by every package
+PRELOAD = ("numpy", "quaternion", "humps", "dataclasses_jsonschema", "arcor2_runtime.resources")
+
+MAX_MSG_SIZE = 64 * 1024
+PR_SET_PDEATHSIG = 1
+
+
+class Run(NamedTuple):
+    cwd: str
+    script: str
+    args: list[str]
+
+
+def preload() -> None:
+    for module in PRELOAD:
+        importlib.import_module(module)
+
+
+def _send(sock: socket.socket, **msg: json.JsonType) -> None:
+    sock.send(json.dumps(msg).encode())
+
+
+def _reap(sock: socket.socket) -> None:
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+
+        if not pid:
+            return
+
+        _send(sock, pid=pid, returncode=os.waitstatus_to_exitcode(status))
+
+
+def _child(sock: socket.socket, wakeup_fds: tuple[int, int], stdin: int, stdout: int, ipc_fd: int) -> None:
+    zygote_pid = os.getppid()
+
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    try:  # the package should not outlive the zygote (it would not be possible to get its return code)
+        ctypes.CDLL(None).prctl(PR_SET_PDEATHSIG, signal.SIGKILL)
+    except (OSError, AttributeError):
+        pass
+
+    if os.getppid() != zygote_pid:
+        os._exit(1)
+
+    sock.close()
+    for fd in wakeup_fds:
+        os.close(fd)
+
+    os.dup2(stdin, 0)
+    os.dup2(stdout, 1)
+    os.dup2(stdout, 2)
+    os.close(stdin)
+    os.close(stdout)
+
+    os.environ[ipc.FD_ENV] = str(ipc_fd)
+    ipc.connect()
+
+    from arcor2_runtime import action  # already imported by preload(), not at the top, as it starts a thread
+
+    action.start_command_thread()  # it was not started in the zygote, as there was no source of commands
+
+
+def serve(sock: socket.socket) -> None | Run:
+    """Forks a process for each request.
+
+    Returns in the forked process only (with what should be run) or
+    when the service closes the socket (with None).
+    """
+
+    wakeup_fds = os.pipe()
+    os.set_blocking(wakeup_fds[1], False)
+    signal.set_wakeup_fd(wakeup_fds[1])
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)  # the handler has to be set to get the wakeup
+
+    sel = selectors.DefaultSelector()
+    sel.register(sock, selectors.EVENT_READ)
+    sel.register(wakeup_fds[0], selectors.EVENT_READ)
+
+    _send(sock, ready=True)
+
+    while True:
+        for key, _ in sel.select():
+            if key.fileobj == wakeup_fds[0]:
+                os.read(wakeup_fds[0], 512)
+                _reap(sock)
+                continue
+
+            msg, fds, _, _ = socket.recv_fds(sock, MAX_MSG_SIZE, 3)
+
+            if not msg:
+                return None
+
+            if len(fds) != 3:
+                for fd in fds:
+                    os.close(fd)
+                _send(sock, error="Expected stdin, stdout and IPC file descriptors.")
+                continue
+
+            req = json.loads_type(msg, dict)
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+            try:
+                pid = os.fork()
+            except OSError as e:
+                _send(sock, error=str(e))
+            else:
+                if pid == 0:
+                    sel.close()
+                    _child(sock, wakeup_fds, *fds)
+                    return Run(req["cwd"], req["script"], req["args"])
+
+                _send(sock, pid=pid)
+
+            for fd in fds:
+                os.close(fd)
+
+
+def run(what: Run) -> None:
+    """Runs the main script of a package the same way as `python
+    script.py`."""
+
+    os.chdir(what.cwd)
+    sys.path[0] = what.cwd
+    sys.argv = [what.script, *what.args]
+    runpy.run_path(what.script, run_name="__main__")
+
+
+def main() -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # ctrl+c in a terminal is for the service (and packages)
+
+    sock = socket.socket(fileno=int(sys.argv[1]))
+    preload()
+
+    if what := serve(sock):
+        run(what)
+
+
+if __name__ == "__main__":
+    main()
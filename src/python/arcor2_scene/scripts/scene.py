@@ -2,22 +2,26 @@
 
 import argparse
 import logging
-import math
+import os
 import random
+import tempfile
+import threading
 import time
-from typing import NamedTuple
+from typing import TYPE_CHECKING, NamedTuple
 
 import humps
 import numpy as np
 import open3d as o3d
 import quaternion
 from flask import jsonify, request
+from lru import LRU
 
 from arcor2 import env
 from arcor2.data import common, object_type, scene
 from arcor2.logging import get_logger
 from arcor2_scene import SCENE_PORT, SCENE_SERVICE_NAME, version
 from arcor2_scene.exceptions import NotFound, SceneGeneral, WebApiError
+from arcor2_storage import client as storage
 from arcor2_web.flask import Response, RespT, create_app, run_app
 
 app = create_app(__name__)
@@ -28,12 +32,28 @@ logger.propagate = False
 class CollisionObject(NamedTuple):
     model: object_type.Models
     pose: common.Pose
+    triangles: None | o3d.t.geometry.TriangleMesh = None  # inflated and transformed, ready for ray casting
 
 
 collision_objects: dict[str, CollisionObject] = {}
 started: bool = False
 inflation = 0.01
 
+"""
+RaycastingScene does not support removing of geometries. Therefore, it is
+built on the first line check after a change of collision objects, from
+triangles prepared when the objects were added/updated.
+"""
+_raycasting_scene: None | o3d.t.geometry.RaycastingScene = None
+_geometry_ids: dict[int, str] = {}  # o3d id to our id
+_lock = threading.Lock()
+
+# recently used mesh files, by SHA-256 of the asset
+if TYPE_CHECKING:
+    _meshes: dict[str, None | o3d.geometry.TriangleMesh] = {}
+else:
+    _meshes = LRU(max(env.get_int("ARCOR2_SCENE_MESH_CACHE_SIZE", 32), 1))
+
 delay_mean = env.get_float("ARCOR2_SCENE_DELAY_MEAN", 0)
 delay_sigma = env.get_float("ARCOR2_SCENE_DELAY_SIGMA", 0)
 
@@ -47,6 +67,127 @@ def delay() -> None:
     time.sleep(random.normalvariate(delay_mean, delay_sigma))
 
 
+def _load_mesh(asset_id: str) -> None | o3d.geometry.TriangleMesh:
+    try:
+        digest = storage.asset_digest(asset_id)
+    except storage.StorageClientException as e:
+        logger.warning(f"Failed to get mesh {asset_id}: {e}")
+        return None
+
+    try:
+        return _meshes[digest]
+    except KeyError:
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, os.path.basename(asset_id))  # o3d detects format from the extension
+
+        try:
+            storage.get_asset_data_to_file(asset_id, path)
+        except storage.StorageClientException as e:
+            logger.warning(f"Failed to get mesh {asset_id}: {e}")
+            return None
+
+        tm = o3d.io.read_triangle_mesh(path)
+
+    if not tm.has_triangles():
+        logger.warning(f"Mesh {asset_id} could not be loaded, it will be ignored by collision checking.")
+        tm = None
+
+    _meshes[digest] = tm
+    return tm
+
+
+def _triangles(
+    model: object_type.Models, pose: common.Pose, scale: tuple[float, float, float] = (1.0, 1.0, 1.0)
+) -> None | o3d.t.geometry.TriangleMesh:
+    """
+    o3d uses different coordinates, but in this case it should not matter
+
+    o3d        x right,   y down, z forward
+    arcor2/ros x forward, y left, z up
+    unity      x Right,   y Up,   z Forward
+    """
+
+    if isinstance(model, object_type.Box):
+        # The left bottom corner on the front will be placed at (0, 0, 0)
+        sx = model.size_x + inflation
+        sy = model.size_y + inflation
+        sz = model.size_z + inflation
+
+        tm = o3d.geometry.TriangleMesh.create_box(sx, sy, sz)
+        tm.translate([-sx / 2, -sy / 2, -sz / 2])
+    elif isinstance(model, object_type.Cylinder):
+        tm = o3d.geometry.TriangleMesh.create_cylinder(model.radius + inflation, model.height + inflation)
+    elif isinstance(model, object_type.Sphere):
+        tm = o3d.geometry.TriangleMesh.create_sphere(model.radius + inflation)
+    elif isinstance(model, object_type.Mesh):
+        loaded = _load_mesh(model.asset_id)
+        if loaded is None:
+            return None
+        tm = o3d.geometry.TriangleMesh(loaded)  # copy, loaded meshes are shared
+        tm.vertices = o3d.utility.Vector3dVector(np.asarray(tm.vertices) * scale)
+    else:
+        logger.warning(f"Unsupported type of collision model: {model.type()}.")
+        return None
+
+    tm.rotate(quaternion.as_rotation_matrix(pose.orientation.as_quaternion()), center=(0, 0, 0))
+    tm.translate(list(pose.position))
+    return o3d.t.geometry.TriangleMesh.from_legacy(tm)
+
+
+def _upsert_collision(
+    model: object_type.Models, pose: common.Pose, scale: tuple[float, float, float] = (1, 1, 1)
+) -> None:
+    global _raycasting_scene
+
+    obj = CollisionObject(model, pose, _triangles(model, pose, scale))
+
+    with _lock:
+        collision_objects[model.id] = obj
+        _raycasting_scene = None
+
+
+def _raycasting() -> tuple[o3d.t.geometry.RaycastingScene, dict[int, str]]:
+    global _raycasting_scene, _geometry_ids
+
+    with _lock:
+        if _raycasting_scene is None:
+            _raycasting_scene = o3d.t.geometry.RaycastingScene()
+            _geometry_ids = {}
+
+            for obj_id, obj in collision_objects.items():
+                if obj.triangles is not None:
+                    _geometry_ids[_raycasting_scene.add_triangles(obj.triangles)] = obj_id
+
+            logger.debug(f"Ray casting scene built from {len(_geometry_ids)} objects.")
+
+        return _raycasting_scene, _geometry_ids
+
+
+def _line_check(checks: list[scene.LineCheck]) -> list[scene.LineCheckResult]:
+    """Casts one ray per line (from pt1 towards pt2), all at once."""
+
+    if not collision_objects or not checks:
+        return [scene.LineCheckResult(True) for _ in checks]
+
+    o3d_scene, o3d_id = _raycasting()
+
+    pt1 = np.array([list(lc.pt1) for lc in checks], dtype=np.float32)
+    vec = np.array([list(lc.pt2) for lc in checks], dtype=np.float32) - pt1
+    dist_btw_points = np.linalg.norm(vec, axis=1)
+    dir_vec = np.divide(vec, dist_btw_points[:, None], out=np.zeros_like(vec), where=dist_btw_points[:, None] > 0)
+
+    ans = o3d_scene.cast_rays(o3d.core.Tensor(np.hstack((pt1, dir_vec)), dtype=o3d.core.Dtype.Float32))
+    dist_to_hit = ans["t_hit"].numpy()
+    geometry_ids = ans["geometry_ids"].numpy()
+
+    return [
+        scene.LineCheckResult(True) if hit > dist else scene.LineCheckResult(False, o3d_id[int(geometry_id)])
+        for hit, dist, geometry_id in zip(dist_to_hit, dist_btw_points, geometry_ids)
+    ]
+
+
 @app.route("/collisions/box", methods=["PUT"])
 def put_box() -> RespT:
     """Add or update collision box.
@@ -102,7 +243,7 @@ def put_box() -> RespT:
 
     args = request.args.to_dict()
     box = object_type.Box(args["boxId"], float(args["sizeX"]), float(args["sizeY"]), float(args["sizeZ"]))
-    collision_objects[box.id] = CollisionObject(box, common.Pose.from_dict(humps.decamelize(request.json)))
+    _upsert_collision(box, common.Pose.from_dict(humps.decamelize(request.json)))
 
     return jsonify("ok"), 200
 
@@ -152,7 +293,7 @@ def put_sphere() -> RespT:
 
     args = humps.decamelize(request.args.to_dict())
     sphere = object_type.Sphere(args["sphere_id"], float(args["radius"]))
-    collision_objects[sphere.id] = CollisionObject(sphere, common.Pose.from_dict(humps.decamelize(request.json)))
+    _upsert_collision(sphere, common.Pose.from_dict(humps.decamelize(request.json)))
     return jsonify("ok"), 200
 
 
@@ -206,7 +347,7 @@ def put_cylinder() -> RespT:
 
     args = humps.decamelize(request.args.to_dict())
     cylinder = object_type.Cylinder(args["cylinder_id"], float(args["radius"]), float(args["height"]))
-    collision_objects[cylinder.id] = CollisionObject(cylinder, common.Pose.from_dict(humps.decamelize(request.json)))
+    _upsert_collision(cylinder, common.Pose.from_dict(humps.decamelize(request.json)))
     return jsonify("ok"), 200
 
 
@@ -272,7 +413,12 @@ def put_mesh() -> RespT:
 
     args = humps.decamelize(request.args.to_dict())
     mesh = object_type.Mesh(args["mesh_id"], args["mesh_file_id"])
-    collision_objects[mesh.id] = CollisionObject(mesh, common.Pose.from_dict(humps.decamelize(request.json)))
+    scale = (
+        float(args.get("mesh_scale_x", 1.0)),
+        float(args.get("mesh_scale_y", 1.0)),
+        float(args.get("mesh_scale_z", 1.0)),
+    )
+    _upsert_collision(mesh, common.Pose.from_dict(humps.decamelize(request.json)), scale)
     return jsonify("ok"), 200
 
 
@@ -302,10 +448,15 @@ def delete_collision(id: str) -> RespT:
                     $ref: WebApiError
     """
 
-    try:
-        del collision_objects[id]
-    except KeyError:
-        raise NotFound("Collision not found")
+    global _raycasting_scene
+
+    with _lock:
+        try:
+            del collision_objects[id]
+        except KeyError:
+            raise NotFound("Collision not found")
+
+        _raycasting_scene = None
 
     return Response(status=200)
 
@@ -400,71 +551,59 @@ def put_line_safe() -> RespT:
     if not isinstance(request.json, dict):
         raise SceneGeneral("Body should be a JSON dict containing LineCheck.")
 
-    if not collision_objects:
-        logger.debug("Safe. No collision object.")
-        return jsonify(scene.LineCheckResult(True).to_dict())
-
     pts = scene.LineCheck.from_dict(request.json)
 
     logger.debug(f"pt1: {pts.pt1}")
     logger.debug(f"pt2: {pts.pt2}")
 
-    o3d_scene = o3d.t.geometry.RaycastingScene()
-    o3d_id: dict[str, str] = {}  # o3d id to our id
+    res = _line_check([pts])[0]
 
-    """
-    o3d uses different coordinates, but in this case it should not matter
+    if res.safe:
+        logger.debug("Safe.")
+    else:
+        logger.debug(f"Unsafe, there is collision with {res.object_id}.")
 
-    o3d        x right,   y down, z forward
-    arcor2/ros x forward, y left, z up
-    unity      x Right,   y Up,   z Forward
-    """
-    for obj_id, (model, pose) in collision_objects.items():
-        if isinstance(model, object_type.Box):
-            # The left bottom corner on the front will be placed at (0, 0, 0)
-            sx = model.size_x + inflation
-            sy = model.size_y + inflation
-            sz = model.size_z + inflation
-
-            tm = o3d.geometry.TriangleMesh.create_box(sx, sy, sz)
-
-            tm = tm.translate([pose.position.x - sx / 2, pose.position.y - sy / 2, pose.position.z - sz / 2])
-        elif isinstance(model, object_type.Cylinder):
-            tm = o3d.geometry.TriangleMesh.create_cylinder(model.radius + inflation, model.height + inflation)
-        elif isinstance(model, object_type.Sphere):
-            tm = o3d.geometry.TriangleMesh.create_sphere(model.radius + inflation)
-        else:  # TODO mesh
-            logger.warning(f"Unsupported type of collision model: {model.type()}.")
-            continue
-
-        tm.rotate(quaternion.as_rotation_matrix(pose.orientation.as_quaternion()))
-        tm = o3d.t.geometry.TriangleMesh.from_legacy(tm)
-        o3d_id[o3d_scene.add_triangles(tm)] = obj_id
-
-    dir_vec = np.array([pts.pt2.x - pts.pt1.x, pts.pt2.y - pts.pt1.y, pts.pt2.z - pts.pt1.z])
-    dir_vec = dir_vec / np.linalg.norm(dir_vec)
-
-    logger.debug(f"Direction: {dir_vec}")
-
-    rays = o3d.core.Tensor(
-        [[pts.pt1.x, pts.pt1.y, pts.pt1.z, dir_vec[0], dir_vec[1], dir_vec[2]]],
-        dtype=o3d.core.Dtype.Float32,
-    )
-    ans = o3d_scene.cast_rays(rays)
-    dist_btw_points = math.dist(pts.pt1, pts.pt2)
+    return jsonify(res.to_dict())
 
-    dist_to_hit = float(ans["t_hit"].numpy()[0])
 
-    if dist_to_hit > dist_btw_points:
-        logger.debug(
-            f"Safe. Distance to hit {dist_to_hit:.3f} larger than distance between points {dist_btw_points:.3f}."
-        )
-        return jsonify(scene.LineCheckResult(True).to_dict())
+@app.route("/utils/line-safe/batch", methods=["PUT"])
+def put_line_safe_batch() -> RespT:
+    """Checks whether lines between given points are without collision.
+    ---
+    put:
+        tags:
+            - Utils
+        description: Checks many lines at once, results are in the same order.
+        requestBody:
+              content:
+                application/json:
+                  schema:
+                    type: array
+                    items:
+                      $ref: LineCheck
+        responses:
+            200:
+              description: Ok
+              content:
+                application/json:
+                  schema:
+                    type: array
+                    items:
+                      $ref: LineCheckResult
+            500:
+              description: "Error types: **General**, **SceneGeneral**."
+              content:
+                application/json:
+                  schema:
+                    $ref: WebApiError
+    """
 
-    collision_with = o3d_id[ans["geometry_ids"].numpy()[0]]
+    if not isinstance(request.json, list):
+        raise SceneGeneral("Body should be a JSON array containing LineCheck.")
 
-    logger.debug(f"Unsafe. Distance to hit {dist_to_hit:.3f}, there is collision with {collision_with}.")
-    return jsonify(scene.LineCheckResult(False, collision_with))
+    results = _line_check([scene.LineCheck.from_dict(lc) for lc in request.json])
+    logger.debug(f"Checked {len(results)} lines, {sum(not res.safe for res in results)} unsafe.")
+    return jsonify([res.to_dict() for res in results])
 
 
 @app.route("/system/start", methods=["PUT"])
@@ -511,11 +650,14 @@ def put_stop() -> RespT:
                     $ref: WebApiError
     """
 
-    global started
+    global started, _raycasting_scene
     if started:
         delay()
     started = False
-    collision_objects.clear()
+
+    with _lock:
+        collision_objects.clear()
+        _raycasting_scene = None
     return Response(status=200)
 
 
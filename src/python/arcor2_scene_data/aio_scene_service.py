@@ -6,34 +6,35 @@ from arcor2.data.scene import MeshFocusAction
 from arcor2.helpers import run_in_executor
 from arcor2_scene_data import scene_service
 from arcor2_scene_data.scene_service import SceneServiceException
+from arcor2_web import rest
 
 
 async def upsert_collision(model: Models, pose: Pose) -> None:
-    await run_in_executor(scene_service.upsert_collision, model, pose)
+    await run_in_executor(scene_service.upsert_collision, model, pose, executor=rest.executor)
 
 
 async def delete_collision_id(collision_id: str) -> None:
-    await run_in_executor(scene_service.delete_collision_id, collision_id)
+    await run_in_executor(scene_service.delete_collision_id, collision_id, executor=rest.executor)
 
 
 async def collision_ids() -> set[str]:
-    return await run_in_executor(scene_service.collision_ids)
+    return await run_in_executor(scene_service.collision_ids, executor=rest.executor)
 
 
 async def focus(mfa: MeshFocusAction) -> Pose:
-    return await run_in_executor(scene_service.focus, mfa)
+    return await run_in_executor(scene_service.focus, mfa, executor=rest.executor)
 
 
 async def start() -> None:
-    await run_in_executor(scene_service.start)
+    await run_in_executor(scene_service.start, executor=rest.executor)
 
 
 async def stop() -> None:
-    await run_in_executor(scene_service.stop)
+    await run_in_executor(scene_service.stop, executor=rest.executor)
 
 
 async def started() -> bool:
-    return await run_in_executor(scene_service.started)
+    return await run_in_executor(scene_service.started, executor=rest.executor)
 
 
 async def delete_all_collisions() -> None:
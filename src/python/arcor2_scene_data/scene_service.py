@@ -100,6 +100,16 @@ def line_check(lc: LineCheck) -> LineCheckResult:
     return rest.call(rest.Method.PUT, f"{URL}/utils/line-safe", body=lc, return_type=LineCheckResult)
 
 
+@handle(SceneServiceException, logger, message="Failed to check whether lines are safe.")
+def line_check_batch(lcs: list[LineCheck]) -> list[LineCheckResult]:
+    """This is specific to arcor2 Scene service.
+
+    :param lcs:
+    :return: Results in the same order as lcs.
+    """
+    return rest.call(rest.Method.PUT, f"{URL}/utils/line-safe/batch", body=lcs, list_return_type=LineCheckResult)
+
+
 def delete_all_collisions() -> None:
     for cid in collision_ids():
         delete_collision_id(cid)
@@ -1,9 +1,18 @@
 import os
 
-from arcor2 import package_version
+from arcor2 import env, package_version
 
 STORAGE_PORT = int(os.getenv("ARCOR2_STORAGE_SERVICE_PORT", 10000))
 STORAGE_DB_PATH = os.getenv("ARCOR2_STORAGE_DB_PATH", "/data/arcor2_storage.sqlite")
+# asset files are stored in the 'assets' directory next to the DB by default
+STORAGE_ASSETS_PATH = os.getenv("ARCOR2_STORAGE_ASSETS_PATH")
+STORAGE_DB_POOL_SIZE = env.get_int("ARCOR2_STORAGE_DB_POOL_SIZE", 16)
+# negative value means KiB, see https://www.sqlite.org/pragma.html#pragma_cache_size
+STORAGE_DB_CACHE_SIZE = env.get_int("ARCOR2_STORAGE_DB_CACHE_SIZE", -64 * 1024)
+STORAGE_DB_MMAP_SIZE = env.get_int("ARCOR2_STORAGE_DB_MMAP_SIZE", 256 * 1024 * 1024)
+STORAGE_DB_STATEMENT_CACHE_SIZE = env.get_int("ARCOR2_STORAGE_DB_STATEMENT_CACHE_SIZE", 256)
+# how many last changes are kept for the change feed
+STORAGE_CHANGES_KEEP = env.get_int("ARCOR2_STORAGE_CHANGES_KEEP", 10000)
 STORAGE_SERVICE_NAME = "ARCOR2 Storage Service"
 
 
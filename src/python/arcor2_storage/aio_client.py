@@ -3,16 +3,23 @@ from typing import Any, Awaitable, Callable, TypeVar
 
 from arcor2.helpers import run_in_executor
 from arcor2_storage import client
+from arcor2_web import metrics, rest
 
 StorageClientException = client.StorageClientException
 
 F = TypeVar("F", bound=Callable[..., Any])
 
+_CALL_DURATION = metrics.histogram(
+    "arcor2_storage_call_seconds", "Duration of Storage service calls (incl. waiting for a thread)."
+)
+
 
 def _wrap(func: F) -> Callable[..., Awaitable[Any]]:
     @functools.wraps(func)
     async def inner(*args: Any, **kwargs: Any) -> Any:
-        return await run_in_executor(func, *args, **kwargs)
+        call = functools.update_wrapper(functools.partial(func, *args, **kwargs), func)
+        with _CALL_DURATION.time(call=func.__name__):
+            return await run_in_executor(call, executor=rest.executor)
 
     return inner
 
@@ -20,9 +27,15 @@ def _wrap(func: F) -> Callable[..., Awaitable[Any]]:
 asset_info = _wrap(client.asset_info)
 asset_ids = _wrap(client.asset_ids)
 create_asset = _wrap(client.create_asset)
+create_asset_from_file = _wrap(client.create_asset_from_file)
 delete_asset = _wrap(client.delete_asset)
 asset_exists = _wrap(client.asset_exists)
+asset_digest = _wrap(client.asset_digest)
+assets_exist = _wrap(client.assets_exist)
 get_asset_data = _wrap(client.get_asset_data)
+get_asset_data_to_file = _wrap(client.get_asset_data_to_file)
+
+get_changes = _wrap(client.get_changes)
 
 get_models = _wrap(client.get_models)
 get_mesh = _wrap(client.get_mesh)
@@ -44,6 +57,8 @@ update_project_parameters = _wrap(client.update_project_parameters)
 
 get_projects = _wrap(client.get_projects)
 get_project = _wrap(client.get_project)
+get_projects_batch = _wrap(client.get_projects_batch)
+get_all_projects = _wrap(client.get_all_projects)
 get_project_sources = _wrap(client.get_project_sources)
 update_project = _wrap(client.update_project)
 update_project_sources = _wrap(client.update_project_sources)
@@ -52,5 +67,9 @@ clone_project = _wrap(client.clone_project)
 
 get_scenes = _wrap(client.get_scenes)
 get_scene = _wrap(client.get_scene)
+get_scenes_batch = _wrap(client.get_scenes_batch)
+get_all_scenes = _wrap(client.get_all_scenes)
 update_scene = _wrap(client.update_scene)
 delete_scene = _wrap(client.delete_scene)
+get_project_ids_with_scene = _wrap(client.get_project_ids_with_scene)
+get_project_ids_using_object = _wrap(client.get_project_ids_using_object)
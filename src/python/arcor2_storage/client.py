@@ -1,13 +1,23 @@
+import hashlib
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from io import BytesIO
-from typing import Optional
+from typing import Iterable, Optional
 
 from dataclasses_jsonschema import JsonSchemaMixin
 from dateutil.parser import parse
 
-from arcor2.data.common import IdDesc, Project, ProjectParameter, ProjectSources, Scene, SceneObjectOverride
+from arcor2.data.common import (
+    IdDesc,
+    Project,
+    ProjectParameter,
+    ProjectSources,
+    Scene,
+    SceneObjectOverride,
+    StrEnum,
+    WebApiError,
+)
 from arcor2.data.object_type import MODEL_MAPPING, Mesh, MeshList, MetaModel3d, Model, Model3dType, ObjectType
 from arcor2.exceptions import Arcor2Exception
 from arcor2.exceptions.helpers import handle
@@ -16,6 +26,9 @@ from arcor2_web import rest
 
 URL = os.getenv("ARCOR2_STORAGE_SERVICE_URL", "http://0.0.0.0:10000")
 
+# SHA-256 of the asset content, also used as its ETag
+DIGEST_HEADER = "X-Content-SHA256"
+
 
 @dataclass
 class Asset(JsonSchemaMixin):
@@ -26,6 +39,29 @@ class Asset(JsonSchemaMixin):
     description: Optional[str] = None
 
 
+@dataclass
+class Change(JsonSchemaMixin):
+    """Change of a stored project, scene or object type."""
+
+    class TypeEnum(StrEnum):
+        PROJECT = "Project"
+        SCENE = "Scene"
+        OBJECT_TYPE = "ObjectType"
+
+    seq: int
+    type: TypeEnum
+    id: str
+    deleted: bool = False
+    item: Optional[IdDesc] = None
+
+
+@dataclass
+class Changes(JsonSchemaMixin):
+    last_seq: int
+    changes: list[Change] = field(default_factory=list)
+    reset: bool = False  # some changes since the requested sequence number are not available anymore
+
+
 class StorageClientException(Arcor2Exception):
     pass
 
@@ -50,18 +86,74 @@ def asset_ids() -> set[str]:
 
 @handle(StorageClientException, logger, message="Failed to create the asset.")
 def create_asset(id: str, asset_data: bytes, *, description: str | None = None, upsert: bool = True) -> Asset:
-    if upsert and asset_exists(id):
-        delete_asset(id)
+    params: dict[str, str | None] = {"id": id, "description": description, "upsert": str(upsert).lower()}
+
+    if asset := _link_asset(hashlib.sha256(asset_data).hexdigest(), {**params, "file_name": id}):
+        return asset
 
     return rest.call(
         rest.Method.POST,
         f"{URL}/assets",
-        params={"id": id, "description": description, "upsert": str(upsert).lower()},
+        params=params,
         files={"asset_data": (id, asset_data)},
         return_type=Asset,
     )
 
 
+@handle(StorageClientException, logger, message="Failed to create the asset.")
+def create_asset_from_file(
+    id: str, path: str, *, description: str | None = None, upsert: bool = True, file_name: str | None = None
+) -> Asset:
+    """Uploads a file as an asset.
+
+    The file is streamed in chunks, so its size does not affect memory
+    consumption.
+    """
+
+    params: dict[str, str | None] = {
+        "id": id,
+        "description": description,
+        "upsert": str(upsert).lower(),
+        "file_name": file_name or os.path.basename(path),
+    }
+
+    with open(path, "rb") as file:
+        if asset := _link_asset(hashlib.file_digest(file, "sha256").hexdigest(), params):
+            return asset
+
+        file.seek(0)
+        return rest.upload(rest.Method.POST, f"{URL}/assets", file, params=params, return_type=Asset)
+
+
+def _link_asset(digest: str, params: dict[str, str | None]) -> Asset | None:
+    """Creates the asset without uploading anything if the service already
+    has the same content."""
+
+    try:
+        return rest.call(rest.Method.POST, f"{URL}/assets", params={**params, "digest": digest}, return_type=Asset)
+    except WebApiError as e:
+        if e.type == "NotFound":
+            return None
+        raise
+
+
+@handle(StorageClientException, logger, message="Failed to get asset digest.")
+def asset_digest(id: str) -> str:
+    """Returns SHA-256 (hex) of the asset content."""
+
+    try:
+        return rest.head(f"{URL}/assets/{id}")[DIGEST_HEADER]
+    except KeyError as e:  # e.g. older version of the service
+        raise StorageClientException(f"Response does not contain {DIGEST_HEADER} header.") from e
+
+
+@handle(StorageClientException, logger, message="Failed to check asset existence.")
+def assets_exist(ids: Iterable[str]) -> set[str]:
+    """Returns ids of existing assets out of the given ones."""
+
+    return set(rest.call(rest.Method.POST, f"{URL}/assets/exists", body=list(ids), list_return_type=str))
+
+
 @handle(StorageClientException, logger, message="Failed to delete the asset.")
 def delete_asset(id: str) -> None:
     rest.call(rest.Method.DELETE, f"{URL}/assets/{id}")
@@ -78,6 +170,41 @@ def get_asset_data(id: str) -> bytes:
     return buff.getvalue()
 
 
+@handle(StorageClientException, logger, message="Failed to download asset data.")
+def get_asset_data_to_file(id: str, path: str) -> None:
+    """Saves asset data to a file without holding them in memory."""
+
+    rest.download(f"{URL}/assets/{id}/data", path)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Changes
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+@handle(StorageClientException, logger, message="Failed to get changes.")
+def get_changes(since: None | int = None, timeout: float = 0) -> Changes:
+    """Gets changes of projects, scenes and object types.
+
+    :param since: Sequence number of the last known change. If not given, only the current sequence number is returned.
+    :param timeout: How long to wait (long-poll) for a change if there is none yet.
+    :return:
+    """
+
+    params: dict[str, float] = {"timeout": timeout}
+
+    if since is not None:
+        params["since"] = since
+
+    return rest.call(
+        rest.Method.GET,
+        f"{URL}/changes",
+        params=params,
+        return_type=Changes,
+        timeout=rest.Timeout(read=rest.Timeout().read + timeout),
+    )
+
+
 # ----------------------------------------------------------------------------------------------------------------------
 # Models
 # ----------------------------------------------------------------------------------------------------------------------
@@ -90,7 +217,7 @@ def get_models() -> list[MetaModel3d]:
 
 @handle(StorageClientException, logger, message="Failed to get the mesh.")
 def get_mesh(mesh_id: str) -> Mesh:
-    return rest.call(rest.Method.GET, f"{URL}/models/{mesh_id}/mesh", return_type=Mesh)
+    return rest.call(rest.Method.GET, f"{URL}/models/{mesh_id}/mesh", return_type=Mesh, use_cache=True)
 
 
 @handle(StorageClientException, logger, message="Failed to get list of meshes.")
@@ -104,6 +231,7 @@ def get_model(model_id: str, model_type: Model3dType) -> Model:
         rest.Method.GET,
         f"{URL}/models/{model_id}/{model_type.value.lower()}",
         return_type=MODEL_MAPPING[model_type],
+        use_cache=True,
     )
 
 
@@ -141,7 +269,9 @@ def update_object_parameters(project_id: str, parameters: list[SceneObjectOverri
 
 @handle(StorageClientException, logger, message="Failed to get the object type.")
 def get_object_type(object_type_id: str) -> ObjectType:
-    obj_type = rest.call(rest.Method.GET, f"{URL}/object-types/{object_type_id}", return_type=ObjectType)
+    obj_type = rest.call(
+        rest.Method.GET, f"{URL}/object-types/{object_type_id}", return_type=ObjectType, use_cache=True
+    )
     assert obj_type.modified, f"Project service returned object without 'modified': {obj_type.id}."
     return obj_type
 
@@ -191,7 +321,27 @@ def get_projects() -> list[IdDesc]:
 
 @handle(StorageClientException, logger, message="Failed to get the project.")
 def get_project(project_id: str) -> Project:
-    return rest.call(rest.Method.GET, f"{URL}/projects/{project_id}", return_type=Project)
+    return rest.call(rest.Method.GET, f"{URL}/projects/{project_id}", return_type=Project, use_cache=True)
+
+
+@handle(StorageClientException, logger, message="Failed to get the projects.")
+def get_projects_batch(project_ids: Iterable[str]) -> list[Project]:
+    """Gets projects with given ids in one request.
+
+    Unknown ids are skipped.
+    """
+
+    ids = list(project_ids)
+
+    if not ids:
+        return []
+
+    return rest.call(rest.Method.POST, f"{URL}/projects/batch", body=ids, list_return_type=Project)
+
+
+@handle(StorageClientException, logger, message="Failed to list projects.")
+def get_all_projects() -> list[Project]:
+    return rest.call(rest.Method.GET, f"{URL}/projects", params={"full": True}, list_return_type=Project)
 
 
 @handle(StorageClientException, logger, message="Failed to get the project sources.")
@@ -247,7 +397,49 @@ def get_scenes() -> list[IdDesc]:
 
 @handle(StorageClientException, logger, message="Failed to get the scene.")
 def get_scene(scene_id: str) -> Scene:
-    return rest.call(rest.Method.GET, f"{URL}/scenes/{scene_id}", return_type=Scene)
+    return rest.call(rest.Method.GET, f"{URL}/scenes/{scene_id}", return_type=Scene, use_cache=True)
+
+
+@handle(StorageClientException, logger, message="Failed to get the scenes.")
+def get_scenes_batch(scene_ids: Iterable[str]) -> list[Scene]:
+    """Gets scenes with given ids in one request.
+
+    Unknown ids are skipped.
+    """
+
+    ids = list(scene_ids)
+
+    if not ids:
+        return []
+
+    return rest.call(rest.Method.POST, f"{URL}/scenes/batch", body=ids, list_return_type=Scene)
+
+
+@handle(StorageClientException, logger, message="Failed to list scenes.")
+def get_all_scenes() -> list[Scene]:
+    return rest.call(rest.Method.GET, f"{URL}/scenes", params={"full": True}, list_return_type=Scene)
+
+
+@handle(StorageClientException, logger, message="Failed to get projects of the scene.")
+def get_project_ids_with_scene(scene_id: str) -> set[str]:
+    return set(rest.call(rest.Method.GET, f"{URL}/scenes/{scene_id}/projects", list_return_type=str))
+
+
+@handle(StorageClientException, logger, message="Failed to get projects using the object.")
+def get_project_ids_using_object(
+    scene_id: str, object_id: str, *, as_parent: bool = True, in_actions: bool = True
+) -> set[str]:
+    """Gets ids of projects where the object is a parent of some action
+    point (as_parent) and/or is used by some action (in_actions)."""
+
+    return set(
+        rest.call(
+            rest.Method.GET,
+            f"{URL}/scenes/{scene_id}/objects/{object_id}/projects",
+            params={"as_parent": as_parent, "in_actions": in_actions},
+            list_return_type=str,
+        )
+    )
 
 
 @handle(StorageClientException, logger, message="Failed to add or update the scene.")
@@ -4,10 +4,10 @@ from __future__ import annotations
 
 import argparse
 import copy
+import hashlib
 import mimetypes
 from datetime import datetime, timezone
-from io import BytesIO
-from typing import Callable, Iterable, Type, TypeVar
+from typing import IO, Callable, Iterable, Type, TypeVar
 
 import fastuuid as uuid
 import humps
@@ -15,14 +15,28 @@ from dataclasses_jsonschema import JsonSchemaMixin
 from flask import jsonify, request, send_file
 
 from arcor2.data import common
+from arcor2.data.codec import CodecException, codec
 from arcor2.data.common import IdDesc, Project, ProjectParameter, ProjectSources, Scene, SceneObjectOverride
-from arcor2.data.object_type import Box, Cylinder, Mesh, MetaModel3d, Model, Model3dType, ObjectType, Sphere
+from arcor2.data.object_type import (
+    MODEL_MAPPING,
+    Box,
+    Cylinder,
+    Mesh,
+    MetaModel3d,
+    Model,
+    Model3dType,
+    ObjectType,
+    Sphere,
+)
 from arcor2_storage import STORAGE_DB_PATH, STORAGE_PORT, STORAGE_SERVICE_NAME, version
-from arcor2_storage.client import Asset
+from arcor2_storage.client import DIGEST_HEADER, Asset, Change, Changes
 from arcor2_storage.exceptions import Argument, NotFound, ProjectGeneral, WebApiError
 from arcor2_storage.storage import Database
 from arcor2_web.flask import Response, RespT, create_app, run_app
 
+# upper limit for long-polling, should be lower than a typical client's read timeout
+MAX_CHANGES_TIMEOUT = 60.0
+
 Jsonable = TypeVar("Jsonable", bound=JsonSchemaMixin)
 ParameterType = TypeVar("ParameterType", bound=JsonSchemaMixin)
 ModelType = TypeVar("ModelType", bound=Model)
@@ -35,21 +49,85 @@ def _now() -> datetime:
     return datetime.now(tz=timezone.utc)
 
 
-def _camelized(dc: Jsonable):
-    return jsonify(humps.camelize(dc.to_dict()))
+def _camelized(dc: Jsonable) -> Response:
+    return Response(codec(type(dc)).dumps(dc), mimetype="application/json")
+
+
+def _camelized_list(cls: Type[Jsonable], items: Iterable[Jsonable]) -> Response:
+    return Response(codec(cls).dumps_list(items), mimetype="application/json")
+
+
+def _etag(data: str) -> str:
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+def _conditional(data: str, cls: Type[Jsonable]) -> RespT:
+    """Returns stored document with ETag (and Last-Modified if available).
+
+    If the client already has the current version (If-None-Match), the
+    document is not even parsed and 304 is returned.
+    """
+
+    etag = _etag(data)
+
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        dc = codec(cls, camel=False).loads(data)
+        resp = _camelized(dc)
+        if isinstance(modified := getattr(dc, "modified", None), datetime):
+            resp.last_modified = modified
+
+    resp.set_etag(etag)
+    return resp
+
+
+def _stored_model(model_id: str, model_type: Model3dType) -> str:
+    res = db.get_model_json(model_id)
+
+    if res is None or res[0] != model_type:
+        raise NotFound(f"{model_type.value} {model_id} was not found.")
+
+    return res[1]
 
 
 def _parse_payload(cls: Type[Jsonable], message: str) -> Jsonable:
     if not isinstance(request.json, dict):
         raise ProjectGeneral(message)
 
-    return cls.from_dict(humps.decamelize(request.json))
+    try:
+        return codec(cls).from_dict(request.json, validate=True)
+    except CodecException as e:
+        raise Argument(str(e)) from e
 
 
 def _param(name: str) -> str | None:
     return request.args.get(name) or request.args.get(humps.camelize(name))
 
 
+def _flag(name: str, default: bool = False) -> bool:
+    return (_param(name) or str(default)).lower() == "true"
+
+
+def _parse_ids() -> list[str]:
+    ids = request.get_json(silent=True)
+
+    if not isinstance(ids, list) or not all(isinstance(item, str) for item in ids):
+        raise Argument("Body should be a JSON array of ids.")
+
+    return ids
+
+
+def _new_asset_info(asset_id: str, file_name: str | None, description: str | None, upsert: bool) -> Asset:
+    now = _now()
+    existing = db.get_asset(asset_id)
+    if existing and not upsert:
+        raise Argument(f"Asset {asset_id} already exists.")
+
+    created = existing.info.created if existing else now
+    return Asset(asset_id, created, now, file_name=file_name, description=description)
+
+
 def _touch_project(project_id: str, modified: datetime) -> None:
     project = db.get_project(project_id)
 
@@ -74,6 +152,8 @@ def post_asset() -> RespT:
         tags:
             - Assets
         description: Store asset file with optional id, description, and upsert flag.
+            The file could be sent either as multipart/form-data or directly as the request body
+            (application/octet-stream), which is preferred for large files.
         parameters:
             - name: id
               in: query
@@ -91,8 +171,21 @@ def post_asset() -> RespT:
               required: false
               schema:
                 type: boolean
+            - name: fileName
+              in: query
+              description: File name for application/octet-stream uploads.
+              required: false
+              schema:
+                type: string
+            - name: digest
+              in: query
+              description: SHA-256 (hex) of the content. When set, the asset is created from already stored content
+                with this digest and the request body is not needed.
+              required: false
+              schema:
+                type: string
         requestBody:
-            required: true
+            required: false
             content:
                 multipart/form-data:
                     schema:
@@ -103,6 +196,10 @@ def post_asset() -> RespT:
                                 format: binary
                         required:
                             - assetData
+                application/octet-stream:
+                    schema:
+                        type: string
+                        format: binary
         responses:
             200:
                 description: Stored asset metadata.
@@ -116,32 +213,118 @@ def post_asset() -> RespT:
                     application/json:
                         schema:
                             $ref: WebApiError
+            404:
+                description: "Error type: **NotFound** (there is no content with the given digest)."
+                content:
+                    application/json:
+                        schema:
+                            $ref: WebApiError
     """
     asset_id = request.args.get("id") or request.args.get("ID") or uuid.uuid4().hex
     description = request.args.get("description")
     upsert = request.args.get("upsert", "true").lower() == "true"
+    digest = _param("digest")
 
-    file_storage = request.files.get("assetData")
-    if not file_storage:
-        raise Argument("Body should contain assetData.")
+    if digest:
+        asset_info = _new_asset_info(asset_id, _param("file_name"), description, upsert)
 
-    buff = BytesIO()
-    file_storage.save(buff)
-    buff.seek(0)
+        if db.link_asset(asset_info, digest) is None:
+            raise NotFound(f"Content {digest} was not found.")
 
-    now = _now()
-    existing = db.get_asset(asset_id)
-    if existing and not upsert:
-        raise Argument(f"Asset {asset_id} already exists.")
+        return _camelized(asset_info)
 
-    created = existing.info.created if existing else now
-    asset_info = Asset(asset_id, created, now, file_name=file_storage.filename, description=description)
+    if request.mimetype == "application/octet-stream":
+        # the body is read in chunks directly from the socket
+        stream: IO[bytes] = request.stream
+        file_name = _param("file_name")
+    else:
+        # larger multipart files are spooled to a temporary file by werkzeug
+        file_storage = request.files.get("assetData")
+        if not file_storage:
+            raise Argument("Body should contain assetData.")
+        stream = file_storage.stream
+        file_name = file_storage.filename
 
-    db.save_asset(asset_info, buff.getvalue(), replace=True)
+    asset_info = _new_asset_info(asset_id, file_name, description, upsert)
+    db.save_asset(asset_info, stream, replace=True)
 
     return _camelized(asset_info)
 
 
+@app.route("/assets/<string:asset_id>", methods=["HEAD"])
+def head_asset(asset_id: str) -> RespT:
+    """Get digest of the asset content.
+    ---
+    head:
+        tags:
+            - Assets
+        parameters:
+            - name: asset_id
+              in: path
+              required: true
+              schema:
+                type: string
+        responses:
+            200:
+                description: Asset exists, its SHA-256 (hex) is in the ETag and X-Content-SHA256 headers.
+                headers:
+                    ETag:
+                        schema:
+                            type: string
+                    X-Content-SHA256:
+                        schema:
+                            type: string
+            404:
+                description: Asset not found.
+    """
+    asset = db.get_asset(asset_id)
+
+    if asset is None:
+        raise NotFound("Asset not found.")
+
+    resp = Response(status=200)
+    resp.set_etag(asset.digest)
+    resp.headers[DIGEST_HEADER] = asset.digest
+    resp.last_modified = asset.info.modified
+    return resp
+
+
+@app.route("/assets/exists", methods=["POST"])
+def post_assets_exist() -> RespT:
+    """Check existence of multiple assets at once.
+    ---
+    post:
+        tags:
+            - Assets
+        requestBody:
+            required: true
+            content:
+                application/json:
+                    schema:
+                        type: array
+                        items:
+                            type: string
+        responses:
+            200:
+                description: Ids of existing assets out of the given ones.
+                content:
+                    application/json:
+                        schema:
+                            type: array
+                            items:
+                                type: string
+            400:
+                description: "Error type: **Argument**."
+                content:
+                    application/json:
+                        schema:
+                            $ref: WebApiError
+    """
+    asset_ids = _parse_ids()
+    existing = db.asset_digests(asset_ids)
+    return jsonify([asset_id for asset_id in asset_ids if asset_id in existing])
+
+
 @app.route("/assets/info", methods=["GET"])
 def get_assets() -> RespT:
     """List asset metadata.
@@ -166,7 +349,7 @@ def get_assets() -> RespT:
                             $ref: WebApiError
     """
     infos = db.list_asset_info()
-    return jsonify([humps.camelize(info.to_dict()) for info in infos])
+    return _camelized_list(Asset, infos)
 
 
 @app.route("/assets/<string:asset_id>/exists", methods=["GET"])
@@ -229,6 +412,7 @@ def get_asset_data(asset_id: str) -> RespT:
     get:
         tags:
             - Assets
+        description: The content is streamed from a file. Range requests and conditional requests are supported.
         parameters:
             - name: asset_id
               in: path
@@ -243,6 +427,15 @@ def get_asset_data(asset_id: str) -> RespT:
                         schema:
                             type: string
                             format: binary
+            206:
+                description: Requested range of the asset content.
+                content:
+                    application/octet-stream:
+                        schema:
+                            type: string
+                            format: binary
+            304:
+                description: Not modified.
             404:
                 description: "Error type: **NotFound**."
                 content:
@@ -257,29 +450,87 @@ def get_asset_data(asset_id: str) -> RespT:
 
     content_type, _ = mimetypes.guess_type(asset.info.file_name or "")
 
-    buff = BytesIO(asset.data)
-    buff.seek(0)
-
     return send_file(
-        buff,
+        asset.path,
         download_name=asset.info.file_name or asset.info.id,
         mimetype=content_type or "application/octet-stream",
         as_attachment=True,
+        conditional=True,
+        etag=asset.digest,
+        last_modified=asset.info.modified,
     )
 
 
+# ----------------------------------------------------------------------------------------------------------------------
+# Changes
+
+
+@app.route("/changes", methods=["GET"])
+def get_changes() -> RespT:
+    """Get changes of projects, scenes and object types.
+    ---
+    get:
+        tags:
+            - Changes
+        description: Each change of a project, scene or object type gets a monotonically increasing sequence number.
+            Without 'since', just the current sequence number is returned. With 'timeout', the request
+            waits (long-poll) until there is at least one change or the timeout elapses.
+            When 'reset' is true, the requested changes are not available anymore and the client should drop
+            any cached data.
+        parameters:
+            - name: since
+              in: query
+              description: Sequence number of the last known change.
+              required: false
+              schema:
+                type: integer
+            - name: timeout
+              in: query
+              description: Max. time to wait for a change (seconds).
+              required: false
+              schema:
+                type: number
+                default: 0
+        responses:
+            200:
+                description: Changes.
+                content:
+                    application/json:
+                        schema:
+                            $ref: Changes
+            400:
+                description: "Error type: **Argument**."
+                content:
+                    application/json:
+                        schema:
+                            $ref: WebApiError
+    """
+    since_arg = _param("since")
+
+    try:
+        since = None if since_arg is None else int(since_arg)
+        timeout = min(max(float(_param("timeout") or 0), 0), MAX_CHANGES_TIMEOUT)
+    except ValueError as e:
+        raise Argument("Invalid since or timeout.") from e
+
+    if since is None or not timeout:
+        return _camelized(db.get_changes(since))
+
+    return _camelized(db.wait_for_changes(since, timeout))
+
+
 # ----------------------------------------------------------------------------------------------------------------------
 # Projects
 
 
-def _id_desc(values: Iterable[common.JsonSchemaMixin]) -> list[dict]:
-    ret: list[dict] = []
+def _id_desc(values: Iterable[common.JsonSchemaMixin]) -> Response:
+    ret: list[IdDesc] = []
     for item in values:
         assert isinstance(item, (Project, Scene, ObjectType))
         assert item.created
         assert item.modified
-        ret.append(humps.camelize(IdDesc(item.id, item.name, item.created, item.modified, item.description).to_dict()))
-    return ret
+        ret.append(IdDesc(item.id, item.name, item.created, item.modified, item.description))
+    return _camelized_list(IdDesc, ret)
 
 
 @app.route("/projects", methods=["PUT"])
@@ -406,6 +657,11 @@ def get_project(project_id: str) -> RespT:
               required: true
               schema:
                 type: string
+            - name: If-None-Match
+              in: header
+              required: false
+              schema:
+                type: string
         responses:
             200:
                 description: Project.
@@ -413,6 +669,8 @@ def get_project(project_id: str) -> RespT:
                     application/json:
                         schema:
                             $ref: Project
+            304:
+                description: Not modified (ETag matches).
             404:
                 description: "Error type: **NotFound**."
                 content:
@@ -420,12 +678,12 @@ def get_project(project_id: str) -> RespT:
                         schema:
                             $ref: WebApiError
     """
-    project = db.get_project(project_id)
+    project = db.get_project_json(project_id)
 
     if project is None:
         raise NotFound(f"Project {project_id} was not found.")
 
-    return _camelized(project)
+    return _conditional(project, Project)
 
 
 @app.route("/projects/<string:project_id>", methods=["DELETE"])
@@ -464,17 +722,65 @@ def get_projects() -> RespT:
     get:
         tags:
             - Projects
+        parameters:
+            - name: full
+              in: query
+              description: Return whole projects instead of summaries.
+              required: false
+              schema:
+                type: boolean
+        responses:
+            200:
+                description: Project summaries (or projects).
+                content:
+                    application/json:
+                        schema:
+                            oneOf:
+                                - type: array
+                                  items:
+                                    $ref: "#/components/schemas/IdDesc"
+                                - type: array
+                                  items:
+                                    $ref: "#/components/schemas/Project"
+    """
+    if _flag("full"):
+        return _camelized_list(Project, db.list_projects())
+
+    return _id_desc(db.list_projects())
+
+
+@app.route("/projects/batch", methods=["POST"])
+def get_projects_batch() -> RespT:
+    """Get multiple projects at once.
+    ---
+    post:
+        tags:
+            - Projects
+        requestBody:
+            required: true
+            content:
+                application/json:
+                    schema:
+                        type: array
+                        items:
+                            type: string
         responses:
             200:
-                description: Project summaries.
+                description: Projects with given ids. Unknown ids are skipped.
                 content:
                     application/json:
                         schema:
                             type: array
                             items:
-                                $ref: IdDesc
+                                $ref: Project
+            400:
+                description: "Error type: **Argument**."
+                content:
+                    application/json:
+                        schema:
+                            $ref: WebApiError
     """
-    return jsonify(_id_desc(db.list_projects()))
+    return _camelized_list(Project, db.get_projects(_parse_ids()))
 
 
 @app.route("/projects/clone", methods=["PUT"])
@@ -793,6 +1099,11 @@ def get_scene(scene_id: str) -> RespT:
               required: true
               schema:
                 type: string
+            - name: If-None-Match
+              in: header
+              required: false
+              schema:
+                type: string
         responses:
             200:
                 description: Scene.
@@ -800,6 +1111,8 @@ def get_scene(scene_id: str) -> RespT:
                     application/json:
                         schema:
                             $ref: Scene
+            304:
+                description: Not modified (ETag matches).
             404:
                 description: "Error type: **NotFound**."
                 content:
@@ -807,12 +1120,12 @@ def get_scene(scene_id: str) -> RespT:
                         schema:
                             $ref: WebApiError
     """
-    scene = db.get_scene(scene_id)
+    scene = db.get_scene_json(scene_id)
 
     if scene is None:
         raise NotFound(f"Scene {scene_id} was not found.")
 
-    return _camelized(scene)
+    return _conditional(scene, Scene)
 
 
 @app.route("/scenes/<string:scene_id>", methods=["DELETE"])
@@ -851,17 +1164,142 @@ def get_scenes() -> RespT:
     get:
         tags:
             - Scenes
+        parameters:
+            - name: full
+              in: query
+              description: Return whole scenes instead of summaries.
+              required: false
+              schema:
+                type: boolean
         responses:
             200:
-                description: Scene summaries.
+                description: Scene summaries (or scenes).
+                content:
+                    application/json:
+                        schema:
+                            oneOf:
+                                - type: array
+                                  items:
+                                    $ref: "#/components/schemas/IdDesc"
+                                - type: array
+                                  items:
+                                    $ref: "#/components/schemas/Scene"
+    """
+    if _flag("full"):
+        return _camelized_list(Scene, db.list_scenes())
+
+    return _id_desc(db.list_scenes())
+
+
+@app.route("/scenes/batch", methods=["POST"])
+def get_scenes_batch() -> RespT:
+    """Get multiple scenes at once.
+    ---
+    post:
+        tags:
+            - Scenes
+        requestBody:
+            required: true
+            content:
+                application/json:
+                    schema:
+                        type: array
+                        items:
+                            type: string
+        responses:
+            200:
+                description: Scenes with given ids. Unknown ids are skipped.
                 content:
                     application/json:
                         schema:
                             type: array
                             items:
-                                $ref: IdDesc
+                                $ref: Scene
+            400:
+                description: "Error type: **Argument**."
+                content:
+                    application/json:
+                        schema:
+                            $ref: WebApiError
+    """
+    return _camelized_list(Scene, db.get_scenes(_parse_ids()))
+
+
+@app.route("/scenes/<string:scene_id>/projects", methods=["GET"])
+def get_scene_projects(scene_id: str) -> RespT:
+    """Get ids of projects using the scene.
+    ---
+    get:
+        tags:
+            - Scenes
+        parameters:
+            - name: scene_id
+              in: path
+              required: true
+              schema:
+                type: string
+        responses:
+            200:
+                description: Ids of projects (empty for unknown scene).
+                content:
+                    application/json:
+                        schema:
+                            type: array
+                            items:
+                                type: string
     """
-    return jsonify(_id_desc(db.list_scenes()))
+    return jsonify(sorted(db.project_ids_with_scene(scene_id)))
+
+
+@app.route("/scenes/<string:scene_id>/objects/<string:object_id>/projects", methods=["GET"])
+def get_object_projects(scene_id: str, object_id: str) -> RespT:
+    """Get ids of projects (of the scene) referencing the scene object.
+    ---
+    get:
+        tags:
+            - Scenes
+        parameters:
+            - name: scene_id
+              in: path
+              required: true
+              schema:
+                type: string
+            - name: object_id
+              in: path
+              required: true
+              schema:
+                type: string
+            - name: as_parent
+              in: query
+              description: Projects where the object is a parent of some action point.
+              required: false
+              schema:
+                type: boolean
+                default: true
+            - name: in_actions
+              in: query
+              description: Projects where the object is used by some action.
+              required: false
+              schema:
+                type: boolean
+                default: true
+        responses:
+            200:
+                description: Ids of projects.
+                content:
+                    application/json:
+                        schema:
+                            type: array
+                            items:
+                                type: string
+    """
+    return jsonify(
+        sorted(
+            db.project_ids_using_object(
+                scene_id, object_id, as_parent=_flag("as_parent", True), in_actions=_flag("in_actions", True)
+            )
+        )
+    )
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -915,6 +1353,11 @@ def get_object_type(obj_type_id: str) -> RespT:
               required: true
               schema:
                 type: string
+            - name: If-None-Match
+              in: header
+              required: false
+              schema:
+                type: string
         responses:
             200:
                 description: Object type.
@@ -922,6 +1365,8 @@ def get_object_type(obj_type_id: str) -> RespT:
                     application/json:
                         schema:
                             $ref: ObjectType
+            304:
+                description: Not modified (ETag matches).
             404:
                 description: "Error type: **NotFound**."
                 content:
@@ -929,12 +1374,12 @@ def get_object_type(obj_type_id: str) -> RespT:
                         schema:
                             $ref: WebApiError
     """
-    obj_type = db.get_object_type(obj_type_id)
+    obj_type = db.get_object_type_json(obj_type_id)
 
     if obj_type is None:
         raise NotFound(f"ObjectType {obj_type_id} was not found.")
 
-    return _camelized(obj_type)
+    return _conditional(obj_type, ObjectType)
 
 
 @app.route("/object-types/<string:obj_type_id>", methods=["DELETE"])
@@ -983,7 +1428,7 @@ def get_object_types() -> RespT:
                             items:
                                 $ref: IdDesc
     """
-    return jsonify(_id_desc(db.list_object_types()))
+    return _id_desc(db.list_object_types())
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -994,7 +1439,10 @@ def _model_from_request(model_cls: Type[ModelType]) -> ModelType:
     if not isinstance(request.json, dict):
         raise ProjectGeneral("Body should be a JSON dict containing model.")
 
-    return model_cls.from_dict(humps.decamelize(request.json))
+    try:
+        return codec(model_cls).from_dict(request.json, validate=True)
+    except CodecException as e:
+        raise Argument(str(e)) from e
 
 
 @app.route("/models", methods=["GET"])
@@ -1037,6 +1485,11 @@ def get_model(model_id: str, model_type: str) -> RespT:
               schema:
                 type: string
                 enum: [box, cylinder, sphere, mesh]
+            - name: If-None-Match
+              in: header
+              required: false
+              schema:
+                type: string
         responses:
             200:
                 description: Model instance.
@@ -1048,6 +1501,8 @@ def get_model(model_id: str, model_type: str) -> RespT:
                                 - $ref: "#/components/schemas/Cylinder"
                                 - $ref: "#/components/schemas/Sphere"
                                 - $ref: "#/components/schemas/Mesh"
+            304:
+                description: Not modified (ETag matches).
             404:
                 description: "Error type: **NotFound**."
                 content:
@@ -1055,7 +1510,7 @@ def get_model(model_id: str, model_type: str) -> RespT:
                         schema:
                             $ref: WebApiError
     """
-    model = db.get_model(model_id)
+    model = db.get_model_json(model_id)
 
     if model is None:
         raise NotFound(f"Model {model_id} was not found.")
@@ -1065,10 +1520,12 @@ def get_model(model_id: str, model_type: str) -> RespT:
     except ValueError as e:
         raise NotFound(f"Model type {model_type} is not supported.") from e
 
-    if model.type() != expected_type:
+    stored_type, data = model
+
+    if stored_type != expected_type:
         raise NotFound(f"Model {model_id} is not of type {expected_type.name}.")
 
-    return _camelized(model)
+    return _conditional(data, MODEL_MAPPING[stored_type])
 
 
 @app.route("/models/meshes", methods=["GET"])
@@ -1088,7 +1545,7 @@ def get_meshes() -> RespT:
                             items:
                                 $ref: Mesh
     """
-    return jsonify([humps.camelize(mesh.to_dict()) for mesh in db.list_meshes()])
+    return _camelized_list(Mesh, db.list_meshes())
 
 
 @app.route("/models/<string:model_id>", methods=["DELETE"])
@@ -1155,6 +1612,11 @@ def get_box(model_id: str) -> RespT:
               required: true
               schema:
                 type: string
+            - name: If-None-Match
+              in: header
+              required: false
+              schema:
+                type: string
         responses:
             200:
                 description: Box model.
@@ -1162,6 +1624,8 @@ def get_box(model_id: str) -> RespT:
                     application/json:
                         schema:
                             $ref: Box
+            304:
+                description: Not modified (ETag matches).
             404:
                 description: "Error type: **NotFound**."
                 content:
@@ -1169,12 +1633,7 @@ def get_box(model_id: str) -> RespT:
                         schema:
                             $ref: WebApiError
     """
-    model = db.get_model(model_id)
-
-    if model is None or not isinstance(model, Box):
-        raise NotFound(f"Box {model_id} was not found.")
-
-    return _camelized(model)
+    return _conditional(_stored_model(model_id, Model3dType.BOX), Box)
 
 
 @app.route("/models/cylinder", methods=["PUT"])
@@ -1212,6 +1671,11 @@ def get_cylinder(model_id: str) -> RespT:
               required: true
               schema:
                 type: string
+            - name: If-None-Match
+              in: header
+              required: false
+              schema:
+                type: string
         responses:
             200:
                 description: Cylinder model.
@@ -1219,6 +1683,8 @@ def get_cylinder(model_id: str) -> RespT:
                     application/json:
                         schema:
                             $ref: Cylinder
+            304:
+                description: Not modified (ETag matches).
             404:
                 description: "Error type: **NotFound**."
                 content:
@@ -1226,12 +1692,7 @@ def get_cylinder(model_id: str) -> RespT:
                         schema:
                             $ref: WebApiError
     """
-    model = db.get_model(model_id)
-
-    if model is None or not isinstance(model, Cylinder):
-        raise NotFound(f"Cylinder {model_id} was not found.")
-
-    return _camelized(model)
+    return _conditional(_stored_model(model_id, Model3dType.CYLINDER), Cylinder)
 
 
 @app.route("/models/sphere", methods=["PUT"])
@@ -1269,6 +1730,11 @@ def get_sphere(model_id: str) -> RespT:
               required: true
               schema:
                 type: string
+            - name: If-None-Match
+              in: header
+              required: false
+              schema:
+                type: string
         responses:
             200:
                 description: Sphere model.
@@ -1276,6 +1742,8 @@ def get_sphere(model_id: str) -> RespT:
                     application/json:
                         schema:
                             $ref: Sphere
+            304:
+                description: Not modified (ETag matches).
             404:
                 description: "Error type: **NotFound**."
                 content:
@@ -1283,12 +1751,7 @@ def get_sphere(model_id: str) -> RespT:
                         schema:
                             $ref: WebApiError
     """
-    model = db.get_model(model_id)
-
-    if model is None or not isinstance(model, Sphere):
-        raise NotFound(f"Sphere {model_id} was not found.")
-
-    return _camelized(model)
+    return _conditional(_stored_model(model_id, Model3dType.SPHERE), Sphere)
 
 
 @app.route("/models/mesh", methods=["PUT"])
@@ -1326,6 +1789,11 @@ def get_mesh(model_id: str) -> RespT:
               required: true
               schema:
                 type: string
+            - name: If-None-Match
+              in: header
+              required: false
+              schema:
+                type: string
         responses:
             200:
                 description: Mesh model.
@@ -1333,6 +1801,8 @@ def get_mesh(model_id: str) -> RespT:
                     application/json:
                         schema:
                             $ref: Mesh
+            304:
+                description: Not modified (ETag matches).
             404:
                 description: "Error type: **NotFound**."
                 content:
@@ -1340,12 +1810,7 @@ def get_mesh(model_id: str) -> RespT:
                         schema:
                             $ref: WebApiError
     """
-    model = db.get_model(model_id)
-
-    if model is None or not isinstance(model, Mesh):
-        raise NotFound(f"Mesh {model_id} was not found.")
-
-    return _camelized(model)
+    return _conditional(_stored_model(model_id, Model3dType.MESH), Mesh)
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -1363,6 +1828,8 @@ def main() -> None:
         STORAGE_PORT,
         [
             Asset,
+            Change,
+            Changes,
             common.Project,
             common.ProjectSources,
             common.Scene,
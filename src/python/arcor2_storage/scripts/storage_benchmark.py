@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+"""Compares throughput of Database queries with per-call connections (the
+original behaviour) and with pooled connections."""
+
+import argparse
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+from arcor2.data.common import ActionPoint, Position, Project, Scene, SceneObject
+from arcor2_storage.storage import Database
+
+
+class UnpooledDatabase(Database):
+    """Opens a new connection for each query, as the service used to do."""
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def _populate(db: Database, count: int, aps: int) -> None:
+    for idx in range(count):
+        scene = Scene(f"scene_{idx}", id=f"scn_{idx}")
+        scene.objects.extend(SceneObject(f"obj_{o}", "Box", id=f"obj_{idx}_{o}") for o in range(10))
+        db.save_scene(scene)
+
+        project = Project(f"project_{idx}", scene.id, id=f"pro_{idx}")
+        project.action_points.extend(ActionPoint(f"ap_{a}", Position(a, a, a), id=f"acp_{idx}_{a}") for a in range(aps))
+        db.save_project(project)
+
+
+def _measure(name: str, func: Callable[[int], object], count: int, iterations: int) -> None:
+    start = time.monotonic()
+    for it in range(iterations):
+        func(it % count)
+    end = time.monotonic()
+
+    print(f"{name}: {iterations / (end - start):.0f} ops/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Storage database benchmark.")
+    parser.add_argument("-c", "--count", type=int, default=100, help="Number of projects/scenes.")
+    parser.add_argument("-a", "--action-points", type=int, default=20, help="Number of APs per project.")
+    parser.add_argument("-i", "--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for db_cls in (UnpooledDatabase, Database):
+            db = db_cls(str(Path(tmp_dir) / f"{db_cls.__name__}.sqlite"))
+            _populate(db, args.count, args.action_points)
+
+            print(db_cls.__name__)
+            _measure("  get_project", lambda idx: db.get_project(f"pro_{idx}"), args.count, args.iterations)
+            _measure("  get_scene", lambda idx: db.get_scene(f"scn_{idx}"), args.count, args.iterations)
+            _measure("  asset_exists", lambda idx: db.asset_exists(f"ast_{idx}"), args.count, args.iterations)
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,171 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import queue
 import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
+from io import BytesIO
 from pathlib import Path
-from typing import Iterable, Type, TypeVar, cast
+from typing import IO, Iterable, Iterator, Protocol, Type, TypeVar, cast
 
 from dataclasses_jsonschema import JsonSchemaMixin
 
-from arcor2.data.common import Project, ProjectParameter, ProjectSources, Scene, SceneObjectOverride
+from arcor2.data.codec import codec
+from arcor2.data.common import IdDesc, Project, ProjectParameter, ProjectSources, Scene, SceneObjectOverride, StrEnum
 from arcor2.data.object_type import MODEL_MAPPING, Mesh, Model3dType, Models, ObjectType
-from arcor2_storage.client import Asset
+from arcor2.exceptions import Arcor2Exception
+from arcor2_storage import (
+    STORAGE_ASSETS_PATH,
+    STORAGE_CHANGES_KEEP,
+    STORAGE_DB_CACHE_SIZE,
+    STORAGE_DB_MMAP_SIZE,
+    STORAGE_DB_POOL_SIZE,
+    STORAGE_DB_STATEMENT_CACHE_SIZE,
+)
+from arcor2_storage.client import Asset, Change, Changes
 
 DataClass = TypeVar("DataClass", bound=JsonSchemaMixin)
 
+_ASSETS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    id TEXT PRIMARY KEY,
+    info_json TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assets_digest ON assets (digest);
+"""
+
+# denormalized references from projects, updated together with the project
+_PROJECT_REFS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS project_refs (
+    project_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    ref_id TEXT NOT NULL,
+    PRIMARY KEY (project_id, kind, ref_id)
+);
+CREATE INDEX IF NOT EXISTS project_refs_ref ON project_refs (ref_id, kind);
+"""
+
+# stays safely below SQLITE_MAX_VARIABLE_NUMBER of older SQLite versions (999)
+_BATCH_SIZE = 500
+
+# asset data are copied in chunks of this size
+_CHUNK_SIZE = 1024 * 1024
+_TMP_PREFIX = ".upload-"
+
+
+class RefKind(StrEnum):
+    SCENE = "scene"  # scene of the project
+    PARENT = "parent"  # parent of an action point
+    ACTION_OBJECT = "action_object"  # object used by an action
+
+
+class _Readable(Protocol):
+    def read(self, size: int = -1, /) -> bytes: ...
+
 
 @dataclass
 class StoredAsset:
     info: Asset
-    data: bytes
+    digest: str  # SHA-256 of the content
+    size: int
+    path: Path
 
 
 def _dump(dc: JsonSchemaMixin) -> str:
-    return dc.to_json()
+    return codec(type(dc), camel=False).dumps(dc).decode()
 
 
 def _load(data: str, cls: Type[DataClass]) -> DataClass:
-    return cls.from_json(data)
+    # stored data were validated when received by the service
+    return codec(cls, camel=False).loads(data)
+
+
+def _project_refs(project: Project) -> set[tuple[RefKind, str]]:
+    refs = {(RefKind.SCENE, project.scene_id)}
+
+    for ap in project.action_points:
+        if ap.parent:
+            refs.add((RefKind.PARENT, ap.parent))
+
+        for action in ap.actions:
+            try:
+                refs.add((RefKind.ACTION_OBJECT, action.parse_type().obj_id))
+            except Arcor2Exception:
+                continue
+
+    return refs
+
+
+def _id_desc(item: Project | Scene | ObjectType) -> IdDesc | None:
+    if item.created is None or item.modified is None:
+        return None
+    return IdDesc(item.id, item.name, item.created, item.modified, item.description)
 
 
 class Database:
-    def __init__(self, path: str):
+    """SQLite persistence of the Storage service.
+
+    Connections are long-lived and kept in a pool - a request thread
+    borrows one for the duration of a query (or a transaction) and then
+    returns it. Thanks to that, the per-connection cache of prepared
+    statements and SQLite page cache survive between requests.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        pool_size: int = STORAGE_DB_POOL_SIZE,
+        cache_size: int = STORAGE_DB_CACHE_SIZE,
+        mmap_size: int = STORAGE_DB_MMAP_SIZE,
+        cached_statements: int = STORAGE_DB_STATEMENT_CACHE_SIZE,
+        changes_keep: int = STORAGE_CHANGES_KEEP,
+        assets_path: str | None = STORAGE_ASSETS_PATH,
+    ):
         self.path = path
+        self.assets_path = Path(assets_path) if assets_path else Path(path).parent / "assets"
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.cached_statements = cached_statements
+        self.changes_keep = changes_keep
+
+        # serializes placing/removing of asset files with respect to rows referencing them
+        self._assets_lock = threading.Lock()
+
+        # incremented (and waiters notified) after each committed change
+        self._changes_cond = threading.Condition()
+        self._changes_counter = 0
+
+        # LIFO - recently used connections (with warm caches) are preferred
+        self._pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=pool_size)
+
         Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.assets_path.mkdir(parents=True, exist_ok=True)
+
+        # leftovers of interrupted uploads
+        for tmp_file in self.assets_path.glob(f"{_TMP_PREFIX}*"):
+            tmp_file.unlink(missing_ok=True)
+
         self._init_db()
 
+    def close(self) -> None:
+        """Closes all idle connections."""
+
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
     # ------------------------------------------------------------------ assets
 
     def list_asset_info(self) -> list[Asset]:
@@ -43,39 +173,142 @@ class Database:
             rows = conn.execute("SELECT info_json FROM assets").fetchall()
         return [_load(row["info_json"], Asset) for row in rows]
 
-    def save_asset(self, asset: Asset, data: bytes, *, replace: bool = True) -> None:
-        with self._connect() as conn:
-            if not replace and self.asset_exists(asset.id, conn):
-                raise ValueError(f"Asset {asset.id} already exists.")
+    def asset_path(self, digest: str) -> Path:
+        return self.assets_path / digest[:2] / digest
 
-            conn.execute(
-                "INSERT INTO assets (id, info_json, data) VALUES (?, ?, ?) "
-                "ON CONFLICT(id) DO UPDATE SET info_json=excluded.info_json, data=excluded.data",
-                (asset.id, _dump(asset), data),
-            )
+    def save_asset(self, asset: Asset, data: bytes | IO[bytes], *, replace: bool = True) -> StoredAsset:
+        """Stores asset data into a file named by SHA-256 of the content.
+
+        The data are copied in chunks, so large assets are never fully
+        loaded into memory. Identical content is stored just once.
+        """
+
+        if isinstance(data, bytes):
+            data = BytesIO(data)
+
+        tmp_path, digest, size = self._receive(data)
 
-    def asset_exists(self, asset_id: str, conn: sqlite3.Connection | None = None) -> bool:
-        own_conn = conn is None
-        connection = conn or self._connect()
         try:
-            return connection.execute("SELECT 1 FROM assets WHERE id=?", (asset_id,)).fetchone() is not None
+            with self._assets_lock:
+                self._place(tmp_path, digest)
+                try:
+                    return self._insert_asset(asset, digest, size, replace)
+                except ValueError:
+                    self._remove_unreferenced(digest)
+                    raise
         finally:
-            if own_conn:
-                connection.close()
+            tmp_path.unlink(missing_ok=True)
+
+    def link_asset(self, asset: Asset, digest: str, *, replace: bool = True) -> StoredAsset | None:
+        """Stores asset with content that is already stored (under another or
+        the same id).
+
+        Returns None if there is no content with the given digest.
+        """
+
+        with self._assets_lock:
+            with self._connect() as conn:
+                row = conn.execute("SELECT size FROM assets WHERE digest=? LIMIT 1", (digest,)).fetchone()
+
+            if row is None:
+                return None
+
+            return self._insert_asset(asset, digest, row["size"], replace)
+
+    def asset_digests(self, asset_ids: Iterable[str]) -> dict[str, str]:
+        """Returns digests of existing assets out of the given ids."""
+
+        with self._connect() as conn:
+            rows = self._select_many(conn, "SELECT id, digest FROM assets WHERE id IN ({})", asset_ids)
+        return {row["id"]: row["digest"] for row in rows}
+
+    def asset_exists(self, asset_id: str) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM assets WHERE id=?", (asset_id,)).fetchone() is not None
 
     def get_asset(self, asset_id: str) -> StoredAsset | None:
         with self._connect() as conn:
-            row = conn.execute("SELECT info_json, data FROM assets WHERE id=?", (asset_id,)).fetchone()
+            row = conn.execute("SELECT info_json, digest, size FROM assets WHERE id=?", (asset_id,)).fetchone()
 
         if row is None:
             return None
 
-        return StoredAsset(_load(row["info_json"], Asset), cast(bytes, row["data"]))
+        return StoredAsset(_load(row["info_json"], Asset), row["digest"], row["size"], self.asset_path(row["digest"]))
 
     def delete_asset(self, asset_id: str) -> bool:
+        with self._assets_lock:
+            with self._connect() as conn:
+                row = conn.execute("SELECT digest FROM assets WHERE id=?", (asset_id,)).fetchone()
+                if row is None:
+                    return False
+                conn.execute("DELETE FROM assets WHERE id=?", (asset_id,))
+
+            self._remove_unreferenced(row["digest"])
+
+        return True
+
+    def _insert_asset(self, asset: Asset, digest: str, size: int, replace: bool) -> StoredAsset:
+        """Has to be called with _assets_lock held and the content already in
+        place."""
+
         with self._connect() as conn:
-            cur = conn.execute("DELETE FROM assets WHERE id=?", (asset_id,))
-            return cur.rowcount > 0
+            row = conn.execute("SELECT digest FROM assets WHERE id=?", (asset.id,)).fetchone()
+
+            if row is not None and not replace:
+                raise ValueError(f"Asset {asset.id} already exists.")
+
+            conn.execute(
+                "INSERT INTO assets (id, info_json, digest, size) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET info_json=excluded.info_json, digest=excluded.digest, "
+                "size=excluded.size",
+                (asset.id, _dump(asset), digest, size),
+            )
+
+        if row is not None and row["digest"] != digest:
+            self._remove_unreferenced(row["digest"])
+
+        return StoredAsset(asset, digest, size, self.asset_path(digest))
+
+    def _receive(self, data: _Readable) -> tuple[Path, str, int]:
+        """Copies data into a temporary file, computes its digest and
+        size."""
+
+        sha = hashlib.sha256()
+        size = 0
+
+        with tempfile.NamedTemporaryFile(dir=self.assets_path, prefix=_TMP_PREFIX, delete=False) as file:
+            try:
+                while chunk := data.read(_CHUNK_SIZE):
+                    sha.update(chunk)
+                    file.write(chunk)
+                    size += len(chunk)
+            except BaseException:
+                file.close()
+                os.unlink(file.name)
+                raise
+
+        return Path(file.name), sha.hexdigest(), size
+
+    def _place(self, tmp_path: Path, digest: str) -> None:
+        """Moves received file under its digest (if not already there).
+
+        Has to be called with _assets_lock held.
+        """
+
+        path = self.asset_path(digest)
+
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            os.replace(tmp_path, path)
+
+    def _remove_unreferenced(self, digest: str) -> None:
+        """Has to be called with _assets_lock held."""
+
+        with self._connect() as conn:
+            referenced = conn.execute("SELECT 1 FROM assets WHERE digest=? LIMIT 1", (digest,)).fetchone() is not None
+
+        if not referenced:
+            self.asset_path(digest).unlink(missing_ok=True)
 
     # ------------------------------------------------------------------ scenes
 
@@ -86,11 +319,25 @@ class Database:
                 "ON CONFLICT(id) DO UPDATE SET scene_json=excluded.scene_json",
                 (scene.id, _dump(scene)),
             )
+            self._record_change(conn, Change.TypeEnum.SCENE, scene.id, _id_desc(scene))
+        self._notify_changes()
 
-    def get_scene(self, scene_id: str) -> Scene | None:
+    def get_scene_json(self, scene_id: str) -> str | None:
         with self._connect() as conn:
             row = conn.execute("SELECT scene_json FROM scenes WHERE id=?", (scene_id,)).fetchone()
-        return None if row is None else _load(row["scene_json"], Scene)
+        return None if row is None else row["scene_json"]
+
+    def get_scene(self, scene_id: str) -> Scene | None:
+        data = self.get_scene_json(scene_id)
+        return None if data is None else _load(data, Scene)
+
+    def get_scenes(self, scene_ids: Iterable[str]) -> list[Scene]:
+        """Returns existing scenes out of the given ids (unknown ids are
+        skipped)."""
+
+        with self._connect() as conn:
+            rows = self._select_many(conn, "SELECT scene_json FROM scenes WHERE id IN ({})", scene_ids)
+        return [_load(row["scene_json"], Scene) for row in rows]
 
     def list_scenes(self) -> Iterable[Scene]:
         with self._connect() as conn:
@@ -100,6 +347,9 @@ class Database:
     def delete_scene(self, scene_id: str) -> bool:
         with self._connect() as conn:
             cur = conn.execute("DELETE FROM scenes WHERE id=?", (scene_id,))
+            if cur.rowcount:
+                self._record_change(conn, Change.TypeEnum.SCENE, scene_id, deleted=True)
+        self._notify_changes()
         return cur.rowcount > 0
 
     # -------------------------------------------------------------- object types
@@ -111,15 +361,24 @@ class Database:
                 "ON CONFLICT(id) DO UPDATE SET object_type_json=excluded.object_type_json",
                 (obj_type.id, _dump(obj_type)),
             )
+            self._record_change(conn, Change.TypeEnum.OBJECT_TYPE, obj_type.id, _id_desc(obj_type))
+        self._notify_changes()
 
-    def get_object_type(self, obj_type_id: str) -> ObjectType | None:
+    def get_object_type_json(self, obj_type_id: str) -> str | None:
         with self._connect() as conn:
             row = conn.execute("SELECT object_type_json FROM object_types WHERE id=?", (obj_type_id,)).fetchone()
-        return None if row is None else _load(row["object_type_json"], ObjectType)
+        return None if row is None else row["object_type_json"]
+
+    def get_object_type(self, obj_type_id: str) -> ObjectType | None:
+        data = self.get_object_type_json(obj_type_id)
+        return None if data is None else _load(data, ObjectType)
 
     def delete_object_type(self, obj_type_id: str) -> bool:
         with self._connect() as conn:
             cur = conn.execute("DELETE FROM object_types WHERE id=?", (obj_type_id,))
+            if cur.rowcount:
+                self._record_change(conn, Change.TypeEnum.OBJECT_TYPE, obj_type_id, deleted=True)
+        self._notify_changes()
         return cur.rowcount > 0
 
     def object_type_ids(self) -> set[str]:
@@ -143,16 +402,19 @@ class Database:
                 (model.id, model_type.value, _dump(model)),
             )
 
-    def get_model(self, model_id: str) -> Models | None:
+    def get_model_json(self, model_id: str) -> tuple[Model3dType, str] | None:
         with self._connect() as conn:
             row = conn.execute("SELECT type, model_json FROM models WHERE id=?", (model_id,)).fetchone()
+        return None if row is None else (Model3dType(row["type"]), row["model_json"])
 
-        if row is None:
+    def get_model(self, model_id: str) -> Models | None:
+        res = self.get_model_json(model_id)
+
+        if res is None:
             return None
 
-        model_type = Model3dType(row["type"])
-        cls = MODEL_MAPPING[model_type]
-        return _load(row["model_json"], cls)
+        model_type, data = res
+        return _load(data, MODEL_MAPPING[model_type])
 
     def delete_model(self, model_id: str) -> bool:
         with self._connect() as conn:
@@ -185,11 +447,26 @@ class Database:
                 "ON CONFLICT(id) DO UPDATE SET project_json=excluded.project_json",
                 (project.id, _dump(project)),
             )
+            self._index_project(conn, project)
+            self._record_change(conn, Change.TypeEnum.PROJECT, project.id, _id_desc(project))
+        self._notify_changes()
 
-    def get_project(self, project_id: str) -> Project | None:
+    def get_project_json(self, project_id: str) -> str | None:
         with self._connect() as conn:
             row = conn.execute("SELECT project_json FROM projects WHERE id=?", (project_id,)).fetchone()
-        return None if row is None else _load(row["project_json"], Project)
+        return None if row is None else row["project_json"]
+
+    def get_project(self, project_id: str) -> Project | None:
+        data = self.get_project_json(project_id)
+        return None if data is None else _load(data, Project)
+
+    def get_projects(self, project_ids: Iterable[str]) -> list[Project]:
+        """Returns existing projects out of the given ids (unknown ids are
+        skipped)."""
+
+        with self._connect() as conn:
+            rows = self._select_many(conn, "SELECT project_json FROM projects WHERE id IN ({})", project_ids)
+        return [_load(row["project_json"], Project) for row in rows]
 
     def list_projects(self) -> Iterable[Project]:
         with self._connect() as conn:
@@ -202,8 +479,53 @@ class Database:
             conn.execute("DELETE FROM project_sources WHERE project_id=?", (project_id,))
             conn.execute("DELETE FROM project_parameters WHERE project_id=?", (project_id,))
             conn.execute("DELETE FROM object_parameters WHERE project_id=?", (project_id,))
+            conn.execute("DELETE FROM project_refs WHERE project_id=?", (project_id,))
+            if cur.rowcount:
+                self._record_change(conn, Change.TypeEnum.PROJECT, project_id, deleted=True)
+        self._notify_changes()
         return cur.rowcount > 0
 
+    def project_ids_with_scene(self, scene_id: str) -> set[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT project_id FROM project_refs WHERE ref_id=? AND kind=?", (scene_id, RefKind.SCENE.value)
+            ).fetchall()
+        return {row["project_id"] for row in rows}
+
+    def project_ids_using_object(
+        self, scene_id: str, obj_id: str, *, as_parent: bool = True, in_actions: bool = True
+    ) -> set[str]:
+        """Returns ids of projects (of the given scene) having the object as
+        a parent of some AP and/or using it in some action."""
+
+        kinds: list[str] = []
+
+        if as_parent:
+            kinds.append(RefKind.PARENT.value)
+        if in_actions:
+            kinds.append(RefKind.ACTION_OBJECT.value)
+
+        if not kinds:
+            return set()
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT obj.project_id FROM project_refs obj "
+                "JOIN project_refs scn ON scn.project_id=obj.project_id AND scn.kind=? AND scn.ref_id=? "
+                f"WHERE obj.ref_id=? AND obj.kind IN ({','.join('?' * len(kinds))})",
+                (RefKind.SCENE.value, scene_id, obj_id, *kinds),
+            ).fetchall()
+        return {row["project_id"] for row in rows}
+
+    def _index_project(self, conn: sqlite3.Connection, project: Project) -> None:
+        """Has to be called within the transaction that saves the project."""
+
+        conn.execute("DELETE FROM project_refs WHERE project_id=?", (project.id,))
+        conn.executemany(
+            "INSERT INTO project_refs (project_id, kind, ref_id) VALUES (?, ?, ?)",
+            ((project.id, kind.value, ref_id) for kind, ref_id in _project_refs(project)),
+        )
+
     # --------------------------------------------------------------- parameters
 
     def get_project_parameters(self, project_id: str) -> list[ProjectParameter]:
@@ -255,12 +577,134 @@ class Database:
             row = conn.execute("SELECT sources_json FROM project_sources WHERE project_id=?", (project_id,)).fetchone()
         return None if row is None else _load(row["sources_json"], ProjectSources)
 
+    # ------------------------------------------------------------------ changes
+
+    def get_changes(self, since: int | None = None, limit: int = 1000) -> Changes:
+        """Returns changes with sequence number higher than 'since'.
+
+        Without 'since', just the current sequence number is returned.
+        """
+
+        with self._connect() as conn:
+            first, last = conn.execute("SELECT MIN(seq), MAX(seq) FROM changes").fetchone()
+
+            if last is None:  # there were no changes so far
+                first = last = 0
+
+            if since is None:
+                return Changes(last)
+
+            # some changes were already pruned (or the database was replaced)
+            if since < first - 1 or since > last:
+                return Changes(last, reset=True)
+
+            rows = conn.execute(
+                "SELECT seq, type, id, deleted, item_json FROM changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                (since, limit),
+            ).fetchall()
+
+        changes = Changes(rows[-1]["seq"] if len(rows) == limit else last)
+        for row in rows:
+            changes.changes.append(
+                Change(
+                    row["seq"],
+                    Change.TypeEnum(row["type"]),
+                    row["id"],
+                    bool(row["deleted"]),
+                    None if row["item_json"] is None else _load(row["item_json"], IdDesc),
+                )
+            )
+        return changes
+
+    def wait_for_changes(self, since: int, timeout: float) -> Changes:
+        """Long-poll version of get_changes - blocks until there is a change
+        or the timeout elapses."""
+
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._changes_cond:
+                counter = self._changes_counter
+
+            changes = self.get_changes(since)
+            remaining = deadline - time.monotonic()
+
+            if changes.changes or changes.reset or remaining <= 0:
+                return changes
+
+            with self._changes_cond:
+                self._changes_cond.wait_for(lambda: self._changes_counter != counter, remaining)
+
+    def _record_change(
+        self,
+        conn: sqlite3.Connection,
+        change_type: Change.TypeEnum,
+        item_id: str,
+        item: IdDesc | None = None,
+        *,
+        deleted: bool = False,
+    ) -> None:
+        """Has to be called within the transaction that made the change."""
+
+        cur = conn.execute(
+            "INSERT INTO changes (type, id, deleted, item_json) VALUES (?, ?, ?, ?)",
+            (change_type.value, item_id, deleted, None if item is None else _dump(item)),
+        )
+        conn.execute("DELETE FROM changes WHERE seq <= ?", (cast(int, cur.lastrowid) - self.changes_keep,))
+
+    def _notify_changes(self) -> None:
+        with self._changes_cond:
+            self._changes_counter += 1
+            self._changes_cond.notify_all()
+
     # ------------------------------------------------------------------ helpers
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.path)
+    @staticmethod
+    def _select_many(conn: sqlite3.Connection, query: str, ids: Iterable[str]) -> list[sqlite3.Row]:
+        """Runs query with 'IN ({})' placeholder for each chunk of ids."""
+
+        unique_ids = list(dict.fromkeys(ids))
+        rows: list[sqlite3.Row] = []
+
+        for idx in range(0, len(unique_ids), _BATCH_SIZE):
+            chunk = unique_ids[idx : idx + _BATCH_SIZE]
+            rows.extend(conn.execute(query.format(",".join("?" * len(chunk))), chunk).fetchall())
+
+        return rows
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Borrows a connection from the pool (or opens a new one).
+
+        The block is executed as a transaction, which is committed (or
+        rolled back) on exit. Then, the connection is returned to the
+        pool or closed if the pool is already full.
+        """
+
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+
+        try:
+            with conn:
+                yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _open(self) -> sqlite3.Connection:
+        # connection is used by one thread at a time, but not always by the same one
+        conn = sqlite3.connect(self.path, cached_statements=self.cached_statements, check_same_thread=False)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA foreign_keys = ON")
+        # WAL makes fsync on each commit unnecessary, the database stays consistent even with NORMAL
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
         return conn
 
     def _init_db(self) -> None:
@@ -268,11 +712,6 @@ class Database:
             conn.executescript(
                 """
                 PRAGMA journal_mode=WAL;
-                CREATE TABLE IF NOT EXISTS assets (
-                    id TEXT PRIMARY KEY,
-                    info_json TEXT NOT NULL,
-                    data BLOB NOT NULL
-                );
                 CREATE TABLE IF NOT EXISTS scenes (
                     id TEXT PRIMARY KEY,
                     scene_json TEXT NOT NULL
@@ -304,5 +743,71 @@ class Database:
                     params_json TEXT NOT NULL,
                     modified TEXT NOT NULL
                 );
+                CREATE TABLE IF NOT EXISTS changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    type TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    deleted INTEGER NOT NULL,
+                    item_json TEXT
+                );
                 """
             )
+
+            if self._has_table(conn, "assets") and "data" in self._columns(conn, "assets"):
+                self._migrate_assets(conn)
+
+            conn.executescript(_ASSETS_SCHEMA)
+
+            if not self._has_table(conn, "project_refs"):
+                self._index_projects(conn)
+
+    @staticmethod
+    def _has_table(conn: sqlite3.Connection, table: str) -> bool:
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+        return row is not None
+
+    @staticmethod
+    def _columns(conn: sqlite3.Connection, table: str) -> set[str]:
+        return {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+    def _index_projects(self, conn: sqlite3.Connection) -> None:
+        """Creates the reference index for projects stored by older
+        versions."""
+
+        conn.execute("BEGIN")
+        # executescript would commit the transaction
+        for statement in _PROJECT_REFS_SCHEMA.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+
+        for row in conn.execute("SELECT project_json FROM projects").fetchall():
+            self._index_project(conn, _load(row["project_json"], Project))
+
+        conn.commit()
+
+    def _migrate_assets(self, conn: sqlite3.Connection) -> None:
+        """Moves asset data from BLOBs (used by older versions) to files."""
+
+        conn.execute("BEGIN")
+        conn.execute("ALTER TABLE assets RENAME TO assets_blobs")
+        # executescript would commit the transaction
+        for statement in _ASSETS_SCHEMA.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+
+        for row in conn.execute("SELECT rowid, id, info_json FROM assets_blobs").fetchall():
+            with conn.blobopen("assets_blobs", "data", row["rowid"], readonly=True) as blob:
+                tmp_path, digest, size = self._receive(blob)
+
+            try:
+                self._place(tmp_path, digest)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+
+            conn.execute(
+                "INSERT INTO assets (id, info_json, digest, size) VALUES (?, ?, ?, ?)",
+                (row["id"], row["info_json"], digest, size),
+            )
+
+        conn.execute("DROP TABLE assets_blobs")
+        conn.commit()
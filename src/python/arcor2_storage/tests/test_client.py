@@ -1,3 +1,5 @@
+import pytest
+
 from arcor2_storage import client
 
 
@@ -25,3 +27,15 @@ def test_create_asset_passes_upsert(monkeypatch) -> None:
     assert params["upsert"] == "false"
     assert params["id"] == "asset-id"
     assert params["description"] == "desc"
+
+
+def test_asset_digest(monkeypatch) -> None:
+    headers: dict[str, str] = {client.DIGEST_HEADER: "abc"}
+    monkeypatch.setattr(client.rest, "head", lambda url: headers)
+
+    assert client.asset_digest("asset-id") == "abc"
+
+    headers.clear()  # e.g. older version of the service
+
+    with pytest.raises(client.StorageClientException):
+        client.asset_digest("asset-id")
@@ -1,10 +1,14 @@
+import hashlib
 from datetime import datetime
 from io import BytesIO
 
 import humps
 
 from arcor2.data.common import (
+    Action,
+    ActionPoint,
     IdDesc,
+    Position,
     Project,
     ProjectParameter,
     ProjectSources,
@@ -13,6 +17,7 @@ from arcor2.data.common import (
     SceneObjectOverride,
 )
 from arcor2.data.object_type import Box, MetaModel3d, Model3dType, ObjectType
+from arcor2_storage.client import DIGEST_HEADER, Change, Changes
 
 
 def _camel(dc):
@@ -40,6 +45,51 @@ def test_asset_lifecycle(service_client) -> None:
     assert service_client.get(f"/assets/{asset_id}/exists").get_json() is False
 
 
+def test_asset_streaming(service_client) -> None:
+    data = bytes(range(256)) * 1000
+
+    resp = service_client.post(
+        "/assets?id=ast&fileName=data.bin", data=BytesIO(data), content_type="application/octet-stream"
+    )
+    assert resp.status_code == 200
+    assert resp.get_json()["fileName"] == "data.bin"
+
+    data_resp = service_client.get("/assets/ast/data")
+    assert data_resp.status_code == 200
+    assert data_resp.data == data
+    etag = data_resp.headers["ETag"]
+
+    range_resp = service_client.get("/assets/ast/data", headers={"Range": "bytes=256-511"})
+    assert range_resp.status_code == 206
+    assert range_resp.data == data[256:512]
+
+    assert service_client.get("/assets/ast/data", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_asset_digest(service_client) -> None:
+    digest = hashlib.sha256(b"hello").hexdigest()
+
+    # error handlers (mapping to proper status codes) are registered by run_app
+    assert service_client.post(f"/assets?id=first&digest={digest}").status_code >= 400
+
+    payload = {"assetData": (BytesIO(b"hello"), "hello.txt")}
+    assert service_client.post("/assets?id=first", data=payload, content_type="multipart/form-data").status_code == 200
+
+    head = service_client.head("/assets/first")
+    assert head.status_code == 200
+    assert head.headers[DIGEST_HEADER] == digest
+    assert service_client.head("/assets/unknown").status_code >= 400
+
+    # content is already there, no need to upload it again
+    resp = service_client.post(f"/assets?id=second&digest={digest}&fileName=hello.txt")
+    assert resp.status_code == 200
+    assert resp.get_json()["fileName"] == "hello.txt"
+    assert service_client.get("/assets/second/data").data == b"hello"
+
+    resp = service_client.post("/assets/exists", json=["first", "unknown", "second"])
+    assert resp.get_json() == ["first", "second"]
+
+
 def test_project_scene_and_models(service_client) -> None:
     # object type and model
     box_model = Box("Box", 0.1, 0.2, 0.3)
@@ -101,3 +151,108 @@ def test_object_type_delete(service_client) -> None:
     # deleting non-existent returns error
     err = service_client.delete("/object-types/ToDelete")
     assert err.status_code == 500
+
+
+def test_batch_listing(service_client) -> None:
+    assert service_client.put("/object-types", json=_camel(ObjectType("Box", "print('box')"))).status_code == 200
+
+    for idx in range(3):
+        scene = Scene(f"scene-{idx}", id=f"scene{idx}")
+        assert service_client.put("/scenes", json=_camel(scene)).status_code == 200
+        project = Project(f"proj-{idx}", scene.id, id=f"proj{idx}")
+        assert service_client.put("/projects", json=_camel(project)).status_code == 200
+
+    projects = service_client.post("/projects/batch", json=["proj0", "proj2", "unknown", "proj0"]).get_json()
+    assert {Project.from_dict(humps.decamelize(p)).id for p in projects} == {"proj0", "proj2"}
+
+    scenes = service_client.post("/scenes/batch", json=["scene1"]).get_json()
+    assert [Scene.from_dict(humps.decamelize(s)).id for s in scenes] == ["scene1"]
+
+    assert service_client.post("/scenes/batch", json={"ids": []}).status_code == 500
+
+    full = service_client.get("/projects", query_string={"full": "true"}).get_json()
+    assert {Project.from_dict(humps.decamelize(p)).scene_id for p in full} == {"scene0", "scene1", "scene2"}
+
+    full = service_client.get("/scenes", query_string={"full": "true"}).get_json()
+    assert len([Scene.from_dict(humps.decamelize(s)) for s in full]) == 3
+
+
+def test_conditional_get(service_client) -> None:
+    assert service_client.put("/models/box", json=_camel(Box("Box", 0.1, 0.2, 0.3))).status_code == 200
+    assert service_client.put("/object-types", json=_camel(ObjectType("Box", "print('box')"))).status_code == 200
+    assert service_client.put("/scenes", json=_camel(Scene("scene", id="scene1"))).status_code == 200
+
+    for url in ("/scenes/scene1", "/object-types/Box", "/models/Box/box"):
+        resp = service_client.get(url)
+        assert resp.status_code == 200
+        assert resp.headers["ETag"]
+
+        not_modified = service_client.get(url, headers={"If-None-Match": resp.headers["ETag"]})
+        assert not_modified.status_code == 304
+        assert not not_modified.data
+        assert not_modified.headers["ETag"] == resp.headers["ETag"]
+
+    assert service_client.get("/scenes/scene1").last_modified
+
+    # document changed -> new ETag
+    etag = service_client.get("/scenes/scene1").headers["ETag"]
+    assert service_client.put("/scenes", json=_camel(Scene("renamed", id="scene1"))).status_code == 200
+    resp = service_client.get("/scenes/scene1", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    assert resp.get_json()["name"] == "renamed"
+
+    assert service_client.get("/models/Box/mesh").status_code == 500
+
+
+def test_changes(service_client) -> None:
+    def changes(**kwargs) -> Changes:
+        resp = service_client.get("/changes", query_string=kwargs)
+        assert resp.status_code == 200
+        return Changes.from_dict(humps.decamelize(resp.get_json()))
+
+    start = changes().last_seq
+
+    assert service_client.put("/object-types", json=_camel(ObjectType("Box", "print('box')"))).status_code == 200
+    assert service_client.put("/scenes", json=_camel(Scene("scene", id="scene1"))).status_code == 200
+    assert service_client.delete("/scenes/scene1").status_code == 200
+
+    res = changes(since=start)
+    assert not res.reset
+    assert [(ch.type, ch.id, ch.deleted) for ch in res.changes] == [
+        (Change.TypeEnum.OBJECT_TYPE, "Box", False),
+        (Change.TypeEnum.SCENE, "scene1", False),
+        (Change.TypeEnum.SCENE, "scene1", True),
+    ]
+    assert res.changes[1].item and res.changes[1].item.name == "scene"
+    assert res.last_seq == res.changes[-1].seq
+
+    # nothing new - long-poll times out
+    assert not changes(since=res.last_seq, timeout=0.1).changes
+
+    # unknown sequence number
+    assert changes(since=res.last_seq + 10).reset
+
+
+def test_project_references(service_client) -> None:
+    assert service_client.put("/object-types", json=_camel(ObjectType("Box", "print('box')"))).status_code == 200
+    scene = Scene("scene", id="scene1", objects=[SceneObject("box", "Box", id="obj_box")])
+    assert service_client.put("/scenes", json=_camel(scene)).status_code == 200
+
+    project = Project("project", scene.id, id="proj1")
+    project.action_points.append(ActionPoint("ap", Position(), "obj_box", id="acp_1"))
+    assert service_client.put("/projects", json=_camel(project)).status_code == 200
+
+    assert service_client.get("/scenes/scene1/projects").get_json() == ["proj1"]
+    assert service_client.get("/scenes/unknown/projects").get_json() == []
+
+    url = "/scenes/scene1/objects/obj_box/projects"
+    assert service_client.get(url).get_json() == ["proj1"]
+    assert service_client.get(url, query_string={"asParent": "false"}).get_json() == []
+
+    project.action_points[0].parent = None
+    project.action_points[0].actions.append(Action("move", "obj_box/move", id="act_1"))
+    assert service_client.put("/projects", json=_camel(project)).status_code == 200
+
+    assert service_client.get(url, query_string={"asParent": "false"}).get_json() == ["proj1"]
+    assert service_client.get(url, query_string={"inActions": "false"}).get_json() == []
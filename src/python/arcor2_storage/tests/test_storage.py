@@ -0,0 +1,202 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from io import BytesIO
+
+from arcor2.data.common import Action, ActionPoint, Position, Project, Scene
+from arcor2_storage.client import Asset
+from arcor2_storage.storage import Database
+
+
+def test_connections_are_reused(tmp_path) -> None:
+    db = Database(str(tmp_path / "db.sqlite"), pool_size=1)
+
+    with db._connect() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    with db._connect() as again:
+        assert again is conn
+
+        # pool is empty while the connection is borrowed
+        with db._connect() as other:
+            assert other is not conn
+
+    # 'conn' was returned after 'other' and didn't fit into the pool
+    with db._connect() as pooled:
+        assert pooled is other
+
+    db.close()
+
+    with db._connect() as new:
+        assert new is not other
+
+    db.close()
+
+
+def test_writes_visible_across_threads(tmp_path) -> None:
+    db = Database(str(tmp_path / "db.sqlite"))
+
+    scene = Scene("scene", id="scn")
+    db.save_scene(scene)
+    db.save_project(Project("project", scene.id, id="pro"))
+
+    results: list[object] = []
+
+    def read() -> None:
+        results.append(db.get_project("pro"))
+        results.append(db.get_scene("scn"))
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 8
+    assert all(results)
+
+    assert db.delete_project("pro")
+    assert db.get_project("pro") is None
+
+    db.close()
+
+
+def test_wait_for_changes(tmp_path) -> None:
+    db = Database(str(tmp_path / "db.sqlite"))
+    since = db.get_changes().last_seq
+
+    timer = threading.Timer(0.1, lambda: db.save_scene(Scene("scene", id="scn")))
+    timer.start()
+
+    start = time.monotonic()
+    changes = db.wait_for_changes(since, 10)
+    assert time.monotonic() - start < 5
+    timer.join()
+
+    assert [change.id for change in changes.changes] == ["scn"]
+    assert changes.changes[0].item is None  # scene without timestamps
+
+    db.close()
+
+
+def test_asset_files(tmp_path) -> None:
+    db = Database(str(tmp_path / "db.sqlite"))
+    now = datetime.now(tz=timezone.utc)
+    data = b"x" * 3_000_000  # more than one chunk
+
+    first = db.save_asset(Asset("first", now, now), BytesIO(data))
+    second = db.save_asset(Asset("second", now, now), data)
+
+    assert first.digest == hashlib.sha256(data).hexdigest()
+    assert first.size == len(data)
+    assert first.path == second.path  # same content is stored once
+    assert first.path.read_bytes() == data
+
+    assert db.delete_asset("first")
+    assert second.path.exists()
+
+    # file is removed once it is not referenced
+    third = db.save_asset(Asset("second", now, now), b"other")
+    assert not second.path.exists()
+    assert third.path.read_bytes() == b"other"
+
+    assert db.delete_asset("second")
+    assert not third.path.exists()
+    assert not db.delete_asset("second")
+    assert not list(tmp_path.glob("assets/.upload-*"))
+
+    db.close()
+
+
+def test_link_asset(tmp_path) -> None:
+    db = Database(str(tmp_path / "db.sqlite"))
+    now = datetime.now(tz=timezone.utc)
+
+    stored = db.save_asset(Asset("first", now, now), b"data")
+
+    assert db.link_asset(Asset("second", now, now), hashlib.sha256(b"other").hexdigest()) is None
+    linked = db.link_asset(Asset("second", now, now), stored.digest)
+    assert linked is not None
+    assert linked.path == stored.path
+    assert linked.size == 4
+
+    assert db.asset_digests(["first", "second", "unknown"]) == {"first": stored.digest, "second": stored.digest}
+
+    db.close()
+
+
+def test_assets_migrated_from_blobs(tmp_path) -> None:
+    path = tmp_path / "db.sqlite"
+    now = datetime.now(tz=timezone.utc)
+    asset = Asset("ast", now, now, file_name="mesh.dae")
+
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE assets (id TEXT PRIMARY KEY, info_json TEXT NOT NULL, data BLOB NOT NULL)")
+    conn.execute("INSERT INTO assets VALUES (?, ?, ?)", (asset.id, asset.to_json(), b"mesh"))
+    conn.commit()
+    conn.close()
+
+    db = Database(str(path))
+    stored = db.get_asset(asset.id)
+
+    assert stored is not None
+    assert stored.info == asset
+    assert stored.size == 4
+    assert stored.path.read_bytes() == b"mesh"
+
+    db.close()
+
+
+def _project_with_refs(project_id: str, scene_id: str, parent: str, action_obj: str) -> Project:
+    project = Project(project_id, scene_id, id=project_id)
+    ap = ActionPoint("ap", Position(), parent, id=f"{project_id}_ap")
+    ap.actions.append(Action("action", f"{action_obj}/move", id=f"{project_id}_act"))
+    project.action_points.append(ap)
+    return project
+
+
+def test_project_refs(tmp_path) -> None:
+    db = Database(str(tmp_path / "db.sqlite"))
+
+    db.save_project(_project_with_refs("p1", "s1", "obj_1", "obj_2"))
+    db.save_project(_project_with_refs("p2", "s1", "obj_2", "obj_3"))
+    db.save_project(_project_with_refs("p3", "s2", "obj_1", "obj_1"))
+
+    assert db.project_ids_with_scene("s1") == {"p1", "p2"}
+    assert db.project_ids_using_object("s1", "obj_2") == {"p1", "p2"}
+    assert db.project_ids_using_object("s1", "obj_2", in_actions=False) == {"p2"}
+    assert db.project_ids_using_object("s1", "obj_2", as_parent=False) == {"p1"}
+    assert db.project_ids_using_object("s2", "obj_1") == {"p3"}
+
+    # references are replaced on save
+    db.save_project(_project_with_refs("p1", "s2", "obj_4", "obj_4"))
+    assert db.project_ids_with_scene("s1") == {"p2"}
+    assert db.project_ids_using_object("s2", "obj_4") == {"p1"}
+
+    assert db.delete_project("p1")
+    assert not db.project_ids_using_object("s2", "obj_4")
+
+    db.close()
+
+
+def test_project_refs_created_for_existing_projects(tmp_path) -> None:
+    path = tmp_path / "db.sqlite"
+
+    db = Database(str(path))
+    db.save_project(_project_with_refs("p1", "s1", "obj_1", "obj_2"))
+    db.close()
+
+    # database created by an older version
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE project_refs")
+    conn.commit()
+    conn.close()
+
+    db = Database(str(path))
+    assert db.project_ids_with_scene("s1") == {"p1"}
+    assert db.project_ids_using_object("s1", "obj_2") == {"p1"}
+
+    db.close()
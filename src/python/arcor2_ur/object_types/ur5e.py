@@ -5,7 +5,7 @@ from typing import cast
 from dataclasses_jsonschema import JsonSchemaMixin
 
 from arcor2.data.common import ActionMetadata, Joint, Pose, StrEnum
-from arcor2.data.robot import InverseKinematicsRequest
+from arcor2.data.robot import InverseKinematicsBatchRequest, InverseKinematicsRequest, InverseKinematicsResult
 from arcor2_object_types.abstract import Robot, Settings
 from arcor2_web import rest
 
@@ -24,6 +24,13 @@ class Vacuum(JsonSchemaMixin):
         return (self.a + self.b) / 2
 
 
+def ik_batch_timeout(poses: int) -> float:
+    """Time for the UR service to compute IK for the given number of poses
+    (for each, it might take up to a few seconds)."""
+
+    return 120 + 3 * poses
+
+
 class VacuumChannel(StrEnum):
     A = "a"
     B = "b"
@@ -189,4 +196,29 @@ class Ur5e(Robot):
             list_return_type=Joint,
         )
 
+    def inverse_kinematics_batch(
+        self,
+        end_effector_id: str,
+        poses: list[Pose],
+        start_joints: None | list[Joint] = None,
+        avoid_collisions: bool = True,
+    ) -> list[None | list[Joint]]:
+        """Computes inverse kinematics for many poses using one request.
+
+        :param end_effector_id: IK target pose end-effector
+        :param poses: IK target poses
+        :param start_joints: IK start joints
+        :param avoid_collisions: Return non-collision IK result if true
+        :return: Inverse kinematics for each pose, None where it could not be computed
+        """
+
+        results = rest.call(
+            rest.Method.PUT,
+            f"{self.settings.url}/ik/batch",
+            body=InverseKinematicsBatchRequest(poses, start_joints, avoid_collisions),
+            list_return_type=InverseKinematicsResult,
+            timeout=rest.Timeout(read=rest.Timeout().read + ik_batch_timeout(len(poses))),  # service times out first
+        )
+        return [res.joints for res in results]
+
     move.__action__ = ActionMetadata()  # type: ignore
@@ -26,7 +26,7 @@ from ur_msgs.srv import SetPayload, SetSpeedSliderFraction  # pants: no-infer-de
 from arcor2 import transformations as tr
 from arcor2.data import common, object_type
 from arcor2.data.common import Joint, Pose
-from arcor2.data.robot import InverseKinematicsRequest
+from arcor2.data.robot import InverseKinematicsBatchRequest, InverseKinematicsRequest
 from arcor2.logging import get_logger
 from arcor2_ur import topics
 from arcor2_ur.exceptions import UrGeneral
@@ -666,6 +666,21 @@ class RosWorkerRuntime:
 
             return [Joint(jn, jv).to_dict() for jn, jv in scene.current_state.joint_positions.items()]
 
+    def inverse_kinematics_batch(self, ikbr: InverseKinematicsBatchRequest) -> list[dict]:
+        results: list[dict] = []
+
+        for pose in ikbr.poses:
+            try:
+                joints = self.inverse_kinematics(
+                    InverseKinematicsRequest(pose, ikbr.start_joints, ikbr.avoid_collisions)
+                )
+            except UrGeneral as e:
+                results.append({"message": str(e)})
+            else:
+                results.append({"joints": joints})
+
+        return results
+
     def set_freedrive_mode(self, enabled: bool) -> dict:
         self._switch_freedrive_controller(enabled)
         self.node.set_freedrive_mode(enabled)
@@ -776,6 +791,8 @@ def ros_worker_main(
                     result = runtime.get_joints()
                 elif op == "ik":
                     result = runtime.inverse_kinematics(InverseKinematicsRequest.from_dict(kwargs["ikr"]))
+                elif op == "ik_batch":
+                    result = runtime.inverse_kinematics_batch(InverseKinematicsBatchRequest.from_dict(kwargs["ikbr"]))
                 elif op == "set_freedrive_mode":
                     result = runtime.set_freedrive_mode(bool(kwargs["enabled"]))
                 elif op == "get_freedrive_mode":
@@ -850,11 +867,11 @@ class RosWorkerClient:
         if resp.get("status") != "ok":
             raise UrGeneral(resp.get("message", "Failed to start ROS worker."))
 
-    def request(self, op: str, **kwargs):
+    def request(self, op: str, timeout: float = 120, **kwargs):
         if not self._process.is_alive():
             raise UrGeneral("ROS worker is not running.")
         self._conn.send({"op": op, "kwargs": kwargs})
-        if not self._conn.poll(120):
+        if not self._conn.poll(timeout):
             raise UrGeneral(f"ROS worker did not respond to '{op}'.")
         resp = self._conn.recv()
         if resp.get("status") != "ok":
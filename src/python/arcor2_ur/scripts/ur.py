@@ -14,12 +14,12 @@ from moveit_configs_utils import MoveItConfigsBuilder  # pants: no-infer-dep
 from arcor2 import env
 from arcor2.data import common, object_type
 from arcor2.data.common import Joint, Pose
-from arcor2.data.robot import InverseKinematicsRequest
+from arcor2.data.robot import InverseKinematicsBatchRequest, InverseKinematicsRequest, InverseKinematicsResult
 from arcor2.helpers import port_from_url
 from arcor2.logging import get_logger
 from arcor2_ur import get_data, version
 from arcor2_ur.exceptions import NotFound, StartError, UrGeneral, WebApiError
-from arcor2_ur.object_types.ur5e import Vacuum
+from arcor2_ur.object_types.ur5e import Vacuum, ik_batch_timeout
 from arcor2_ur.scripts.ros_worker import CollisionObjectTuple, RosWorkerClient
 from arcor2_web.flask import RespT, create_app, run_app
 
@@ -568,6 +568,47 @@ def put_ik() -> RespT:
     return jsonify(result)
 
 
+@app.route("/ik/batch", methods=["PUT"])
+@requires_started
+def put_ik_batch() -> RespT:
+    """Computes IK for many poses at once.
+    ---
+    put:
+        description: Computes IK for many poses at once.
+        tags:
+           - Robot
+        requestBody:
+              content:
+                application/json:
+                  schema:
+                    $ref: InverseKinematicsBatchRequest
+        responses:
+            200:
+              description: Ok (for each pose, joints are missing if IK could not be computed)
+              content:
+                application/json:
+                    schema:
+                        type: array
+                        items:
+                            $ref: InverseKinematicsResult
+            500:
+              description: "Error types: **General**, **UrGeneral**, **StartError**."
+              content:
+                application/json:
+                  schema:
+                    $ref: WebApiError
+    """
+    assert globs.state
+
+    if not isinstance(request.json, dict):
+        raise UrGeneral("Body should be a JSON dict containing InverseKinematicsBatchRequest.")
+
+    ikbr = InverseKinematicsBatchRequest.from_dict(request.json)
+    logger.debug(f"Got IK batch request for {len(ikbr.poses)} poses.")
+    result = globs.state.worker.request("ik_batch", timeout=ik_batch_timeout(len(ikbr.poses)), ikbr=ikbr.to_dict())
+    return jsonify(result)
+
+
 @app.route("/hand_teaching", methods=["GET"])
 @requires_started
 def get_hand_teaching() -> RespT:
@@ -827,7 +868,15 @@ def main() -> None:
         SERVICE_NAME,
         version(),
         port_from_url(URL),
-        [Vacuum, Pose, Joint, InverseKinematicsRequest, WebApiError],
+        [
+            Vacuum,
+            Pose,
+            Joint,
+            InverseKinematicsRequest,
+            InverseKinematicsBatchRequest,
+            InverseKinematicsResult,
+            WebApiError,
+        ],
         args.swagger,
     )
 
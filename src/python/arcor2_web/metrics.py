@@ -0,0 +1,217 @@
+"""Simple in-process metrics (counters, gauges and histograms).
+
+Metrics are registered (get or create) by name and their values are
+kept per combination of labels. Updates are thread-safe, so metrics
+might be updated also from executor threads. All registered metrics
+could be rendered in the Prometheus text format.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, ClassVar, Iterator, TypeVar
+
+from arcor2.exceptions import Arcor2Exception
+
+# seconds, suitable for RPC callbacks, REST calls, etc.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsException(Arcor2Exception):
+    pass
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Metric:
+    kind: ClassVar[str]
+
+    __slots__ = ("name", "help", "_lock")
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    __slots__ = ("_values",)
+
+    def __init__(self, name: str, help: str) -> None:
+        super().__init__(name, help)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def values(self) -> dict[Labels, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class HistogramValue:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * (buckets + 1)  # the last one is +Inf
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    __slots__ = ("buckets", "_values")
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = BUCKETS) -> None:
+        super().__init__(name, help)
+        self.buckets = buckets
+        self._values: dict[Labels, HistogramValue] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            try:
+                hv = self._values[key]
+            except KeyError:
+                hv = self._values[key] = HistogramValue(len(self.buckets))
+            hv.counts[bisect_left(self.buckets, value)] += 1
+            hv.sum += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observes duration of the block (also when it raises)."""
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, **labels)
+
+    def values(self) -> dict[Labels, HistogramValue]:
+        with self._lock:
+            ret: dict[Labels, HistogramValue] = {}
+            for key, hv in self._values.items():
+                ret[key] = copy_hv = HistogramValue(len(self.buckets))
+                copy_hv.counts[:] = hv.counts
+                copy_hv.sum = hv.sum
+            return ret
+
+
+MetricT = TypeVar("MetricT", bound=Metric)
+
+_registry: dict[str, Metric] = {}
+_registry_lock = threading.Lock()
+_collectors: list[Callable[[], None]] = []
+
+
+def _get(cls: type[MetricT], name: str, help: str) -> MetricT:
+    with _registry_lock:
+        try:
+            metric = _registry[name]
+        except KeyError:
+            metric = _registry[name] = cls(name, help)
+
+    if type(metric) is not cls:
+        raise MetricsException(f"Metric {name} is already registered as {metric.kind}.")
+
+    assert isinstance(metric, cls)
+    return metric
+
+
+def counter(name: str, help: str) -> Counter:
+    return _get(Counter, name, help)
+
+
+def gauge(name: str, help: str) -> Gauge:
+    return _get(Gauge, name, help)
+
+
+def histogram(name: str, help: str) -> Histogram:
+    return _get(Histogram, name, help)
+
+
+def registered() -> list[Metric]:
+    with _registry_lock:
+        return list(_registry.values())
+
+
+def collector(func: Callable[[], None]) -> Callable[[], None]:
+    """Registers a function to be called before rendering the metrics,
+    e.g. to set gauges that are costly or impossible to keep up-to-date."""
+
+    _collectors.append(func)
+    return func
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(labels: Labels, extra: None | tuple[str, str] = None) -> str:
+    items = labels + (extra,) if extra else labels
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def render() -> str:
+    """Returns all metrics in the Prometheus text format."""
+
+    for func in _collectors:
+        func()
+
+    lines: list[str] = []
+
+    for metric in sorted(registered(), key=lambda m: m.name):
+        lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+        if isinstance(metric, Histogram):
+            for labels, hv in sorted(metric.values().items()):
+                cumulative = 0
+                for le, cnt in zip(metric.buckets + (float("inf"),), hv.counts):
+                    cumulative += cnt
+                    lines.append(f"{metric.name}_bucket{_fmt_labels(labels, ('le', _fmt_value(le)))} {cumulative}")
+                lines.append(f"{metric.name}_sum{_fmt_labels(labels)} {_fmt_value(hv.sum)}")
+                lines.append(f"{metric.name}_count{_fmt_labels(labels)} {cumulative}")
+        elif isinstance(metric, Counter):
+            for labels, value in sorted(metric.values().items()):
+                lines.append(f"{metric.name}{_fmt_labels(labels)} {_fmt_value(value)}")
+
+    lines.append("")
+    return "\n".join(lines)
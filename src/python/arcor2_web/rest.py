@@ -1,18 +1,38 @@
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from functools import partial
+from http import HTTPStatus
 from io import BytesIO
-from typing import Any, NamedTuple, Sequence, TypeAlias, TypeVar, Union, overload
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Hashable,
+    Mapping,
+    NamedTuple,
+    Sequence,
+    TypeAlias,
+    TypeVar,
+    Union,
+    overload,
+)
 
 import humps
 import requests
 from dataclasses_jsonschema import JsonSchemaMixin, ValidationError
+from lru import LRU
 from PIL import Image, UnidentifiedImageError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from arcor2 import env, json
+from arcor2.data.codec import CodecException, codec
 from arcor2.data.common import WebApiError
 from arcor2.exceptions import Arcor2Exception
 from arcor2.logging import get_logger
+from arcor2_web import metrics
 
 # typing-related definitions
 DataClass = TypeVar("DataClass", bound=JsonSchemaMixin)
@@ -35,11 +55,17 @@ class RestException(Arcor2Exception):
 class Method(Enum):
     """Enumeration of supported HTTP methods."""
 
-    GET = partial(requests.get)
-    POST = partial(requests.post)
-    PUT = partial(requests.put)
-    DELETE = partial(requests.delete)
-    PATCH = partial(requests.patch)
+    GET = "GET"
+    POST = "POST"
+    PUT = "PUT"
+    DELETE = "DELETE"
+    PATCH = "PATCH"
+    HEAD = "HEAD"
+
+    def __call__(self, url: str, **kwargs: Any) -> requests.Response:
+        """Sends the request using the module-level session."""
+
+        return session.request(self.value, url, **kwargs)
 
 
 class Timeout(NamedTuple):
@@ -65,12 +91,84 @@ class Timeout(NamedTuple):
 OptTimeout = None | Timeout
 
 
+class CachedResponse(NamedTuple):
+    """Body of a response together with its validator.
+
+    The body is kept instead of the parsed value, so each caller gets
+    its own value without copying (decoding the already validated body
+    is cheaper than a deep copy).
+    """
+
+    etag: str
+    content: bytes
+
+
 # module-level variables
+CHUNK_SIZE = 1024 * 1024  # for streamed downloads
 debug = env.get_bool("ARCOR2_REST_DEBUG", False)
+# responses are validated against JSON schema of the expected dataclass
+validate_responses = env.get_bool("ARCOR2_REST_VALIDATE", True)
 headers = {"accept": "application/json", "content-type": "application/json; charset=utf-8"}
-session = requests.session()
+
+# requests are sent over pooled keep-alive connections
+POOL_SIZE = max(env.get_int("ARCOR2_REST_POOL_SIZE", 32), 1)
+RETRIES = env.get_int("ARCOR2_REST_RETRIES", 3)
+BACKOFF = env.get_float("ARCOR2_REST_BACKOFF", 0.1)
+
+# only requests without side effects are repeated when a response is not received (e.g. due to a dropped keep-alive
+# connection), or on 502/503/504; requests that did not reach the server (failed to connect) are repeated for any method
+RETRY_METHODS = frozenset({Method.GET.value, Method.HEAD.value, "OPTIONS"})
+RETRY_STATUSES = frozenset({HTTPStatus.BAD_GATEWAY, HTTPStatus.SERVICE_UNAVAILABLE, HTTPStatus.GATEWAY_TIMEOUT})
+
+
+def create_session(pool_size: int = POOL_SIZE, retries: int = RETRIES, backoff: float = BACKOFF) -> requests.Session:
+    """Creates session with a connection pool of a given size (per host) and
+    retries with exponential backoff."""
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=backoff,
+            allowed_methods=RETRY_METHODS,
+            status_forcelist=RETRY_STATUSES,
+            raise_on_status=False,  # the last response is handled as usual
+        ),
+    )
+
+    sess = requests.Session()
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
+    return sess
+
+
+session = create_session()
+
+# for asyncio code - there is a thread for each pooled connection, so blocking calls don't occupy the default executor
+executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="rest")
 logger = get_logger(__name__, logging.DEBUG if debug else logging.INFO)
 
+_EXECUTOR_QUEUE = metrics.gauge("arcor2_rest_executor_queue", "Calls waiting for a thread of rest.executor.")
+
+
+@metrics.collector
+def _collect() -> None:
+    _EXECUTOR_QUEUE.set(executor._work_queue.qsize())
+
+
+# responses of GET requests made with use_cache=True, keyed by url and params
+if TYPE_CHECKING:
+    _cache: dict[Hashable, CachedResponse] = {}
+else:
+    _cache = LRU(max(env.get_int("ARCOR2_REST_CACHE_SIZE", 256), 1))
+_cache_lock = threading.Lock()
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
 
 def dataclass_from_json(resp_json: dict[str, Any], return_type: type[DataClass]) -> DataClass:
     try:
@@ -99,6 +197,7 @@ def call(
     raw_params: bool = False,
     files: OptFiles = None,
     timeout: OptTimeout = None,
+    use_cache: bool = False,
 ) -> None: ...
 
 
@@ -114,6 +213,7 @@ def call(
     raw_params: bool = False,
     files: OptFiles = None,
     timeout: OptTimeout = None,
+    use_cache: bool = False,
 ) -> Primitive: ...
 
 
@@ -128,6 +228,7 @@ def call(
     raw_params: bool = False,
     files: OptFiles = None,
     timeout: OptTimeout = None,
+    use_cache: bool = False,
 ) -> DataClass: ...
 
 
@@ -142,6 +243,7 @@ def call(
     raw_params: bool = False,
     files: OptFiles = None,
     timeout: OptTimeout = None,
+    use_cache: bool = False,
 ) -> BytesIO: ...
 
 
@@ -157,6 +259,7 @@ def call(
     raw_params: bool = False,
     files: OptFiles = None,
     timeout: OptTimeout = None,
+    use_cache: bool = False,
 ) -> list[Primitive]: ...
 
 
@@ -171,6 +274,7 @@ def call(
     raw_params: bool = False,
     files: OptFiles = None,
     timeout: OptTimeout = None,
+    use_cache: bool = False,
 ) -> list[DataClass]: ...
 
 
@@ -185,6 +289,7 @@ def call(
     raw_params: bool = False,
     files: OptFiles = None,
     timeout: OptTimeout = None,
+    use_cache: bool = False,
 ) -> list[BytesIO]: ...
 
 
@@ -199,6 +304,7 @@ def call(
     raw_params: bool = False,
     files: OptFiles = None,
     timeout: OptTimeout = None,
+    use_cache: bool = False,
 ) -> ReturnValue:
     """Universal function for calling REST APIs.
 
@@ -212,6 +318,9 @@ def call(
                        If you do not want this behavior, pass True here
     :param files: Instead of body, it is possible to send files.
     :param timeout: Specific timeout for a call.
+    :param use_cache: For GET requests, the response is cached and next time, server is asked (If-None-Match)
+                      if it has changed (server has to provide ETag). If not, the cached response is decoded
+                      (without validation).
     :return: Return value/type is given by return_type/list_return_type. If both are None, nothing will be returned.
     """
     logger.debug(f"{method} {url}, body: {body}, params: {params}, files: {files is not None}, timeout: {timeout}")
@@ -225,42 +334,50 @@ def call(
     if return_type is None:
         return_type = list_return_type
 
+    if use_cache and (method != Method.GET or return_type is None):
+        raise RestException("Only GET requests returning a value can be cached.")
+
     d: list[Any] | dict[str, Any] | None = None
 
     # prepare body data into dict or list (if any)
     if isinstance(body, JsonSchemaMixin):
-        d = humps.camelize(body.to_dict())
+        d = codec(type(body)).to_dict(body)
     elif isinstance(body, list):
         d = []
         for dd in body:
             if isinstance(dd, JsonSchemaMixin):
-                d.append(humps.camelize(dd.to_dict()))
+                d.append(codec(type(dd)).to_dict(dd))
             else:
                 d.append(dd)
     elif body is not None:
         raise RestException("Unsupported type of data.")
 
-    if params and not raw_params:
-        params = humps.camelize(params)
-
-        # requests just simply stringifies parameters, which does not work for booleans
-        for param_name, param_value in params.items():
-            if isinstance(param_value, bool):
-                params[param_name] = "true" if param_value else "false"
+    params = _prepare_params(params, raw_params)
 
     if timeout is None:
         timeout = Timeout()
 
+    cache_key: None | Hashable = None
+    cached: None | CachedResponse = None
+    req_headers = headers
+
+    if use_cache:
+        cache_key = (url, tuple(sorted(params.items())) if params else None, return_type, list_return_type is not None)
+        with _cache_lock:
+            cached = _cache.get(cache_key)
+        if cached is not None:
+            req_headers = {**headers, "if-none-match": cached.etag}
+
     try:
         if files:
             files = humps.camelize(files)
-            resp = method.value(url, files=files, timeout=timeout, params=params)
+            resp = method(url, files=files, timeout=timeout, params=params)
         else:
-            resp = method.value(
+            resp = method(
                 url,
                 data=json.dumps(d).encode("utf-8") if d is not None else None,
                 timeout=timeout,
-                headers=headers,
+                headers=req_headers,
                 params=params,
             )
     except requests.exceptions.RequestException as e:
@@ -275,43 +392,83 @@ def call(
     if return_type is None:
         return None
 
+    if resp.status_code == HTTPStatus.NOT_MODIFIED:
+        if cached is None:
+            raise RestException("Unexpected 'Not Modified' response.")
+        logger.debug(f"Using cached response for {url}.")
+        return _parse_content(cached.content, return_type, list_return_type is not None, validate=False)
+
+    value = _parse_content(resp.content, return_type, list_return_type is not None)
+
+    if cache_key is not None:
+        with _cache_lock:
+            if etag := resp.headers.get("ETag"):
+                _cache[cache_key] = CachedResponse(etag, resp.content)
+            else:
+                _cache.pop(cache_key, None)
+
+    return value
+
+
+def _prepare_params(params: OptParams, raw_params: bool) -> OptParams:
+    if params and not raw_params:
+        params = humps.camelize(params)
+
+        # requests just simply stringifies parameters, which does not work for booleans
+        for param_name, param_value in params.items():
+            if isinstance(param_value, bool):
+                params[param_name] = "true" if param_value else "false"
+
+    return params
+
+
+def _parse_content(content: bytes, return_type: ReturnType, is_list: bool, validate: None | bool = None) -> ReturnValue:
+    """:param validate: Validate against JSON schema (validate_responses by default)."""
+
+    assert return_type is not None
+
+    if validate is None:
+        validate = validate_responses
+
     if issubclass(return_type, BytesIO):
-        if list_return_type:
+        if is_list:
             raise NotImplementedError
 
-        return BytesIO(resp.content)
+        return BytesIO(content)
 
-    logger.debug(f"Response text: {resp.text}")
+    if debug:
+        logger.debug(f"Response text: {content.decode(errors='replace')}")
 
     try:
-        resp_json = resp.json()
-    except ValueError as e:
-        logger.debug(f"Got invalid JSON in the response: {resp.text}")
+        resp_json: Any = json.loads(content)
+    except json.JsonException as e:
+        logger.debug(f"Got invalid JSON in the response: {content.decode(errors='replace')}")
         raise RestException("Invalid JSON.") from e
 
-    logger.debug(f"Response json: {resp_json}")
-    if isinstance(resp_json, (dict, list)):
-        resp_json = humps.decamelize(resp_json)
-    logger.debug(f"Decamelized json: {resp_json}")
-
-    if list_return_type and not isinstance(resp_json, list):
+    if is_list and not isinstance(resp_json, list):
         logger.debug(f"Expected list of type {return_type}, but got {resp_json}.")
         raise RestException("Response is not a list.")
 
     if issubclass(return_type, JsonSchemaMixin):
-        if list_return_type:
-            return [dataclass_from_json(item, return_type) for item in resp_json]
+        # codec maps camelCase keys itself
+        try:
+            if is_list:
+                return codec(return_type).from_list(resp_json, validate)
+            return codec(return_type).from_dict(resp_json, validate)
+        except CodecException as e:
+            logger.debug(f'{return_type.__name__}: error "{e}" while parsing "{resp_json}".')
+            raise RestException("Invalid data.", str(e)) from e
 
-        else:
-            assert not isinstance(resp_json, list)
-            return dataclass_from_json(resp_json, return_type)
+    if isinstance(resp_json, (dict, list)):
+        resp_json = humps.decamelize(resp_json)
 
-    else:  # probably a primitive
-        if list_return_type:
-            return [primitive_from_json(item, return_type) for item in resp_json]
-        else:
-            assert not isinstance(resp_json, list)
-            return primitive_from_json(resp_json, return_type)
+    # probably a primitive
+    if is_list:
+        assert isinstance(resp_json, list)
+        return [primitive_from_json(item, return_type) for item in resp_json]
+    else:
+        assert not isinstance(resp_json, list)
+        return primitive_from_json(resp_json, return_type)
 
 
 def _handle_response(resp: requests.Response) -> None:
@@ -352,9 +509,102 @@ def get_image(url: str, params: OptParams = None, raw_params: bool = False) -> I
         raise RestException("Invalid image.") from e
 
 
-def download(url: str, path: str, params: OptParams = None) -> None:
-    """Shortcut for saving a file to disk."""
+def download(
+    url: str, path: str, params: OptParams = None, raw_params: bool = False, timeout: OptTimeout = None
+) -> None:
+    """Shortcut for saving a file to disk.
+
+    The response is streamed in chunks, so memory consumption does not
+    depend on the file size. The file is written under a temporary name
+    and renamed once complete.
+    """
+
+    logger.debug(f"Downloading {url} to {path}, params: {params}")
+
+    params = _prepare_params(params, raw_params)
+
+    if timeout is None:
+        timeout = Timeout()
+
+    tmp_path = f"{path}.part"
+
+    try:
+        with Method.GET(url, params=params, timeout=timeout, stream=True) as resp:
+            _handle_response(resp)
+
+            with open(tmp_path, "wb") as file:
+                for chunk in resp.iter_content(CHUNK_SIZE):
+                    file.write(chunk)
+
+        os.replace(tmp_path, path)
+    except requests.exceptions.RequestException as e:
+        logger.debug("Download failed.", exc_info=True)
+        raise RestException("Catastrophic system error.") from e
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def head(url: str, params: OptParams = None, raw_params: bool = False, timeout: OptTimeout = None) -> Mapping[str, str]:
+    """Returns headers of a resource (case-insensitive mapping)."""
+
+    logger.debug(f"HEAD {url}, params: {params}")
+
+    params = _prepare_params(params, raw_params)
+
+    if timeout is None:
+        timeout = Timeout()
+
+    try:
+        resp = Method.HEAD(url, params=params, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        logger.debug("Request failed.", exc_info=True)
+        raise RestException("Catastrophic system error.") from e
+
+    # there is no body with details
+    if resp.status_code >= 400:
+        raise RestException(f"{resp.status_code} {resp.reason}")
+
+    return resp.headers
+
+
+def upload(
+    method: Method,
+    url: str,
+    data: BinaryIO,
+    *,
+    return_type: type[DataClass],
+    params: OptParams = None,
+    raw_params: bool = False,
+    timeout: OptTimeout = None,
+) -> DataClass:
+    """Sends binary data (e.g. an opened file) as the request body.
+
+    Unlike with 'files' of the call function, the data are not encoded
+    into a multipart message, but streamed as they are read.
+    """
+
+    logger.debug(f"{method} {url} (upload), params: {params}")
+
+    params = _prepare_params(params, raw_params)
+
+    if timeout is None:
+        timeout = Timeout()
+
+    try:
+        resp = method(
+            url,
+            data=data,
+            params=params,
+            timeout=timeout,
+            headers={"accept": "application/json", "content-type": "application/octet-stream"},
+        )
+    except requests.exceptions.RequestException as e:
+        logger.debug("Upload failed.", exc_info=True)
+        raise RestException("Catastrophic system error.") from e
+
+    _handle_response(resp)
 
-    with call(Method.GET, url, return_type=BytesIO, params=params) as buff:
-        with open(path, "wb") as file:
-            file.write(buff.getvalue())
+    value = _parse_content(resp.content, return_type, False)
+    assert isinstance(value, return_type)
+    return value
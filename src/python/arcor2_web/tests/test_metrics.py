@@ -0,0 +1,77 @@
+import pytest
+
+from arcor2_web import metrics
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Metrics registered by imported modules are not rendered."""
+
+    monkeypatch.setattr(metrics, "_registry", {})
+    monkeypatch.setattr(metrics, "_collectors", [])
+
+
+def test_render() -> None:
+    cnt = metrics.counter("test_requests_total", "Handled requests.")
+    cnt.inc(method="GetScene")
+    cnt.inc(2, method='Get"Project"\\\n')  # sorted before GetScene
+
+    gauge = metrics.gauge("test_clients", "Connected clients.")
+    gauge.inc()
+    gauge.dec(3)
+
+    hist = metrics._registry["test_duration_seconds"] = metrics.Histogram(
+        "test_duration_seconds", "Duration.", buckets=(0.1, 1.0)
+    )
+    hist.observe(0.1, rpc="A")  # upper bounds are inclusive
+    hist.observe(0.5, rpc="A")
+    hist.observe(20, rpc="A")
+    hist.observe(0.05)
+
+    assert metrics.render() == "\n".join(
+        [
+            "# HELP test_clients Connected clients.",
+            "# TYPE test_clients gauge",
+            "test_clients -2.0",
+            "# HELP test_duration_seconds Duration.",
+            "# TYPE test_duration_seconds histogram",
+            'test_duration_seconds_bucket{le="0.1"} 1',
+            'test_duration_seconds_bucket{le="1.0"} 1',
+            'test_duration_seconds_bucket{le="+Inf"} 1',
+            "test_duration_seconds_sum 0.05",
+            "test_duration_seconds_count 1",
+            'test_duration_seconds_bucket{rpc="A",le="0.1"} 1',
+            'test_duration_seconds_bucket{rpc="A",le="1.0"} 2',
+            'test_duration_seconds_bucket{rpc="A",le="+Inf"} 3',
+            'test_duration_seconds_sum{rpc="A"} 20.6',
+            'test_duration_seconds_count{rpc="A"} 3',
+            "# HELP test_requests_total Handled requests.",
+            "# TYPE test_requests_total counter",
+            'test_requests_total{method="Get\\"Project\\"\\\\\\n"} 2.0',
+            'test_requests_total{method="GetScene"} 1.0',
+            "",
+        ]
+    )
+
+
+def test_collector() -> None:
+    gauge = metrics.gauge("test_queue", "Queue depth.")
+
+    @metrics.collector
+    def _collect() -> None:
+        gauge.set(5)
+
+    assert "test_queue 5.0\n" in metrics.render()
+
+
+def test_get() -> None:
+    cnt = metrics.counter("test_total", "Help.")
+
+    assert metrics.counter("test_total", "Help.") is cnt
+    assert metrics.registered() == [cnt]
+
+    with pytest.raises(metrics.MetricsException):
+        metrics.gauge("test_total", "Help.")  # Gauge is a subclass of Counter, but still a different type
+
+    with pytest.raises(metrics.MetricsException):
+        metrics.histogram("test_total", "Help.")
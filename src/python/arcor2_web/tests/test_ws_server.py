@@ -0,0 +1,99 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from arcor2_web import ws_server
+
+
+class SlowClient:
+    """Sends a message only when allowed to."""
+
+    def __init__(self) -> None:
+        self.remote_address = ("127.0.0.1", 12345)
+        self.sent: list[str] = []
+        self.closed: list[tuple[int, str]] = []
+        self.gate = asyncio.Event()
+
+    async def send(self, message: str) -> None:
+        await self.gate.wait()
+        self.sent.append(message)
+
+    async def close(self, code: int, reason: str) -> None:
+        self.closed.append((code, reason))
+
+
+class Logger:
+    def __init__(self) -> None:
+        self.warnings: list[str] = []
+
+    def warn(self, message: str) -> None:
+        self.warnings.append(message)
+
+
+async def _flush() -> None:
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_outbox_coalesces() -> None:
+    client: Any = SlowClient()
+    outbox = ws_server._Outbox(client, Logger())
+
+    outbox.put("m1")
+    outbox.put("joints1", key="joints")
+    outbox.put("m2")
+    outbox.put("joints2", key="joints")
+    outbox.put("m3")
+    outbox.put("joints3", key="joints")
+
+    assert outbox.depth == 4
+
+    client.gate.set()
+    await _flush()
+
+    # only the latest keyed message is sent, at the position of the first one
+    assert client.sent == ["m1", "joints3", "m2", "m3"]
+    assert outbox.depth == 0
+
+    outbox.put("joints4", key="joints")  # the previous one was already sent
+    await _flush()
+    assert client.sent[-1] == "joints4"
+
+    outbox.close()
+    assert not client.closed
+
+
+@pytest.mark.asyncio
+async def test_outbox_overflow(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ws_server, "SEND_QUEUE_SIZE", 3)
+
+    client: Any = SlowClient()
+    logger = Logger()
+    outbox = ws_server._Outbox(client, logger)
+
+    outbox.put("m0")
+    outbox.put("m1")
+
+    for idx in range(3):
+        outbox.put(f"state{idx}", key="state")  # coalesced, occupies one place
+
+    assert outbox.depth == 3
+    assert not client.closed
+
+    outbox.put("m2")
+    await _flush()
+
+    assert client.closed == [(1013, "Client does not keep up.")]
+    assert len(logger.warnings) == 1
+    assert outbox.depth == 0
+
+    outbox.put("m3")  # ignored, the connection is being closed
+    assert outbox.depth == 0
+
+    client.gate.set()
+    await _flush()
+    assert client.sent == []
+
+    outbox.close()
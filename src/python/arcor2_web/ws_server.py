@@ -1,19 +1,65 @@
 import asyncio
 import time
 from collections import deque
-from typing import Any, Awaitable, Callable, Coroutine, TypeVar
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Coroutine, Iterable, TypeVar
 
 import websockets
 from aiologger.levels import LogLevel
 from dataclasses_jsonschema import ValidationError
+from websockets.datastructures import Headers
 from websockets.server import WebSocketServerProtocol as WsClient
 
 from arcor2 import env, json
+from arcor2.data.codec import codec
+from arcor2.data.common import StrEnum
 from arcor2.data.events import Event
 from arcor2.data.rpc.common import RPC
 from arcor2.exceptions import Arcor2Exception
+from arcor2_web import metrics
 
 MAX_RPC_DURATION = env.get_float("ARCOR2_MAX_RPC_DURATION", 0.1)
+SEND_QUEUE_SIZE = max(env.get_int("ARCOR2_WS_SEND_QUEUE_SIZE", 1024), 1)
+COMPRESSION = env.get_bool("ARCOR2_WS_COMPRESSION", True)
+MAX_RPC_IN_FLIGHT = max(env.get_int("ARCOR2_MAX_RPC_IN_FLIGHT", 256), 1)
+MAX_CLIENT_RPC_IN_FLIGHT = max(env.get_int("ARCOR2_MAX_CLIENT_RPC_IN_FLIGHT", 16), 1)
+METRICS = env.get_bool("ARCOR2_METRICS", True)
+METRICS_PATH = "/metrics"
+
+
+class RpcClass(StrEnum):
+    """Concurrency class of an RPC, each one has its own limit of RPCs
+    being handled at once."""
+
+    CHEAP = "cheap"  # no I/O
+    READ = "read"  # mostly cached data
+    ROBOT = "robot"  # communication with robots/objects
+    STORAGE = "storage"  # writes to the Project service
+
+
+_RPC_CLASS_LIMITS: dict[RpcClass, int] = {
+    RpcClass.CHEAP: 256,
+    RpcClass.READ: 64,
+    RpcClass.ROBOT: 8,
+    RpcClass.STORAGE: 16,
+}
+
+_RPC_CLASS_ATTR = "__rpc_class__"
+
+_in_flight = asyncio.Semaphore(MAX_RPC_IN_FLIGHT)
+_class_semaphores = {
+    rpc_class: asyncio.Semaphore(max(env.get_int(f"ARCOR2_RPC_LIMIT_{rpc_class.name}", limit), 1))
+    for rpc_class, limit in _RPC_CLASS_LIMITS.items()
+}
+
+_RPC_DURATION = metrics.histogram("arcor2_rpc_duration_seconds", "Duration of RPC callbacks.")
+_RPC_WAIT = metrics.histogram("arcor2_rpc_wait_seconds", "Time from receiving an RPC until its callback is called.")
+_RPC_WAITING = metrics.gauge("arcor2_rpc_waiting", "RPCs waiting for a free slot of their concurrency class.")
+_IN_FLIGHT = metrics.gauge("arcor2_rpc_in_flight", "Messages being handled.")
+_RPC_REQUESTS = metrics.counter("arcor2_rpc_requests_total", "Handled RPCs.")
+_BROADCAST = metrics.histogram("arcor2_ws_broadcast_seconds", "Time to queue a message for all the clients.")
+_SEND_QUEUE = metrics.gauge("arcor2_ws_send_queue_messages", "Messages waiting to be sent, over all clients.")
+_CLIENTS = metrics.gauge("arcor2_ws_clients", "Connected clients.")
 
 RPCT = TypeVar("RPCT", bound=RPC)
 ReqT = TypeVar("ReqT", bound=RPC.Request)
@@ -25,6 +71,22 @@ RPC_DICT_TYPE = dict[str, tuple[type[RPC], RPC_CB]]
 EventT = TypeVar("EventT", bound=Event)
 EVENT_DICT_TYPE = dict[str, tuple[type[EventT], Callable[[EventT, WsClient], Coroutine[Any, Any, None]]]]
 
+BINARY_CB = Callable[[bytes, WsClient], Awaitable[None]]
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def rpc_class(cls: RpcClass) -> Callable[[F], F]:
+    """Sets concurrency class of the RPC callback (RpcClass.READ is the
+    default)."""
+
+    def decorator(cb: F) -> F:
+        setattr(cb, _RPC_CLASS_ATTR, cls)
+        return cb
+
+    return decorator
+
 
 def custom_exception_handler(loop: asyncio.AbstractEventLoop, context: dict[str, Any]) -> None:
     # it is also possible to use aiorun.run with stop_on_unhandled_errors=True but this prints much more useful info
@@ -34,13 +96,131 @@ def custom_exception_handler(loop: asyncio.AbstractEventLoop, context: dict[str,
         loop.stop()
 
 
-async def send_json_to_client(client: WsClient, data: str) -> None:
+class _Outbox:
+    """Outgoing messages of one client, sent by its own task.
+
+    Sending to a client thus never waits for other (possibly slow)
+    clients. Messages with a key (e.g. periodic robot joints) are
+    coalesced - if a message with the same key is still waiting, it is
+    replaced by the new one. When there are too many waiting messages,
+    the connection is closed, as the client would miss some state
+    changes anyway.
+    """
+
+    __slots__ = ("client", "logger", "_messages", "_latest", "_wakeup", "_task", "_overflowed")
+
+    def __init__(self, client: WsClient, logger: Any) -> None:
+        self.client = client
+        self.logger = logger
+        self._messages: deque[tuple[None | str, str]] = deque()  # (key, message), keyed messages are in _latest
+        self._latest: dict[str, str] = {}
+        self._wakeup = asyncio.Event()
+        self._overflowed = False
+        self._task = asyncio.create_task(self._writer())
+
+    def put(self, message: str, key: None | str = None) -> None:
+        if self._overflowed:
+            return
+
+        if key is not None:
+            if key in self._latest:
+                self._latest[key] = message  # the waiting one is outdated
+                return
+            self._latest[key] = message
+
+        if len(self._messages) >= SEND_QUEUE_SIZE:
+            self._overflowed = True
+            self._messages.clear()
+            self._latest.clear()
+            self.logger.warn(f"Client {self.client.remote_address} does not keep up, closing the connection.")
+            asyncio.create_task(self.client.close(1013, "Client does not keep up."))
+            return
+
+        self._messages.append((key, message))
+        self._wakeup.set()
+
+    @property
+    def depth(self) -> int:
+        return len(self._messages)
+
+    def close(self) -> None:
+        self._task.cancel()
+
+    async def _writer(self) -> None:
+        while True:
+            while not self._messages:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            key, message = self._messages.popleft()
+
+            if key is not None:
+                message = self._latest.pop(key)
+
+            try:
+                await self.client.send(message)
+            except websockets.exceptions.ConnectionClosed:
+                return
+
+
+_outboxes: dict[WsClient, _Outbox] = {}
+
+
+def send(client: WsClient, data: str, key: None | str = None) -> None:
+    """Queues the message for the client (handled by server()).
+
+    :param key: Messages with the same key are coalesced when the client lags behind.
+    """
+
     try:
-        await client.send(data)
-    except websockets.exceptions.ConnectionClosed:
+        _outboxes[client].put(data, key)
+    except KeyError:  # not connected (anymore)
         pass
 
 
+def broadcast(clients: Iterable[WsClient], data: str, key: None | str = None) -> None:
+    with _BROADCAST.time():
+        for client in clients:
+            send(client, data, key)
+
+
+@metrics.collector
+def _collect() -> None:
+    _SEND_QUEUE.set(sum(outbox.depth for outbox in list(_outboxes.values())))
+    _CLIENTS.set(len(_outboxes))
+
+
+async def _process_request(
+    path: str, request_headers: Headers
+) -> None | tuple[HTTPStatus, list[tuple[str, str]], bytes]:
+    """Serves metrics over plain HTTP, other requests continue with the
+    WebSocket handshake."""
+
+    if path != METRICS_PATH:
+        return None
+
+    return HTTPStatus.OK, [("Content-Type", metrics.CONTENT_TYPE)], metrics.render().encode()
+
+
+async def send_json_to_client(client: WsClient, data: str) -> None:
+    send(client, data)
+
+
+def serve_options() -> dict[str, Any]:
+    """Keyword arguments for websockets.server.serve.
+
+    Messages are compressed (permessage-deflate) for clients supporting
+    it, unless disabled by ARCOR2_WS_COMPRESSION. Metrics are available
+    at /metrics (Prometheus text format), unless disabled by
+    ARCOR2_METRICS.
+    """
+
+    opts: dict[str, Any] = {"compression": "deflate" if COMPRESSION else None}
+    if METRICS:
+        opts["process_request"] = _process_request
+    return opts
+
+
 async def server(
     client: Any,
     logger: Any,
@@ -49,8 +229,16 @@ async def server(
     rpc_dict: RPC_DICT_TYPE,
     event_dict: None | EVENT_DICT_TYPE = None,
     verbose: bool = False,
+    binary_cb: None | BINARY_CB = None,
 ) -> None:
-    async def handle_message(msg: str) -> None:
+    """Handles one client.
+
+    :param binary_cb: Called for binary messages. Unlike RPCs, they are handled one by one,
+        in order and before reading the next message (so e.g. chunks of a file are written before an RPC
+        finishing the upload is handled).
+    """
+
+    async def handle_message(msg: str, received: float) -> None:
         try:
             data = json.loads(msg)
         except json.JsonException as e:
@@ -81,17 +269,31 @@ async def server(
             except Arcor2Exception as e:
                 # this might happen if e.g. some dataclass does additional validation of values in its __post_init__
                 try:
-                    await client.send(rpc_cls.Response(data["id"], False, messages=[str(e)]).to_json())
+                    send(client, rpc_cls.Response(data["id"], False, messages=[str(e)]).to_json())
                     logger.debug(e, exc_info=True)
-                except (KeyError, websockets.exceptions.ConnectionClosed):
+                except KeyError:
                     pass
                 return
 
             else:
+                cls = getattr(rpc_cb, _RPC_CLASS_ATTR, RpcClass.READ)
+
                 try:
-                    rpc_start = time.monotonic()
-                    resp = await rpc_cb(req, client)
-                    rpc_dur = time.monotonic() - rpc_start
+                    _RPC_WAITING.inc(rpc_class=cls)
+                    try:
+                        await _class_semaphores[cls].acquire()
+                    finally:
+                        _RPC_WAITING.dec(rpc_class=cls)
+
+                    try:
+                        rpc_start = time.monotonic()
+                        _RPC_WAIT.observe(rpc_start - received, rpc_class=cls)
+                        resp = await rpc_cb(req, client)
+                    finally:
+                        _class_semaphores[cls].release()
+                        rpc_dur = time.monotonic() - rpc_start
+                        _RPC_DURATION.observe(rpc_dur, rpc=req_type)
+
                     if rpc_dur > MAX_RPC_DURATION:
                         logger.warn(f"{req.request} callback took {rpc_dur:.3f}s.")
 
@@ -105,10 +307,9 @@ async def server(
                         assert isinstance(resp, rpc_cls.Response)
                         resp.id = req.id
 
-            try:
-                await client.send(resp.to_json())
-            except websockets.exceptions.ConnectionClosed:
-                return
+                _RPC_REQUESTS.inc(rpc=req_type, result="ok" if resp.result else "failed")
+
+            send(client, codec(type(resp), camel=False).dumps(resp).decode())
 
             if logger.level == LogLevel.DEBUG:
                 # Silencing of repetitive log messages
@@ -164,15 +365,48 @@ async def server(
     req_last_ts: dict[str, deque] = {}
     ignored_reqs: set[str] = set()
 
+    # RPCs are handled concurrently, but when there are too many of them, reading from the client is paused
+    client_slots = asyncio.Semaphore(MAX_CLIENT_RPC_IN_FLIGHT)
+
+    async def handle(msg: str, received: float) -> None:
+        try:
+            await handle_message(msg, received)
+        finally:
+            _IN_FLIGHT.dec()
+            _in_flight.release()
+            client_slots.release()
+
+    async def handle_binary(data: bytes) -> None:
+        if binary_cb is None:
+            logger.error("Binary messages are not supported.")
+            return
+
+        try:
+            await binary_cb(data, client)
+        except Arcor2Exception as e:
+            logger.error(f"Failed to handle binary message: {e}")
+            logger.debug(e, exc_info=True)
+
+    _outboxes[client] = _Outbox(client, logger)
+
     try:
         await register(client)
 
         loop = asyncio.get_event_loop()
 
         async for message in client:
-            loop.create_task(handle_message(message))
+            if isinstance(message, bytes):
+                await handle_binary(message)
+                continue
+
+            received = time.monotonic()
+            await client_slots.acquire()
+            await _in_flight.acquire()
+            _IN_FLIGHT.inc()
+            loop.create_task(handle(message, received))
 
     except websockets.exceptions.ConnectionClosed:
         pass
     finally:
         await unregister(client)
+        _outboxes.pop(client).close()